@@ -0,0 +1,8 @@
+"""
+离线基准测试套件
+
+- harness.py: 注册、运行、保存和对比基准测试结果
+- bench_micro.py: 缓存查找、前复权、技术指标、新闻去重和报告序列化等热点路径
+- bench_propagate.py: 回放LLM + 录制数据源的完整 propagate 运行
+- run_benchmarks.py: 命令行入口
+"""
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+热点路径微基准测试
+全部使用本地生成的确定性数据，不访问任何数据源
+"""
+
+import atexit
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+from .harness import benchmark
+
+SYMBOL = "000001"
+
+
+def _temp_dir() -> str:
+    path = tempfile.mkdtemp(prefix="ta_bench_")
+    atexit.register(shutil.rmtree, path, True)
+    return path
+
+
+def _daily_bars(rows: int = 750, seed: int = 7):
+    """生成A股日线数据（含除权跳空），列与Tushare daily接口一致"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    pct_chg = rng.normal(0, 1.6, rows).clip(-10, 10)
+    close = 12.0 * np.cumprod(1 + pct_chg / 100)
+    # 每年一次分红除权：原始价格跳空，pct_chg 仍为复权后的真实涨跌幅
+    for ex_day in range(240, rows, 240):
+        close[ex_day:] *= 0.95
+    open_ = close * (1 + rng.normal(0, 0.005, rows))
+    dates = pd.bdate_range("2022-07-01", periods=rows)
+    return pd.DataFrame({
+        'ts_code': f"{SYMBOL}.SZ",
+        'trade_date': dates.strftime('%Y%m%d'),
+        'open': open_.round(2),
+        'high': (np.maximum(open_, close) * 1.01).round(2),
+        'low': (np.minimum(open_, close) * 0.99).round(2),
+        'close': close.round(2),
+        'pct_chg': pct_chg.round(2),
+        'vol': rng.integers(500_000, 2_000_000, rows),
+    })
+
+
+def _ohlcv(rows: int = 250):
+    """yfinance格式的日线数据（DatetimeIndex + 首字母大写列名）"""
+    bars = _daily_bars(rows)
+    import pandas as pd
+    frame = pd.DataFrame({
+        'Open': bars['open'].values,
+        'High': bars['high'].values,
+        'Low': bars['low'].values,
+        'Close': bars['close'].values,
+        'Adj Close': bars['close'].values,
+        'Volume': bars['vol'].values,
+    }, index=pd.to_datetime(bars['trade_date']))
+    return frame
+
+
+# ---------------------------------------------------------------- 缓存查找
+
+@benchmark("cache.find_cached_stock_data", number=50)
+def bench_cache_find():
+    from tradingagents.dataflows.cache_manager import StockDataCache
+
+    cache = StockDataCache(cache_dir=_temp_dir())
+    bars = _daily_bars(60)
+    # 200只股票的缓存条目，查找其中一只
+    for i in range(200):
+        cache.save_stock_data(f"{600000 + i}", bars, "2025-04-01", "2025-07-01", "tushare")
+    cache.save_stock_data(SYMBOL, bars, "2025-04-01", "2025-07-01", "tushare")
+
+    return lambda: cache.find_cached_stock_data(SYMBOL, "2025-04-01", "2025-07-01", "tushare")
+
+
+@benchmark("cache.load_stock_data", number=50)
+def bench_cache_load():
+    from tradingagents.dataflows.cache_manager import StockDataCache
+
+    cache = StockDataCache(cache_dir=_temp_dir())
+    cache_key = cache.save_stock_data(SYMBOL, _daily_bars(250), "2024-07-01", "2025-07-01", "tushare")
+    return lambda: cache.load_stock_data(cache_key)
+
+
+# ---------------------------------------------------------------- 价格与指标计算
+
+@benchmark("tushare.forward_adjusted_prices", number=3, repeat=3)
+def bench_forward_adjusted():
+    from tradingagents.dataflows.tushare_utils import TushareProvider
+
+    # 只用到纯计算方法，不需要连接Tushare
+    provider = TushareProvider.__new__(TushareProvider)
+    bars = _daily_bars(750)
+    return lambda: provider._calculate_forward_adjusted_prices(bars)
+
+
+@benchmark("indicators.tdx_technical_indicators", number=50)
+def bench_tdx_indicators():
+    from tradingagents.dataflows.tdx_utils import TongDaXinDataProvider
+
+    provider = TongDaXinDataProvider.__new__(TongDaXinDataProvider)
+    history = _ohlcv(120)
+    provider.get_stock_history_data = lambda *args, **kwargs: history
+    return lambda: provider.get_stock_technical_indicators(SYMBOL, period=60)
+
+
+@benchmark("indicators.us_format_stock_data", number=20)
+def bench_us_format():
+    from tradingagents.dataflows.optimized_us_data import OptimizedUSDataProvider
+
+    provider = OptimizedUSDataProvider.__new__(OptimizedUSDataProvider)
+    history = _ohlcv(250)
+    return lambda: provider._format_stock_data("AAPL", history.copy(), "2024-07-01", "2025-07-01")
+
+
+# ---------------------------------------------------------------- 新闻去重与评分
+
+def _news_titles(count: int = 500):
+    topics = ["业绩预告", "董事会决议", "股东增持", "回购进展", "行业点评", "指数基金调仓", "资金流向", "研报"]
+    return [f"平安银行{topics[i % len(topics)]}：第{i % (count // 2)}期市场观察与投资要点"
+            for i in range(count)]
+
+
+@benchmark("news.deduplicate_and_score", number=20)
+def bench_news_dedup():
+    from tradingagents.dataflows.realtime_news_utils import NewsItem, RealtimeNewsAggregator
+
+    aggregator = RealtimeNewsAggregator()
+    now = datetime(2025, 7, 1, 15, 0)
+    items = [NewsItem(title=title, content=title * 3, source="东方财富",
+                      publish_time=now - timedelta(minutes=i), url=f"https://example.com/{i}",
+                      urgency="low", relevance_score=0.0)
+             for i, title in enumerate(_news_titles())]
+
+    def run():
+        unique = aggregator._deduplicate_news(items)
+        return [aggregator._calculate_relevance(item.title, SYMBOL) for item in unique]
+    return run
+
+
+@benchmark("news.relevance_filter", number=5, repeat=3)
+def bench_news_filter():
+    import pandas as pd
+    from tradingagents.utils.news_filter import NewsRelevanceFilter
+
+    titles = _news_titles()
+    news_df = pd.DataFrame({'新闻标题': titles, '新闻内容': [t * 5 for t in titles]})
+    news_filter = NewsRelevanceFilter(SYMBOL, "平安银行")
+    return lambda: news_filter.filter_news(news_df, min_score=30)
+
+
+# ---------------------------------------------------------------- 报告序列化
+
+def _final_state():
+    from .stubs import load_fixture
+
+    script = load_fixture("llm_000001.json")
+    reports = {c['name']: c['content'] * 8 for c in script['completions']}
+    return {
+        "company_of_interest": SYMBOL,
+        "trade_date": "2025-07-01",
+        "market_report": reports['market_analyst'],
+        "sentiment_report": reports['social_media_analyst'],
+        "news_report": reports['news_analyst'],
+        "fundamentals_report": reports['fundamentals_analyst'],
+        "investment_debate_state": {
+            "bull_history": reports['bull_researcher'],
+            "bear_history": reports['bear_researcher'],
+            "history": reports['bull_researcher'] + reports['bear_researcher'],
+            "current_response": reports['bear_researcher'],
+            "judge_decision": reports['research_manager'],
+        },
+        "trader_investment_plan": reports['trader'],
+        "investment_plan": reports['research_manager'],
+        "risk_debate_state": {
+            "risky_history": reports['risky_debator'],
+            "safe_history": reports['safe_debator'],
+            "neutral_history": reports['neutral_debator'],
+            "history": reports['risky_debator'] + reports['safe_debator'] + reports['neutral_debator'],
+            "judge_decision": reports['risk_manager'],
+        },
+        "final_trade_decision": reports['risk_manager'],
+    }
+
+
+@benchmark("report.state_json", number=200)
+def bench_state_json():
+    state = {"2025-07-01": _final_state()}
+    return lambda: json.dumps(state, indent=4)
+
+
+@benchmark("report.markdown_export", number=50)
+def bench_markdown_report():
+    # 报告导出模块依赖 streamlit，未安装时跳过
+    from web.utils.report_exporter import ReportExporter
+
+    exporter = ReportExporter()
+    results = {
+        'stock_symbol': SYMBOL,
+        'decision': {'action': '买入', 'confidence': 0.72, 'risk_score': 0.38,
+                     'target_price': 13.2, 'reasoning': '估值处于历史低位'},
+        'state': _final_state(),
+        'llm_provider': 'replay',
+        'llm_model': 'replay-000001',
+        'analysts': ['market', 'fundamentals'],
+        'research_depth': 3,
+    }
+    return lambda: exporter.generate_markdown_report(results)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+端到端基准测试
+用回放LLM和录制的数据源响应离线运行一次完整的 TradingAgentsGraph.propagate
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+from .harness import benchmark
+from .stubs import fixture_path, load_fixture, offline_providers
+
+
+def build_offline_graph(selected_analysts=("market", "fundamentals"), latency: float = 0.0):
+    """创建使用回放LLM的分析图（关闭记忆，避免调用嵌入服务）"""
+    from tradingagents.default_config import DEFAULT_CONFIG
+    from tradingagents.graph.trading_graph import TradingAgentsGraph
+
+    work_dir = tempfile.mkdtemp(prefix="ta_bench_e2e_")
+    atexit.register(shutil.rmtree, work_dir, True)
+
+    config = DEFAULT_CONFIG.copy()
+    config.update({
+        "llm_provider": "replay",
+        "deep_think_llm": "replay-000001",
+        "quick_think_llm": "replay-000001",
+        "replay_script": fixture_path("llm_000001.json"),
+        "replay_latency": latency,
+        "memory_enabled": False,
+        "online_tools": True,
+        "max_debate_rounds": 1,
+        "max_risk_discuss_rounds": 1,
+        "results_dir": os.path.join(work_dir, "results"),
+        "data_cache_dir": os.path.join(work_dir, "data_cache"),
+    })
+    return TradingAgentsGraph(list(selected_analysts), config=config), work_dir
+
+
+@benchmark("e2e.propagate_000001", number=1, repeat=3, group="e2e")
+def bench_propagate():
+    graph, work_dir = build_offline_graph()
+    providers = load_fixture("providers_000001.json")
+
+    def run():
+        # _log_state 以当前目录为根写入 eval_results/，切换到临时目录避免污染工作区
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            with offline_providers(providers):
+                return graph.propagate("000001", "2025-07-01")
+        finally:
+            os.chdir(cwd)
+    return run
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+基准测试框架
+注册、运行基准测试并输出/对比JSON结果
+
+基准测试函数负责准备数据并返回一个无参可调用对象，框架对其计时：
+    @benchmark("cache.find_cached_stock_data", number=200)
+    def bench_find():
+        cache = ...
+        return lambda: cache.find_cached_stock_data("000001", ...)
+
+缺少可选依赖（ImportError）的基准测试记为 skipped，不影响其他测试。
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    number: int
+    repeat: int
+    group: str
+
+
+_REGISTRY: List[Benchmark] = []
+
+
+def benchmark(name: str, number: int = 100, repeat: int = 5, group: str = "micro"):
+    """注册基准测试：number 为每轮调用次数，repeat 为轮数"""
+    def decorator(setup: Callable[[], Callable[[], Any]]):
+        _REGISTRY.append(Benchmark(name, setup, number, repeat, group))
+        return setup
+    return decorator
+
+
+def get_benchmarks(pattern: Optional[str] = None, group: Optional[str] = None) -> List[Benchmark]:
+    return [b for b in _REGISTRY
+            if (pattern is None or pattern in b.name) and (group is None or b.group == group)]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run_benchmark(bench: Benchmark, scale: float = 1.0) -> Dict[str, Any]:
+    """运行单个基准测试，返回每次调用耗时的统计（毫秒）"""
+    try:
+        func = bench.setup()
+    except ImportError as e:
+        return {'status': 'skipped', 'reason': f"缺少依赖: {e}"}
+    except Exception as e:
+        return {'status': 'error', 'reason': f"准备失败: {e}", 'traceback': traceback.format_exc()}
+
+    number = max(1, int(bench.number * scale))
+    per_call_ms = []
+    try:
+        # 预热一次，排除首次导入和缓存建立的开销
+        func()
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(bench.repeat):
+                start = time.perf_counter()
+                for _ in range(number):
+                    func()
+                per_call_ms.append((time.perf_counter() - start) * 1000 / number)
+        finally:
+            if gc_enabled:
+                gc.enable()
+    except Exception as e:
+        return {'status': 'error', 'reason': str(e), 'traceback': traceback.format_exc()}
+
+    return {
+        'status': 'ok',
+        'group': bench.group,
+        'number': number,
+        'repeat': bench.repeat,
+        'mean_ms': statistics.mean(per_call_ms),
+        'min_ms': min(per_call_ms),
+        'p50_ms': statistics.median(per_call_ms),
+        'p95_ms': percentile(per_call_ms, 95),
+        'stdev_ms': statistics.stdev(per_call_ms) if len(per_call_ms) > 1 else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_all(benchmarks: List[Benchmark], scale: float = 1.0, verbose: bool = True) -> Dict[str, Any]:
+    """运行一组基准测试并返回完整结果（含环境信息）"""
+    results = {}
+    for bench in benchmarks:
+        result = run_benchmark(bench, scale)
+        results[bench.name] = result
+        if verbose:
+            if result['status'] == 'ok':
+                print(f"  {bench.name:<45} p50 {result['p50_ms']:10.3f}ms  min {result['min_ms']:10.3f}ms")
+            else:
+                print(f"  {bench.name:<45} {result['status']}: {result['reason']}")
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'scale': scale,
+        },
+        'benchmarks': results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    与基线结果对比（按p50），返回变化超过阈值的基准测试
+
+    Returns:
+        [{'name', 'baseline_ms', 'current_ms', 'change', 'regression'}]
+    """
+    changes = []
+    for name, result in current['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if result.get('status') != 'ok' or not base or base.get('status') != 'ok':
+            continue
+        change = (result['p50_ms'] - base['p50_ms']) / base['p50_ms'] if base['p50_ms'] else 0.0
+        if abs(change) >= threshold:
+            changes.append({
+                'name': name,
+                'baseline_ms': base['p50_ms'],
+                'current_ms': result['p50_ms'],
+                'change': change,
+                'regression': change > 0,
+            })
+    return changes
+
+
+def save_results(results: Dict[str, Any], path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+并发分析压测
+
+并发执行 N 次 run_stock_analysis，统计吞吐量、p50/p95 延迟和每次分析的内存占用。
+配合录制/回放（tradingagents/utils/cassette.py）使用，不消耗 Token、不触发数据源限流：
+
+    # 1. 录制：真实调用一次，保存LLM、向量化和数据源的请求与响应
+    python -m benchmarks.load_driver --mode record --requests 1 --concurrency 1 --cassette-dir cassettes/000001
+
+    # 2. 回放：按录制耗时注入延迟，32路并发执行200次分析
+    python -m benchmarks.load_driver --mode replay --requests 200 --concurrency 32 --cassette-dir cassettes/000001
+
+    # 固定延迟 / 缩放录制耗时
+    python -m benchmarks.load_driver --latency 0.5 ...
+    python -m benchmarks.load_driver --latency-scale 0.1 ...
+
+美股（--market-type 美股）在压测开始前用 yf.download 批量预取全部股票的行情并写入缓存（--no-prefetch 关闭）。
+
+说明：录制覆盖LLM适配器、记忆向量化和 DataSourceManager（A股行情与基本信息）；
+新闻、基本面财务数据等其他数据接口仍会访问网络，回放时建议选择 market/fundamentals 分析师并使用A股代码。
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.harness import percentile, save_results
+
+
+def _current_rss() -> int:
+    """当前进程常驻内存（字节）"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        import resource
+        # Linux 下 ru_maxrss 单位为KB，只能得到峰值
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemorySampler:
+    """后台线程定时采样进程内存，记录峰值"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.baseline = _current_rss()
+        self.peak = self.baseline
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _current_rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _current_rss())
+
+
+def _run_one(index: int, symbol: str, args) -> Dict[str, Any]:
+    from web.utils.analysis_runner import run_stock_analysis
+
+    start = time.perf_counter()
+    try:
+        result = run_stock_analysis(
+            stock_symbol=symbol,
+            analysis_date=args.date,
+            analysts=args.analysts,
+            research_depth=args.research_depth,
+            llm_provider=args.provider,
+            llm_model=args.model,
+            market_type=args.market_type,
+        )
+        success, error = bool(result.get('success')), result.get('error')
+    except Exception as e:
+        success, error = False, f"{type(e).__name__}: {e}"
+    return {'index': index, 'symbol': symbol, 'success': success, 'error': error,
+            'duration': time.perf_counter() - start}
+
+
+def run_load(args) -> Dict[str, Any]:
+    """执行压测并返回统计结果"""
+    from tradingagents.utils.cassette import configure_cassette
+
+    cassette = configure_cassette(args.mode, args.cassette_dir, args.latency, args.latency_scale)
+    if args.mode == 'replay':
+        # run_stock_analysis 会检查API密钥是否配置，回放时不会真正使用
+        os.environ.setdefault('DASHSCOPE_API_KEY', 'replay')
+        os.environ.setdefault('FINNHUB_API_KEY', 'replay')
+
+    symbols = args.symbols
+    if args.prefetch and args.market_type == '美股' and args.mode != 'replay':
+        # 多只美股一次批量下载行情写入缓存，避免每次分析逐只请求 Yahoo Finance
+        from tradingagents.dataflows.optimized_us_data import prefetch_us_stock_data
+        start = time.perf_counter()
+        saved = prefetch_us_stock_data(symbols, args.date)
+        print(f"📦 批量预取: {sum(1 for n in saved.values() if n)}/{len(symbols)} 只美股行情, "
+              f"耗时 {time.perf_counter() - start:.2f}s")
+
+    for i in range(args.warmup):
+        warmup = _run_one(-1 - i, symbols[0], args)
+        print(f"🔥 预热 {i + 1}/{args.warmup}: {warmup['duration']:.2f}s {'✅' if warmup['success'] else '❌ ' + str(warmup['error'])}")
+
+    print(f"🚀 开始压测: {args.requests} 次分析, 并发 {args.concurrency}, 模式 {args.mode}")
+    runs: List[Dict[str, Any]] = []
+    with MemorySampler() as memory:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="load") as pool:
+            futures = [pool.submit(_run_one, i, symbols[i % len(symbols)], args) for i in range(args.requests)]
+            for future in as_completed(futures):
+                run = future.result()
+                runs.append(run)
+                print(f"  [{len(runs):>4}/{args.requests}] {run['symbol']} {run['duration']:.2f}s "
+                      f"{'✅' if run['success'] else '❌ ' + str(run['error'])}")
+        wall = time.perf_counter() - start
+
+    durations = [r['duration'] for r in runs]
+    succeeded = sum(1 for r in runs if r['success'])
+    in_flight = min(args.concurrency, args.requests)
+    return {
+        'config': {k: v for k, v in vars(args).items() if k != 'output'},
+        'requests': args.requests,
+        'succeeded': succeeded,
+        'failed': args.requests - succeeded,
+        'wall_seconds': wall,
+        'throughput_per_min': succeeded / wall * 60 if wall else 0.0,
+        'latency_p50_s': percentile(durations, 50),
+        'latency_p95_s': percentile(durations, 95),
+        'latency_max_s': max(durations),
+        'memory_baseline_mb': memory.baseline / 1024 / 1024,
+        'memory_peak_mb': memory.peak / 1024 / 1024,
+        # 峰值时约有 in_flight 个分析同时进行
+        'memory_per_analysis_mb': (memory.peak - memory.baseline) / 1024 / 1024 / in_flight,
+        'cassette': dict(cassette.stats) if cassette else None,
+        'errors': sorted({r['error'] for r in runs if r['error']}),
+    }
+
+
+def _latency(value: str) -> Optional[float]:
+    return None if value == 'recorded' else float(value)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="TradingAgents-CN 并发分析压测")
+    parser.add_argument('--requests', '-n', type=int, default=10, help="分析总次数")
+    parser.add_argument('--concurrency', '-c', type=int, default=4, help="并发数")
+    parser.add_argument('--symbols', type=lambda s: s.split(','), default=['000001'], help="股票代码，逗号分隔，轮流使用")
+    parser.add_argument('--date', default='2025-07-01', help="分析日期")
+    parser.add_argument('--analysts', type=lambda s: s.split(','), default=['market', 'fundamentals'],
+                        help="分析师，逗号分隔")
+    parser.add_argument('--research-depth', type=int, default=1)
+    parser.add_argument('--provider', default='dashscope', help="LLM提供商（回放时需与录制时一致以使用相同的提示词）")
+    parser.add_argument('--model', default='qwen-turbo')
+    parser.add_argument('--market-type', default='A股')
+    parser.add_argument('--mode', choices=['replay', 'record', 'off'], default='replay')
+    parser.add_argument('--cassette-dir', default='./cassettes', help="录制目录")
+    parser.add_argument('--latency', type=_latency, default=None,
+                        help="回放延迟：recorded（默认，按录制耗时）或固定秒数")
+    parser.add_argument('--latency-scale', type=float, default=1.0, help="回放延迟缩放系数")
+    parser.add_argument('--warmup', type=int, default=1, help="正式压测前的预热次数")
+    parser.add_argument('--no-prefetch', dest='prefetch', action='store_false',
+                        help="美股不在开始前批量预取行情")
+    parser.add_argument('--output', '-o', help="结果JSON输出路径")
+    args = parser.parse_args(argv)
+
+    report = run_load(args)
+
+    print(f"\n📊 压测结果 ({report['succeeded']}/{report['requests']} 成功, 耗时 {report['wall_seconds']:.1f}s)")
+    print(f"  吞吐量: {report['throughput_per_min']:.2f} 次/分钟")
+    print(f"  延迟: p50 {report['latency_p50_s']:.2f}s  p95 {report['latency_p95_s']:.2f}s  "
+          f"max {report['latency_max_s']:.2f}s")
+    print(f"  内存: 基线 {report['memory_baseline_mb']:.0f}MB  峰值 {report['memory_peak_mb']:.0f}MB  "
+          f"每次分析约 {report['memory_per_analysis_mb']:.1f}MB")
+    if report['cassette']:
+        print(f"  录制/回放: {json.dumps(report['cassette'], ensure_ascii=False)}")
+    for error in report['errors']:
+        print(f"  ❌ {error}")
+
+    if args.output:
+        save_results(report, args.output)
+        print(f"💾 结果已保存: {args.output}")
+    return 0 if report['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+运行离线基准测试
+
+用法:
+    python -m benchmarks.run_benchmarks --output results/bench/current.json
+    python -m benchmarks.run_benchmarks --group micro --filter cache
+    python -m benchmarks.run_benchmarks --baseline results/bench/baseline.json --threshold 0.2
+
+与基线对比时，p50 变慢超过阈值的基准测试视为性能回归，命令以非零状态退出。
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks import bench_micro, bench_propagate  # noqa: F401  注册基准测试
+from benchmarks.harness import compare, get_benchmarks, run_all, save_results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="TradingAgents-CN 离线基准测试")
+    parser.add_argument('--output', '-o', help="结果JSON输出路径")
+    parser.add_argument('--filter', '-k', help="只运行名称包含该字符串的基准测试")
+    parser.add_argument('--group', choices=['micro', 'e2e'], help="只运行指定分组")
+    parser.add_argument('--scale', type=float, default=1.0, help="调用次数缩放系数（CI中可设为0.2）")
+    parser.add_argument('--baseline', help="基线结果JSON，用于检测性能回归")
+    parser.add_argument('--threshold', type=float, default=0.2, help="回归阈值（相对变化，默认0.2即20%%）")
+    args = parser.parse_args(argv)
+
+    benchmarks = get_benchmarks(args.filter, args.group)
+    if not benchmarks:
+        print("❌ 没有匹配的基准测试")
+        return 2
+
+    print(f"🚀 运行 {len(benchmarks)} 个基准测试 (scale={args.scale})")
+    results = run_all(benchmarks, scale=args.scale)
+
+    if args.output:
+        save_results(results, args.output)
+        print(f"💾 结果已保存: {args.output}")
+
+    failed = [name for name, r in results['benchmarks'].items() if r['status'] == 'error']
+    for name in failed:
+        print(f"❌ {name} 运行失败:\n{results['benchmarks'][name].get('traceback', '')}")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        changes = compare(results, baseline, args.threshold)
+        print(f"\n📊 与基线对比 (阈值 {args.threshold:.0%}, 基线提交 {baseline.get('meta', {}).get('commit')}):")
+        if not changes:
+            print("  无明显变化")
+        for change in changes:
+            mark = "🔴 回归" if change['regression'] else "🟢 提升"
+            print(f"  {mark} {change['name']:<45} {change['baseline_ms']:.3f}ms -> "
+                  f"{change['current_ms']:.3f}ms ({change['change']:+.1%})")
+        regressions = [c for c in changes if c['regression']]
+
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+离线数据源桩
+用录制的数据源响应替换分析工具调用的数据接口，使 TradingAgentsGraph.propagate 可以完全离线运行
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Dict
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def fixture_path(name: str) -> str:
+    return os.path.join(FIXTURES_DIR, name)
+
+
+def load_fixture(name: str) -> Dict[str, Any]:
+    with open(fixture_path(name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@contextmanager
+def offline_providers(fixture: Dict[str, Any]):
+    """
+    在上下文内用录制的响应替换数据接口
+
+    替换的入口（工具函数在调用时才从这些模块导入，因此替换模块属性即可生效）：
+    - interface.get_china_stock_info_unified: 股票基本信息（公司名称）
+    - interface.get_china_stock_data_unified: 行情和技术指标
+    - OptimizedChinaDataProvider._generate_fundamentals_report: 基本面报告
+    """
+    from tradingagents.dataflows import interface
+    from tradingagents.dataflows.optimized_china_data import OptimizedChinaDataProvider
+
+    patches = [
+        (interface, 'get_china_stock_info_unified', lambda ticker: fixture['stock_info']),
+        (interface, 'get_china_stock_data_unified',
+         lambda ticker, start_date, end_date: fixture['stock_data']),
+        (OptimizedChinaDataProvider, '_generate_fundamentals_report',
+         lambda self, symbol, stock_data: fixture['fundamentals_report']),
+    ]
+    originals = [(target, name, getattr(target, name)) for target, name, _ in patches]
+    try:
+        for target, name, replacement in patches:
+            setattr(target, name, replacement)
+        yield
+    finally:
+        for target, name, original in originals:
+            setattr(target, name, original)
@@ -35,9 +35,11 @@ from cli.utils import (
     select_research_depth,
     select_shallow_thinking_agent,
 )
+from tradingagents.dataflows.cache_warmer import WARMUP_TASKS
 from tradingagents.default_config import DEFAULT_CONFIG
 from tradingagents.graph.trading_graph import TradingAgentsGraph
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.token_stream import token_stream
 
 # 加载环境变量
 load_dotenv()
@@ -150,6 +152,16 @@ app = typer.Typer(
 
 # Create a deque to store recent messages with a maximum length
 class MessageBuffer:
+    SECTION_TITLES = {
+        "market_report": "Market Analysis",
+        "sentiment_report": "Social Sentiment",
+        "news_report": "News Analysis",
+        "fundamentals_report": "Fundamentals Analysis",
+        "investment_plan": "Research Team Decision",
+        "trader_investment_plan": "Trading Team Plan",
+        "final_trade_decision": "Portfolio Management Decision",
+    }
+
     def __init__(self, max_length=DEFAULT_MESSAGE_BUFFER_SIZE):
         self.messages = deque(maxlen=max_length)
         self.tool_calls = deque(maxlen=max_length)
@@ -198,10 +210,18 @@ class MessageBuffer:
             self.agent_status[agent] = status
             self.current_agent = agent
 
-    def update_report_section(self, section_name, content):
-        if section_name in self.report_sections:
-            self.report_sections[section_name] = content
-            self._update_current_report()
+    def update_report_section(self, section_name, content, partial=False, agent=None):
+        if section_name not in self.report_sections:
+            return
+        if partial:
+            # 流式输出中的部分报告只刷新当前报告面板，完整报告在节点完成后写入
+            title = self.SECTION_TITLES[section_name]
+            if agent:
+                title = f"{title} - {agent}"
+            self.current_report = f"### {title} (生成中...)\n{content}"
+            return
+        self.report_sections[section_name] = content
+        self._update_current_report()
 
     def _update_current_report(self):
         # For the panel display, only show the most recently updated section
@@ -216,17 +236,8 @@ class MessageBuffer:
                
         if latest_section and latest_content:
             # Format the current section for display
-            section_titles = {
-                "market_report": "Market Analysis",
-                "sentiment_report": "Social Sentiment",
-                "news_report": "News Analysis",
-                "fundamentals_report": "Fundamentals Analysis",
-                "investment_plan": "Research Team Decision",
-                "trader_investment_plan": "Trading Team Plan",
-                "final_trade_decision": "Portfolio Management Decision",
-            }
             self.current_report = (
-                f"### {section_titles[latest_section]}\n{latest_content}"
+                f"### {self.SECTION_TITLES[latest_section]}\n{latest_content}"
             )
 
         # Update the final complete report
@@ -1264,305 +1275,323 @@ def run_analysis():
         # 跟踪已完成的分析师，避免重复提示
         completed_analysts = set()
 
-        for chunk in graph.graph.stream(init_agent_state, **args):
-            if len(chunk["messages"]) > 0:
-                # Get the last message from the chunk
-                last_message = chunk["messages"][-1]
+        # 绑定数据预获取阶段的运行上下文，分析师工具直接复用已获取的数据
+        data_context, context_token = graph.toolkit.begin_run(selections['ticker'], preparation_result.data_context)
 
-                # Extract message content and type
-                if hasattr(last_message, "content"):
-                    content = extract_content_string(last_message.content)  # Use the helper function
-                    msg_type = "Reasoning"
-                else:
-                    content = str(last_message)
-                    msg_type = "System"
-
-                # Add message to buffer
-                message_buffer.add_message(msg_type, content)                
-
-                # If it's a tool call, add it to tool calls
-                if hasattr(last_message, "tool_calls"):
-                    for tool_call in last_message.tool_calls:
-                        # Handle both dictionary and object tool calls
-                        if isinstance(tool_call, dict):
-                            message_buffer.add_tool_call(
-                                tool_call["name"], tool_call["args"]
-                            )
+        # 节点生成报告时流式刷新当前报告面板
+        def on_token_stream(event):
+            if event.section is None:
+                return
+            agent = "Portfolio Manager" if event.node == "Risk Judge" else event.node
+            if message_buffer.agent_status.get(agent) == "pending":
+                message_buffer.update_agent_status(agent, "in_progress")
+            message_buffer.update_report_section(event.section, event.text, partial=True, agent=agent)
+            update_display(layout)
+
+        try:
+            with token_stream(on_token_stream):
+                for chunk in graph.graph.stream(init_agent_state, **args):
+                    if len(chunk["messages"]) > 0:
+                        # Get the last message from the chunk
+                        last_message = chunk["messages"][-1]
+
+                        # Extract message content and type
+                        if hasattr(last_message, "content"):
+                            content = extract_content_string(last_message.content)  # Use the helper function
+                            msg_type = "Reasoning"
                         else:
-                            message_buffer.add_tool_call(tool_call.name, tool_call.args)
-
-                # Update reports and agent status based on chunk content
-                # Analyst Team Reports
-                if "market_report" in chunk and chunk["market_report"]:
-                    # 只在第一次完成时显示提示
-                    if "market_report" not in completed_analysts:
-                        ui.show_success("📈 市场分析完成")
-                        completed_analysts.add("market_report")
-                        # 调试信息（写入日志文件）
-                        logger.info(f"首次显示市场分析完成提示，已完成分析师: {completed_analysts}")
-                    else:
-                        # 调试信息（写入日志文件）
-                        logger.debug(f"跳过重复的市场分析完成提示，已完成分析师: {completed_analysts}")
-
-                    message_buffer.update_report_section(
-                        "market_report", chunk["market_report"]
-                    )
-                    message_buffer.update_agent_status("Market Analyst", "completed")
-                    # Set next analyst to in_progress
-                    if "social" in selections["analysts"]:
-                        message_buffer.update_agent_status(
-                            "Social Analyst", "in_progress"
-                        )
-
-                if "sentiment_report" in chunk and chunk["sentiment_report"]:
-                    # 只在第一次完成时显示提示
-                    if "sentiment_report" not in completed_analysts:
-                        ui.show_success("💭 情感分析完成")
-                        completed_analysts.add("sentiment_report")
-                        # 调试信息（写入日志文件）
-                        logger.info(f"首次显示情感分析完成提示，已完成分析师: {completed_analysts}")
-                    else:
-                        # 调试信息（写入日志文件）
-                        logger.debug(f"跳过重复的情感分析完成提示，已完成分析师: {completed_analysts}")
-
-                    message_buffer.update_report_section(
-                        "sentiment_report", chunk["sentiment_report"]
-                    )
-                    message_buffer.update_agent_status("Social Analyst", "completed")
-                    # Set next analyst to in_progress
-                    if "news" in selections["analysts"]:
-                        message_buffer.update_agent_status(
-                            "News Analyst", "in_progress"
-                        )
-
-                if "news_report" in chunk and chunk["news_report"]:
-                    # 只在第一次完成时显示提示
-                    if "news_report" not in completed_analysts:
-                        ui.show_success("📰 新闻分析完成")
-                        completed_analysts.add("news_report")
-                        # 调试信息（写入日志文件）
-                        logger.info(f"首次显示新闻分析完成提示，已完成分析师: {completed_analysts}")
-                    else:
-                        # 调试信息（写入日志文件）
-                        logger.debug(f"跳过重复的新闻分析完成提示，已完成分析师: {completed_analysts}")
-
-                    message_buffer.update_report_section(
-                        "news_report", chunk["news_report"]
-                    )
-                    message_buffer.update_agent_status("News Analyst", "completed")
-                    # Set next analyst to in_progress
-                    if "fundamentals" in selections["analysts"]:
-                        message_buffer.update_agent_status(
-                            "Fundamentals Analyst", "in_progress"
-                        )
-
-                if "fundamentals_report" in chunk and chunk["fundamentals_report"]:
-                    # 只在第一次完成时显示提示
-                    if "fundamentals_report" not in completed_analysts:
-                        ui.show_success("📊 基本面分析完成")
-                        completed_analysts.add("fundamentals_report")
-                        # 调试信息（写入日志文件）
-                        logger.info(f"首次显示基本面分析完成提示，已完成分析师: {completed_analysts}")
-                    else:
-                        # 调试信息（写入日志文件）
-                        logger.debug(f"跳过重复的基本面分析完成提示，已完成分析师: {completed_analysts}")
-
-                    message_buffer.update_report_section(
-                        "fundamentals_report", chunk["fundamentals_report"]
-                    )
-                    message_buffer.update_agent_status(
-                        "Fundamentals Analyst", "completed"
-                    )
-                    # Set all research team members to in_progress
-                    update_research_team_status("in_progress")
-
-                # Research Team - Handle Investment Debate State
-                if (
-                    "investment_debate_state" in chunk
-                    and chunk["investment_debate_state"]
-                ):
-                    debate_state = chunk["investment_debate_state"]
-
-                    # Update Bull Researcher status and report
-                    if "bull_history" in debate_state and debate_state["bull_history"]:
-                        # 显示研究团队开始工作
-                        if "research_team_started" not in completed_analysts:
-                            ui.show_progress("🔬 研究团队开始深度分析...")
-                            completed_analysts.add("research_team_started")
-
-                        # Keep all research team members in progress
-                        update_research_team_status("in_progress")
-                        # Extract latest bull response
-                        bull_responses = debate_state["bull_history"].split("\n")
-                        latest_bull = bull_responses[-1] if bull_responses else ""
-                        if latest_bull:
-                            message_buffer.add_message("Reasoning", latest_bull)
-                            # Update research report with bull's latest analysis
+                            content = str(last_message)
+                            msg_type = "System"
+
+                        # Add message to buffer
+                        message_buffer.add_message(msg_type, content)                
+
+                        # If it's a tool call, add it to tool calls
+                        if hasattr(last_message, "tool_calls"):
+                            for tool_call in last_message.tool_calls:
+                                # Handle both dictionary and object tool calls
+                                if isinstance(tool_call, dict):
+                                    message_buffer.add_tool_call(
+                                        tool_call["name"], tool_call["args"]
+                                    )
+                                else:
+                                    message_buffer.add_tool_call(tool_call.name, tool_call.args)
+
+                        # Update reports and agent status based on chunk content
+                        # Analyst Team Reports
+                        if "market_report" in chunk and chunk["market_report"]:
+                            # 只在第一次完成时显示提示
+                            if "market_report" not in completed_analysts:
+                                ui.show_success("📈 市场分析完成")
+                                completed_analysts.add("market_report")
+                                # 调试信息（写入日志文件）
+                                logger.info(f"首次显示市场分析完成提示，已完成分析师: {completed_analysts}")
+                            else:
+                                # 调试信息（写入日志文件）
+                                logger.debug(f"跳过重复的市场分析完成提示，已完成分析师: {completed_analysts}")
+
                             message_buffer.update_report_section(
-                                "investment_plan",
-                                f"### Bull Researcher Analysis\n{latest_bull}",
+                                "market_report", chunk["market_report"]
                             )
+                            message_buffer.update_agent_status("Market Analyst", "completed")
+                            # Set next analyst to in_progress
+                            if "social" in selections["analysts"]:
+                                message_buffer.update_agent_status(
+                                    "Social Analyst", "in_progress"
+                                )
+
+                        if "sentiment_report" in chunk and chunk["sentiment_report"]:
+                            # 只在第一次完成时显示提示
+                            if "sentiment_report" not in completed_analysts:
+                                ui.show_success("💭 情感分析完成")
+                                completed_analysts.add("sentiment_report")
+                                # 调试信息（写入日志文件）
+                                logger.info(f"首次显示情感分析完成提示，已完成分析师: {completed_analysts}")
+                            else:
+                                # 调试信息（写入日志文件）
+                                logger.debug(f"跳过重复的情感分析完成提示，已完成分析师: {completed_analysts}")
 
-                    # Update Bear Researcher status and report
-                    if "bear_history" in debate_state and debate_state["bear_history"]:
-                        # Keep all research team members in progress
-                        update_research_team_status("in_progress")
-                        # Extract latest bear response
-                        bear_responses = debate_state["bear_history"].split("\n")
-                        latest_bear = bear_responses[-1] if bear_responses else ""
-                        if latest_bear:
-                            message_buffer.add_message("Reasoning", latest_bear)
-                            # Update research report with bear's latest analysis
                             message_buffer.update_report_section(
-                                "investment_plan",
-                                f"{message_buffer.report_sections['investment_plan']}\n\n### Bear Researcher Analysis\n{latest_bear}",
+                                "sentiment_report", chunk["sentiment_report"]
                             )
+                            message_buffer.update_agent_status("Social Analyst", "completed")
+                            # Set next analyst to in_progress
+                            if "news" in selections["analysts"]:
+                                message_buffer.update_agent_status(
+                                    "News Analyst", "in_progress"
+                                )
+
+                        if "news_report" in chunk and chunk["news_report"]:
+                            # 只在第一次完成时显示提示
+                            if "news_report" not in completed_analysts:
+                                ui.show_success("📰 新闻分析完成")
+                                completed_analysts.add("news_report")
+                                # 调试信息（写入日志文件）
+                                logger.info(f"首次显示新闻分析完成提示，已完成分析师: {completed_analysts}")
+                            else:
+                                # 调试信息（写入日志文件）
+                                logger.debug(f"跳过重复的新闻分析完成提示，已完成分析师: {completed_analysts}")
 
-                    # Update Research Manager status and final decision
-                    if (
-                        "judge_decision" in debate_state
-                        and debate_state["judge_decision"]
-                    ):
-                        # 显示研究团队完成
-                        if "research_team" not in completed_analysts:
-                            ui.show_success("🔬 研究团队分析完成")
-                            completed_analysts.add("research_team")
-
-                        # Keep all research team members in progress until final decision
-                        update_research_team_status("in_progress")
-                        message_buffer.add_message(
-                            "Reasoning",
-                            f"Research Manager: {debate_state['judge_decision']}",
-                        )
-                        # Update research report with final decision
-                        message_buffer.update_report_section(
-                            "investment_plan",
-                            f"{message_buffer.report_sections['investment_plan']}\n\n### Research Manager Decision\n{debate_state['judge_decision']}",
-                        )
-                        # Mark all research team members as completed
-                        update_research_team_status("completed")
-                        # Set first risk analyst to in_progress
-                        message_buffer.update_agent_status(
-                            "Risky Analyst", "in_progress"
-                        )
-
-                # Trading Team
-                if (
-                    "trader_investment_plan" in chunk
-                    and chunk["trader_investment_plan"]
-                ):
-                    # 显示交易团队开始工作
-                    if "trading_team_started" not in completed_analysts:
-                        ui.show_progress("💼 交易团队制定投资计划...")
-                        completed_analysts.add("trading_team_started")
-
-                    # 显示交易团队完成
-                    if "trading_team" not in completed_analysts:
-                        ui.show_success("💼 交易团队计划完成")
-                        completed_analysts.add("trading_team")
-
-                    message_buffer.update_report_section(
-                        "trader_investment_plan", chunk["trader_investment_plan"]
-                    )
-                    # Set first risk analyst to in_progress
-                    message_buffer.update_agent_status("Risky Analyst", "in_progress")
-
-                # Risk Management Team - Handle Risk Debate State
-                if "risk_debate_state" in chunk and chunk["risk_debate_state"]:
-                    risk_state = chunk["risk_debate_state"]
-
-                    # Update Risky Analyst status and report
-                    if (
-                        "current_risky_response" in risk_state
-                        and risk_state["current_risky_response"]
-                    ):
-                        # 显示风险管理团队开始工作
-                        if "risk_team_started" not in completed_analysts:
-                            ui.show_progress("⚖️ 风险管理团队评估投资风险...")
-                            completed_analysts.add("risk_team_started")
-
-                        message_buffer.update_agent_status(
-                            "Risky Analyst", "in_progress"
-                        )
-                        message_buffer.add_message(
-                            "Reasoning",
-                            f"Risky Analyst: {risk_state['current_risky_response']}",
-                        )
-                        # Update risk report with risky analyst's latest analysis only
-                        message_buffer.update_report_section(
-                            "final_trade_decision",
-                            f"### Risky Analyst Analysis\n{risk_state['current_risky_response']}",
-                        )
-
-                    # Update Safe Analyst status and report
-                    if (
-                        "current_safe_response" in risk_state
-                        and risk_state["current_safe_response"]
-                    ):
-                        message_buffer.update_agent_status(
-                            "Safe Analyst", "in_progress"
-                        )
-                        message_buffer.add_message(
-                            "Reasoning",
-                            f"Safe Analyst: {risk_state['current_safe_response']}",
-                        )
-                        # Update risk report with safe analyst's latest analysis only
-                        message_buffer.update_report_section(
-                            "final_trade_decision",
-                            f"### Safe Analyst Analysis\n{risk_state['current_safe_response']}",
-                        )
-
-                    # Update Neutral Analyst status and report
-                    if (
-                        "current_neutral_response" in risk_state
-                        and risk_state["current_neutral_response"]
-                    ):
-                        message_buffer.update_agent_status(
-                            "Neutral Analyst", "in_progress"
-                        )
-                        message_buffer.add_message(
-                            "Reasoning",
-                            f"Neutral Analyst: {risk_state['current_neutral_response']}",
-                        )
-                        # Update risk report with neutral analyst's latest analysis only
-                        message_buffer.update_report_section(
-                            "final_trade_decision",
-                            f"### Neutral Analyst Analysis\n{risk_state['current_neutral_response']}",
-                        )
-
-                    # Update Portfolio Manager status and final decision
-                    if "judge_decision" in risk_state and risk_state["judge_decision"]:
-                        # 显示风险管理团队完成
-                        if "risk_management" not in completed_analysts:
-                            ui.show_success("⚖️ 风险管理团队分析完成")
-                            completed_analysts.add("risk_management")
-
-                        message_buffer.update_agent_status(
-                            "Portfolio Manager", "in_progress"
-                        )
-                        message_buffer.add_message(
-                            "Reasoning",
-                            f"Portfolio Manager: {risk_state['judge_decision']}",
-                        )
-                        # Update risk report with final decision only
-                        message_buffer.update_report_section(
-                            "final_trade_decision",
-                            f"### Portfolio Manager Decision\n{risk_state['judge_decision']}",
-                        )
-                        # Mark risk analysts as completed
-                        message_buffer.update_agent_status("Risky Analyst", "completed")
-                        message_buffer.update_agent_status("Safe Analyst", "completed")
-                        message_buffer.update_agent_status(
-                            "Neutral Analyst", "completed"
-                        )
-                        message_buffer.update_agent_status(
-                            "Portfolio Manager", "completed"
-                        )
-
-                # Update the display
-                update_display(layout)
-
-            trace.append(chunk)
+                            message_buffer.update_report_section(
+                                "news_report", chunk["news_report"]
+                            )
+                            message_buffer.update_agent_status("News Analyst", "completed")
+                            # Set next analyst to in_progress
+                            if "fundamentals" in selections["analysts"]:
+                                message_buffer.update_agent_status(
+                                    "Fundamentals Analyst", "in_progress"
+                                )
+
+                        if "fundamentals_report" in chunk and chunk["fundamentals_report"]:
+                            # 只在第一次完成时显示提示
+                            if "fundamentals_report" not in completed_analysts:
+                                ui.show_success("📊 基本面分析完成")
+                                completed_analysts.add("fundamentals_report")
+                                # 调试信息（写入日志文件）
+                                logger.info(f"首次显示基本面分析完成提示，已完成分析师: {completed_analysts}")
+                            else:
+                                # 调试信息（写入日志文件）
+                                logger.debug(f"跳过重复的基本面分析完成提示，已完成分析师: {completed_analysts}")
+
+                            message_buffer.update_report_section(
+                                "fundamentals_report", chunk["fundamentals_report"]
+                            )
+                            message_buffer.update_agent_status(
+                                "Fundamentals Analyst", "completed"
+                            )
+                            # Set all research team members to in_progress
+                            update_research_team_status("in_progress")
+
+                        # Research Team - Handle Investment Debate State
+                        if (
+                            "investment_debate_state" in chunk
+                            and chunk["investment_debate_state"]
+                        ):
+                            debate_state = chunk["investment_debate_state"]
+
+                            # Update Bull Researcher status and report
+                            if "bull_history" in debate_state and debate_state["bull_history"]:
+                                # 显示研究团队开始工作
+                                if "research_team_started" not in completed_analysts:
+                                    ui.show_progress("🔬 研究团队开始深度分析...")
+                                    completed_analysts.add("research_team_started")
+
+                                # Keep all research team members in progress
+                                update_research_team_status("in_progress")
+                                # Extract latest bull response
+                                bull_responses = debate_state["bull_history"].split("\n")
+                                latest_bull = bull_responses[-1] if bull_responses else ""
+                                if latest_bull:
+                                    message_buffer.add_message("Reasoning", latest_bull)
+                                    # Update research report with bull's latest analysis
+                                    message_buffer.update_report_section(
+                                        "investment_plan",
+                                        f"### Bull Researcher Analysis\n{latest_bull}",
+                                    )
+
+                            # Update Bear Researcher status and report
+                            if "bear_history" in debate_state and debate_state["bear_history"]:
+                                # Keep all research team members in progress
+                                update_research_team_status("in_progress")
+                                # Extract latest bear response
+                                bear_responses = debate_state["bear_history"].split("\n")
+                                latest_bear = bear_responses[-1] if bear_responses else ""
+                                if latest_bear:
+                                    message_buffer.add_message("Reasoning", latest_bear)
+                                    # Update research report with bear's latest analysis
+                                    message_buffer.update_report_section(
+                                        "investment_plan",
+                                        f"{message_buffer.report_sections['investment_plan']}\n\n### Bear Researcher Analysis\n{latest_bear}",
+                                    )
+
+                            # Update Research Manager status and final decision
+                            if (
+                                "judge_decision" in debate_state
+                                and debate_state["judge_decision"]
+                            ):
+                                # 显示研究团队完成
+                                if "research_team" not in completed_analysts:
+                                    ui.show_success("🔬 研究团队分析完成")
+                                    completed_analysts.add("research_team")
+
+                                # Keep all research team members in progress until final decision
+                                update_research_team_status("in_progress")
+                                message_buffer.add_message(
+                                    "Reasoning",
+                                    f"Research Manager: {debate_state['judge_decision']}",
+                                )
+                                # Update research report with final decision
+                                message_buffer.update_report_section(
+                                    "investment_plan",
+                                    f"{message_buffer.report_sections['investment_plan']}\n\n### Research Manager Decision\n{debate_state['judge_decision']}",
+                                )
+                                # Mark all research team members as completed
+                                update_research_team_status("completed")
+                                # Set first risk analyst to in_progress
+                                message_buffer.update_agent_status(
+                                    "Risky Analyst", "in_progress"
+                                )
+
+                        # Trading Team
+                        if (
+                            "trader_investment_plan" in chunk
+                            and chunk["trader_investment_plan"]
+                        ):
+                            # 显示交易团队开始工作
+                            if "trading_team_started" not in completed_analysts:
+                                ui.show_progress("💼 交易团队制定投资计划...")
+                                completed_analysts.add("trading_team_started")
+
+                            # 显示交易团队完成
+                            if "trading_team" not in completed_analysts:
+                                ui.show_success("💼 交易团队计划完成")
+                                completed_analysts.add("trading_team")
+
+                            message_buffer.update_report_section(
+                                "trader_investment_plan", chunk["trader_investment_plan"]
+                            )
+                            # Set first risk analyst to in_progress
+                            message_buffer.update_agent_status("Risky Analyst", "in_progress")
+
+                        # Risk Management Team - Handle Risk Debate State
+                        if "risk_debate_state" in chunk and chunk["risk_debate_state"]:
+                            risk_state = chunk["risk_debate_state"]
+
+                            # Update Risky Analyst status and report
+                            if (
+                                "current_risky_response" in risk_state
+                                and risk_state["current_risky_response"]
+                            ):
+                                # 显示风险管理团队开始工作
+                                if "risk_team_started" not in completed_analysts:
+                                    ui.show_progress("⚖️ 风险管理团队评估投资风险...")
+                                    completed_analysts.add("risk_team_started")
+
+                                message_buffer.update_agent_status(
+                                    "Risky Analyst", "in_progress"
+                                )
+                                message_buffer.add_message(
+                                    "Reasoning",
+                                    f"Risky Analyst: {risk_state['current_risky_response']}",
+                                )
+                                # Update risk report with risky analyst's latest analysis only
+                                message_buffer.update_report_section(
+                                    "final_trade_decision",
+                                    f"### Risky Analyst Analysis\n{risk_state['current_risky_response']}",
+                                )
+
+                            # Update Safe Analyst status and report
+                            if (
+                                "current_safe_response" in risk_state
+                                and risk_state["current_safe_response"]
+                            ):
+                                message_buffer.update_agent_status(
+                                    "Safe Analyst", "in_progress"
+                                )
+                                message_buffer.add_message(
+                                    "Reasoning",
+                                    f"Safe Analyst: {risk_state['current_safe_response']}",
+                                )
+                                # Update risk report with safe analyst's latest analysis only
+                                message_buffer.update_report_section(
+                                    "final_trade_decision",
+                                    f"### Safe Analyst Analysis\n{risk_state['current_safe_response']}",
+                                )
+
+                            # Update Neutral Analyst status and report
+                            if (
+                                "current_neutral_response" in risk_state
+                                and risk_state["current_neutral_response"]
+                            ):
+                                message_buffer.update_agent_status(
+                                    "Neutral Analyst", "in_progress"
+                                )
+                                message_buffer.add_message(
+                                    "Reasoning",
+                                    f"Neutral Analyst: {risk_state['current_neutral_response']}",
+                                )
+                                # Update risk report with neutral analyst's latest analysis only
+                                message_buffer.update_report_section(
+                                    "final_trade_decision",
+                                    f"### Neutral Analyst Analysis\n{risk_state['current_neutral_response']}",
+                                )
+
+                            # Update Portfolio Manager status and final decision
+                            if "judge_decision" in risk_state and risk_state["judge_decision"]:
+                                # 显示风险管理团队完成
+                                if "risk_management" not in completed_analysts:
+                                    ui.show_success("⚖️ 风险管理团队分析完成")
+                                    completed_analysts.add("risk_management")
+
+                                message_buffer.update_agent_status(
+                                    "Portfolio Manager", "in_progress"
+                                )
+                                message_buffer.add_message(
+                                    "Reasoning",
+                                    f"Portfolio Manager: {risk_state['judge_decision']}",
+                                )
+                                # Update risk report with final decision only
+                                message_buffer.update_report_section(
+                                    "final_trade_decision",
+                                    f"### Portfolio Manager Decision\n{risk_state['judge_decision']}",
+                                )
+                                # Mark risk analysts as completed
+                                message_buffer.update_agent_status("Risky Analyst", "completed")
+                                message_buffer.update_agent_status("Safe Analyst", "completed")
+                                message_buffer.update_agent_status(
+                                    "Neutral Analyst", "completed"
+                                )
+                                message_buffer.update_agent_status(
+                                    "Portfolio Manager", "completed"
+                                )
+
+                        # Update the display
+                        update_display(layout)
+
+                    trace.append(chunk)
+        finally:
+            # 分析中途出错时同样释放运行上下文
+            graph.toolkit.end_run(data_context, context_token)
 
         # 显示最终决策阶段
         ui.show_step_header(5, "投资决策生成 | Investment Decision Generation")
@@ -1864,6 +1893,60 @@ def data_config(
     logger.info(f"• 环境变量优先级最高 | Environment variables have highest priority")
 
 
+@app.command(
+    name="warm-cache",
+    help="盘前缓存预热 | Pre-market cache warming"
+)
+def warm_cache(
+    watchlist: Optional[str] = typer.Option(
+        None, "--watchlist", "-w",
+        help="自选股列表文件（默认读取 TRADINGAGENTS_WATCHLIST）| Watchlist file"),
+    symbols: Optional[str] = typer.Option(None, "--symbols", "-s", help="股票代码，逗号分隔 | Comma-separated symbols"),
+    date: Optional[str] = typer.Option(None, "--date", "-d", help="分析日期，默认今天 | Analysis date"),
+    tasks: str = typer.Option(",".join(WARMUP_TASKS), "--tasks", "-t", help="预热任务 | Warm-up tasks"),
+    workers: int = typer.Option(4, "--workers", help="同时处理的股票数 | Concurrent symbols"),
+    force: bool = typer.Option(False, "--force", "-f", help="忽略未过期的缓存 | Refresh even if cached"),
+    at: Optional[str] = typer.Option(None, "--at", help="常驻运行，每个工作日 HH:MM 预热 | Run daily at HH:MM"),
+):
+    """
+    按自选股列表预热行情、基本面、股票信息和新闻缓存
+    Warm price, fundamentals, stock info and news caches for a watchlist
+    """
+    from tradingagents.dataflows.cache_warmer import CacheWarmer, load_watchlist, run_daily
+
+    watchlist = watchlist or os.getenv("TRADINGAGENTS_WATCHLIST")
+
+    def make_warmer() -> CacheWarmer:
+        # 常驻模式下每次预热重新读取自选股列表
+        selected = [s.strip() for s in symbols.split(",") if s.strip()] if symbols else []
+        if watchlist:
+            selected += load_watchlist(watchlist)
+        if not selected:
+            raise typer.BadParameter("请通过 --watchlist、--symbols 或 TRADINGAGENTS_WATCHLIST 指定股票")
+        return CacheWarmer(selected, tasks=[t.strip() for t in tasks.split(",") if t.strip()],
+                           analysis_date=date, max_workers=workers, force_refresh=force)
+
+    if at:
+        make_warmer()  # 启动前校验参数
+        run_daily(at, make_warmer)
+        return
+
+    report = make_warmer().run()
+
+    table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED)
+    table.add_column("任务 | Task", style="cyan")
+    table.add_column("成功 | OK", style="green", justify="right")
+    table.add_column("失败 | Failed", style="red", justify="right")
+    table.add_column("跳过 | Skipped", style="yellow", justify="right")
+    for task, counts in report.coverage().items():
+        table.add_row(task, str(counts['ok']), str(counts['failed']), str(counts['skipped']))
+    console.print(table)
+    console.print(f"覆盖率 | Coverage: {report.coverage_ratio():.0%}  耗时 | Duration: {report.duration:.1f}s")
+    for result in report.results:
+        if result.status == 'failed':
+            console.print(f"[red]❌ {result.symbol} {result.task}: {result.detail}[/red]")
+
+
 @app.command(
     name="examples",
     help="示例程序 | Example programs"
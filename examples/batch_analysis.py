@@ -25,6 +25,23 @@ from langchain_core.messages import HumanMessage, SystemMessage
 # 加载环境变量
 load_dotenv()
 
+# 批量分析使用的模型（也作为缓存数据源标识的一部分）
+BATCH_MODEL = "qwen-turbo"
+
+
+def get_analysis_cache():
+    """启用MongoDB/Redis时返回数据库缓存，用于跳过当天已分析过的股票"""
+    try:
+        from tradingagents.config.database_manager import get_database_manager
+        if not get_database_manager().is_database_available():
+            return None
+        from tradingagents.dataflows.db_cache_manager import get_db_cache
+        return get_db_cache()
+    except Exception as e:
+        logger.warning(f"⚠️ 数据库缓存不可用，不缓存分析结果: {e}")
+        return None
+
+
 def batch_stock_analysis():
     """批量分析股票"""
     
@@ -48,18 +65,37 @@ def batch_stock_analysis():
     try:
         # 初始化模型
         llm = ChatDashScope(
-            model="qwen-turbo",  # 使用快速模型进行批量分析
+            model=BATCH_MODEL,  # 使用快速模型进行批量分析
             temperature=0.1,
             max_tokens=2000
         )
         
+        # 一次批量读取当天已缓存的分析结果（Redis MGET + MongoDB $in）
+        analysis_date = time.strftime("%Y-%m-%d")
+        data_source = f"batch_analysis:{BATCH_MODEL}"
+        analysis_cache = get_analysis_cache()
+        cached_results = {}
+        if analysis_cache is not None:
+            all_stocks = [stock for stocks in stock_portfolio.values() for stock in stocks]
+            keys = {stock: analysis_cache.cache_key("analysis_results", stock, analysis_date=analysis_date,
+                                                     data_source=data_source) for stock in all_stocks}
+            loaded = analysis_cache.mget(keys.values(), "analysis_results")
+            cached_results = {stock: loaded[key] for stock, key in keys.items() if key in loaded}
+            logger.info(f"💾 已缓存的分析结果: {len(cached_results)}/{len(all_stocks)} 只股票")
+        
         all_results = {}
+        new_results = []
         
         for category, stocks in stock_portfolio.items():
             logger.info(f"\n📊 正在分析 {category} 板块...")
             category_results = {}
             
             for i, stock in enumerate(stocks, 1):
+                if stock in cached_results:
+                    logger.info(f"  [{i}/{len(stocks)}] {stock} 使用缓存的分析结果")
+                    category_results[stock] = cached_results[stock]
+                    continue
+
                 logger.info(f"  [{i}/{len(stocks)}] 分析 {stock}...")
                 
                 # 简化的分析提示
@@ -77,6 +113,8 @@ def batch_stock_analysis():
                 try:
                     response = llm.invoke([HumanMessage(content=prompt)])
                     category_results[stock] = response.content
+                    new_results.append({"symbol": stock, "analysis": response.content,
+                                        "analysis_date": analysis_date, "data_source": data_source})
                     logger.info(f"    ✅ {stock} 分析完成")
                     
                     # 添加延迟避免API限制
@@ -88,6 +126,10 @@ def batch_stock_analysis():
             
             all_results[category] = category_results
         
+        # 新的分析结果一次批量写入（MongoDB bulk_write + Redis 管道）
+        if analysis_cache is not None and new_results:
+            analysis_cache.mset(new_results, "analysis_results")
+        
         # 生成汇总报告
         logger.info(f"\n📋 生成汇总报告...")
         generate_summary_report(all_results, llm)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+DatabaseCacheManager 测试用的 Redis/MongoDB 替身
+各替身记录往返次数（round_trips），用于断言批量读写的请求数
+"""
+
+from contextlib import contextmanager
+from unittest import mock
+
+from tradingagents.dataflows import db_cache_manager
+from tradingagents.dataflows.cache_codec import PayloadCodec
+from tradingagents.dataflows.db_cache_manager import DatabaseCacheManager
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.round_trips = 0
+
+    def get(self, key):
+        self.round_trips += 1
+        return self.values.get(key)
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.values.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        assert isinstance(value, str)
+        self.values[key] = value
+
+    def exists(self, key):
+        return key in self.values
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, ttl, value))
+
+    def execute(self):
+        self.redis.round_trips += 1
+        for key, ttl, value in self.commands:
+            self.redis.setex(key, ttl, value)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = {}
+        self.round_trips = 0
+
+    def bulk_write(self, requests, ordered=True):
+        self.round_trips += 1
+        for request in requests:
+            self.docs[request.filter["_id"]] = dict(request.replacement)
+
+    def find(self, query):
+        self.round_trips += 1
+        return [self.docs[key] for key in query["_id"]["$in"] if key in self.docs]
+
+    def find_one(self, query, sort=None):
+        return self.docs.get(query["_id"])
+
+
+class FakeReplaceOne:
+    """pymongo.ReplaceOne 的替身，保留构造参数供 FakeCollection.bulk_write 使用"""
+
+    def __init__(self, filter, replacement, upsert=False):
+        self.filter = filter
+        self.replacement = replacement
+        self.upsert = upsert
+
+
+@contextmanager
+def fake_replace_one():
+    """在上下文内让 DatabaseCacheManager 构造 FakeReplaceOne（未安装pymongo时同样可用）"""
+    with mock.patch.object(db_cache_manager, 'ReplaceOne', FakeReplaceOne, create=True):
+        yield
+
+
+class FakeMongoDB(dict):
+    def __getattr__(self, name):
+        return self[name]
+
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+def make_cache_manager(redis=True, mongodb=True) -> DatabaseCacheManager:
+    """不连接数据库的 DatabaseCacheManager，Redis/MongoDB 使用替身（关闭时传 False）"""
+    manager = DatabaseCacheManager.__new__(DatabaseCacheManager)
+    manager.codec = PayloadCodec(codec="zlib", min_bytes=1024)
+    manager.redis_client = FakeRedis() if redis else None
+    manager.mongodb_client = None
+    manager.mongodb_db = FakeMongoDB() if mongodb else None
+    manager._write_behind = None
+    return manager
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+基准测试框架测试
+测试计时统计、缺少依赖时跳过以及与基线对比的回归判断
+"""
+
+import os
+import sys
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from benchmarks.harness import Benchmark, compare, run_all, run_benchmark
+
+
+def test_run_benchmark_stats():
+    calls = []
+    bench = Benchmark("sum", lambda: (lambda: calls.append(sum(range(100)))), number=10, repeat=3, group="micro")
+    result = run_benchmark(bench)
+    assert result['status'] == 'ok'
+    # 预热1次 + 3轮×10次
+    assert len(calls) == 31
+    assert result['min_ms'] <= result['p50_ms'] <= result['p95_ms']
+
+
+def test_missing_dependency_skipped():
+    def setup():
+        import module_that_does_not_exist  # noqa: F401
+    result = run_benchmark(Benchmark("missing", setup, 1, 1, "micro"))
+    assert result['status'] == 'skipped'
+
+
+def test_compare_detects_regression():
+    current = run_all([], verbose=False)
+    current['benchmarks'] = {
+        'slow': {'status': 'ok', 'p50_ms': 1.5},
+        'fast': {'status': 'ok', 'p50_ms': 0.5},
+        'same': {'status': 'ok', 'p50_ms': 1.05},
+        'new': {'status': 'ok', 'p50_ms': 1.0},
+    }
+    baseline = {'benchmarks': {name: {'status': 'ok', 'p50_ms': 1.0} for name in ('slow', 'fast', 'same')}}
+    changes = {c['name']: c for c in compare(current, baseline, threshold=0.2)}
+    assert set(changes) == {'slow', 'fast'}
+    assert changes['slow']['regression'] and not changes['fast']['regression']
+
+
+if __name__ == "__main__":
+    test_run_benchmark_stats()
+    test_missing_dependency_skipped()
+    test_compare_detects_regression()
+    print("✅ 基准测试框架测试全部通过")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+数据库缓存负载压缩测试
+测试阈值压缩、DataFrame数据编码、旧格式记录兼容、未知格式拒绝，以及 DatabaseCacheManager 经 Redis/MongoDB 的单条和批量读写
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.cache_codec import PayloadCodec, to_redis_value
+from tests.db_cache_fakes import fake_replace_one, make_cache_manager
+
+REPORT = "## 新闻摘要\n" + "公司发布季度财报，营收同比增长。\n" * 200
+
+
+def test_threshold_and_stats():
+    codec = PayloadCodec(codec="zlib", min_bytes=1024)
+    small = codec.encode("短文本")
+    # 小负载不压缩，保持与旧版本一致的文本
+    assert small == {"data": "短文本", "data_format": "text", "compression": None}
+
+    large = codec.encode(REPORT)
+    assert large["compression"] == "zlib" and isinstance(large["data"], bytes)
+    assert codec.decode(large["data"], large["data_format"], large["compression"]) == REPORT
+
+    stats = codec.get_stats()
+    assert stats["encoded"] == 2 and stats["compressed"] == 1
+    assert stats["bytes_saved"] > 0 and stats["ratio"] < 1
+
+    # Redis中以base64保存
+    redis_value = to_redis_value(large)
+    assert isinstance(redis_value["data"], str)
+    assert codec.decode(redis_value["data"], redis_value["data_format"], redis_value["compression"]) == REPORT
+
+
+def test_dataframe_split_encoding():
+    codec = PayloadCodec(codec="zlib", min_bytes=1024)
+    frame = pd.DataFrame({"close": [10.5, 10.8], "volume": [1000, 1200], "trade_date": ["20250701", "20250702"]},
+                         index=pd.to_datetime(["2025-07-01", "2025-07-02"]))
+    encoded = codec.encode(frame)
+    assert encoded["data_format"] == "dataframe_split" and encoded["compression"] is None
+    assert isinstance(encoded["data"], str)
+    decoded = codec.decode(encoded["data"], encoded["data_format"], encoded["compression"])
+    # 保留索引和列类型（trade_date 不会被推断成整数）
+    pd.testing.assert_frame_equal(decoded, frame, check_freq=False)
+
+    # 长行情压缩后经Redis的base64读取（重复的日期索引不会丢失）
+    long_frame = pd.concat([frame] * 100)
+    redis_value = to_redis_value(codec.encode(long_frame))
+    assert redis_value["compression"] == "zlib"
+    decoded = codec.decode(redis_value["data"], redis_value["data_format"], redis_value["compression"])
+    pd.testing.assert_frame_equal(decoded, long_frame, check_freq=False)
+
+
+def test_unknown_format_rejected():
+    codec = PayloadCodec()
+    # 旧版本的pickle记录不再反序列化，视为读取失败
+    for data_format in ("dataframe_pickle", "parquet"):
+        try:
+            codec.decode(b"\x80\x05...", data_format)
+        except ValueError as e:
+            assert data_format in str(e)
+        else:
+            raise AssertionError(f"应拒绝未知的数据格式 {data_format}")
+
+
+def test_legacy_records_still_load():
+    codec = PayloadCodec()
+    legacy_json = pd.DataFrame({"close": [1.0, 2.0]}).to_json(orient="records")
+    assert list(codec.decode(legacy_json, "dataframe_json")["close"]) == [1.0, 2.0]
+    # 旧版本新闻记录没有格式标记
+    assert codec.decode("旧新闻") == "旧新闻"
+
+    # 不可用的压缩算法视为读取失败
+    try:
+        codec.decode(b"...", "text", "brotli")
+    except ValueError as e:
+        assert "brotli" in str(e)
+    else:
+        raise AssertionError("应拒绝不可用的压缩算法")
+
+
+def test_manager_round_trip():
+    with fake_replace_one():
+        manager = make_cache_manager()
+        key = manager.save_news_data("AAPL", REPORT, "2025-07-01", "2025-07-02", data_source="google")
+        redis_record = json.loads(manager.redis_client.values[key])
+        assert redis_record["compression"] == "zlib"
+        assert manager.load_news_data(key) == REPORT
+
+        # Redis过期后从MongoDB读取并回填Redis
+        manager.redis_client.values.clear()
+        assert manager.load_news_data(key) == REPORT
+        assert key in manager.redis_client.values
+
+        fundamentals_key = manager.save_fundamentals_data("000001", "PE 5.2", "2025-07-01")
+        assert manager.load_fundamentals_data(fundamentals_key) == "PE 5.2"
+
+        # 旧版本写入MongoDB的文本记录
+        manager.mongodb_db.stock_data.docs["stock:000001:legacy"] = {
+            "_id": "stock:000001:legacy", "data": "旧行情", "data_format": "text", "symbol": "000001", "data_source": "tdx",
+            "created_at": datetime(2025, 7, 1),
+        }
+        assert manager.load_stock_data("stock:000001:legacy") == "旧行情"
+
+
+def test_batch_round_trips():
+    with fake_replace_one():
+        manager = make_cache_manager()
+        records = [{"symbol": symbol, "data": f"{symbol} 行情", "start_date": "2025-06-01",
+                    "end_date": "2025-07-01", "data_source": "yfinance"} for symbol in ("AAPL", "MSFT", "NVDA")]
+        keys = manager.mset(records)
+        collection = manager.mongodb_db.stock_data
+        # MongoDB一次bulk_write，Redis一次管道提交
+        assert collection.round_trips == 1 and manager.redis_client.round_trips == 1
+
+        manager.redis_client.values.pop(keys[1])
+        manager.redis_client.round_trips = 0
+        results = manager.mget(keys + ["stock:missing:0"])
+        assert results == {key: record["data"] for key, record in zip(keys, records)}
+        # Redis一次MGET，未命中的键一次MongoDB查询，再一次管道回填
+        assert manager.redis_client.round_trips == 2 and collection.round_trips == 2
+        assert keys[1] in manager.redis_client.values
+
+        # LLM分析结果单独存放，不与基本面数据共用集合和键
+        analysis_keys = manager.mset([{"symbol": "AAPL", "analysis": "建议持有", "analysis_date": "2025-07-01",
+                                       "data_source": "batch_analysis:qwen-turbo"}], "analysis_results")
+        assert analysis_keys[0].startswith("analysis:AAPL:")
+        assert analysis_keys[0] == manager.cache_key("analysis_results", "AAPL", analysis_date="2025-07-01",
+                                                     data_source="batch_analysis:qwen-turbo")
+        assert analysis_keys[0] in manager.mongodb_db.analysis_results.docs
+        assert manager.mget(analysis_keys, "analysis_results") == {analysis_keys[0]: "建议持有"}
+
+        try:
+            manager.mset([], "options_data")
+        except ValueError as e:
+            assert "options_data" in str(e)
+        else:
+            raise AssertionError("应拒绝不支持的数据类型")
+
+
+if __name__ == "__main__":
+    test_threshold_and_stats()
+    test_dataframe_split_encoding()
+    test_unknown_format_rejected()
+    test_legacy_records_still_load()
+    test_manager_round_trip()
+    test_batch_round_trips()
+    print("✅ 数据库缓存负载压缩测试全部通过")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+盘前缓存预热测试
+测试自选股列表解析、按市场分派预热任务、覆盖率统计与历史记录，以及常驻模式的调度时间
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows import cache_warmer
+from tradingagents.dataflows.cache_warmer import CacheWarmer, load_watchlist, seconds_until
+
+
+class FakeWarmer(CacheWarmer):
+    """替换数据接口，只记录调用"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def _warm_stock_list(self):
+        self.calls.append(('*', 'stock_list'))
+        return "5000 stocks"
+
+    def _warm_us_prices(self, symbols):
+        self.calls.append((tuple(symbols), 'us_price'))
+        return [cache_warmer.WarmupResult(s, 'price', 'ok') for s in symbols]
+
+    def _warm_price(self, symbol, market):
+        self.calls.append((symbol, 'price', tuple(self._price_windows(market))))
+        return ["行情数据"]
+
+    def _warm_fundamentals(self, symbol, market):
+        self.calls.append((symbol, 'fundamentals'))
+        if symbol == "600036":
+            raise RuntimeError("数据源超时")
+        return "基本面数据" if market['is_china'] else None
+
+    def _warm_info(self, symbol, market):
+        self.calls.append((symbol, 'info'))
+        return "❌ 获取股票信息失败" if symbol == "0700.HK" else "股票信息"
+
+    def _warm_news(self, symbol, market):
+        self.calls.append((symbol, 'news'))
+        return "新闻内容"
+
+    def _record(self, report):
+        self.recorded = report.to_dict()
+
+
+def test_load_watchlist():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        text_path = os.path.join(temp_dir, "watchlist.txt")
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write("# 自选股\n000001\nAAPL, MSFT  # 美股\n\n000001\n")
+        assert load_watchlist(text_path) == ["000001", "AAPL", "MSFT"]
+
+        json_path = os.path.join(temp_dir, "watchlist.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({"symbols": ["0700.HK", "600036"]}, f)
+        assert load_watchlist(json_path) == ["0700.HK", "600036"]
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_warmup_dispatch_and_coverage():
+    warmer = FakeWarmer(["000001", "600036", "0700.HK", "AAPL", "MSFT"], analysis_date="2025-07-01")
+    report = warmer.run()
+
+    # Tushare股票列表只预热一次，美股行情批量预取
+    assert warmer.calls.count(('*', 'stock_list')) == 1
+    assert (("AAPL", "MSFT"), 'us_price') in warmer.calls
+    assert not any(call[:2] == ("AAPL", 'price') for call in warmer.calls)
+
+    # A股额外预热基本面分析师读取的行情区间
+    china_windows = next(call[2] for call in warmer.calls if call[:2] == ("000001", 'price'))
+    hk_windows = next(call[2] for call in warmer.calls if call[:2] == ("0700.HK", 'price'))
+    assert len(china_windows) == len(hk_windows) + 1
+    assert all(end == "2025-07-01" for _, end in china_windows)
+
+    coverage = report.coverage()
+    assert coverage['price'] == {'ok': 5, 'failed': 0, 'skipped': 0}
+    assert coverage['fundamentals'] == {'ok': 1, 'failed': 1, 'skipped': 3}
+    assert coverage['info']['failed'] == 1
+    # 跳过的任务不计入覆盖率
+    assert abs(report.coverage_ratio() - 16 / 18) < 1e-9
+
+    recorded = warmer.recorded
+    assert recorded['duration'] >= 0
+    assert {(f['symbol'], f['task']) for f in recorded['failures']} == {("600036", 'fundamentals'), ("0700.HK", 'info')}
+
+
+def test_unknown_task_rejected():
+    try:
+        CacheWarmer(["000001"], tasks=["price", "options"])
+    except ValueError as e:
+        assert "options" in str(e)
+    else:
+        raise AssertionError("应拒绝不支持的任务")
+
+
+def test_seconds_until():
+    now = datetime(2025, 7, 1, 8, 0, 0)
+    assert seconds_until("08:30", now) == 30 * 60
+    # 已过今天的时间点时等到明天
+    assert seconds_until("07:30", now) == 23.5 * 3600
+
+
+if __name__ == "__main__":
+    test_load_watchlist()
+    test_warmup_dispatch_and_coverage()
+    test_unknown_task_rejected()
+    test_seconds_until()
+    print("✅ 盘前缓存预热测试全部通过")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+录制/回放测试
+测试数据源调用的录制、精确与宽松匹配回放、注入延迟以及未命中时的错误
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils.cassette import CassetteMissError, cassette_call, configure_cassette
+
+
+class FakeProvider:
+    def __init__(self):
+        self.calls = 0
+
+    @cassette_call('data', 'stock_data')
+    def get_stock_data(self, symbol, start_date=None, end_date=None):
+        self.calls += 1
+        time.sleep(0.05)
+        return f"{symbol} {start_date}~{end_date} 收盘价 12.{self.calls}"
+
+
+def test_record_then_replay():
+    provider = FakeProvider()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            configure_cassette('record', tmp)
+            first = provider.get_stock_data('000001', '2025-06-01', '2025-07-01')
+            second = provider.get_stock_data('000001', '2025-06-01', '2025-07-01')
+            assert provider.calls == 2
+
+            cassette = configure_cassette('replay', tmp, latency=0.0)
+            # 同一请求录制了两条响应，按顺序轮流返回
+            assert provider.get_stock_data('000001', '2025-06-01', end_date='2025-07-01') == first
+            assert provider.get_stock_data('000001', '2025-06-01', '2025-07-01') == second
+            assert provider.get_stock_data('000001', '2025-06-01', '2025-07-01') == first
+            assert provider.calls == 2
+
+            # 日期不同时按宽松键匹配
+            assert provider.get_stock_data('000001', '2025-08-01', '2025-09-01') in (first, second)
+            assert cassette.stats['loose_hits'] == 1
+
+            try:
+                provider.get_stock_data('600519', '2025-06-01', '2025-07-01')
+                assert False, "未录制的请求应抛出 CassetteMissError"
+            except CassetteMissError:
+                pass
+            assert provider.calls == 2
+        finally:
+            configure_cassette('off')
+
+
+def test_replay_latency():
+    provider = FakeProvider()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            configure_cassette('record', tmp)
+            provider.get_stock_data('000001', '2025-06-01', '2025-07-01')
+
+            # 按录制耗时（约50ms）缩放
+            configure_cassette('replay', tmp, latency_scale=0.0)
+            start = time.perf_counter()
+            provider.get_stock_data('000001', '2025-06-01', '2025-07-01')
+            assert time.perf_counter() - start < 0.04
+
+            configure_cassette('replay', tmp, latency=0.1)
+            start = time.perf_counter()
+            provider.get_stock_data('000001', '2025-06-01', '2025-07-01')
+            assert time.perf_counter() - start >= 0.1
+        finally:
+            configure_cassette('off')
+
+
+def test_off_passthrough():
+    configure_cassette('off')
+    provider = FakeProvider()
+    provider.get_stock_data('000001')
+    provider.get_stock_data('000001')
+    assert provider.calls == 2
+
+
+if __name__ == "__main__":
+    test_record_then_replay()
+    test_replay_latency()
+    test_off_passthrough()
+    print("✅ 录制/回放测试全部通过")
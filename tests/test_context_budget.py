@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+上下文预算压缩测试
+测试报告摘要、辩论历史压缩以及压缩节点写入 AgentState 后各节点的读取
+"""
+
+import os
+import sys
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.agents.utils.context_budget import (
+    compact_debate_history, compact_text, create_context_compactor, get_history_context, get_report_context
+)
+from tradingagents.llm_adapters.tokenizer import count_text_tokens
+
+
+def _report(sections: int = 30) -> str:
+    lines = ["# 平安银行(000001) 技术分析报告"]
+    for i in range(sections):
+        lines.append(f"## 第{i}部分")
+        lines.append("市场整体情绪较为平稳，投资者观望情绪浓厚，成交活跃度一般，板块轮动较快。" * 3)
+        lines.append(f"MA5: ¥12.{i:02d}，RSI: {40 + i}")
+    lines.append("## 投资建议：持有，目标价 ¥13.50")
+    return "\n".join(lines)
+
+
+def test_compact_text_within_budget():
+    report = _report()
+    digest = compact_text(report, 600)
+    assert count_text_tokens(report) > 600
+    assert count_text_tokens(digest) <= 600
+    # 标题、结论和数据行优先保留
+    assert digest.startswith("# 平安银行(000001) 技术分析报告")
+    assert "## 投资建议：持有，目标价 ¥13.50" in digest
+    assert "……" in digest
+
+    short = "## 结论：买入"
+    assert compact_text(short, 600) == short
+
+
+def test_compact_text_single_long_line():
+    text = "没有换行的长段落" * 500
+    assert count_text_tokens(compact_text(text, 200)) <= 210
+
+
+def test_debate_history_keeps_latest_turn():
+    turns = [f"{'Bull' if i % 2 == 0 else 'Bear'} Analyst: 第{i}轮发言。" + "估值合理，增长稳健，但需关注风险。\n" * 20
+             for i in range(8)]
+    history = "\n" + "\n".join(turns)
+    compacted = compact_debate_history(history, 1500)
+    assert count_text_tokens(compacted) <= 1500 + 20
+    # 最近一次发言保留原文，较早的发言被压缩或省略
+    assert compacted.endswith(turns[-1].rstrip("\n")) or turns[-1].strip() in compacted
+    assert count_text_tokens(compacted) < count_text_tokens(history)
+
+
+def test_compactor_node_and_readers():
+    state = {
+        "market_report": _report(),
+        "sentiment_report": "",
+        "news_report": "新闻：平安银行发布业绩快报",
+        "fundamentals_report": _report(10),
+    }
+    # 未经过压缩节点时返回原文
+    assert get_report_context(state) == (state["market_report"], "", state["news_report"], state["fundamentals_report"])
+    assert get_history_context(state, "Bull Analyst: x") == "Bull Analyst: x"
+
+    node = create_context_compactor({"report_token_budget": 500, "debate_history_token_budget": 800})
+    update = node(state)
+    state.update(update)
+    market, sentiment, news, fundamentals = get_report_context(state)
+    assert count_text_tokens(market) <= 500 and count_text_tokens(fundamentals) <= 500
+    assert news == state["news_report"] and sentiment == ""
+    assert update["context_digests"]["digest_tokens"] < update["context_digests"]["original_tokens"]
+    assert state["market_report"] == _report()  # 原始报告保持不变
+
+    long_history = "\n" + "\n".join(f"Risky Analyst: {'建议积极买入。' * 200}" for _ in range(5))
+    assert count_text_tokens(get_history_context(state, long_history)) <= 820
+
+
+if __name__ == "__main__":
+    test_compact_text_within_budget()
+    test_compact_text_single_long_line()
+    test_debate_history_keeps_latest_turn()
+    test_compactor_node_and_readers()
+    print("✅ 上下文预算压缩测试全部通过")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+数据库检测测试
+测试MongoDB/Redis并发探测、探测连接复用、检测结果磁盘缓存和后台重新探测
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.config.database_manager import DatabaseManager
+
+
+class FakeDatabaseManager(DatabaseManager):
+    """用可控的探测结果代替真实连接"""
+
+    probe_delay = 0.3
+    mongodb_up = True
+    redis_up = True
+    probe_calls = []
+
+    def _detect_mongodb(self):
+        self.probe_calls.append('mongodb')
+        time.sleep(self.probe_delay)
+        if not self.mongodb_up:
+            return False, "MongoDB连接失败: down"
+        self._probe_clients['mongodb'] = 'mongo-probe-client'
+        return True, "MongoDB连接成功"
+
+    def _detect_redis(self):
+        self.probe_calls.append('redis')
+        time.sleep(self.probe_delay)
+        if not self.redis_up:
+            return False, "Redis连接失败: down"
+        self._probe_clients['redis'] = 'redis-probe-client'
+        return True, "Redis连接成功"
+
+    def _create_mongodb_client(self):
+        return 'mongo-new-client'
+
+    def _create_redis_client(self):
+        return 'redis-new-client'
+
+
+def _setup_env(cache_file, ttl="60", reprobe="0"):
+    os.environ["MONGODB_ENABLED"] = "true"
+    os.environ["REDIS_ENABLED"] = "true"
+    os.environ["DATABASE_DETECTION_CACHE_FILE"] = cache_file
+    os.environ["DATABASE_DETECTION_CACHE_TTL"] = ttl
+    os.environ["DATABASE_REPROBE_INTERVAL"] = reprobe
+    FakeDatabaseManager.probe_calls = []
+    FakeDatabaseManager.mongodb_up = True
+    FakeDatabaseManager.redis_up = True
+
+
+def test_concurrent_probe_reuses_clients():
+    """两个数据库并发探测，探测连接直接作为正式客户端"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _setup_env(os.path.join(tmp, "detect.json"))
+        start = time.time()
+        manager = FakeDatabaseManager()
+        elapsed = time.time() - start
+
+        assert elapsed < FakeDatabaseManager.probe_delay * 1.8, f"探测应并发执行，实际耗时{elapsed:.2f}秒"
+        assert manager.get_mongodb_client() == 'mongo-probe-client'
+        assert manager.get_redis_client() == 'redis-probe-client'
+        assert manager.get_cache_backend() == 'redis'
+
+
+def test_detection_cache_skips_probe():
+    """缓存有效期内的新实例不再探测"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, "detect.json")
+        _setup_env(cache_file)
+        FakeDatabaseManager.redis_up = False
+        FakeDatabaseManager()
+        assert sorted(FakeDatabaseManager.probe_calls) == ['mongodb', 'redis']
+
+        FakeDatabaseManager.probe_calls = []
+        manager = FakeDatabaseManager()
+        assert FakeDatabaseManager.probe_calls == []
+        assert manager.detection_source == 'cache'
+        assert manager.is_mongodb_available() and not manager.is_redis_available()
+        assert manager.get_mongodb_client() == 'mongo-new-client'
+
+        # 缓存关闭时重新探测
+        os.environ["DATABASE_DETECTION_CACHE_TTL"] = "0"
+        FakeDatabaseManager()
+        assert sorted(FakeDatabaseManager.probe_calls) == ['mongodb', 'redis']
+
+
+def test_background_reprobe_promotes_backend():
+    """数据库恢复后后台探测启用它并切换缓存后端"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _setup_env(os.path.join(tmp, "detect.json"), ttl="0", reprobe="0.1")
+        FakeDatabaseManager.probe_delay = 0.01
+        FakeDatabaseManager.redis_up = False
+        manager = FakeDatabaseManager()
+        try:
+            assert manager.get_cache_backend() == 'mongodb'
+            assert manager.get_status_report()['reprobe_active']
+
+            FakeDatabaseManager.redis_up = True
+            deadline = time.time() + 2
+            while not manager.is_redis_available() and time.time() < deadline:
+                time.sleep(0.05)
+
+            assert manager.is_redis_available()
+            assert manager.get_redis_client() == 'redis-probe-client'
+            assert manager.get_cache_backend() == 'redis'
+        finally:
+            manager.stop_background_reprobe()
+            FakeDatabaseManager.probe_delay = 0.3
+
+
+if __name__ == "__main__":
+    test_concurrent_probe_reuses_clients()
+    test_detection_cache_skips_probe()
+    test_background_reprobe_promotes_backend()
+    print("✅ 数据库检测测试全部通过")
@@ -89,14 +89,12 @@ def test_cache_direct():
         
         provider = ImprovedHKStockProvider()
         
-        # 清理可能存在的缓存文件
-        cache_file = "hk_stock_cache.json"
-        if os.path.exists(cache_file):
-            os.remove(cache_file)
-            print("🗑️ 清理旧缓存文件")
-        
         test_symbol = "0700.HK"
         
+        # 清理可能存在的缓存
+        provider.cache_store.delete(f"name_{test_symbol}")
+        print(f"🗑️ 清理旧缓存（{provider.cache_store.backend}存储）")
+        
         # 第一次获取（应该使用内置映射）
         print(f"\n📊 第一次获取 {test_symbol}:")
         start_time = time.time()
@@ -119,19 +117,12 @@ def test_cache_direct():
         else:
             print("❌ 缓存结果不一致")
         
-        # 检查缓存文件
-        if os.path.exists(cache_file):
-            print("✅ 缓存文件已创建")
-            
-            # 读取缓存内容
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-            
-            print(f"📄 缓存条目数: {len(cache_data)}")
-            for key, value in cache_data.items():
-                print(f"   {key}: {value['data']} (来源: {value['source']})")
+        # 检查缓存内容（内置映射的股票直接由股票主表返回，不写缓存）
+        cached = provider.cache_store.get(f"name_{test_symbol}")
+        if cached:
+            print(f"📄 缓存: {cached['data']} (来源: {cached['source']})")
         else:
-            print("⚠️ 缓存文件未创建")
+            print("📄 内置映射命中，未写入缓存")
         
         return True
         
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+启动导入耗时回归测试
+使用 python -X importtime 在独立进程中导入 tradingagents.graph.trading_graph，
+检查总耗时是否超出预算，以及未使用的提供商/数据源重依赖是否被提前加载
+
+预算可通过环境变量 IMPORT_TIME_BUDGET_MS 调整（默认6000毫秒）
+"""
+
+import os
+import subprocess
+import sys
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+TARGET_MODULE = "tradingagents.graph.trading_graph"
+
+# 导入 trading_graph 时不应加载的模块（只在对应提供商/数据源首次使用时加载）
+LAZY_MODULES = [
+    "chromadb",
+    "dashscope",
+    "langchain_openai",
+    "langchain_anthropic",
+    "langchain_google_genai",
+    "yfinance",
+    "stockstats",
+    "akshare",
+    "bs4",
+    "tqdm",
+]
+
+DEFAULT_BUDGET_MS = 6000
+
+
+def measure_import_time(module: str):
+    """
+    在新进程中导入模块并解析 -X importtime 输出
+
+    Returns:
+        (总耗时毫秒, {模块名: 累计耗时毫秒})
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = project_root + os.pathsep + env.get("PYTHONPATH", "")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root, env=env, capture_output=True, text=True, timeout=300,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入{module}失败:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        # 格式: "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        cumulative_us = int(cumulative.strip())
+        # 只有一个前导空格的是顶层导入，其累计耗时之和即为总耗时
+        if not name.startswith("  "):
+            total_us += cumulative_us
+        modules[name.strip()] = cumulative_us / 1000
+    return total_us / 1000, modules
+
+
+def test_lazy_modules_not_loaded():
+    """导入 trading_graph 不加载提供商SDK和数据源重依赖"""
+    _, modules = measure_import_time(TARGET_MODULE)
+    loaded = sorted(m for m in LAZY_MODULES if m in modules)
+    assert not loaded, f"以下模块应按需导入，却在启动时被加载: {loaded}"
+
+
+def test_import_time_budget():
+    """导入 trading_graph 的总耗时不超过预算"""
+    budget_ms = float(os.getenv("IMPORT_TIME_BUDGET_MS", DEFAULT_BUDGET_MS))
+    total_ms, modules = measure_import_time(TARGET_MODULE)
+
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]
+    print(f"📦 导入 {TARGET_MODULE} 耗时 {total_ms:.0f}ms（预算 {budget_ms:.0f}ms）")
+    for name, ms in slowest:
+        print(f"   {ms:8.1f}ms  {name}")
+
+    assert total_ms <= budget_ms, f"启动导入耗时 {total_ms:.0f}ms 超出预算 {budget_ms:.0f}ms"
+
+
+if __name__ == "__main__":
+    test_lazy_modules_not_loaded()
+    test_import_time_budget()
+    print("✅ 启动导入耗时测试全部通过")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+共享键值存储测试
+测试SQLite存储的TTL过期、覆盖写入、批量读写、命名空间隔离和多线程并发写入
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.kv_store import SQLiteKVStore
+
+
+def test_ttl_and_upsert():
+    """按key设置TTL，过期后不可见；重复写入覆盖旧值"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteKVStore(os.path.join(tmp, 'kv.db'), 'test')
+        store.set('short', {'data': 1}, ttl=0.2)
+        store.set('long', {'data': 2}, ttl=60)
+        store.set('forever', {'data': 3})
+        store.set('long', {'data': 22}, ttl=60)
+
+        assert store.get('short') == {'data': 1}
+        assert store.get('long') == {'data': 22}
+        time.sleep(0.3)
+        assert store.get('short') is None
+        assert store.get('forever') == {'data': 3}
+
+        store.delete('forever')
+        assert store.get('forever') is None
+
+
+def test_batch_and_namespace():
+    """批量读写，不同命名空间互不影响"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'kv.db')
+        hk = SQLiteKVStore(path, 'hk')
+        us = SQLiteKVStore(path, 'us')
+
+        hk.set_many({f"name_{i}": f"股票{i}" for i in range(1200)}, ttl=60)
+        us.set('name_1', 'Apple')
+
+        result = hk.get_many([f"name_{i}" for i in range(0, 1300, 100)])
+        assert len(result) == 12
+        assert result['name_100'] == '股票100'
+        assert us.get('name_1') == 'Apple'
+
+        hk.clear()
+        assert hk.get_many(['name_1', 'name_2']) == {}
+        assert us.get('name_1') == 'Apple'
+
+
+def test_concurrent_writes():
+    """多线程并发写入同一存储文件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteKVStore(os.path.join(tmp, 'kv.db'), 'test')
+        errors = []
+
+        def writer(worker):
+            try:
+                for i in range(50):
+                    store.set(f"{worker}_{i}", i, ttl=60)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert not errors, errors
+        assert len(store.get_many([f"{w}_{i}" for w in range(4) for i in range(50)])) == 200
+
+
+if __name__ == "__main__":
+    test_ttl_and_upsert()
+    test_batch_and_namespace()
+    test_concurrent_writes()
+    print("✅ 键值存储测试全部通过")
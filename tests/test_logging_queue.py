@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+队列日志测试
+测试 QueueHandler/QueueListener 异步日志、队列满时的丢弃/反压策略和延迟字段，
+直接运行时输出同步与队列模式的单次日志调用耗时对比
+"""
+
+import logging
+import os
+import queue
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils.logging_manager import (
+    BoundedQueueHandler, StructuredFormatter, lazy, setup_logging
+)
+
+
+def _config(log_dir, queue_enabled):
+    return {
+        'level': 'DEBUG',
+        'format': {
+            'console': '%(asctime)s | %(name)-20s | %(levelname)-8s | %(message)s',
+            'file': '%(asctime)s | %(name)-20s | %(levelname)-8s | %(module)s:%(funcName)s:%(lineno)d | %(message)s',
+        },
+        'handlers': {
+            'console': {'enabled': False},
+            'file': {'enabled': True, 'level': 'DEBUG', 'max_size': '10MB', 'backup_count': 1, 'directory': log_dir},
+            'structured': {'enabled': True, 'level': 'INFO', 'directory': log_dir},
+        },
+        'loggers': {},
+        'docker': {'enabled': False, 'stdout_only': True},
+        'queue': {'enabled': queue_enabled, 'max_size': 10000, 'policy': 'drop'},
+    }
+
+
+def _reset_root():
+    # 重新配置会停止当前的监听线程；最后清空根日志器，避免测试间互相影响
+    manager = setup_logging(_config(tempfile.gettempdir(), False))
+    for handler in logging.getLogger().handlers:
+        handler.close()
+    logging.getLogger().handlers.clear()
+    return manager
+
+
+def test_queue_pipeline_writes_files():
+    """队列模式下根日志器只挂队列处理器，日志由后台线程写入文件"""
+    os.environ.pop('TRADINGAGENTS_LOG_ASYNC', None)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = setup_logging(_config(tmp, True))
+        try:
+            root_handlers = logging.getLogger().handlers
+            assert len(root_handlers) == 1 and isinstance(root_handlers[0], BoundedQueueHandler)
+
+            # config/logging.toml 把 tradingagents 日志器设为INFO，测试中临时打开DEBUG
+            logger = logging.getLogger('tradingagents.test_queue')
+            logger.setLevel(logging.DEBUG)
+            logger.info("队列日志 %s", "参数", extra={'stock_symbol': lazy(str.upper, '000001.sz')})
+            logger.debug("调试日志")
+            manager.flush()
+
+            with open(os.path.join(tmp, 'tradingagents.log'), encoding='utf-8') as f:
+                content = f.read()
+            assert "队列日志 参数" in content and "调试日志" in content
+            with open(os.path.join(tmp, 'tradingagents_structured.log'), encoding='utf-8') as f:
+                structured = f.read()
+            # 结构化处理器级别为INFO，且延迟字段在后台线程中计算
+            assert '"stock_symbol": "000001.SZ"' in structured
+            assert "调试日志" not in structured
+
+            stats = manager.get_queue_stats()
+            assert stats['enabled'] and stats['dropped'] == 0 and stats['pending'] == 0
+        finally:
+            logging.getLogger('tradingagents.test_queue').setLevel(logging.NOTSET)
+            _reset_root()
+
+
+def test_drop_policy():
+    """队列满时丢弃INFO日志；WARNING日志等待超时后丢弃并计数"""
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2), policy='drop', block_timeout=0.05)
+    logger = logging.Logger('test_drop')
+    logger.addHandler(handler)
+
+    for i in range(5):
+        logger.info("info %d", i)
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+    start = time.time()
+    logger.warning("warning")
+    assert time.time() - start >= 0.04
+    assert handler.dropped == 4
+
+    # 入队时已合并消息参数
+    assert handler.queue.get_nowait().msg == "info 0"
+
+
+def test_lazy_value():
+    """延迟字段只在被输出时计算一次"""
+    calls = []
+
+    def expensive():
+        calls.append(1)
+        return {'input': 10, 'output': 20}
+
+    record = logging.LogRecord('test', logging.INFO, __file__, 1, "msg", None, None)
+    record.tokens = lazy(expensive)
+    record.args_info = lazy(expensive)
+
+    logging.Formatter('%(message)s').format(record)
+    assert calls == []
+
+    output = StructuredFormatter().format(record)
+    assert '"tokens": {"input": 10, "output": 20}' in output
+    assert calls == [1]
+
+
+def benchmark_logging_overhead(iterations: int = 5000):
+    """对比同步和队列模式下调用线程的单次日志耗时（文件+结构化处理器）"""
+    os.environ.pop('TRADINGAGENTS_LOG_ASYNC', None)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, queue_enabled in (('sync', False), ('queue', True)):
+            manager = setup_logging(_config(os.path.join(tmp, mode), queue_enabled))
+            logger = logging.getLogger('tradingagents.benchmark')
+            start = time.perf_counter()
+            for i in range(iterations):
+                logger.info(f"📊 [数据来源: tushare] 获取数据 {i}", extra={'stock_symbol': '000001'})
+            elapsed = time.perf_counter() - start
+            manager.flush()
+            results[mode] = elapsed / iterations * 1e6
+        _reset_root()
+
+    print(f"📈 单次日志调用耗时: 同步 {results['sync']:.1f}µs, 队列 {results['queue']:.1f}µs "
+          f"({results['sync'] / results['queue']:.1f}x)")
+    return results
+
+
+if __name__ == "__main__":
+    test_queue_pipeline_writes_files()
+    test_drop_policy()
+    test_lazy_value()
+    benchmark_logging_overhead()
+    print("✅ 队列日志测试全部通过")
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+进程内L1缓存测试
+测试按字节数的LRU淘汰、不超过底层剩余TTL的过期、保存时失效、批量加载，以及各层级命中率统计
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows import adaptive_cache, integrated_cache
+from tradingagents.dataflows.memory_cache import SizedLRUCache, estimate_size
+
+
+def test_lru_eviction_by_bytes():
+    value = "x" * 1000
+    size = estimate_size(value)
+    cache = SizedLRUCache(max_bytes=size * 3, max_ttl=60)
+
+    for key in ("a", "b", "c"):
+        assert cache.put(key, value)
+    assert cache.get("a") == value  # a 变为最近使用
+    assert cache.put("d", value)
+
+    # 超出字节上限时淘汰最久未使用的 b
+    assert cache.get("b") is None
+    assert cache.get("a") == value and cache.get("d") == value
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1 and stats['bytes'] == size * 3
+
+    # 单个过大的对象不缓存，不会挤掉其他条目
+    assert cache.put("big", "y" * 5000) is False
+    assert len(cache) == 3
+
+
+def test_ttl_bounded_by_backing_entry():
+    cache = SizedLRUCache(max_bytes=1024 * 1024, max_ttl=60)
+    assert cache.put("expired", "data", ttl=0) is False
+    assert cache.put("short", "data", ttl=0.05)
+    assert cache.get("short") == "data"
+    time.sleep(0.1)
+    assert cache.get("short") is None
+    assert cache.get_stats()['expirations'] == 1
+
+
+def test_cached_objects_are_copied():
+    cache = SizedLRUCache(max_bytes=1024 * 1024, max_ttl=60)
+    fundamentals = {"pe": 12.5}
+    cache.put("k", fundamentals)
+    fundamentals["pe"] = 0
+    loaded = cache.get("k")
+    loaded["pb"] = 1.0
+    assert cache.get("k") == {"pe": 12.5}
+
+
+def test_integrated_cache_tiers():
+    temp_dir = tempfile.mkdtemp()
+    original = integrated_cache.ADAPTIVE_CACHE_AVAILABLE
+    integrated_cache.ADAPTIVE_CACHE_AVAILABLE = False
+    try:
+        manager = integrated_cache.IntegratedCacheManager(temp_dir)
+        key = manager.save_stock_data("000001", "旧行情", "2025-06-01", "2025-07-01", data_source="unified")
+
+        assert manager.load_stock_data(key) == "旧行情"  # 文件
+        assert manager.load_stock_data(key) == "旧行情"  # L1
+        assert manager.load_stock_data("missing") is None
+
+        # 保存新数据后L1中的旧对象失效
+        assert manager.save_stock_data("000001", "新行情", "2025-06-01", "2025-07-01", data_source="unified") == key
+        assert manager.load_stock_data(key) == "新行情"
+
+        tier_stats = manager.get_cache_stats()['tier_stats']
+        assert tier_stats['lookups'] == 4 and tier_stats['misses'] == 1
+        assert tier_stats['tiers']['file']['hits'] == 2
+        assert tier_stats['tiers']['memory'] == {'hits': 1, 'hit_ratio': 0.25}
+        assert tier_stats['memory_cache']['invalidations'] == 1
+    finally:
+        integrated_cache.ADAPTIVE_CACHE_AVAILABLE = original
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_integrated_cache_load_many():
+    temp_dir = tempfile.mkdtemp()
+    original = integrated_cache.ADAPTIVE_CACHE_AVAILABLE
+    integrated_cache.ADAPTIVE_CACHE_AVAILABLE = False
+    try:
+        manager = integrated_cache.IntegratedCacheManager(temp_dir)
+        keys = [manager.save_stock_data(symbol, f"{symbol} 行情", "2025-06-01", "2025-07-01", data_source="unified")
+                for symbol in ("000001", "600036")]
+        manager.load_stock_data(keys[0])
+
+        results = manager.load_many(keys + ["missing", keys[0]])
+        assert results == {keys[0]: "000001 行情", keys[1]: "600036 行情"}
+        tiers = manager.get_tier_stats()['tiers']
+        # 第一个键来自L1，第二个键来自文件并写入L1
+        assert tiers['memory']['hits'] == 1 and tiers['file']['hits'] == 2
+        assert manager.load_many([keys[1]]) == {keys[1]: "600036 行情"}
+        assert manager.get_tier_stats()['tiers']['memory']['hits'] == 2
+    finally:
+        integrated_cache.ADAPTIVE_CACHE_AVAILABLE = original
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.round_trips = 0
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def get(self, key):
+        self.round_trips += 1
+        return self.values.get(key)
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.values.get(key) for key in keys]
+
+
+class FakeCacheCollection:
+    def __init__(self):
+        self.docs = {}
+        self.round_trips = 0
+
+    def replace_one(self, query, doc, upsert=False):
+        self.docs[query['_id']] = dict(doc)
+
+    def find_one(self, query):
+        self.round_trips += 1
+        return self.docs.get(query['_id'])
+
+    def find(self, query):
+        self.round_trips += 1
+        return [self.docs[key] for key in query['_id']['$in'] if key in self.docs]
+
+    def delete_one(self, query):
+        self.docs.pop(query['_id'], None)
+
+
+class FakeMongoClient:
+    def __init__(self):
+        self.tradingagents = type('FakeDatabase', (), {'cache': FakeCacheCollection()})()
+
+
+class FakeDatabaseManager:
+    def __init__(self, backend, redis=None, mongodb=None):
+        self.backend = backend
+        self.redis = redis
+        self.mongodb = mongodb
+
+    def get_config(self):
+        return {"cache": {"primary_backend": self.backend, "fallback_enabled": True, "ttl_settings": {}}}
+
+    def get_redis_client(self):
+        return self.redis
+
+    def get_mongodb_client(self):
+        return self.mongodb
+
+    def is_redis_available(self):
+        return self.redis is not None
+
+    def is_mongodb_available(self):
+        return self.mongodb is not None
+
+
+def test_adaptive_cache_load_entries():
+    for backend in ("redis", "mongodb"):
+        temp_dir = tempfile.mkdtemp()
+        redis, mongodb = FakeRedis(), FakeMongoClient()
+        db_manager = FakeDatabaseManager(backend, redis=redis, mongodb=mongodb)
+        try:
+            with mock.patch.object(adaptive_cache, 'get_database_manager', lambda: db_manager):
+                cache = adaptive_cache.AdaptiveCacheSystem(temp_dir)
+            keys = [cache.save_data(symbol, f"{symbol} 行情", "2025-06-01", "2025-07-01")
+                    for symbol in ("000001", "600036")]
+            # 主后端没有的键按文件缓存降级
+            file_key = cache.cache_key("AAPL", "2025-06-01", "2025-07-01")
+            cache._save_to_file(file_key, "AAPL 行情", {'symbol': "AAPL", 'data_type': "stock_data"})
+
+            expired_key = None
+            if backend == "mongodb":
+                # 已过期的MongoDB文档不返回
+                expired_key = cache.save_data("000002", "过期行情", "2025-06-01", "2025-07-01")
+                mongodb.tradingagents.cache.docs[expired_key]['expires_at'] = datetime.now() - timedelta(seconds=1)
+
+            with mock.patch.object(integrated_cache, 'ADAPTIVE_CACHE_AVAILABLE', True), \
+                    mock.patch.object(integrated_cache, 'get_cache_system', lambda: cache, create=True), \
+                    mock.patch.object(integrated_cache, 'get_database_manager', lambda: db_manager, create=True):
+                manager = integrated_cache.IntegratedCacheManager(temp_dir)
+            assert manager.use_adaptive
+
+            requested = keys + [file_key, "missing"] + ([expired_key] if expired_key else [])
+            results = manager.load_many(requested)
+            assert results == {keys[0]: "000001 行情", keys[1]: "600036 行情", file_key: "AAPL 行情"}
+
+            # 主后端一次批量查询（Redis MGET / MongoDB $in）
+            round_trips = redis.round_trips if backend == "redis" else mongodb.tradingagents.cache.round_trips
+            assert round_trips == 1
+            tiers = manager.get_tier_stats()['tiers']
+            assert tiers[backend]['hits'] == 2 and tiers['file']['hits'] == 1
+
+            # 已加载的键写入L1，再次加载不访问后端
+            assert manager.load_many(keys) == {keys[0]: "000001 行情", keys[1]: "600036 行情"}
+            assert (redis.round_trips if backend == "redis" else mongodb.tradingagents.cache.round_trips) == 1
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_find_cached_stock_data_many():
+    temp_dir = tempfile.mkdtemp()
+    redis = FakeRedis()
+    db_manager = FakeDatabaseManager("redis", redis=redis)
+    try:
+        with mock.patch.object(adaptive_cache, 'get_database_manager', lambda: db_manager):
+            cache = adaptive_cache.AdaptiveCacheSystem(temp_dir)
+        with mock.patch.object(integrated_cache, 'ADAPTIVE_CACHE_AVAILABLE', True), \
+                mock.patch.object(integrated_cache, 'get_cache_system', lambda: cache, create=True), \
+                mock.patch.object(integrated_cache, 'get_database_manager', lambda: db_manager, create=True):
+            manager = integrated_cache.IntegratedCacheManager(temp_dir)
+        aapl_key = manager.save_stock_data("AAPL", "AAPL 行情", "2025-06-01", "2025-07-01", data_source="yfinance")
+        msft_key = manager.save_stock_data("MSFT", "MSFT 行情", "2025-06-01", "2025-07-01", data_source="finnhub")
+
+        queries = [(symbol, "2025-06-01", "2025-07-01", source)
+                   for symbol in ("AAPL", "MSFT") for source in ("finnhub", "yfinance")]
+        found = manager.find_cached_stock_data_many(queries)
+        assert found == {("AAPL", "2025-06-01", "2025-07-01", "yfinance"): aapl_key,
+                         ("MSFT", "2025-06-01", "2025-07-01", "finnhub"): msft_key}
+        # 所有查询一次 Redis MGET
+        assert redis.round_trips == 1
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_lru_eviction_by_bytes()
+    test_ttl_bounded_by_backing_entry()
+    test_cached_objects_are_copied()
+    test_integrated_cache_tiers()
+    test_integrated_cache_load_many()
+    test_adaptive_cache_load_entries()
+    test_find_cached_stock_data_many()
+    print("✅ 进程内L1缓存测试全部通过")
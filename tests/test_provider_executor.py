@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+数据源调用执行器测试
+测试共享线程池的超时、并发上限、熔断和指标
+"""
+
+import os
+import sys
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.provider_executor import (
+    ProviderExecutor,
+    ProviderTimeoutError,
+    ProviderCircuitOpenError,
+    ProviderBusyError,
+)
+
+
+def test_call_returns_result():
+    """正常调用返回结果"""
+    executor = ProviderExecutor(max_workers=2, default_max_concurrency=1)
+    assert executor.call('demo', lambda x, y=0: x + y, 1, y=2, timeout=5) == 3
+    metrics = executor.get_metrics()['providers']['demo']
+    assert metrics['succeeded'] == 1
+    assert metrics['queue_depth'] == 0
+    executor.shutdown()
+
+
+def test_timeout_marks_call_abandoned():
+    """超时后调用被标记为已放弃，完成后计数归零"""
+    executor = ProviderExecutor(max_workers=2, default_max_concurrency=2, failure_threshold=5)
+    try:
+        executor.call('slow', time.sleep, 0.5, timeout=0.1)
+        assert False, "应当超时"
+    except ProviderTimeoutError:
+        pass
+    metrics = executor.get_metrics()
+    assert metrics['abandoned_in_flight'] == 1
+    assert metrics['providers']['slow']['timeouts'] == 1
+
+    time.sleep(0.6)
+    assert executor.get_metrics()['abandoned_in_flight'] == 0
+    executor.shutdown()
+
+
+def test_concurrency_cap():
+    """单数据源并发达到上限时，新调用在超时内拿不到槽位"""
+    executor = ProviderExecutor(max_workers=4, default_max_concurrency=1, failure_threshold=5)
+    try:
+        executor.call('capped', time.sleep, 0.5, timeout=0.05)
+    except ProviderTimeoutError:
+        pass
+    try:
+        executor.call('capped', lambda: 'ok', timeout=0.05)
+        assert False, "应当因并发已满被拒绝"
+    except ProviderBusyError:
+        pass
+    time.sleep(0.5)
+    assert executor.call('capped', lambda: 'ok', timeout=1) == 'ok'
+    executor.shutdown()
+
+
+def test_circuit_breaker():
+    """连续超时后熔断，冷却期后放行试探调用"""
+    executor = ProviderExecutor(max_workers=4, default_max_concurrency=4,
+                                failure_threshold=2, reset_timeout=0.3)
+    for _ in range(2):
+        try:
+            executor.call('flaky', time.sleep, 0.2, timeout=0.01)
+        except ProviderTimeoutError:
+            pass
+
+    try:
+        executor.call('flaky', lambda: 'ok', timeout=1)
+        assert False, "熔断期间应当拒绝调用"
+    except ProviderCircuitOpenError:
+        pass
+    assert executor.get_metrics()['providers']['flaky']['circuit_state'] == 'open'
+
+    time.sleep(0.35)
+    assert executor.call('flaky', lambda: 'ok', timeout=1) == 'ok'
+    assert executor.get_metrics()['providers']['flaky']['circuit_state'] == 'closed'
+    executor.shutdown()
+
+
+def test_function_errors_propagate():
+    """业务异常原样抛出且不触发熔断"""
+    executor = ProviderExecutor(max_workers=2, failure_threshold=1)
+
+    def boom():
+        raise ValueError("bad symbol")
+
+    try:
+        executor.call('errors', boom, timeout=1)
+        assert False, "应当抛出ValueError"
+    except ValueError:
+        pass
+    metrics = executor.get_metrics()['providers']['errors']
+    assert metrics['failed'] == 1
+    assert metrics['circuit_state'] == 'closed'
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    test_call_returns_result()
+    test_timeout_marks_call_abandoned()
+    test_concurrency_cap()
+    test_circuit_breaker()
+    test_function_errors_propagate()
+    print("✅ 数据源调用执行器测试全部通过")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+数据源速率限制器测试
+测试令牌桶限流、多线程共享、asyncio支持和429自适应退避
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.rate_limiter import (
+    RateLimiter,
+    get_rate_limiter,
+    is_rate_limit_error,
+)
+
+
+def test_burst_then_throttle():
+    """突发容量内立即放行，超出后按QPS限速"""
+    limiter = RateLimiter('test_burst', qps=20, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.05
+
+    for _ in range(4):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+    assert elapsed >= 0.15, f"超出突发容量后应当限速，实际耗时{elapsed:.3f}s"
+
+
+def test_shared_across_threads():
+    """多个线程共享同一个令牌桶，总速率不超过QPS"""
+    limiter = RateLimiter('test_threads', qps=50, burst=1)
+    count = [0]
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(5):
+            limiter.acquire()
+            with lock:
+                count[0] += 1
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+
+    assert count[0] == 20
+    assert elapsed >= 19 / 50 * 0.9, f"20次调用在50QPS下不应少于0.38s，实际{elapsed:.3f}s"
+
+
+def test_acquire_timeout():
+    """超时时间内拿不到令牌时返回False"""
+    limiter = RateLimiter('test_timeout', qps=1, burst=1)
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0.1)
+
+
+def test_async_acquire():
+    """asyncio版本可并发等待"""
+    limiter = RateLimiter('test_async', qps=40, burst=2)
+
+    async def run():
+        results = await asyncio.gather(*[limiter.acquire_async() for _ in range(6)])
+        return results
+
+    start = time.monotonic()
+    assert all(asyncio.run(run()))
+    assert time.monotonic() - start >= 0.08
+
+
+def test_backoff_and_recovery():
+    """遇到限流错误后降速并暂停，成功后逐步恢复"""
+    limiter = RateLimiter('test_backoff', qps=10, burst=2, recovery_step=0.5)
+    limiter.report_rate_limited(retry_after=0.2)
+    assert limiter.effective_qps == 5
+    assert not limiter.acquire(timeout=0.1)
+    assert limiter.acquire(timeout=0.5)
+
+    limiter.report_success()
+    assert limiter.effective_qps == 10
+    assert limiter.get_stats()['rate_limited'] == 1
+
+
+def test_rate_limit_error_detection():
+    """识别常见的限流错误信息"""
+    assert is_rate_limit_error(Exception("429 Client Error: Too Many Requests"))
+    assert is_rate_limit_error("抱歉，您每分钟最多访问该接口200次")
+    assert is_rate_limit_error(Exception("Rate limited. Try after a while."))
+    assert not is_rate_limit_error(Exception("symbol not found"))
+    assert not is_rate_limit_error("❌ 所有数据源都无法获取000429的数据")
+
+
+def test_registry_singleton():
+    """同一数据源返回同一个限流器"""
+    assert get_rate_limiter('tushare') is get_rate_limiter('tushare')
+    assert get_rate_limiter('tushare') is not get_rate_limiter('finnhub')
+
+
+if __name__ == "__main__":
+    test_burst_then_throttle()
+    test_shared_across_threads()
+    test_acquire_timeout()
+    test_async_acquire()
+    test_backoff_and_recovery()
+    test_rate_limit_error_detection()
+    test_registry_singleton()
+    print("✅ 数据源速率限制器测试全部通过")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+运行数据上下文测试
+测试数据预获取结果在分析运行中被工具调用复用
+"""
+
+import os
+import sys
+import threading
+
+import pandas as pd
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.run_data_context import (
+    RunDataContext,
+    get_current_run_context,
+    make_run_context_key,
+    run_context_cached,
+    run_context_frame,
+)
+
+
+calls = []
+
+
+@run_context_cached('test_stock_data', key_arity=3)
+def fetch_stock_data(symbol, start_date=None, end_date=None):
+    calls.append((symbol, start_date, end_date))
+    return f"{symbol} 收盘价 10.00"
+
+
+@run_context_cached('test_stock_info', key_arity=1)
+def fetch_stock_info(symbol):
+    calls.append((symbol,))
+    return f"❌ 无法获取{symbol}信息"
+
+
+def test_no_context_passthrough():
+    """不在分析运行中时直接调用原函数"""
+    calls.clear()
+    assert get_current_run_context() is None
+    fetch_stock_data("000001", "2025-01-01", "2025-01-31")
+    fetch_stock_data("000001", "2025-01-01", "2025-01-31")
+    assert len(calls) == 2
+
+
+def test_prefetched_data_is_reused():
+    """预获取阶段写入的数据在运行中被复用，代码大小写/关键字参数不影响命中"""
+    calls.clear()
+    context = RunDataContext(symbol="0700.hk")
+    with context.activated():
+        fetch_stock_data("0700.hk", "2025-01-01", "2025-01-31")
+
+    with context.activated():
+        result = fetch_stock_data(symbol="0700.HK", start_date="2025-01-01", end_date="2025-01-31")
+
+    assert result == "0700.hk 收盘价 10.00"
+    assert len(calls) == 1
+    assert context.contains(make_run_context_key('test_stock_data', '0700.HK', '2025-01-01', '2025-01-31'))
+    assert context.get_stats()['hits'] == 1
+
+
+def test_different_window_not_served():
+    """不同时间窗口不会命中"""
+    calls.clear()
+    context = RunDataContext()
+    with context.activated():
+        fetch_stock_data("000001", "2025-01-01", "2025-01-31")
+        fetch_stock_data("000001", "2025-01-02", "2025-01-31")
+    assert len(calls) == 2
+
+
+def _daily_frame(start_date, end_date):
+    dates = pd.date_range(start_date, end_date, freq="D")
+    return pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "close": range(len(dates))})
+
+
+def test_covering_window_is_sliced():
+    """区间被已获取行情覆盖的请求切片复用，超出已获取区间时重新获取"""
+    fetched = []
+
+    def fetch(start_date, end_date):
+        fetched.append((start_date, end_date))
+        return _daily_frame(start_date, end_date)
+
+    context = RunDataContext()
+    with context.activated():
+        run_context_frame("test_daily", "000001", "2025-01-01", "2025-01-31", fetch)
+        sliced = run_context_frame("test_daily", "000001", "2025-01-10", "2025-01-20", fetch)
+        assert list(sliced["date"]) == [d.strftime("%Y-%m-%d") for d in pd.date_range("2025-01-10", "2025-01-20")]
+        run_context_frame("test_daily", "000001", "2024-12-01", "2025-01-31", fetch)
+
+    assert fetched == [("2025-01-01", "2025-01-31"), ("2024-12-01", "2025-01-31")]
+    assert context.get_stats()["frame_hits"] == 1
+
+
+def test_frame_window_widens_fetch():
+    """设置 frame_window 后首次获取覆盖整个区间，之后不同区间的请求都命中（结束日期不含当天的数据源同样切片）"""
+    fetched = []
+
+    def fetch(start_date, end_date):
+        fetched.append((start_date, end_date))
+        return _daily_frame(start_date, end_date).set_index(pd.DatetimeIndex(pd.date_range(start_date, end_date)))
+
+    context = RunDataContext()
+    context.frame_window = ("2025-05-02", "2025-07-01")
+    with context.activated():
+        prepared = run_context_frame("test_history", "aapl", "2025-06-01", "2025-07-01", fetch, end_inclusive=False)
+        market = run_context_frame("test_history", "AAPL", "2025-05-02", "2025-07-01", fetch, end_inclusive=False)
+
+    assert fetched == [("2025-05-02", "2025-07-01")]
+    assert prepared.index.min() == pd.Timestamp("2025-06-01") and prepared.index.max() == pd.Timestamp("2025-06-30")
+    assert len(market) == 60
+
+
+def test_failed_widened_fetch_not_repeated():
+    """扩展区间获取失败时直接返回失败结果，不按请求区间再调用一次数据源"""
+    fetched = []
+
+    def fetch(start_date, end_date):
+        fetched.append((start_date, end_date))
+        return pd.DataFrame()
+
+    context = RunDataContext()
+    context.frame_window = ("2025-05-02", "2025-07-01")
+    with context.activated():
+        result = run_context_frame("test_daily", "000001", "2025-06-01", "2025-07-01", fetch)
+
+    assert result.empty
+    assert fetched == [("2025-05-02", "2025-07-01")]
+
+
+def test_errors_not_cached():
+    """错误结果不写入上下文"""
+    calls.clear()
+    context = RunDataContext()
+    with context.activated():
+        fetch_stock_info("999999")
+        fetch_stock_info("999999")
+    assert len(calls) == 2
+    assert context.get_stats()['entries'] == 0
+
+
+def test_context_is_isolated_per_thread():
+    """上下文绑定在当前线程，其他线程的分析互不影响"""
+    context = RunDataContext()
+    seen = []
+
+    def worker():
+        seen.append(get_current_run_context())
+
+    with context.activated():
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        assert get_current_run_context() is context
+    assert seen == [None]
+    assert get_current_run_context() is None
+
+
+if __name__ == "__main__":
+    test_no_context_passthrough()
+    test_prefetched_data_is_reused()
+    test_different_window_not_served()
+    test_covering_window_is_sliced()
+    test_frame_window_widens_fetch()
+    test_failed_widened_fetch_not_repeated()
+    test_errors_not_cached()
+    test_context_is_isolated_per_thread()
+    print("✅ 运行数据上下文测试全部通过")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+工具调用去重测试
+测试同一次分析运行内相同工具+参数的重复调用只执行一次
+"""
+
+import os
+import sys
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.run_data_context import RunDataContext, run_memoized_tool
+
+
+calls = []
+
+
+@run_memoized_tool("demo_tool")
+def demo_tool(ticker: str, curr_date: str, look_back_days: int = 7) -> str:
+    calls.append((ticker, curr_date, look_back_days))
+    if ticker.strip().upper() == 'BAD':
+        return "❌ 获取失败"
+    return f"report for {ticker.strip().upper()} {curr_date} {look_back_days}"
+
+
+def test_no_context_passthrough():
+    """不在分析运行中时每次都执行"""
+    calls.clear()
+    demo_tool('AAPL', '2025-01-10')
+    demo_tool('AAPL', '2025-01-10')
+    assert len(calls) == 2
+
+
+def test_dedup_normalized_args():
+    """代码大小写、空格和默认参数写法不同的调用视为同一次调用"""
+    calls.clear()
+    context = RunDataContext(symbol='AAPL')
+    with context.activated():
+        first = demo_tool('AAPL', '2025-01-10')
+        assert demo_tool(' aapl ', '2025-01-10') == first
+        assert demo_tool(ticker='AAPL', curr_date='2025-01-10', look_back_days=7) == first
+        demo_tool('AAPL', '2025-01-10', look_back_days=30)
+    assert len(calls) == 2
+
+    stats = context.get_stats()
+    assert stats['tool_calls'] == 4
+    assert stats['tool_calls_deduped'] == 2
+    assert stats['tools']['demo_tool'] == {'calls': 4, 'deduped': 2}
+
+
+def test_errors_not_memoized():
+    """失败结果不复用，重试时重新执行"""
+    calls.clear()
+    with RunDataContext().activated():
+        demo_tool('BAD', '2025-01-10')
+        demo_tool('BAD', '2025-01-10')
+    assert len(calls) == 2
+
+
+def test_runs_are_isolated():
+    """不同运行之间不共享结果"""
+    calls.clear()
+    for _ in range(2):
+        with RunDataContext().activated():
+            demo_tool('MSFT', '2025-01-10')
+    assert len(calls) == 2
+
+
+if __name__ == "__main__":
+    test_no_context_passthrough()
+    test_dedup_normalized_args()
+    test_errors_not_memoized()
+    test_runs_are_isolated()
+    print("✅ 工具调用去重测试全部通过")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+请求合并（single-flight）测试
+测试相同参数的并发请求只执行一次并共享结果
+"""
+
+import os
+import sys
+import threading
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.single_flight import SingleFlight, single_flight, get_single_flight
+
+
+def _run_concurrently(func, args_list):
+    results = [None] * len(args_list)
+
+    def worker(i, args):
+        results[i] = func(*args)
+
+    threads = [threading.Thread(target=worker, args=(i, args)) for i, args in enumerate(args_list)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_calls_are_coalesced():
+    """相同key的并发调用只执行一次"""
+    calls = []
+
+    @single_flight('test_coalesce')
+    def fetch(symbol, start_date, end_date=None):
+        calls.append(symbol)
+        time.sleep(0.2)
+        return f"{symbol}:{start_date}:{end_date}"
+
+    results = _run_concurrently(fetch, [("000001", "2025-01-01")] * 5)
+    assert len(calls) == 1, f"应当只执行一次，实际{len(calls)}次"
+    assert all(r == "000001:2025-01-01:None" for r in results)
+    stats = get_single_flight('test_coalesce').get_stats()
+    assert stats['leaders'] == 1 and stats['followers'] == 4
+
+
+def test_different_keys_not_coalesced():
+    """不同参数互不影响，关键字参数与位置参数视为同一key"""
+    calls = []
+
+    @single_flight('test_keys')
+    def fetch(symbol, start_date=None):
+        calls.append((symbol, start_date))
+        time.sleep(0.1)
+        return symbol
+
+    _run_concurrently(fetch, [("000001",), ("600036",), ("000001", None)])
+    assert sorted(calls) == [("000001", None), ("600036", None)]
+
+
+def test_errors_are_shared():
+    """leader的异常会传递给所有follower"""
+    group = SingleFlight('test_errors')
+    errors = []
+
+    def boom():
+        time.sleep(0.1)
+        raise RuntimeError("provider down")
+
+    def worker():
+        try:
+            group.do('k', boom)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == ["provider down"] * 3
+    assert group.get_stats()['leaders'] == 1
+
+
+def test_no_caching_after_completion():
+    """调用完成后不缓存结果"""
+    group = SingleFlight('test_no_cache')
+    counter = [0]
+
+    def fetch():
+        counter[0] += 1
+        return counter[0]
+
+    assert group.do('k', fetch) == 1
+    assert group.do('k', fetch) == 2
+    assert group.in_flight() == 0
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_are_coalesced()
+    test_different_keys_not_coalesced()
+    test_errors_are_shared()
+    test_no_caching_after_completion()
+    print("✅ 请求合并测试全部通过")
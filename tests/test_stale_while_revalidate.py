@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+过期缓存先返回、后台刷新测试
+测试软TTL/硬TTL的判定、过期缓存的返回与后台刷新，以及相同刷新任务的去重
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.cache_manager import StockDataCache
+from tradingagents.dataflows.stale_while_revalidate import BackgroundRefresher, serve_stale_stock_data
+from tradingagents.dataflows import stale_while_revalidate
+
+
+def _age_cache(cache: StockDataCache, cache_key: str, hours: float):
+    """把缓存的写入时间改为 hours 小时前"""
+    metadata_path = cache._get_metadata_path(cache_key)
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    metadata['cached_at'] = (datetime.now() - timedelta(hours=hours)).isoformat()
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+
+
+def test_soft_and_hard_ttl():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cache = StockDataCache(temp_dir)
+        assert cache.get_ttl_hours("000001", 'stock_data') == (1, 6)
+        assert cache.get_ttl_hours("AAPL", 'stock_data') == (2, 12)
+        # 未配置硬TTL的数据类型不启用
+        assert cache.get_ttl_hours("AAPL", 'news')[1] is None
+
+        key = cache.save_stock_data("000001", "A股行情", "2025-06-01", "2025-07-01", data_source="unified")
+        _age_cache(cache, key, 1.2)
+        assert cache.find_cached_stock_data("000001", "2025-06-01", "2025-07-01", data_source="unified") is None
+        stale = cache.find_stale_stock_data("000001", "2025-06-01", "2025-07-01", ("unified", "tdx"))
+        assert stale[0] == key and 1.1 < stale[1] < 1.3
+
+        # 日期区间不同的缓存不作为过期缓存返回
+        assert cache.find_stale_stock_data("000001", "2025-05-01", "2025-07-01", ("unified",)) is None
+
+        # 超过硬TTL后不再返回
+        _age_cache(cache, key, 7)
+        assert cache.find_stale_stock_data("000001", "2025-06-01", "2025-07-01", ("unified",)) is None
+
+        cache.stale_while_revalidate = False
+        _age_cache(cache, key, 2)
+        assert cache.find_stale_stock_data("000001", "2025-06-01", "2025-07-01", ("unified",)) is None
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_serve_stale_and_refresh():
+    temp_dir = tempfile.mkdtemp()
+    original = stale_while_revalidate._refresher
+    stale_while_revalidate._refresher = BackgroundRefresher(max_workers=1)
+    try:
+        cache = StockDataCache(temp_dir)
+        key = cache.save_stock_data("AAPL", "旧行情", "2025-06-01", "2025-07-01", data_source="yfinance")
+        _age_cache(cache, key, 3)
+
+        refreshed = threading.Event()
+
+        def refresh():
+            cache.save_stock_data("AAPL", "新行情", "2025-06-01", "2025-07-01", data_source="yfinance")
+            refreshed.set()
+
+        data = serve_stale_stock_data(cache, "AAPL", "2025-06-01", "2025-07-01", ("finnhub", "yfinance"), refresh)
+        assert data == "旧行情"
+        assert refreshed.wait(5)
+
+        # 刷新后缓存重新变为新鲜
+        fresh_key = cache.find_cached_stock_data("AAPL", "2025-06-01", "2025-07-01", data_source="yfinance")
+        assert cache.load_stock_data(fresh_key) == "新行情"
+        assert serve_stale_stock_data(cache, "AAPL", "2025-06-01", "2025-07-01", ("yfinance",), refresh) is None
+
+        # 没有过期缓存时由调用方同步获取
+        assert serve_stale_stock_data(cache, "MSFT", "2025-06-01", "2025-07-01", ("yfinance",), refresh) is None
+    finally:
+        stale_while_revalidate._refresher = original
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_refresher_deduplicates():
+    refresher = BackgroundRefresher(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def slow_refresh():
+        calls.append(1)
+        release.wait(5)
+
+    assert refresher.schedule("AAPL", slow_refresh) is True
+    assert refresher.schedule("AAPL", slow_refresh) is False
+    release.set()
+    refresher._executor.shutdown(wait=True)
+
+    stats = refresher.get_stats()
+    assert calls == [1]
+    assert stats['scheduled'] == 1 and stats['deduplicated'] == 1
+    assert stats['succeeded'] == 1 and stats['pending'] == 0
+
+
+def _wait_idle(refresher: BackgroundRefresher):
+    deadline = time.monotonic() + 5
+    while refresher.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_refresh_failure_backs_off():
+    refresher = BackgroundRefresher(max_workers=1, backoff_seconds=0.1)
+    calls = []
+
+    def failing_refresh():
+        calls.append(1)
+        raise RuntimeError("数据源不可用")
+
+    assert refresher.schedule("000001", failing_refresh)
+    _wait_idle(refresher)
+    assert refresher.get_stats()['failed'] == 1
+    # 退避期内命中过期缓存不再请求失败的数据源
+    assert refresher.schedule("000001", failing_refresh) is False
+    assert refresher.get_stats()['backed_off'] == 1
+    time.sleep(0.15)
+    assert refresher.schedule("000001", lambda: "新行情")
+    _wait_idle(refresher)
+    stats = refresher.get_stats()
+    assert calls == [1] and stats['succeeded'] == 1 and stats['backing_off'] == 0
+
+
+def test_fallback_result_keeps_stale_cache():
+    temp_dir = tempfile.mkdtemp()
+    original = stale_while_revalidate._refresher
+    stale_while_revalidate._refresher = refresher = BackgroundRefresher(max_workers=1, backoff_seconds=60)
+    try:
+        cache = StockDataCache(temp_dir)
+        key = cache.save_stock_data("000001", "旧行情", "2025-06-01", "2025-07-01", data_source="unified")
+        _age_cache(cache, key, 2)
+
+        def fallback_refresh():
+            return "# 000001 A股数据获取失败\n\n## ❌ 错误信息\n数据源API调用失败\n"
+
+        assert serve_stale_stock_data(cache, "000001", "2025-06-01", "2025-07-01", ("unified",),
+                                      fallback_refresh) == "旧行情"
+        _wait_idle(refresher)
+        assert refresher.get_stats()['failed'] == 1
+
+        # 备用数据不算刷新成功，仍返回原缓存且在退避期内不再提交刷新
+        assert serve_stale_stock_data(cache, "000001", "2025-06-01", "2025-07-01", ("unified",),
+                                      fallback_refresh) == "旧行情"
+        assert refresher.get_stats()['scheduled'] == 1
+
+        # 数据源失败时提供器退回旧缓存，同样视为刷新失败
+        assert refresher.schedule("600036", lambda: "旧行情", stale="旧行情")
+        _wait_idle(refresher)
+        assert refresher.get_stats()['failed'] == 2
+    finally:
+        stale_while_revalidate._refresher = original
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_soft_and_hard_ttl()
+    test_serve_stale_and_refresh()
+    test_refresher_deduplicates()
+    test_refresh_failure_backs_off()
+    test_fallback_result_keeps_stale_cache()
+    print("✅ 过期缓存后台刷新测试全部通过")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+股票主表测试
+测试代码别名查询、名称/拼音搜索、来源优先级、增量更新和本地快照
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows import symbol_master
+from tradingagents.dataflows.symbol_master import SymbolMaster, MARKET_CHINA, MARKET_HK
+
+
+A_SHARES = [
+    {'code': '000001', 'name': '平安银行', 'market': '深圳', 'cnspell': 'payh'},
+    {'code': '601318', 'name': '中国平安', 'market': '上海', 'cnspell': 'zgpa'},
+    {'code': '600036', 'name': '招商银行', 'market': '上海', 'cnspell': 'zsyh'},
+    {'code': '300750', 'name': '宁德时代', 'market': '深圳', 'cnspell': 'ndsd'},
+]
+
+
+def _master():
+    # 刷新间隔设为0并标记已刷新，避免测试中访问MongoDB
+    master = SymbolMaster(refresh_interval=0)
+    master._last_refresh = 0
+    master.load_entries(A_SHARES, MARKET_CHINA, 'mongodb')
+    master.load_entries([{'code': '0700.HK', 'name': '腾讯控股'}], MARKET_HK, 'builtin')
+    return master
+
+
+def test_lookup_aliases():
+    """同一股票的多种代码格式都能查到"""
+    master = _master()
+    assert master.get_name('000001') == '平安银行'
+    assert master.get_name('000001.sz') == '平安银行'
+    for code in ['0700.HK', '0700', '00700', '700', '0700.hk']:
+        assert master.get_name(code, MARKET_HK) == '腾讯控股', code
+    assert master.get('0700.HK', MARKET_CHINA) is None
+    assert master.get('999999') is None
+
+
+def test_search_ranking():
+    """代码前缀、名称子串、拼音首字母搜索及排序"""
+    master = _master()
+    assert [s['code'] for s in master.search('平安')] == ['000001', '601318']
+    assert [s['code'] for s in master.search('银行')] == ['000001', '600036']
+    assert [s['code'] for s in master.search('PAYH')] == ['000001']
+    assert [s['code'] for s in master.search('zg')] == ['601318']
+    assert master.search('6000')[0]['code'] == '600036'
+    assert master.search('0001')[0]['code'] == '000001'
+    assert master.search('腾讯', market=MARKET_CHINA) == []
+    assert master.search('') == []
+
+
+def test_incremental_update_and_priority():
+    """更名后旧名称不再命中；低优先级来源不覆盖高优先级来源"""
+    master = _master()
+    changed = master.load_entries([{'code': '000001', 'name': '平安银行股份', 'cnspell': 'payhgf'}],
+                                  MARKET_CHINA, 'mongodb')
+    assert changed == 1
+    assert master.get_name('000001') == '平安银行股份'
+    assert master.load_entries(A_SHARES[1:], MARKET_CHINA, 'mongodb') == 0
+
+    master.upsert({'code': '000001', 'name': '旧名称'}, MARKET_CHINA, 'builtin')
+    assert master.get_name('000001') == '平安银行股份'
+
+    master.upsert({'code': '000001', 'name': '万科A'}, MARKET_CHINA, 'mongodb')
+    assert [s['code'] for s in master.search('平安')] == ['601318']
+
+
+def test_results_are_copies():
+    """返回结果被修改不影响主表"""
+    master = _master()
+    master.get('000001')['name'] = 'changed'
+    master.search('平安')[0]['name'] = 'changed'
+    assert master.get_name('000001') == '平安银行'
+
+
+def test_snapshot_roundtrip():
+    """快照保存后可被新实例加载"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'symbols.json')
+        assert _master().save_snapshot(path)
+
+        restored = SymbolMaster(snapshot_path=path, refresh_interval=0)
+        restored._last_refresh = 0
+        assert restored.load_snapshot() == len(A_SHARES)
+        assert restored.get_name('600036') == '招商银行'
+        # 内置映射不写入快照
+        assert restored.get('0700.HK') is None
+
+
+def test_tushare_search_keeps_ranking():
+    """Tushare搜索结果按主表相关度排序，完整ts_code仍可搜索"""
+    import pandas as pd
+    from tradingagents.dataflows.tushare_utils import TushareProvider
+
+    stock_list = pd.DataFrame([
+        {'ts_code': f"{s['code']}.{'SZ' if s['market'] == '深圳' else 'SH'}", 'symbol': s['code'],
+         'name': s['name'], 'market': s['market'], 'cnspell': s['cnspell']} for s in reversed(A_SHARES)
+    ])
+    provider = TushareProvider.__new__(TushareProvider)
+    provider.get_stock_list = lambda: stock_list
+
+    original = symbol_master._symbol_master
+    symbol_master._symbol_master = _master()
+    try:
+        # 股票列表按倒序排列，结果顺序仍与主表搜索一致
+        assert list(provider.search_stocks('平安')['symbol']) == ['000001', '601318']
+        assert list(provider.search_stocks('银行')['symbol']) == ['000001', '600036']
+        # 完整ts_code通过主表别名解析（大小写不敏感）
+        assert list(provider.search_stocks('000001.SZ')['symbol']) == ['000001']
+        assert list(provider.search_stocks('600036.sh')['symbol']) == ['600036']
+    finally:
+        symbol_master._symbol_master = original
+
+
+if __name__ == "__main__":
+    test_lookup_aliases()
+    test_search_ranking()
+    test_incremental_update_and_priority()
+    test_results_are_copies()
+    test_snapshot_roundtrip()
+    test_tushare_search_keeps_ranking()
+    print("✅ 股票主表测试全部通过")
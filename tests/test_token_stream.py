@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+智能体流式输出测试
+测试回调通道的按节点节流、节点归属、无回调时回退到普通调用，以及流式结果的合并与用量
+"""
+
+import contextvars
+import os
+import sys
+import threading
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils.token_stream import (
+    NODE_SECTIONS, is_streaming, stream_generate, stream_node, streaming_node, token_stream
+)
+
+
+def test_node_binding():
+    events = []
+    node = stream_node("Market Analyst", lambda state: is_streaming())
+
+    # 没有回调通道时节点内不流式输出
+    assert node({}) is False
+    with token_stream(events.append):
+        assert is_streaming() is False
+        assert node({}) is True
+    assert is_streaming() is False
+    assert node.__wrapped__ is not None
+
+
+def test_no_listener_falls_back():
+    def fail_stream(*args, **kwargs):
+        raise AssertionError("没有回调时不应调用流式接口")
+
+    assert stream_generate(fail_stream, []) is None
+    with streaming_node("Trader"):
+        assert stream_generate(fail_stream, []) is None
+
+
+def test_throttle_per_node():
+    from tradingagents.utils.token_stream import _channel
+
+    events = []
+    built = []
+
+    def text(value):
+        def build():
+            built.append(value)
+            return value
+        return build
+
+    with token_stream(events.append, min_interval=60):
+        channel = _channel.get()
+        channel.emit("Market Analyst", "a", text("a"))
+        channel.emit("Market Analyst", "b", text("ab"))
+        channel.emit("News Analyst", "x", text("x"))
+        channel.emit("Market Analyst", "c", text("abc"), done=True)
+
+    # 累计文本只在实际推送时生成
+    assert built == ["a", "x", "abc"]
+
+    assert [(e.node, e.delta, e.text, e.done) for e in events] == [
+        ("Market Analyst", "a", "a", False),
+        ("News Analyst", "x", "x", False),
+        # 节流期间的增量合并到下一次推送，完成事件总会推送
+        ("Market Analyst", "bc", "abc", True),
+    ]
+    assert events[0].section == NODE_SECTIONS["Market Analyst"] == "market_report"
+
+
+def test_worker_thread_inherits_channel():
+    events = []
+    node = stream_node("Risk Judge", lambda: is_streaming())
+    results = []
+    with token_stream(events.append):
+        # LangGraph 在工作线程中执行节点时复制调用方的上下文
+        context = contextvars.copy_context()
+        worker = threading.Thread(target=lambda: results.append(context.run(node)))
+        worker.start()
+        worker.join()
+    assert results == [True]
+
+
+def test_stream_generate_merges_chunks():
+    try:
+        from langchain_core.messages import AIMessageChunk, HumanMessage
+        from langchain_core.outputs import ChatGenerationChunk
+    except ImportError:
+        print("⚠️ 未安装 langchain_core，跳过流式合并测试")
+        return
+
+    def fake_stream(messages, stop=None, run_manager=None, **kwargs):
+        for text in ["看涨", "，目标价", "100元"]:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text))
+
+    events = []
+    with token_stream(events.append, min_interval=0), streaming_node("Trader"):
+        result = stream_generate(fake_stream, [HumanMessage(content="分析")], model_name="qwen-plus")
+
+    assert result.generations[0].message.content == "看涨，目标价100元"
+    assert events[-1].done and events[-1].text == "看涨，目标价100元"
+    assert events[-1].section == "trader_investment_plan"
+    # 流式响应没有用量时按分词器估算，格式与普通调用一致
+    assert result.llm_output['token_usage']['completion_tokens'] > 0
+
+
+if __name__ == "__main__":
+    test_node_binding()
+    test_no_listener_falls_back()
+    test_throttle_per_node()
+    test_worker_thread_inherits_channel()
+    test_stream_generate_merges_chunks()
+    print("✅ 智能体流式输出测试全部通过")
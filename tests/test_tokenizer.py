@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Token计数测试
+测试估算分词器、文本计数缓存、自定义分词器注册和消息/工具计数
+"""
+
+import os
+import sys
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.llm_adapters.tokenizer import (
+    HeuristicTokenizer, Tokenizer, TOKENS_PER_MESSAGE, TOKENS_PER_REPLY,
+    count_text_tokens, count_tokens, get_tokenizer, register_tokenizer
+)
+
+
+class WordTokenizer(Tokenizer):
+    name = "words"
+
+    def __init__(self):
+        self.calls = 0
+
+    def count(self, text):
+        self.calls += 1
+        return len(text.split())
+
+
+def test_heuristic_counts_cjk_and_latin():
+    tokenizer = HeuristicTokenizer()
+    # 10个中文字符 ≈ 6 token，10个英文字符 ≈ 3 token
+    assert tokenizer.count("平安银行发布业绩快报") == 6
+    assert tokenizer.count("abcdefghij") == 3
+    assert tokenizer.count("") == 0
+
+
+def test_prefix_counts_are_cached():
+    words = WordTokenizer()
+    register_tokenizer("wordmodel", lambda: words)
+    system = "你是 一位 专业的 股票 分析师 " * 50
+    history = [{'role': 'system', 'content': system}]
+
+    for turn in range(5):
+        history.append({'role': 'user', 'content': f"第 {turn} 轮 问题"})
+        count_tokens(history, model="wordmodel-v1")
+
+    tokenizer = get_tokenizer("wordmodel-v1")
+    # 系统提示词和角色名只分词一次，之后每轮只对新消息分词
+    assert tokenizer.misses == words.calls
+    assert words.calls == 3 + 5  # system角色、系统提示词、user角色 + 5条新问题
+    assert tokenizer.hits > tokenizer.misses
+
+
+def test_count_tokens_messages_and_tools():
+    register_tokenizer("wordmodel", WordTokenizer)
+    messages = [{'role': 'system', 'content': 'a b c'}, {'role': 'user', 'content': 'd e'}]
+    expected = TOKENS_PER_REPLY + 2 * TOKENS_PER_MESSAGE + (1 + 3) + (1 + 2)
+    assert count_tokens(messages, model="wordmodel") == expected
+
+    tool = {'type': 'function', 'function': {'name': 'get_stock_market_data_unified', 'description': 'x'}}
+    assert count_tokens(messages, model="wordmodel", tools=[tool]) > expected
+    assert count_text_tokens("one two three", model="wordmodel") == 3
+
+
+def test_broken_tokenizer_falls_back():
+    def broken():
+        raise ImportError("tokenizers not installed")
+    register_tokenizer("brokenmodel", broken)
+    assert get_tokenizer("brokenmodel").name == "heuristic"
+    assert count_text_tokens("平安银行", model="brokenmodel") > 0
+
+
+if __name__ == "__main__":
+    test_heuristic_counts_cjk_and_latin()
+    test_prefix_counts_are_cached()
+    test_count_tokens_messages_and_tools()
+    test_broken_tokenizer_falls_back()
+    print("✅ Token计数测试全部通过")
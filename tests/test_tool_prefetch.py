@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+推测性数据预取测试
+测试预测的工具调用参数、预取结果在运行上下文中复用，以及预取进行中时相同调用等待而不重复获取
+"""
+
+import os
+import sys
+import threading
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.agents.utils.tool_prefetch import (
+    FUNDAMENTALS_START_DATE, SpeculativePrefetcher, market_data_window, predict_tool_calls
+)
+from tradingagents.dataflows.run_data_context import RunDataContext, run_memoized_tool
+
+
+calls = []
+release = threading.Event()
+
+
+@run_memoized_tool("get_stock_market_data_unified")
+def market_tool(ticker: str, start_date: str, end_date: str) -> str:
+    calls.append(ticker)
+    release.wait(5)
+    return f"market {ticker} {start_date} {end_date}"
+
+
+class FakeTool:
+    def __init__(self, func):
+        self.func = func
+
+    def invoke(self, args):
+        return self.func(**args)
+
+
+class FakeToolkit:
+    config = {"online_tools": True, "market_lookback_days": 90}
+    get_stock_market_data_unified = FakeTool(market_tool)
+
+
+def test_predict_tool_calls():
+    calls_a = dict(predict_tool_calls("000001", "2025-07-01", ["market", "fundamentals", "news"],
+                                      lookback_days=60))
+    assert calls_a['get_stock_market_data_unified'] == {
+        'ticker': "000001", 'start_date': "2025-05-02", 'end_date': "2025-07-01"}
+    assert market_data_window("2025-07-01", 60) == ("2025-05-02", "2025-07-01")
+    assert calls_a['get_stock_fundamentals_unified']['start_date'] == FUNDAMENTALS_START_DATE
+    assert 'get_realtime_stock_news' in calls_a
+
+    calls_hk = dict(predict_tool_calls("0700.HK", "2025-07-01", ["news"]))
+    assert "港股" in calls_hk['get_google_news']['query']
+
+    # 离线模式：情绪分析按市场选择数据源，行情和基本面工具不同，不预取
+    offline_us = dict(predict_tool_calls("AAPL", "2025-07-01", ["market", "social"], online_tools=False))
+    assert list(offline_us) == ['get_reddit_stock_info']
+
+
+def test_prefetch_result_reused():
+    calls.clear()
+    release.set()
+    context = RunDataContext(symbol="000001")
+    with context.activated():
+        prefetcher = SpeculativePrefetcher(FakeToolkit(), ["market"])
+        assert prefetcher.start("000001", "2025-07-01") == ['get_stock_market_data_unified']
+        prefetcher.shutdown(wait=True)
+
+        # 预取与市场分析师提示词使用同一配置的行情天数
+        start_date, end_date = market_data_window("2025-07-01", FakeToolkit.config["market_lookback_days"])
+        result = market_tool("000001", start_date, end_date)
+
+    assert result == "market 000001 2025-04-02 2025-07-01"
+    assert len(calls) == 1
+    # 预取不计入工具调用统计，分析师的调用计为复用
+    assert context.get_stats()['tools']['get_stock_market_data_unified'] == {'calls': 1, 'deduped': 1}
+    assert prefetcher.stats()['get_stock_market_data_unified']['done']
+
+
+def test_call_waits_for_in_flight_prefetch():
+    calls.clear()
+    release.clear()
+    context = RunDataContext(symbol="000001")
+    with context.activated():
+        prefetcher = SpeculativePrefetcher(FakeToolkit(), ["market"])
+        prefetcher.start("000001", "2025-07-01")
+        time.sleep(0.05)
+
+        start_date, end_date = market_data_window("2025-07-01", FakeToolkit.config["market_lookback_days"])
+        threading.Timer(0.1, release.set).start()
+        result = market_tool("000001", start_date, end_date)
+        prefetcher.shutdown(wait=True)
+
+    assert result.startswith("market 000001")
+    assert len(calls) == 1
+    assert context.get_stats()['tool_calls_deduped'] == 1
+
+
+def test_shutdown_cancels_pending_prefetch():
+    calls.clear()
+    release.clear()
+    context = RunDataContext(symbol="000001")
+    with context.activated():
+        prefetcher = SpeculativePrefetcher(FakeToolkit(), ["market"], max_workers=1)
+        prefetcher.start("000001", "2025-07-01")
+        # 单线程池被占用，第二项预取排队等待
+        pending = prefetcher._executor.submit(market_tool, "600000", "2025-04-02", "2025-07-01")
+        prefetcher._futures['queued'] = pending
+        time.sleep(0.05)
+        prefetcher.shutdown()
+        release.set()
+
+    assert pending.cancelled()
+    assert prefetcher.stats()['queued'] == {'done': True, 'cancelled': True, 'duration': None}
+    assert "600000" not in calls
+
+
+if __name__ == "__main__":
+    test_predict_tool_calls()
+    test_prefetch_result_reused()
+    test_call_waits_for_in_flight_prefetch()
+    test_shutdown_cancels_pending_prefetch()
+    print("✅ 推测性数据预取测试全部通过")
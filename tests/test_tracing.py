@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+分析运行追踪测试
+测试嵌套区间、跨线程传递、关键路径、Chrome trace / OTel 导出以及工具日志装饰器的接入
+"""
+
+import contextvars
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils.tracing import (
+    current_trace, finish_trace, span, start_trace, trace_event, trace_llm_call
+)
+from tradingagents.utils.tool_logging import log_analysis_module, log_data_source_call, log_tool_call
+
+
+def test_noop_without_trace():
+    """未开始追踪时 span 为空操作"""
+    assert current_trace() is None
+    with span("outside", "tool") as s:
+        assert s is None
+    trace_event("cache.hit")
+
+
+def test_nested_spans_and_critical_path():
+    """并行节点中较慢的一支构成关键路径"""
+    trace, token = start_trace("analysis_000001", symbol="000001")
+
+    def node(name, delay):
+        with span(name, "node"):
+            with span(f"{name}.tool", "tool"):
+                time.sleep(delay)
+                trace_event("cache.miss")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, node, name, delay)
+                   for name, delay in (("fast_analyst", 0.02), ("slow_analyst", 0.1))]
+        for future in futures:
+            future.result()
+    with span("trader", "node"):
+        time.sleep(0.03)
+
+    summary = finish_trace(trace, token)
+    assert current_trace() is None
+
+    names = [p['name'] for p in summary['critical_path']]
+    assert names == ["analysis_000001", "slow_analyst", "slow_analyst.tool", "trader"], names
+    assert summary['by_category']['node']['count'] == 3
+    assert summary['events'] == {"cache.miss": 2}
+    # 并行子区间不重复计算：根区间的自身耗时不为负
+    assert summary['by_category']['run']['self_ms'] >= 0
+    assert summary['duration_ms'] >= 130
+
+    tool_span = next(s for s in trace.spans if s.name == "slow_analyst.tool")
+    node_span = next(s for s in trace.spans if s.name == "slow_analyst")
+    assert tool_span.parent_id == node_span.span_id
+    assert node_span.parent_id == trace.root.span_id
+
+
+def test_exports():
+    """Chrome trace 和 OTel 导出格式"""
+    trace, token = start_trace("export_run")
+    try:
+        with span("tushare.get_stock_data", "data_source", symbol="000001"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    finish_trace(trace, token)
+
+    chrome = trace.to_chrome_trace()
+    events = {e['name']: e for e in chrome['traceEvents']}
+    assert events["tushare.get_stock_data"]['ph'] == 'X'
+    assert events["tushare.get_stock_data"]['args']['error'] == "ValueError: boom"
+
+    otel = trace.to_otel()
+    spans = otel['resourceSpans'][0]['scopeSpans'][0]['spans']
+    child = next(s for s in spans if s['name'] == "tushare.get_stock_data")
+    root = next(s for s in spans if s['name'] == "export_run")
+    assert child['parentSpanId'] == root['spanId']
+    assert child['status']['code'] == 2
+    assert len(child['traceId']) == 32 and int(child['endTimeUnixNano']) >= int(child['startTimeUnixNano'])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ('chrome', 'otel'):
+            path = trace.export(os.path.join(tmp, f"trace.{fmt}.json"), fmt)
+            with open(path, encoding='utf-8') as f:
+                json.load(f)
+
+
+def test_decorators_record_spans():
+    """工具、数据源、分析模块和LLM装饰器生成嵌套区间"""
+
+    @log_data_source_call("tushare")
+    def fetch(symbol):
+        return f"{symbol} 数据"
+
+    @log_tool_call(tool_name="get_stock_market_data_unified")
+    def tool(ticker):
+        return fetch(ticker)
+
+    class FakeLLM:
+        provider_name = "deepseek"
+        model_name = "deepseek-chat"
+
+        @trace_llm_call()
+        def _generate(self, messages, stop=None):
+            return "ok"
+
+    @log_analysis_module("market_analyst")
+    def market_node(state):
+        FakeLLM()._generate(["hi", "there"])
+        return tool(state['company_of_interest'])
+
+    trace, token = start_trace("decorated_run")
+    market_node({'company_of_interest': '000001'})
+    finish_trace(trace, token)
+
+    by_name = {s.name: s for s in trace.spans}
+    assert by_name["market_analyst"].category == 'node'
+    assert by_name["get_stock_market_data_unified"].parent_id == by_name["market_analyst"].span_id
+    source = by_name["tushare.fetch"]
+    assert source.parent_id == by_name["get_stock_market_data_unified"].span_id
+    assert source.attributes['success'] is True
+    assert by_name["deepseek/deepseek-chat"].attributes['messages'] == 2
+
+
+if __name__ == "__main__":
+    test_noop_without_trace()
+    test_nested_spans_and_critical_path()
+    test_exports()
+    test_decorators_record_spans()
+    print("✅ 追踪测试全部通过")
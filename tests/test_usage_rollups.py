@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Token使用量汇总测试
+测试小时/天汇总的增量累加、分组查询、JSON存储的持久化与重建，以及分页查询
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.config.config_manager import ConfigManager, TokenTracker, UsageRecord
+from tradingagents.config.usage_rollups import (
+    JsonRollupStore, UsageRollups, bucket_start, summarize_rollups
+)
+
+
+def _record(ts: datetime, provider="dashscope", model="qwen-turbo", session="s1", cost=0.01,
+            input_tokens=100, output_tokens=50) -> UsageRecord:
+    return UsageRecord(timestamp=ts.isoformat(), provider=provider, model_name=model,
+                       input_tokens=input_tokens, output_tokens=output_tokens, cost=cost,
+                       session_id=session, analysis_type="stock_analysis")
+
+
+def test_bucket_start():
+    ts = datetime(2025, 7, 1, 10, 42, 13, 500)
+    assert bucket_start(ts, 'hour') == datetime(2025, 7, 1, 10)
+    assert bucket_start(ts, 'day') == datetime(2025, 7, 1)
+
+
+def test_rollups_group_by_dimensions():
+    rollups = UsageRollups()
+    base = datetime.now().replace(minute=5, second=0, microsecond=0)
+    rollups.add(_record(base))
+    rollups.add(_record(base + timedelta(minutes=10), session="s2", cost=0.02))
+    rollups.add(_record(base + timedelta(minutes=20), provider="deepseek", model="deepseek-chat", cost=0.03))
+
+    by_provider = rollups.query('hour', group_by=('provider',))
+    assert [row['provider'] for row in by_provider] == ["dashscope", "deepseek"]
+    assert by_provider[0]['requests'] == 2
+    assert abs(by_provider[0]['cost'] - 0.03) < 1e-9
+
+    total = rollups.query('day', group_by=())
+    assert len(total) == 1 and total[0]['requests'] == 3
+    assert total[0]['input_tokens'] == 300
+
+    session = rollups.query('day', group_by=(), session_id="s2")
+    assert abs(session[0]['cost'] - 0.02) < 1e-9
+
+    stats = summarize_rollups(by_provider, 1)
+    assert stats['total_requests'] == 3
+    assert set(stats['provider_stats']) == {"dashscope", "deepseek"}
+
+
+def test_rollups_window_and_prune():
+    rollups = UsageRollups()
+    now = datetime.now()
+    rollups.add(_record(now - timedelta(days=40)))
+    rollups.add(_record(now))
+
+    assert len(rollups.query('day', start=bucket_start(now - timedelta(days=7), 'day'), group_by=())) == 1
+    assert rollups.query('day', group_by=())[0]['requests'] == 2
+
+    rollups.prune()
+    # 小时汇总过期删除，天汇总保留
+    assert rollups.query('hour', group_by=())[0]['requests'] == 1
+    assert rollups.query('day', group_by=())[0]['requests'] == 2
+
+
+def test_json_store_persists_and_rebuilds():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "usage_rollups.json")
+        records = [_record(datetime.now() - timedelta(hours=i)) for i in range(5)]
+
+        store = JsonRollupStore(path, save_every=3)
+        # 汇总文件不存在时从原始记录重建
+        assert store.load(lambda: records).query('day', group_by=())[0]['requests'] == 5
+        store.add(_record(datetime.now()))
+        store.add(_record(datetime.now()))
+        # 未达到批量条件时不写回文件，查询读取内存中的汇总
+        assert store.load().query('day', group_by=())[0]['requests'] == 7
+        assert JsonRollupStore(path).load().query('day', group_by=())[0]['requests'] == 5
+        store.add(_record(datetime.now()))
+        assert JsonRollupStore(path).load().query('day', group_by=())[0]['requests'] == 8
+
+        store.add(_record(datetime.now()))
+        store.flush()
+        reloaded = JsonRollupStore(path).load()
+        assert reloaded.query('day', group_by=())[0]['requests'] == 9
+        assert isinstance(reloaded.query('hour')[0]['bucket'], datetime)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_config_manager_reads_rollups():
+    temp_dir = tempfile.mkdtemp()
+    manager = ConfigManager(temp_dir)
+    manager.mongodb_storage = None
+    try:
+        for i in range(25):
+            manager.add_usage_record("dashscope", "qwen-turbo", 1000, 500, f"session_{i % 3}")
+
+        stats = manager.get_usage_statistics(1)
+        assert stats['total_requests'] == 25
+        assert stats['provider_stats']['dashscope']['requests'] == 25
+
+        # 统计不再读取原始记录
+        manager.load_usage_records = lambda: []
+        assert manager.get_usage_statistics(30)['total_requests'] == 25
+
+        tracker = TokenTracker(manager)
+        session_cost = tracker.get_session_cost("session_0")
+        assert abs(session_cost - stats['total_cost'] * 9 / 25) < 1e-3
+    finally:
+        manager.usage_rollups.flush()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_records_page():
+    temp_dir = tempfile.mkdtemp()
+    manager = ConfigManager(temp_dir)
+    manager.mongodb_storage = None
+    try:
+        for i in range(25):
+            manager.add_usage_record("dashscope", "qwen-turbo", 1000 + i, 500, "s")
+
+        first, total = manager.get_usage_records_page(days=1, page=1, page_size=10)
+        last, _ = manager.get_usage_records_page(days=1, page=3, page_size=10)
+        assert total == 25
+        assert len(first) == 10 and len(last) == 5
+        # 按时间倒序
+        assert first[0].input_tokens == 1024
+        assert last[-1].input_tokens == 1000
+
+        # MongoDB查询失败时回退到JSON文件
+        class BrokenStorage:
+            def is_connected(self):
+                return True
+
+            def load_usage_records_page(self, *args):
+                raise ConnectionError("MongoDB不可用")
+
+        manager.mongodb_storage = BrokenStorage()
+        fallback, total = manager.get_usage_records_page(days=1, page=1, page_size=10)
+        assert total == 25 and fallback[0].input_tokens == 1024
+    finally:
+        manager.usage_rollups.flush()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_bucket_start()
+    test_rollups_group_by_dimensions()
+    test_rollups_window_and_prune()
+    test_json_store_persists_and_rebuilds()
+    test_config_manager_reads_rollups()
+    test_records_page()
+    print("✅ Token使用量汇总测试全部通过")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+MongoDB延迟写入队列测试
+测试同键合并、按集合批量写入、失败重试、延迟指标、close()写完积压，以及 DatabaseCacheManager 读到自己的写入
+"""
+
+import os
+import sys
+import threading
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.write_behind import WriteBehindQueue
+from tests.db_cache_fakes import fake_replace_one, make_cache_manager
+
+
+class RecordingSink:
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+        self.lock = threading.Lock()
+
+    def __call__(self, collection_name, docs):
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("MongoDB不可用")
+            self.batches.append((collection_name, [doc["_id"] for doc in docs], [doc["data"] for doc in docs]))
+
+
+def _queue(sink, **kwargs) -> WriteBehindQueue:
+    # 间隔足够长，测试中由 flush()/close() 显式写入
+    kwargs.setdefault("flush_interval", 60)
+    return WriteBehindQueue(sink, **kwargs)
+
+
+def test_coalesce_and_batch_by_collection():
+    sink = RecordingSink()
+    queue = _queue(sink)
+    try:
+        for version in range(3):
+            queue.enqueue("stock_data", [{"_id": "stock:AAPL", "data": f"v{version}"}])
+        queue.enqueue("news_data", [{"_id": "news:AAPL", "data": "新闻"}])
+        assert queue.get("stock_data", "stock:AAPL")["data"] == "v2"
+
+        stats = queue.get_stats()
+        assert stats["pending"] == 2 and stats["coalesced"] == 2 and stats["enqueued"] == 4
+
+        assert queue.flush()
+        # 同一键只写入最新版本，每个集合一次写入
+        assert sorted(sink.batches) == [("news_data", ["news:AAPL"], ["新闻"]),
+                                        ("stock_data", ["stock:AAPL"], ["v2"])]
+        assert queue.get("stock_data", "stock:AAPL") is None
+        assert queue.get_stats()["flushed"] == 2
+    finally:
+        queue.close()
+
+
+def test_worker_flushes_full_batches():
+    sink = RecordingSink()
+    queue = _queue(sink, max_batch=10)
+    try:
+        queue.enqueue("stock_data", [{"_id": f"stock:{i}", "data": i} for i in range(25)])
+        deadline = time.monotonic() + 5
+        while queue.get_stats()["flushed"] < 20 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # 积压达到 max_batch 时后台线程不等间隔立即写入
+        assert all(len(ids) <= 10 for _, ids, _ in sink.batches)
+        assert queue.get_stats()["flushed"] >= 20
+    finally:
+        assert queue.close()
+    assert sum(len(ids) for _, ids, _ in sink.batches) == 25
+
+
+def test_failed_batch_is_retried_without_losing_newer_writes():
+    sink = RecordingSink(failures=1)
+    queue = _queue(sink)
+    try:
+        queue.enqueue("stock_data", [{"_id": "stock:AAPL", "data": "v1"}, {"_id": "stock:MSFT", "data": "m1"}])
+        assert queue.flush() is False
+        stats = queue.get_stats()
+        assert stats["failures"] == 1 and stats["pending"] == 2
+
+        # 失败后的新版本不会被旧版本覆盖
+        queue.enqueue("stock_data", [{"_id": "stock:AAPL", "data": "v2"}])
+        assert queue.flush()
+        assert sink.batches == [("stock_data", ["stock:AAPL", "stock:MSFT"], ["v2", "m1"])]
+    finally:
+        queue.close()
+
+
+def test_lag_metric():
+    queue = _queue(RecordingSink())
+    try:
+        assert queue.lag_seconds() == 0.0
+        queue.enqueue("stock_data", [{"_id": "stock:AAPL", "data": "v1"}])
+        time.sleep(0.05)
+        # 合并写入不重置等待时间
+        queue.enqueue("stock_data", [{"_id": "stock:AAPL", "data": "v2"}])
+        assert queue.get_stats()["lag_seconds"] >= 0.05
+        queue.flush()
+        stats = queue.get_stats()
+        assert stats["lag_seconds"] == 0.0 and stats["last_flush_lag_seconds"] >= 0.05
+    finally:
+        queue.close()
+
+
+def test_close_drains_and_rejects_new_writes():
+    sink = RecordingSink()
+    queue = _queue(sink)
+    queue.enqueue("fundamentals_data", [{"_id": f"fundamentals:{i}", "data": i} for i in range(3)])
+    assert queue.close()
+    assert sink.batches[0][1] == ["fundamentals:0", "fundamentals:1", "fundamentals:2"]
+    assert queue.get_stats()["closed"]
+    try:
+        queue.enqueue("fundamentals_data", [{"_id": "fundamentals:late", "data": 0}])
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("关闭后应拒绝入队")
+
+
+def test_manager_reads_its_own_writes():
+    with fake_replace_one():
+        manager = make_cache_manager(redis=False)
+        manager._write_behind = _queue(manager._bulk_write_mongodb)
+        collection = manager.mongodb_db.stock_data
+
+        key = manager.save_stock_data("AAPL", "行情 v1", "2025-06-01", "2025-07-01", data_source="yfinance")
+        manager.save_stock_data("AAPL", "行情 v2", "2025-06-01", "2025-07-01", data_source="yfinance")
+        # 保存不等待MongoDB，读取时从队列中取到未持久化的最新版本
+        assert collection.round_trips == 0
+        assert manager.load_stock_data(key) == "行情 v2"
+        assert manager.find_cached_stock_data("AAPL", "2025-06-01", "2025-07-01", "yfinance") == key
+        assert manager.get_cache_stats()["write_behind"]["pending"] == 1
+
+        # close() 合并写入一次后关闭
+        manager.close()
+        assert collection.round_trips == 1
+        assert manager.load_stock_data(key) == "行情 v2"
+
+        # 关闭后的保存同步写入MongoDB
+        manager.save_news_data("AAPL", "新闻", "2025-07-01", "2025-07-02", data_source="google")
+        assert manager.mongodb_db.news_data.round_trips == 1
+
+
+if __name__ == "__main__":
+    test_coalesce_and_batch_by_collection()
+    test_worker_flushes_full_batches()
+    test_failed_batch_is_retried_without_losing_newer_writes()
+    test_lag_metric()
+    test_close_drains_and_rejects_new_writes()
+    test_manager_reads_its_own_writes()
+    print("✅ MongoDB延迟写入队列测试全部通过")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+美股批量行情下载测试
+测试 yf.download 结果按股票拆分、分批请求，以及批量预取写入缓存后 get_stock_data 直接命中
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+# 添加项目根目录到路径
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows import integrated_cache, yfin_bulk
+from tradingagents.dataflows.optimized_us_data import OptimizedUSDataProvider
+
+
+def _fake_download_frame(symbols, start, end):
+    """构造与 yf.download(group_by='ticker') 相同结构的结果：(股票代码, 字段) 的MultiIndex列"""
+    index = pd.date_range(start, end, freq='B', inclusive='left', name='Date')
+    frames = {}
+    for i, symbol in enumerate(symbols):
+        if symbol == "NODATA":
+            frames[symbol] = pd.DataFrame(float('nan'), index=index,
+                                          columns=["Open", "High", "Low", "Close", "Volume"])
+            continue
+        close = pd.Series(range(len(index)), index=index, dtype=float) + 100 + i
+        frames[symbol] = pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1,
+                                       "Close": close, "Volume": 1000.0})
+    return pd.concat(frames, axis=1)
+
+
+class FakeYF:
+    def __init__(self):
+        self.calls = []
+
+    def download(self, tickers, start=None, end=None, **kwargs):
+        self.calls.append(list(tickers))
+        return _fake_download_frame(tickers, start, end)
+
+
+def test_split_download():
+    data = _fake_download_frame(["AAPL", "MSFT", "NODATA"], "2025-06-02", "2025-06-07")
+    frames = yfin_bulk.split_download(data, ["AAPL", "MSFT", "NODATA", "MISSING"])
+    assert set(frames) == {"AAPL", "MSFT"}
+    assert list(frames["AAPL"].columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert len(frames["MSFT"]) == 5
+
+    # 单只股票时为普通列
+    single = yfin_bulk.split_download(data["AAPL"], ["AAPL"])
+    assert list(single) == ["AAPL"]
+
+
+def test_bulk_download_batches():
+    fake = FakeYF()
+    original = yfin_bulk.yf
+    yfin_bulk.yf = fake
+    try:
+        symbols = [f"S{i}" for i in range(5)]
+        frames = yfin_bulk.bulk_download(symbols + ["S0"], "2025-06-02", "2025-06-07", batch_size=2)
+    finally:
+        yfin_bulk.yf = original
+    assert fake.calls == [["S0", "S1"], ["S2", "S3"], ["S4"]]
+    assert set(frames) == set(symbols)
+
+
+def test_prefetch_populates_cache():
+    temp_dir = tempfile.mkdtemp()
+    fake = FakeYF()
+    original = yfin_bulk.yf
+    yfin_bulk.yf = fake
+    original_adaptive = integrated_cache.ADAPTIVE_CACHE_AVAILABLE
+    integrated_cache.ADAPTIVE_CACHE_AVAILABLE = False
+    try:
+        provider = OptimizedUSDataProvider()
+        provider.cache = integrated_cache.IntegratedCacheManager(temp_dir)
+        windows = [("2025-05-01", "2025-06-01"), ("2025-04-02", "2025-06-01")]
+
+        saved = provider.prefetch_stock_data(["aapl", "MSFT", "000001"], windows)
+        # 非美股跳过，两只美股一次下载覆盖两个区间
+        assert saved == {"AAPL": 2, "MSFT": 2}
+        assert fake.calls == [["AAPL", "MSFT"]]
+
+        # 已缓存的区间不再下载
+        assert provider.prefetch_stock_data(["AAPL"], windows) == {}
+        assert len(fake.calls) == 1
+
+        data = provider.get_stock_data("AAPL", "2025-05-01", "2025-06-01")
+        assert "AAPL 美股数据分析" in data
+        assert "2025-05-01 至 2025-06-01" in data
+    finally:
+        yfin_bulk.yf = original
+        integrated_cache.ADAPTIVE_CACHE_AVAILABLE = original_adaptive
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_split_download()
+    test_bulk_download_batches()
+    test_prefetch_populates_cache()
+    print("✅ 美股批量行情下载测试全部通过")
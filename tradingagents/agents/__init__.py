@@ -1,27 +1,46 @@
-from .utils.agent_utils import Toolkit, create_msg_delete
-from .utils.agent_states import AgentState, InvestDebateState, RiskDebateState
-from .utils.memory import FinancialSituationMemory
+# 智能体按需导入：访问某个名称时才加载对应模块，
+# 避免仅使用 tradingagents.agents.utils 等子模块时拉起全部智能体及其依赖
+import importlib
 
-from .analysts.fundamentals_analyst import create_fundamentals_analyst
-from .analysts.market_analyst import create_market_analyst
-from .analysts.news_analyst import create_news_analyst
-from .analysts.social_media_analyst import create_social_media_analyst
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
 
-from .researchers.bear_researcher import create_bear_researcher
-from .researchers.bull_researcher import create_bull_researcher
+# 导出名称 -> 所在模块（相对本包）
+_LAZY_EXPORTS = {
+    "Toolkit": ".utils.agent_utils",
+    "create_msg_delete": ".utils.agent_utils",
+    "AgentState": ".utils.agent_states",
+    "InvestDebateState": ".utils.agent_states",
+    "RiskDebateState": ".utils.agent_states",
+    "FinancialSituationMemory": ".utils.memory",
+    "create_fundamentals_analyst": ".analysts.fundamentals_analyst",
+    "create_market_analyst": ".analysts.market_analyst",
+    "create_news_analyst": ".analysts.news_analyst",
+    "create_social_media_analyst": ".analysts.social_media_analyst",
+    "create_bear_researcher": ".researchers.bear_researcher",
+    "create_bull_researcher": ".researchers.bull_researcher",
+    "create_risky_debator": ".risk_mgmt.aggresive_debator",
+    "create_safe_debator": ".risk_mgmt.conservative_debator",
+    "create_neutral_debator": ".risk_mgmt.neutral_debator",
+    "create_research_manager": ".managers.research_manager",
+    "create_risk_manager": ".managers.risk_manager",
+    "create_trader": ".trader.trader",
+}
 
-from .risk_mgmt.aggresive_debator import create_risky_debator
-from .risk_mgmt.conservative_debator import create_safe_debator
-from .risk_mgmt.neutral_debator import create_neutral_debator
 
-from .managers.research_manager import create_research_manager
-from .managers.risk_manager import create_risk_manager
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
-from .trader.trader import create_trader
 
-# 导入统一日志系统
-from tradingagents.utils.logging_init import get_logger
-logger = get_logger("default")
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
 
 __all__ = [
     "FinancialSituationMemory",
@@ -16,6 +16,9 @@ logger = get_logger("default")
 # 导入Google工具调用处理器
 from tradingagents.agents.utils.google_tool_handler import GoogleToolCallHandler
 
+# 工具调用参数与分析开始时的数据预取保持一致
+from tradingagents.agents.utils.tool_prefetch import FUNDAMENTALS_START_DATE
+
 
 def _get_company_name_for_fundamentals(ticker: str, market_info: dict) -> str:
     """
@@ -88,7 +91,7 @@ def create_fundamentals_analyst(llm, toolkit):
 
         current_date = state["trade_date"]
         ticker = state["company_of_interest"]
-        start_date = '2025-05-28'
+        start_date = FUNDAMENTALS_START_DATE
 
         logger.debug(f"📊 [DEBUG] 输入参数: ticker={ticker}, date={current_date}")
         logger.debug(f"📊 [DEBUG] 当前状态中的消息数量: {len(state.get('messages', []))}")
@@ -15,6 +15,9 @@ logger = get_logger("default")
 # 导入Google工具调用处理器
 from tradingagents.agents.utils.google_tool_handler import GoogleToolCallHandler
 
+# 工具调用参数与分析开始时的数据预取保持一致
+from tradingagents.agents.utils.tool_prefetch import market_data_window, market_lookback_days
+
 
 def _get_company_name(ticker: str, market_info: dict) -> str:
     """
@@ -308,6 +311,7 @@ def create_market_analyst(llm, toolkit):
             ]
 
         # 统一的系统提示，适用于所有股票类型
+        start_date, end_date = market_data_window(current_date, market_lookback_days(toolkit.config))
         system_message = (
             f"""你是一位专业的股票技术分析师。你必须对{company_name}（股票代码：{ticker}）进行详细的技术分析。
 
@@ -319,6 +323,7 @@ def create_market_analyst(llm, toolkit):
 
 **工具调用指令：**
 你有一个工具叫做get_stock_market_data_unified，你必须立即调用这个工具来获取{company_name}（{ticker}）的市场数据。
+参数：ticker='{ticker}', start_date='{start_date}', end_date='{end_date}'
 不要说你将要调用工具，直接调用工具。
 
 **分析要求：**
@@ -1,6 +1,8 @@
 import time
 import json
 
+from tradingagents.agents.utils.context_budget import get_history_context, get_report_context
+
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
@@ -29,6 +31,10 @@ def create_research_manager(llm, memory):
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
+        # 提示词使用压缩后的报告摘要和辩论历史（未启用压缩时为原文）
+        market_research_report, sentiment_report, news_report, fundamentals_report = get_report_context(state)
+        history_context = get_history_context(state, history)
+
         prompt = f"""作为投资组合经理和辩论主持人，您的职责是批判性地评估这轮辩论并做出明确决策：支持看跌分析师、看涨分析师，或者仅在基于所提出论点有强有力理由时选择持有。
 
 简洁地总结双方的关键观点，重点关注最有说服力的证据或推理。您的建议——买入、卖出或持有——必须明确且可操作。避免仅仅因为双方都有有效观点就默认选择持有；要基于辩论中最强有力的论点做出承诺。
@@ -63,7 +69,7 @@ def create_research_manager(llm, memory):
 
 以下是辩论：
 辩论历史：
-{history}
+{history_context}
 
 请用中文撰写所有分析内容和建议。"""
         response = llm.invoke(prompt)
@@ -1,6 +1,8 @@
 import time
 import json
 
+from tradingagents.agents.utils.context_budget import get_history_context
+
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
@@ -32,6 +34,9 @@ def create_risk_manager(llm, memory):
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
+        # 提示词使用压缩后的辩论历史（未启用压缩时为原文）
+        history_context = get_history_context(state, history)
+
         prompt = f"""作为风险管理委员会主席和辩论主持人，您的目标是评估三位风险分析师——激进、中性和安全/保守——之间的辩论，并确定交易员的最佳行动方案。您的决策必须产生明确的建议：买入、卖出或持有。只有在有具体论据强烈支持时才选择持有，而不是在所有方面都似乎有效时作为后备选择。力求清晰和果断。
 
 决策指导原则：
@@ -47,7 +52,7 @@ def create_risk_manager(llm, memory):
 ---
 
 **分析师辩论历史：**
-{history}
+{history_context}
 
 ---
 
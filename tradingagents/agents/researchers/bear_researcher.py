@@ -2,6 +2,8 @@ from langchain_core.messages import AIMessage
 import time
 import json
 
+from tradingagents.agents.utils.context_budget import get_history_context, get_report_context
+
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
@@ -43,6 +45,10 @@ def create_bear_researcher(llm, memory):
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
+        # 提示词使用压缩后的报告摘要和辩论历史（未启用压缩时为原文）
+        market_research_report, sentiment_report, news_report, fundamentals_report = get_report_context(state)
+        history_context = get_history_context(state, history)
+
         prompt = f"""你是一位看跌分析师，负责论证不投资股票 {company_name} 的理由。
 
 ⚠️ 重要提醒：当前分析的是 {market_info['market_name']}，所有价格和估值请使用 {currency}（{currency_symbol}）作为单位。
@@ -63,7 +69,7 @@ def create_bear_researcher(llm, memory):
 社交媒体情绪报告：{sentiment_report}
 最新世界事务新闻：{news_report}
 公司基本面报告：{fundamentals_report}
-辩论对话历史：{history}
+辩论对话历史：{history_context}
 最后的看涨论点：{current_response}
 类似情况的反思和经验教训：{past_memory_str}
 
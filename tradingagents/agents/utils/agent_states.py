@@ -1,8 +1,6 @@
 from typing import Annotated, Sequence
 from datetime import date, timedelta, datetime
 from typing_extensions import TypedDict, Optional
-from langchain_openai import ChatOpenAI
-from tradingagents.agents import *
 from langgraph.prebuilt import ToolNode
 from langgraph.graph import END, StateGraph, START, MessagesState
 
@@ -64,6 +62,9 @@ class AgentState(MessagesState):
         str, "Report from the News Researcher of current world affairs"
     ]
     fundamentals_report: Annotated[str, "Report from the Fundamentals Researcher"]
+    context_digests: Annotated[
+        dict, "Token-bounded report digests and debate history budget (see context_budget.py)"
+    ]
 
     # researcher team discussion step
     investment_debate_state: Annotated[
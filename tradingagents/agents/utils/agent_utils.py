@@ -1,5 +1,5 @@
 from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage, AIMessage
-from typing import List
+from typing import List, Dict
 from typing import Annotated
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import RemoveMessage
@@ -9,7 +9,6 @@ import functools
 import pandas as pd
 import os
 from dateutil.relativedelta import relativedelta
-from langchain_openai import ChatOpenAI
 import tradingagents.dataflows.interface as interface
 from tradingagents.default_config import DEFAULT_CONFIG
 from langchain_core.messages import HumanMessage
@@ -17,6 +16,8 @@ from langchain_core.messages import HumanMessage
 # 导入统一日志系统和工具日志装饰器
 from tradingagents.utils.logging_init import get_logger
 from tradingagents.utils.tool_logging import log_tool_call, log_analysis_step
+from tradingagents.dataflows.run_data_context import RunDataContext, run_memoized_tool
+from tradingagents.utils.tracing import start_trace, finish_trace, format_critical_path
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -42,6 +43,38 @@ def create_msg_delete():
 class Toolkit:
     _config = DEFAULT_CONFIG.copy()
 
+    @staticmethod
+    def begin_run(symbol: str = None, data_context: RunDataContext = None):
+        """
+        开始一次分析运行的工具调用去重作用域和追踪
+
+        Args:
+            symbol: 分析的股票代码
+            data_context: 已有的运行上下文（如数据预获取阶段创建的），不提供则新建
+
+        Returns:
+            (RunDataContext, token): token需传给end_run；本次运行的追踪记录在 context.trace
+        """
+        context = data_context or RunDataContext(symbol=symbol)
+        context_token = context.activate()
+        context.trace, trace_token = start_trace(f"analysis_{context.symbol or 'unknown'}",
+                                                 symbol=context.symbol, run_id=context.run_id)
+        return context, (context_token, trace_token)
+
+    @staticmethod
+    def end_run(context: RunDataContext, token) -> Dict:
+        """结束分析运行作用域并返回本次运行的去重统计和追踪摘要"""
+        context_token, trace_token = token
+        trace_summary = finish_trace(context.trace, trace_token)
+        context.deactivate(context_token)
+        stats = context.get_stats()
+        stats['trace'] = trace_summary
+        logger.info(f"♻️ [工具去重] 本次分析工具调用{stats['tool_calls']}次，"
+                    f"其中{stats['tool_calls_deduped']}次复用了已有结果；数据复用命中{stats['hits']}次")
+        logger.info(f"⏱️ [追踪] 本次分析耗时{trace_summary['duration_ms'] / 1000:.1f}秒，"
+                    f"关键路径: {format_critical_path(trace_summary)}")
+        return stats
+
     @classmethod
     def update_config(cls, config):
         """Update the class-level configuration."""
@@ -58,6 +91,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_reddit_news")
     def get_reddit_news(
         curr_date: Annotated[str, "Date you want to get news for in yyyy-mm-dd format"],
     ) -> str:
@@ -75,6 +109,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_finnhub_news")
     def get_finnhub_news(
         ticker: Annotated[
             str,
@@ -107,6 +142,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_reddit_stock_info")
     def get_reddit_stock_info(
         ticker: Annotated[
             str,
@@ -129,6 +165,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_chinese_social_sentiment")
     def get_chinese_social_sentiment(
         ticker: Annotated[str, "Ticker of a company. e.g. AAPL, TSM"],
         curr_date: Annotated[str, "Current date in yyyy-mm-dd format"],
@@ -197,6 +234,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_china_market_overview")
     def get_china_market_overview(
         curr_date: Annotated[str, "当前日期，格式 yyyy-mm-dd"],
     ) -> str:
@@ -242,6 +280,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_YFin_data")
     def get_YFin_data(
         symbol: Annotated[str, "ticker symbol of the company"],
         start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
@@ -263,6 +302,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_YFin_data_online")
     def get_YFin_data_online(
         symbol: Annotated[str, "ticker symbol of the company"],
         start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
@@ -284,6 +324,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_stockstats_indicators_report")
     def get_stockstats_indicators_report(
         symbol: Annotated[str, "ticker symbol of the company"],
         indicator: Annotated[
@@ -313,6 +354,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_stockstats_indicators_report_online")
     def get_stockstats_indicators_report_online(
         symbol: Annotated[str, "ticker symbol of the company"],
         indicator: Annotated[
@@ -342,6 +384,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_finnhub_company_insider_sentiment")
     def get_finnhub_company_insider_sentiment(
         ticker: Annotated[str, "ticker symbol for the company"],
         curr_date: Annotated[
@@ -366,6 +409,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_finnhub_company_insider_transactions")
     def get_finnhub_company_insider_transactions(
         ticker: Annotated[str, "ticker symbol"],
         curr_date: Annotated[
@@ -390,6 +434,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_simfin_balance_sheet")
     def get_simfin_balance_sheet(
         ticker: Annotated[str, "ticker symbol"],
         freq: Annotated[
@@ -414,6 +459,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_simfin_cashflow")
     def get_simfin_cashflow(
         ticker: Annotated[str, "ticker symbol"],
         freq: Annotated[
@@ -438,6 +484,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_simfin_income_stmt")
     def get_simfin_income_stmt(
         ticker: Annotated[str, "ticker symbol"],
         freq: Annotated[
@@ -464,6 +511,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_google_news")
     def get_google_news(
         query: Annotated[str, "Query to search with"],
         curr_date: Annotated[str, "Curr date in yyyy-mm-dd format"],
@@ -484,6 +532,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_realtime_stock_news")
     def get_realtime_stock_news(
         ticker: Annotated[str, "Ticker of a company. e.g. AAPL, TSM"],
         curr_date: Annotated[str, "Current date in yyyy-mm-dd format"],
@@ -505,6 +554,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_stock_news_openai")
     def get_stock_news_openai(
         ticker: Annotated[str, "the company's ticker"],
         curr_date: Annotated[str, "Current date in yyyy-mm-dd format"],
@@ -524,6 +574,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_global_news_openai")
     def get_global_news_openai(
         curr_date: Annotated[str, "Current date in yyyy-mm-dd format"],
     ):
@@ -695,6 +746,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_stock_fundamentals_unified")
     @log_tool_call(tool_name="get_stock_fundamentals_unified", log_args=True)
     def get_stock_fundamentals_unified(
         ticker: Annotated[str, "股票代码（支持A股、港股、美股）"],
@@ -881,6 +933,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_stock_market_data_unified")
     @log_tool_call(tool_name="get_stock_market_data_unified", log_args=True)
     def get_stock_market_data_unified(
         ticker: Annotated[str, "股票代码（支持A股、港股、美股）"],
@@ -971,6 +1024,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_stock_news_unified")
     @log_tool_call(tool_name="get_stock_news_unified", log_args=True)
     def get_stock_news_unified(
         ticker: Annotated[str, "股票代码（支持A股、港股、美股）"],
@@ -1102,6 +1156,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @run_memoized_tool("get_stock_sentiment_unified")
     @log_tool_call(tool_name="get_stock_sentiment_unified", log_args=True)
     def get_stock_sentiment_unified(
         ticker: Annotated[str, "股票代码（支持A股、港股、美股）"],
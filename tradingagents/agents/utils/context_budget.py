@@ -0,0 +1,178 @@
+"""
+上下文预算压缩
+分析师报告在研究员、交易员和风险辩论的每一轮提示词中都会完整出现，辩论历史也随轮次不断增长。
+压缩节点在分析师阶段结束后为每份报告生成一次有 token 上限的摘要并缓存在 AgentState 中，
+后续节点通过 get_report_context / get_history_context 使用摘要，控制每轮提示词的长度。
+
+摘要为抽取式（保留标题、结论、含数据的行，按原顺序输出），不额外调用模型。
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from tradingagents.llm_adapters.tokenizer import count_text_tokens
+from tradingagents.utils.tracing import trace_event
+
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
+
+REPORT_FIELDS = ("market_report", "sentiment_report", "news_report", "fundamentals_report")
+
+DEFAULT_REPORT_TOKEN_BUDGET = 2000
+DEFAULT_HISTORY_TOKEN_BUDGET = 4000
+
+# 历史中较早发言的最小摘要长度
+MIN_TURN_TOKENS = 80
+
+GAP_MARKER = "……"
+
+_KEYWORDS = ("建议", "结论", "总结", "评级", "目标价", "风险", "买入", "卖出", "持有", "估值", "操作")
+_DIGIT_PATTERN = re.compile(r'\d')
+# 辩论历史中每次发言以 "Xxx Analyst:" 开头
+_TURN_PATTERN = re.compile(r'\n(?=[A-Z][A-Za-z]* Analyst:)')
+
+
+def _line_priority(line: str) -> int:
+    """行的保留优先级，数值越小越优先"""
+    stripped = line.strip()
+    if stripped.startswith('#') or any(k in stripped for k in _KEYWORDS):
+        return 0
+    if _DIGIT_PATTERN.search(stripped):
+        return 1
+    return 2
+
+
+@lru_cache(maxsize=512)
+def compact_text(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """
+    把文本压缩到 max_tokens 以内
+
+    未超出预算时原样返回；否则按优先级（标题/结论 > 含数据的行 > 其他）选取行，
+    保持原有顺序，被省略的连续片段用省略号标记。
+    """
+    if not text or count_text_tokens(text, model) <= max_tokens:
+        return text
+
+    lines = text.splitlines()
+    marker_tokens = count_text_tokens(GAP_MARKER, model)
+    candidates = sorted(
+        ((_line_priority(line), index, count_text_tokens(line, model))
+         for index, line in enumerate(lines) if line.strip()),
+        key=lambda item: (item[0], item[1]))
+
+    selected = set()
+    used = 0
+    for _, index, tokens in candidates:
+        # 每选一行最多新增一个省略标记
+        if used + tokens + marker_tokens > max_tokens:
+            continue
+        selected.add(index)
+        used += tokens + marker_tokens
+
+    if not selected:
+        # 单行超长（如没有换行的大段文字）：按比例截断
+        ratio = max_tokens / max(1, count_text_tokens(text, model))
+        return text[:max(1, int(len(text) * ratio * 0.95))] + GAP_MARKER
+
+    output: List[str] = []
+    skipped = False
+    for index, line in enumerate(lines):
+        if index in selected:
+            if skipped and output:
+                output.append(GAP_MARKER)
+            output.append(line)
+            skipped = False
+        elif line.strip():
+            skipped = True
+    if skipped:
+        output.append(GAP_MARKER)
+    return "\n".join(output)
+
+
+def split_turns(history: str) -> List[str]:
+    """把辩论历史拆分为单次发言"""
+    return [turn for turn in _TURN_PATTERN.split(history) if turn.strip()]
+
+
+def compact_debate_history(history: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """
+    把辩论历史压缩到 max_tokens 以内
+
+    最近的发言在一半预算内保留原文，较早的发言平分另一半预算各自压缩为摘要，
+    仍超出预算时省略最早的发言。
+    """
+    if not history or count_text_tokens(history, model) <= max_tokens:
+        return history
+
+    turns = split_turns(history)
+    recent: List[str] = []
+    recent_budget = max_tokens // 2
+    used = 0
+    while turns and used + count_text_tokens(turns[-1], model) <= recent_budget:
+        used += count_text_tokens(turns[-1], model)
+        recent.insert(0, turns.pop())
+    if not recent and turns:
+        # 最近一次发言本身就超出一半预算
+        recent.insert(0, compact_text(turns.pop(), recent_budget, model))
+        used = recent_budget
+
+    older_budget = max_tokens - used
+    dropped = 0
+    while turns and older_budget // len(turns) < MIN_TURN_TOKENS:
+        turns.pop(0)
+        dropped += 1
+    older = [compact_text(turn, older_budget // len(turns), model) for turn in turns] if turns else []
+
+    parts = [f"（省略了更早的{dropped}次发言）"] if dropped else []
+    return "\n".join(parts + older + recent)
+
+
+def create_context_compactor(config: Dict[str, Any]):
+    """
+    创建上下文压缩节点：分析师阶段结束后运行一次，把报告摘要和历史预算写入 state["context_digests"]
+    """
+    report_budget = int(config.get("report_token_budget", DEFAULT_REPORT_TOKEN_BUDGET))
+    history_budget = int(config.get("debate_history_token_budget", DEFAULT_HISTORY_TOKEN_BUDGET))
+    model = config.get("quick_think_llm")
+
+    def context_compactor_node(state) -> dict:
+        reports = {}
+        original_tokens = digest_tokens = 0
+        for field in REPORT_FIELDS:
+            report = state.get(field) or ""
+            reports[field] = compact_text(report, report_budget, model)
+            original_tokens += count_text_tokens(report, model)
+            digest_tokens += count_text_tokens(reports[field], model)
+
+        logger.info(f"🗜️ [上下文压缩] 报告 {original_tokens} -> {digest_tokens} tokens "
+                    f"(每份上限 {report_budget}, 辩论历史上限 {history_budget})")
+        trace_event('context.compacted')
+        return {
+            "context_digests": {
+                "reports": reports,
+                "history_budget": history_budget,
+                "model": model,
+                "original_tokens": original_tokens,
+                "digest_tokens": digest_tokens,
+            }
+        }
+
+    return context_compactor_node
+
+
+def get_report_context(state) -> Tuple[str, str, str, str]:
+    """
+    提示词中使用的（市场、情绪、新闻、基本面）报告：已压缩时返回摘要，否则返回原文
+    """
+    digests = (state.get("context_digests") or {}).get("reports") or {}
+    return tuple(digests.get(field, state.get(field) or "") for field in REPORT_FIELDS)
+
+
+def get_history_context(state, history: str) -> str:
+    """提示词中使用的辩论历史：按压缩节点记录的预算压缩，未启用压缩时返回原文"""
+    digests = state.get("context_digests")
+    if not digests:
+        return history
+    return compact_debate_history(history, digests["history_budget"], digests.get("model"))
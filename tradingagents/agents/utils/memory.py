@@ -1,8 +1,5 @@
-import chromadb
-from chromadb.config import Settings
+# chromadb 和 dashscope 在首次使用时导入，避免拖慢启动
 from openai import OpenAI
-import dashscope
-from dashscope import TextEmbedding
 import os
 import threading
 import hashlib
@@ -10,6 +7,7 @@ from typing import Dict, Optional
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
+from tradingagents.utils.cassette import cassette_call
 logger = get_logger("agents.utils.memory")
 
 
@@ -31,6 +29,8 @@ class ChromaDBManager:
 
     def __init__(self):
         if not self._initialized:
+            import chromadb
+            from chromadb.config import Settings
             try:
                 # 自动检测操作系统版本并使用最优配置
                 import platform
@@ -332,6 +332,7 @@ class FinancialSituationMemory:
         logger.warning(f"⚠️ 强制截断：保留首尾关键信息，{len(text)}字符截断为{len(truncated)}字符")
         return truncated, True
 
+    @cassette_call('embedding', 'embedding')
     def get_embedding(self, text):
         """Get embedding for a text using the configured provider"""
 
@@ -0,0 +1,177 @@
+"""
+分析开始时的推测性数据预取
+分析师的第一次工具调用参数几乎是确定的（股票代码 + 分析日期），但要等分析师的第一次LLM调用返回后才会发起。
+TradingAgentsGraph.propagate 在构建初始状态后立即在后台按相同参数调用这些工具，与第一次LLM调用并行；
+结果写入本次运行的数据上下文（run_memoized_tool），分析师随后发起的相同调用直接复用，
+预取尚未完成时则等待预取结果，不会重复获取。
+
+只预取直接访问数据源的工具；依赖LLM的工具（get_stock_news_openai、get_global_news_openai 等）
+会产生额外费用，不做推测调用。
+"""
+
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from tradingagents.dataflows.run_data_context import prefetching
+from tradingagents.utils.tracing import span
+
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
+
+# 市场分析师提示词中建议的行情区间（分析日期前N天），配置项 market_lookback_days 未设置时使用
+MARKET_LOOKBACK_DAYS = 60
+# 基本面分析师提示词中使用的起始日期
+FUNDAMENTALS_START_DATE = '2025-05-28'
+# 数据预获取阶段（prepare_stock_data）获取的历史天数
+PREPARATION_PERIOD_DAYS = 30
+
+DEFAULT_MAX_WORKERS = 4
+
+
+def market_lookback_days(config: Optional[Dict[str, Any]] = None) -> int:
+    """
+    市场分析师获取行情的天数
+
+    Args:
+        config: 分析配置（Toolkit.config），为空时读取当前数据流配置
+    """
+    if config is None:
+        from tradingagents.dataflows.config import get_config
+        config = get_config()
+    return int(config.get("market_lookback_days", MARKET_LOOKBACK_DAYS))
+
+
+def market_data_window(trade_date: str, lookback_days: Optional[int] = None) -> Tuple[str, str]:
+    """市场分析师获取行情数据的（开始日期, 结束日期）"""
+    if lookback_days is None:
+        lookback_days = market_lookback_days()
+    end = datetime.strptime(str(trade_date)[:10], '%Y-%m-%d')
+    return (end - timedelta(days=lookback_days)).strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+
+def analysis_data_windows(trade_date: str, period_days: int = PREPARATION_PERIOD_DAYS,
+                          lookback_days: Optional[int] = None) -> List[Tuple[str, str]]:
+    """
+    一次分析读取行情的（开始日期, 结束日期）区间：数据预获取阶段（prepare_stock_data）和市场分析师
+    """
+    end = datetime.strptime(str(trade_date)[:10], '%Y-%m-%d')
+    preparation = ((end - timedelta(days=period_days)).strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+    return list(dict.fromkeys([preparation, market_data_window(trade_date, lookback_days)]))
+
+
+def predict_tool_calls(ticker: str, trade_date: str, selected_analysts: Sequence[str],
+                       online_tools: bool = True,
+                       lookback_days: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    预测各分析师的首次工具调用
+
+    Args:
+        lookback_days: 市场分析师的行情天数，与其提示词使用同一配置（market_lookback_days）
+
+    Returns:
+        List[(Toolkit工具名称, 参数)]
+    """
+    from tradingagents.tools.unified_news_tool import UnifiedNewsAnalyzer
+    from tradingagents.utils.stock_utils import StockUtils
+
+    trade_date = str(trade_date)
+    market_info = StockUtils.get_market_info(ticker)
+    calls: List[Tuple[str, Dict[str, Any]]] = []
+
+    if 'market' in selected_analysts and online_tools:
+        start_date, end_date = market_data_window(trade_date, lookback_days)
+        calls.append(('get_stock_market_data_unified',
+                      {'ticker': ticker, 'start_date': start_date, 'end_date': end_date}))
+
+    if 'fundamentals' in selected_analysts and online_tools:
+        calls.append(('get_stock_fundamentals_unified',
+                      {'ticker': ticker, 'start_date': FUNDAMENTALS_START_DATE,
+                       'end_date': trade_date, 'curr_date': trade_date}))
+
+    if 'news' in selected_analysts:
+        # 统一新闻工具按当天日期查询，首选数据源与 UnifiedNewsAnalyzer 一致（美股首选为LLM新闻，使用次选的Google新闻）
+        today = datetime.now().strftime('%Y-%m-%d')
+        if market_info['is_china']:
+            calls.append(('get_realtime_stock_news', {'ticker': ticker, 'curr_date': today}))
+        elif market_info['is_hk']:
+            calls.append(('get_google_news', {'query': UnifiedNewsAnalyzer.hk_news_query(ticker), 'curr_date': today}))
+        else:
+            calls.append(('get_google_news', {'query': UnifiedNewsAnalyzer.us_news_query(ticker), 'curr_date': today}))
+
+    if 'social' in selected_analysts and not online_tools:
+        # 在线模式下情绪分析师使用 get_stock_news_openai（LLM），不预取
+        if market_info['is_china'] or market_info['is_hk']:
+            calls.append(('get_chinese_social_sentiment', {'ticker': ticker, 'curr_date': trade_date}))
+        else:
+            calls.append(('get_reddit_stock_info', {'ticker': ticker, 'curr_date': trade_date}))
+
+    return calls
+
+
+class SpeculativePrefetcher:
+    """在后台线程中执行预测的工具调用，结果进入当前运行的数据上下文"""
+
+    def __init__(self, toolkit, selected_analysts: Sequence[str], max_workers: int = DEFAULT_MAX_WORKERS):
+        self.toolkit = toolkit
+        self.selected_analysts = list(selected_analysts)
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[str, Any] = {}
+
+    def start(self, ticker: str, trade_date: str) -> List[str]:
+        """
+        发起预取（须在 Toolkit.begin_run 之后调用，后台线程继承当前运行上下文）
+
+        Returns:
+            List[str]: 已发起预取的工具名称
+        """
+        try:
+            calls = predict_tool_calls(ticker, trade_date, self.selected_analysts,
+                                       self.toolkit.config.get("online_tools", True),
+                                       market_lookback_days(self.toolkit.config))
+        except Exception as e:
+            logger.warning(f"⚠️ [数据预取] 无法预测工具调用，跳过预取: {e}")
+            return []
+
+        calls = [(name, args) for name, args in calls if hasattr(self.toolkit, name)]
+        if not calls:
+            return []
+
+        self._executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(calls)),
+                                            thread_name_prefix="prefetch")
+        for name, args in calls:
+            # 每个任务复制一份contextvars，使预取线程看到本次运行的数据上下文和追踪记录
+            context = contextvars.copy_context()
+            self._futures[name] = self._executor.submit(context.run, self._run, name, args)
+        logger.info(f"🚀 [数据预取] 已在后台发起 {len(calls)} 项预取: {', '.join(n for n, _ in calls)}")
+        return [name for name, _ in calls]
+
+    def _run(self, name: str, args: Dict[str, Any]) -> float:
+        start = time.perf_counter()
+        with prefetching(), span(f"prefetch.{name}", 'prefetch'):
+            try:
+                getattr(self.toolkit, name).invoke(args)
+            except Exception as e:
+                logger.warning(f"⚠️ [数据预取] {name} 预取失败: {e}")
+        duration = time.perf_counter() - start
+        logger.debug(f"🚀 [数据预取] {name} 完成，耗时 {duration:.2f}s")
+        return duration
+
+    def stats(self) -> Dict[str, Any]:
+        """各项预取的状态: {tool: {'done': bool, 'cancelled': bool, 'duration': 秒}}"""
+        return {name: {'done': future.done(),
+                       'cancelled': future.cancelled(),
+                       'duration': (future.result()
+                                    if future.done() and not future.cancelled() and not future.exception()
+                                    else None)}
+                for name, future in self._futures.items()}
+
+    def shutdown(self, wait: bool = False):
+        """分析结束后关闭线程池：取消尚未开始的预取（默认不等待正在进行的预取）"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -135,26 +135,19 @@ def search_stocks(keyword: str) -> List[Dict[str, Any]]:
         >>> for stock in results:
         logger.info(f"{stock["code']}: {stock['name']}")
     """
-    all_stocks = get_all_stocks()
-    
-    if not all_stocks or (len(all_stocks) == 1 and 'error' in all_stocks[0]):
-        return all_stocks
-    
-    # 搜索匹配的股票
-    matches = []
-    keyword_lower = keyword.lower()
-    
-    for stock in all_stocks:
-        if 'error' in stock:
-            continue
-            
-        code = stock.get('code', '').lower()
-        name = stock.get('name', '').lower()
-        
-        if keyword_lower in code or keyword_lower in name:
-            matches.append(stock)
-    
-    return matches
+    from tradingagents.dataflows.symbol_master import get_symbol_master, MARKET_CHINA
+
+    # 股票主表未从MongoDB加载时，用一次全量列表填充，之后的搜索都走内存索引
+    master = get_symbol_master()
+    if not (master.has_source('mongodb') or master.has_source('stock_api')):
+        all_stocks = get_all_stocks()
+
+        if not all_stocks or (len(all_stocks) == 1 and 'error' in all_stocks[0]):
+            return all_stocks
+
+        master.load_entries(all_stocks, MARKET_CHINA, 'stock_api')
+
+    return master.search(keyword, market=MARKET_CHINA, limit=len(master))
 
 def get_market_summary() -> Dict[str, Any]:
     """
@@ -7,8 +7,8 @@
 import json
 import os
 import re
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from dotenv import load_dotenv
@@ -27,6 +27,8 @@ except ImportError:
     MONGODB_AVAILABLE = False
     MongoDBStorage = None
 
+from .usage_rollups import JsonRollupStore, granularity_for_days, summarize_rollups, window_start
+
 
 @dataclass
 class ModelConfig:
@@ -73,6 +75,7 @@ class ConfigManager:
         self.models_file = self.config_dir / "models.json"
         self.pricing_file = self.config_dir / "pricing.json"
         self.usage_file = self.config_dir / "usage.json"
+        self.usage_rollups = JsonRollupStore(self.config_dir / "usage_rollups.json")
         self.settings_file = self.config_dir / "settings.json"
 
         # 加载.env文件（保持向后兼容）
@@ -393,6 +396,8 @@ class ConfigManager:
         
         # 回退到JSON文件存储
         records = self.load_usage_records()
+        # 汇总文件不存在时先按已有记录重建，再累加新记录
+        self.usage_rollups.load(lambda: records)
         records.append(record)
         
         # 限制记录数量
@@ -402,6 +407,7 @@ class ConfigManager:
             records = records[-max_records:]
         
         self.save_usage_records(records)
+        self.usage_rollups.add(record)
         return record
     
     def calculate_cost(self, provider: str, model_name: str, input_tokens: int, output_tokens: int) -> float:
@@ -517,69 +523,56 @@ class ConfigManager:
                 return model
         return None
     
-    def get_usage_statistics(self, days: int = 30) -> Dict[str, Any]:
-        """获取使用统计"""
-        # 优先使用MongoDB获取统计
-        if self.mongodb_storage and self.mongodb_storage.is_connected():
+    def _use_mongodb(self) -> bool:
+        return bool(self.mongodb_storage and self.mongodb_storage.is_connected())
+
+    def get_usage_rollups(self, days: Optional[int] = 30, granularity: str = 'day',
+                          group_by: Sequence[str] = ('bucket', 'provider', 'model_name'),
+                          session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        查询使用量汇总
+
+        Args:
+            days: 最近N天（按汇总区间对齐），None 表示不限
+            granularity: hour 或 day
+            group_by: 分组维度（bucket、provider、model_name、session_id），为空时返回一行总计
+            session_id: 只统计指定会话
+
+        Returns:
+            List[Dict]: 分组维度 + cost、input_tokens、output_tokens、requests
+        """
+        start = window_start(days, granularity)
+        if self._use_mongodb():
             try:
-                # 从MongoDB获取基础统计
-                stats = self.mongodb_storage.get_usage_statistics(days)
-                # 获取供应商统计
-                provider_stats = self.mongodb_storage.get_provider_statistics(days)
-                
-                if stats:
-                    stats["provider_stats"] = provider_stats
-                    stats["records_count"] = stats.get("total_requests", 0)
-                    return stats
+                return self.mongodb_storage.query_rollups(granularity, start, group_by, session_id)
             except Exception as e:
-                logger.error(f"⚠️ MongoDB统计获取失败，回退到JSON文件: {e}")
-        
-        # 回退到JSON文件统计
-        records = self.load_usage_records()
-        
-        # 过滤最近N天的记录
-        from datetime import datetime, timedelta
+                logger.error(f"⚠️ MongoDB汇总查询失败，回退到JSON文件: {e}")
 
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        recent_records = []
-        for record in records:
+        rollups = self.usage_rollups.load(self.load_usage_records)
+        return rollups.query(granularity, start, group_by, session_id)
+
+    def get_usage_records_page(self, days: Optional[int] = 30, page: int = 1,
+                               page_size: int = 20) -> Tuple[List[UsageRecord], int]:
+        """分页获取使用记录（按时间倒序），返回 (当前页记录, 总记录数)"""
+        if self._use_mongodb():
             try:
-                record_date = datetime.fromisoformat(record.timestamp)
-                if record_date >= cutoff_date:
-                    recent_records.append(record)
-            except:
-                continue
-        
-        # 统计数据
-        total_cost = sum(record.cost for record in recent_records)
-        total_input_tokens = sum(record.input_tokens for record in recent_records)
-        total_output_tokens = sum(record.output_tokens for record in recent_records)
-        
-        # 按供应商统计
-        provider_stats = {}
-        for record in recent_records:
-            if record.provider not in provider_stats:
-                provider_stats[record.provider] = {
-                    "cost": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "requests": 0
-                }
-            provider_stats[record.provider]["cost"] += record.cost
-            provider_stats[record.provider]["input_tokens"] += record.input_tokens
-            provider_stats[record.provider]["output_tokens"] += record.output_tokens
-            provider_stats[record.provider]["requests"] += 1
-        
-        return {
-            "period_days": days,
-            "total_cost": round(total_cost, 4),
-            "total_input_tokens": total_input_tokens,
-            "total_output_tokens": total_output_tokens,
-            "total_requests": len(recent_records),
-            "provider_stats": provider_stats,
-            "records_count": len(recent_records)
-        }
+                return self.mongodb_storage.load_usage_records_page(days, page, page_size)
+            except Exception as e:
+                logger.error(f"⚠️ MongoDB分页查询失败，回退到JSON文件: {e}")
+
+        records = self.load_usage_records()
+        if days:
+            cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+            records = [r for r in records if r.timestamp >= cutoff]
+        records.sort(key=lambda r: r.timestamp, reverse=True)
+        offset = max(0, page - 1) * page_size
+        return records[offset:offset + page_size], len(records)
+
+    def get_usage_statistics(self, days: int = 30) -> Dict[str, Any]:
+        """获取使用统计（读取汇总，不扫描原始记录）"""
+        granularity = granularity_for_days(days)
+        rows = self.get_usage_rollups(days, granularity, group_by=('provider',))
+        return summarize_rollups(rows, days)
     
     def get_data_dir(self) -> str:
         """获取数据目录路径"""
@@ -690,7 +683,7 @@ class TokenTracker:
         settings = self.config_manager.load_settings()
         threshold = settings.get("cost_alert_threshold", 100.0)
 
-        # 获取今日总成本
+        # 获取今日总成本（读取小时汇总）
         today_stats = self.config_manager.get_usage_statistics(1)
         total_today = today_stats["total_cost"]
 
@@ -700,9 +693,8 @@ class TokenTracker:
 
     def get_session_cost(self, session_id: str) -> float:
         """获取会话成本"""
-        records = self.config_manager.load_usage_records()
-        session_cost = sum(record.cost for record in records if record.session_id == session_id)
-        return session_cost
+        rows = self.config_manager.get_usage_rollups(days=None, group_by=(), session_id=session_id)
+        return sum(row['cost'] for row in rows)
 
     def estimate_cost(self, provider: str, model_name: str, estimated_input_tokens: int,
                      estimated_output_tokens: int) -> float:
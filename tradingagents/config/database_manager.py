@@ -5,10 +5,15 @@
 使用项目现有的.env配置
 """
 
+import json
 import logging
 import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 class DatabaseManager:
     """智能数据库管理器"""
@@ -25,12 +30,22 @@ class DatabaseManager:
         self.mongodb_client = None
         self.redis_client = None
 
+        # 探测成功的连接直接作为正式客户端使用
+        self._probe_clients: Dict[str, Any] = {}
+        self._state_lock = threading.Lock()
+        self._reprobe_stop = threading.Event()
+        self._reprobe_thread: Optional[threading.Thread] = None
+        self.detection_source = "probe"
+
         # 检测数据库可用性
         self._detect_databases()
 
         # 初始化连接
         self._initialize_connections()
 
+        # 有数据库不可用时在后台定期重新探测
+        self._start_background_reprobe()
+
         self.logger.info(f"数据库管理器初始化完成 - MongoDB: {self.mongodb_available}, Redis: {self.redis_available}")
     
     def _load_env_config(self):
@@ -69,6 +84,13 @@ class DatabaseManager:
             "timeout": 2
         }
 
+        # 检测结果磁盘缓存（短生命周期进程跳过重复探测）与后台重新探测间隔
+        self.detection_cache_ttl = float(os.getenv("DATABASE_DETECTION_CACHE_TTL", "60"))
+        self.detection_cache_file = Path(os.getenv(
+            "DATABASE_DETECTION_CACHE_FILE",
+            os.path.join(tempfile.gettempdir(), "tradingagents_db_detection.json")))
+        self.reprobe_interval = float(os.getenv("DATABASE_REPROBE_INTERVAL", "30"))
+
         self.logger.info(f"MongoDB启用: {self.mongodb_enabled}")
         self.logger.info(f"Redis启用: {self.redis_enabled}")
         if self.mongodb_enabled:
@@ -84,37 +106,21 @@ class DatabaseManager:
         if not self.mongodb_enabled:
             return False, "MongoDB未启用 (MONGODB_ENABLED=false)"
 
+        client = None
         try:
-            import pymongo
-            from pymongo import MongoClient
+            client = self._create_mongodb_client()
 
-            # 构建连接参数
-            connect_kwargs = {
-                "host": self.mongodb_config["host"],
-                "port": self.mongodb_config["port"],
-                "serverSelectionTimeoutMS": self.mongodb_config["timeout"],
-                "connectTimeoutMS": self.mongodb_config["timeout"]
-            }
-
-            # 如果有用户名和密码，添加认证
-            if self.mongodb_config["username"] and self.mongodb_config["password"]:
-                connect_kwargs.update({
-                    "username": self.mongodb_config["username"],
-                    "password": self.mongodb_config["password"],
-                    "authSource": self.mongodb_config["auth_source"]
-                })
-
-            client = MongoClient(**connect_kwargs)
-
-            # 测试连接
+            # 测试连接，成功后保留该连接作为正式客户端
             client.server_info()
-            client.close()
+            self._probe_clients["mongodb"] = client
 
             return True, "MongoDB连接成功"
 
         except ImportError:
             return False, "pymongo未安装"
         except Exception as e:
+            if client is not None:
+                client.close()
             return False, f"MongoDB连接失败: {str(e)}"
     
     def _detect_redis(self) -> Tuple[bool, str]:
@@ -124,25 +130,11 @@ class DatabaseManager:
             return False, "Redis未启用 (REDIS_ENABLED=false)"
 
         try:
-            import redis
+            client = self._create_redis_client()
 
-            # 构建连接参数
-            connect_kwargs = {
-                "host": self.redis_config["host"],
-                "port": self.redis_config["port"],
-                "db": self.redis_config["db"],
-                "socket_timeout": self.redis_config["timeout"],
-                "socket_connect_timeout": self.redis_config["timeout"]
-            }
-
-            # 如果有密码，添加密码
-            if self.redis_config["password"]:
-                connect_kwargs["password"] = self.redis_config["password"]
-
-            client = redis.Redis(**connect_kwargs)
-
-            # 测试连接
+            # 测试连接，成功后保留该连接作为正式客户端
             client.ping()
+            self._probe_clients["redis"] = client
 
             return True, "Redis连接成功"
 
@@ -151,31 +143,128 @@ class DatabaseManager:
         except Exception as e:
             return False, f"Redis连接失败: {str(e)}"
     
+    def _create_mongodb_client(self):
+        """按配置创建MongoDB客户端（pymongo在首次操作时才真正连接）"""
+        from pymongo import MongoClient
+
+        # 构建连接参数
+        connect_kwargs = {
+            "host": self.mongodb_config["host"],
+            "port": self.mongodb_config["port"],
+            "serverSelectionTimeoutMS": self.mongodb_config["timeout"],
+            "connectTimeoutMS": self.mongodb_config["timeout"]
+        }
+
+        # 如果有用户名和密码，添加认证
+        if self.mongodb_config["username"] and self.mongodb_config["password"]:
+            connect_kwargs.update({
+                "username": self.mongodb_config["username"],
+                "password": self.mongodb_config["password"],
+                "authSource": self.mongodb_config["auth_source"]
+            })
+
+        return MongoClient(**connect_kwargs)
+
+    def _create_redis_client(self):
+        """按配置创建Redis客户端"""
+        import redis
+
+        # 构建连接参数
+        connect_kwargs = {
+            "host": self.redis_config["host"],
+            "port": self.redis_config["port"],
+            "db": self.redis_config["db"],
+            "socket_timeout": self.redis_config["timeout"],
+            "socket_connect_timeout": self.redis_config["timeout"]
+        }
+
+        # 如果有密码，添加密码
+        if self.redis_config["password"]:
+            connect_kwargs["password"] = self.redis_config["password"]
+
+        return redis.Redis(**connect_kwargs)
+
+    def _detection_fingerprint(self) -> str:
+        """检测结果缓存对应的配置指纹，配置变化后缓存失效"""
+        return json.dumps([
+            self.mongodb_enabled, self.mongodb_config["host"], self.mongodb_config["port"],
+            self.redis_enabled, self.redis_config["host"], self.redis_config["port"], self.redis_config["db"],
+        ])
+
+    def _load_detection_cache(self) -> Optional[Dict[str, Any]]:
+        """读取未过期的检测结果缓存"""
+        if self.detection_cache_ttl <= 0:
+            return None
+        try:
+            with open(self.detection_cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if cached.get("fingerprint") != self._detection_fingerprint():
+            return None
+        if time.time() - cached.get("timestamp", 0) > self.detection_cache_ttl:
+            return None
+        return cached
+
+    def _save_detection_cache(self):
+        """写入检测结果缓存（先写临时文件再替换，避免并发进程读到半个文件）"""
+        if self.detection_cache_ttl <= 0:
+            return
+        payload = {
+            "fingerprint": self._detection_fingerprint(),
+            "timestamp": time.time(),
+            "mongodb": self.mongodb_available,
+            "redis": self.redis_available,
+        }
+        try:
+            self.detection_cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.detection_cache_file.with_name(
+                f"{self.detection_cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_file, self.detection_cache_file)
+        except OSError as e:
+            self.logger.debug(f"写入数据库检测缓存失败: {e}")
+
     def _detect_databases(self):
-        """检测所有数据库"""
+        """检测所有数据库（MongoDB和Redis并发探测，短时间内复用磁盘缓存的结果）"""
+        cached = self._load_detection_cache()
+        if cached is not None:
+            self.mongodb_available = bool(cached.get("mongodb"))
+            self.redis_available = bool(cached.get("redis"))
+            self.detection_source = "cache"
+            self.logger.info(
+                f"使用{time.time() - cached['timestamp']:.0f}秒前的数据库检测结果 - "
+                f"MongoDB: {self.mongodb_available}, Redis: {self.redis_available}")
+            self._update_config_based_on_detection()
+            return
+
         self.logger.info("开始检测数据库可用性...")
-        
-        # 检测MongoDB
-        mongodb_available, mongodb_msg = self._detect_mongodb()
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="db-detect") as executor:
+            mongodb_future = executor.submit(self._detect_mongodb)
+            redis_future = executor.submit(self._detect_redis)
+            mongodb_available, mongodb_msg = mongodb_future.result()
+            redis_available, redis_msg = redis_future.result()
+
         self.mongodb_available = mongodb_available
-        
         if mongodb_available:
             self.logger.info(f"✅ MongoDB: {mongodb_msg}")
         else:
             self.logger.info(f"❌ MongoDB: {mongodb_msg}")
-        
-        # 检测Redis
-        redis_available, redis_msg = self._detect_redis()
+
         self.redis_available = redis_available
-        
         if redis_available:
             self.logger.info(f"✅ Redis: {redis_msg}")
         else:
             self.logger.info(f"❌ Redis: {redis_msg}")
-        
+
+        self._save_detection_cache()
+
         # 更新配置
         self._update_config_based_on_detection()
-    
+
     def _update_config_based_on_detection(self):
         """根据检测结果更新配置"""
         # 确定缓存后端
@@ -189,56 +278,96 @@ class DatabaseManager:
         self.logger.info(f"主要缓存后端: {self.primary_backend}")
     
     def _initialize_connections(self):
-        """初始化数据库连接"""
+        """初始化数据库连接（优先复用探测时建立的连接）"""
         # 初始化MongoDB连接
         if self.mongodb_available:
             try:
-                import pymongo
-
-                # 构建连接参数
-                connect_kwargs = {
-                    "host": self.mongodb_config["host"],
-                    "port": self.mongodb_config["port"],
-                    "serverSelectionTimeoutMS": self.mongodb_config["timeout"]
-                }
-
-                # 如果有用户名和密码，添加认证
-                if self.mongodb_config["username"] and self.mongodb_config["password"]:
-                    connect_kwargs.update({
-                        "username": self.mongodb_config["username"],
-                        "password": self.mongodb_config["password"],
-                        "authSource": self.mongodb_config["auth_source"]
-                    })
-
-                self.mongodb_client = pymongo.MongoClient(**connect_kwargs)
+                self.mongodb_client = self._probe_clients.pop("mongodb", None) or self._create_mongodb_client()
                 self.logger.info("MongoDB客户端初始化成功")
             except Exception as e:
                 self.logger.error(f"MongoDB客户端初始化失败: {e}")
                 self.mongodb_available = False
+                self._update_config_based_on_detection()
 
         # 初始化Redis连接
         if self.redis_available:
             try:
-                import redis
-
-                # 构建连接参数
-                connect_kwargs = {
-                    "host": self.redis_config["host"],
-                    "port": self.redis_config["port"],
-                    "db": self.redis_config["db"],
-                    "socket_timeout": self.redis_config["timeout"]
-                }
-
-                # 如果有密码，添加密码
-                if self.redis_config["password"]:
-                    connect_kwargs["password"] = self.redis_config["password"]
-
-                self.redis_client = redis.Redis(**connect_kwargs)
+                self.redis_client = self._probe_clients.pop("redis", None) or self._create_redis_client()
                 self.logger.info("Redis客户端初始化成功")
             except Exception as e:
                 self.logger.error(f"Redis客户端初始化失败: {e}")
                 self.redis_available = False
-    
+                self._update_config_based_on_detection()
+
+    def _pending_backends(self) -> List[str]:
+        """已启用但当前不可用的数据库"""
+        pending = []
+        if self.mongodb_enabled and not self.mongodb_available:
+            pending.append("mongodb")
+        if self.redis_enabled and not self.redis_available:
+            pending.append("redis")
+        return pending
+
+    def reprobe(self) -> List[str]:
+        """
+        重新探测不可用的数据库，恢复的数据库立即启用并重新选择缓存后端
+
+        Returns:
+            List[str]: 本次恢复的数据库
+        """
+        recovered = []
+        for backend in self._pending_backends():
+            detect = self._detect_mongodb if backend == "mongodb" else self._detect_redis
+            available, msg = detect()
+            if not available:
+                self.logger.debug(f"数据库重新探测 {backend}: {msg}")
+                continue
+
+            with self._state_lock:
+                client = self._probe_clients.pop(backend)
+                if backend == "mongodb":
+                    self.mongodb_client = client
+                    self.mongodb_available = True
+                else:
+                    self.redis_client = client
+                    self.redis_available = True
+            recovered.append(backend)
+            self.logger.info(f"✅ 数据库已恢复: {backend}")
+
+        if recovered:
+            previous_backend = self.primary_backend
+            self._update_config_based_on_detection()
+            self._save_detection_cache()
+            if self.primary_backend != previous_backend:
+                self.logger.info(f"🔄 缓存后端已切换: {previous_backend} -> {self.primary_backend}")
+        return recovered
+
+    def _reprobe_loop(self):
+        while self._pending_backends() and not self._reprobe_stop.wait(self.reprobe_interval):
+            try:
+                self.reprobe()
+            except Exception as e:
+                self.logger.debug(f"数据库重新探测异常: {e}")
+
+    def _start_background_reprobe(self):
+        """有已启用但不可用的数据库时启动后台重新探测线程，全部恢复后线程退出"""
+        if self.reprobe_interval <= 0 or not self._pending_backends():
+            return
+        if self._reprobe_thread is not None and self._reprobe_thread.is_alive():
+            return
+        self._reprobe_stop.clear()
+        self._reprobe_thread = threading.Thread(
+            target=self._reprobe_loop, name="db-reprobe", daemon=True)
+        self._reprobe_thread.start()
+        self.logger.info(f"数据库后台重新探测已启动，间隔{self.reprobe_interval:.0f}秒: {self._pending_backends()}")
+
+    def stop_background_reprobe(self):
+        """停止后台重新探测"""
+        self._reprobe_stop.set()
+        if self._reprobe_thread is not None:
+            self._reprobe_thread.join(timeout=5)
+            self._reprobe_thread = None
+
     def get_mongodb_client(self):
         """获取MongoDB客户端"""
         if self.mongodb_available and self.mongodb_client:
@@ -292,6 +421,8 @@ class DatabaseManager:
                 "port": self.redis_config["port"]
             },
             "cache_backend": self.get_cache_backend(),
+            "detection_source": self.detection_source,
+            "reprobe_active": self._reprobe_thread is not None and self._reprobe_thread.is_alive(),
             "fallback_enabled": True  # 总是启用降级
         }
 
@@ -2,20 +2,27 @@
 """
 MongoDB存储适配器
 用于将token使用记录存储到MongoDB数据库
+
+原始记录保存在 token_usage 集合（ts 为原生时间字段，用于范围查询和分页）；
+写入时同步累加 token_usage_rollups 集合中的 小时/天 汇总，统计查询只读取汇总。
 """
 
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 from dataclasses import asdict
 from .config_manager import UsageRecord
+from .usage_rollups import (
+    GRANULARITIES, HOUR_RETENTION_DAYS, METRICS, UsageRollups, bucket_start,
+    granularity_for_days, parse_timestamp, summarize_rollups, window_start
+)
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
 try:
-    from pymongo import MongoClient
+    from pymongo import MongoClient, UpdateOne
     from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
     MONGODB_AVAILABLE = True
 except ImportError:
@@ -42,10 +49,15 @@ class MongoDBStorage:
         
         self.database_name = database_name
         self.collection_name = "token_usage"
+        self.rollup_collection_name = "token_usage_rollups"
+        # 一次性迁移的完成标记
+        self.meta_collection_name = "token_usage_meta"
         
         self.client = None
         self.db = None
         self.collection = None
+        self.rollups = None
+        self.meta = None
         self._connected = False
         
         # 尝试连接
@@ -63,9 +75,12 @@ class MongoDBStorage:
             
             self.db = self.client[self.database_name]
             self.collection = self.db[self.collection_name]
+            self.rollups = self.db[self.rollup_collection_name]
+            self.meta = self.db[self.meta_collection_name]
             
             # 创建索引以提高查询性能
             self._create_indexes()
+            self._migrate_legacy_records()
             
             self._connected = True
             logger.info(f"✅ MongoDB连接成功: {self.database_name}.{self.collection_name}")
@@ -93,9 +108,100 @@ class MongoDBStorage:
             
             # 创建分析类型索引
             self.collection.create_index("analysis_type")
+
+            # 原生时间字段索引（范围查询、分页）
+            self.collection.create_index([("ts", -1)])
+
+            # 汇总集合：每个 粒度 × 区间 × 供应商 × 模型 × 会话 一条
+            self.rollups.create_index([
+                ("granularity", 1),
+                ("bucket", 1),
+                ("provider", 1),
+                ("model_name", 1),
+                ("session_id", 1)
+            ], unique=True)
+            self.rollups.create_index([("session_id", 1), ("granularity", 1)])
+            # 小时汇总过期自动删除
+            self.rollups.create_index(
+                "bucket",
+                expireAfterSeconds=HOUR_RETENTION_DAYS * 86400,
+                partialFilterExpression={"granularity": "hour"},
+                name="hour_bucket_ttl"
+            )
             
         except Exception as e:
             logger.error(f"创建MongoDB索引失败: {e}")
+
+    def _migrate_legacy_records(self):
+        """为旧版本写入的记录补充 ts 字段（只执行一次），并在汇总集合为空时从原始记录重建汇总"""
+        try:
+            if not self.meta.find_one({'_id': 'ts_backfill'}):
+                self._backfill_ts()
+                self.meta.update_one({'_id': 'ts_backfill'},
+                                     {'$set': {'completed_at': datetime.now()}}, upsert=True)
+
+            if self.rollups.estimated_document_count() == 0 and self.collection.estimated_document_count() > 0:
+                self.rebuild_rollups()
+        except Exception as e:
+            logger.error(f"迁移旧版本使用记录失败: {e}")
+
+    def _backfill_ts(self):
+        legacy = self.collection.find({'ts': {'$exists': False}}, {'timestamp': 1})
+        updates = []
+        for doc in legacy:
+            try:
+                updates.append(UpdateOne({'_id': doc['_id']},
+                                         {'$set': {'ts': parse_timestamp(doc['timestamp'])}}))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if len(updates) >= 1000:
+                self.collection.bulk_write(updates, ordered=False)
+                updates = []
+        if updates:
+            self.collection.bulk_write(updates, ordered=False)
+
+    def rebuild_rollups(self) -> int:
+        """从原始记录重建汇总集合，返回汇总行数"""
+        rollups = UsageRollups()
+        for doc in self.collection.find({}, {'_id': 0, '_created_at': 0, 'ts': 0}):
+            try:
+                rollups.add(doc)
+            except (KeyError, TypeError, ValueError):
+                continue
+        rollups.prune()
+
+        self.rollups.delete_many({})
+        rows = list(rollups.rows())
+        if rows:
+            self.rollups.insert_many(rows, ordered=False)
+        logger.info(f"📊 已从原始记录重建 {len(rows)} 条使用量汇总")
+        return len(rows)
+
+    def _update_rollups(self, record_dict: Dict[str, Any]):
+        """把一条记录累加到各粒度的汇总"""
+        now = datetime.now()
+        operations = []
+        for granularity in GRANULARITIES:
+            operations.append(UpdateOne(
+                {
+                    'granularity': granularity,
+                    'bucket': bucket_start(record_dict['ts'], granularity),
+                    'provider': record_dict['provider'],
+                    'model_name': record_dict['model_name'],
+                    'session_id': record_dict['session_id'],
+                },
+                {
+                    '$inc': {
+                        'cost': record_dict['cost'],
+                        'input_tokens': record_dict['input_tokens'],
+                        'output_tokens': record_dict['output_tokens'],
+                        'requests': 1,
+                    },
+                    '$set': {'updated_at': now},
+                },
+                upsert=True
+            ))
+        self.rollups.bulk_write(operations, ordered=False)
     
     def is_connected(self) -> bool:
         """检查是否连接到MongoDB"""
@@ -112,11 +218,17 @@ class MongoDBStorage:
             
             # 添加MongoDB特有的字段
             record_dict['_created_at'] = datetime.now()
+            record_dict['ts'] = parse_timestamp(record.timestamp)
             
             # 插入记录
             result = self.collection.insert_one(record_dict)
             
             if result.inserted_id:
+                try:
+                    self._update_rollups(record_dict)
+                except Exception as e:
+                    # 原始记录已保存，汇总可通过 rebuild_rollups 修复
+                    logger.error(f"更新使用量汇总失败: {e}")
                 return True
             else:
                 logger.error(f"MongoDB插入失败：未返回插入ID")
@@ -132,82 +244,94 @@ class MongoDBStorage:
             return []
         
         try:
-            # 构建查询条件
-            query = {}
-            if days:
-                from datetime import timedelta
-                cutoff_date = datetime.now() - timedelta(days=days)
-                query['timestamp'] = {'$gte': cutoff_date.isoformat()}
-            
             # 查询记录，按时间倒序
-            cursor = self.collection.find(query).sort('timestamp', -1).limit(limit)
-            
-            records = []
-            for doc in cursor:
-                # 移除MongoDB特有的字段
-                doc.pop('_id', None)
-                doc.pop('_created_at', None)
-                
-                # 转换为UsageRecord对象
-                try:
-                    record = UsageRecord(**doc)
-                    records.append(record)
-                except Exception as e:
-                    logger.error(f"解析记录失败: {e}, 记录: {doc}")
-                    continue
-            
-            return records
+            cursor = self.collection.find(self._days_query(days)).sort('ts', -1).limit(limit)
+            return self._to_records(cursor)
             
         except Exception as e:
             logger.error(f"从MongoDB加载记录失败: {e}")
             return []
+
+    def load_usage_records_page(self, days: Optional[int] = None, page: int = 1,
+                                page_size: int = 20) -> Tuple[List[UsageRecord], int]:
+        """分页加载使用记录（按时间倒序），返回 (当前页记录, 总记录数)"""
+        if not self._connected:
+            return [], 0
+
+        try:
+            query = self._days_query(days)
+            total = self.collection.count_documents(query)
+            cursor = (self.collection.find(query)
+                      .sort('ts', -1)
+                      .skip(max(0, page - 1) * page_size)
+                      .limit(page_size))
+            return self._to_records(cursor), total
+
+        except Exception as e:
+            logger.error(f"从MongoDB分页加载记录失败: {e}")
+            return [], 0
+
+    @staticmethod
+    def _days_query(days: Optional[int]) -> Dict[str, Any]:
+        if not days:
+            return {}
+        return {'ts': {'$gte': datetime.now() - timedelta(days=days)}}
+
+    @staticmethod
+    def _to_records(cursor) -> List[UsageRecord]:
+        records = []
+        for doc in cursor:
+            # 移除MongoDB特有的字段
+            doc.pop('_id', None)
+            doc.pop('_created_at', None)
+            doc.pop('ts', None)
+
+            # 转换为UsageRecord对象
+            try:
+                records.append(UsageRecord(**doc))
+            except Exception as e:
+                logger.error(f"解析记录失败: {e}, 记录: {doc}")
+        return records
+
+    def query_rollups(self, granularity: str = 'day', start: Optional[datetime] = None,
+                      group_by: Sequence[str] = ('bucket', 'provider', 'model_name'),
+                      session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """按维度分组查询汇总（参数与 UsageRollups.query 一致）"""
+        if not self._connected:
+            return []
+
+        match: Dict[str, Any] = {'granularity': granularity}
+        if start is not None:
+            match['bucket'] = {'$gte': start}
+        if session_id is not None:
+            match['session_id'] = session_id
+
+        group: Dict[str, Any] = {
+            '_id': {dim: f'${dim}' for dim in group_by} if group_by else None,
+        }
+        for metric in METRICS:
+            group[metric] = {'$sum': f'${metric}'}
+
+        pipeline = [{'$match': match}, {'$group': group}]
+        if group_by:
+            pipeline.append({'$sort': {f'_id.{dim}': 1 for dim in group_by}})
+
+        rows = []
+        for result in self.rollups.aggregate(pipeline):
+            row = dict(result.pop('_id') or {})
+            row.update(result)
+            rows.append(row)
+        return rows
     
     def get_usage_statistics(self, days: int = 30) -> Dict[str, Any]:
-        """从MongoDB获取使用统计"""
+        """从汇总集合获取使用统计"""
         if not self._connected:
             return {}
         
         try:
-            from datetime import timedelta
-            cutoff_date = datetime.now() - timedelta(days=days)
-            
-            # 聚合查询
-            pipeline = [
-                {
-                    '$match': {
-                        'timestamp': {'$gte': cutoff_date.isoformat()}
-                    }
-                },
-                {
-                    '$group': {
-                        '_id': None,
-                        'total_cost': {'$sum': '$cost'},
-                        'total_input_tokens': {'$sum': '$input_tokens'},
-                        'total_output_tokens': {'$sum': '$output_tokens'},
-                        'total_requests': {'$sum': 1}
-                    }
-                }
-            ]
-            
-            result = list(self.collection.aggregate(pipeline))
-            
-            if result:
-                stats = result[0]
-                return {
-                    'period_days': days,
-                    'total_cost': round(stats.get('total_cost', 0), 4),
-                    'total_input_tokens': stats.get('total_input_tokens', 0),
-                    'total_output_tokens': stats.get('total_output_tokens', 0),
-                    'total_requests': stats.get('total_requests', 0)
-                }
-            else:
-                return {
-                    'period_days': days,
-                    'total_cost': 0,
-                    'total_input_tokens': 0,
-                    'total_output_tokens': 0,
-                    'total_requests': 0
-                }
+            granularity = granularity_for_days(days)
+            rows = self.query_rollups(granularity, window_start(days, granularity), group_by=('provider',))
+            return summarize_rollups(rows, days)
                 
         except Exception as e:
             logger.error(f"获取MongoDB统计失败: {e}")
@@ -215,48 +339,7 @@ class MongoDBStorage:
     
     def get_provider_statistics(self, days: int = 30) -> Dict[str, Dict[str, Any]]:
         """按供应商获取统计信息"""
-        if not self._connected:
-            return {}
-        
-        try:
-            from datetime import timedelta
-            cutoff_date = datetime.now() - timedelta(days=days)
-            
-            # 按供应商聚合
-            pipeline = [
-                {
-                    '$match': {
-                        'timestamp': {'$gte': cutoff_date.isoformat()}
-                    }
-                },
-                {
-                    '$group': {
-                        '_id': '$provider',
-                        'cost': {'$sum': '$cost'},
-                        'input_tokens': {'$sum': '$input_tokens'},
-                        'output_tokens': {'$sum': '$output_tokens'},
-                        'requests': {'$sum': 1}
-                    }
-                }
-            ]
-            
-            results = list(self.collection.aggregate(pipeline))
-            
-            provider_stats = {}
-            for result in results:
-                provider = result['_id']
-                provider_stats[provider] = {
-                    'cost': round(result.get('cost', 0), 4),
-                    'input_tokens': result.get('input_tokens', 0),
-                    'output_tokens': result.get('output_tokens', 0),
-                    'requests': result.get('requests', 0)
-                }
-            
-            return provider_stats
-            
-        except Exception as e:
-            logger.error(f"获取供应商统计失败: {e}")
-            return {}
+        return self.get_usage_statistics(days).get('provider_stats', {})
     
     def cleanup_old_records(self, days: int = 90) -> int:
         """清理旧记录"""
@@ -264,12 +347,11 @@ class MongoDBStorage:
             return 0
         
         try:
-            from datetime import timedelta
-
             cutoff_date = datetime.now() - timedelta(days=days)
             
+            # 只清理原始记录，汇总保留
             result = self.collection.delete_many({
-                'timestamp': {'$lt': cutoff_date.isoformat()}
+                'ts': {'$lt': cutoff_date}
             })
             
             deleted_count = result.deleted_count
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Token使用量汇总（rollup）
+每条使用记录写入时，按 小时/天 × 供应商 × 模型 × 会话 累加成本、token 数和请求数。
+统计面板、成本警告和会话成本只读取汇总，不再扫描全部原始记录。
+
+MongoDB 存储使用 token_usage_rollups 集合（见 MongoDBStorage）；
+JSON 文件存储使用本模块的 JsonRollupStore（config/usage_rollups.json）。
+两者的查询结果格式一致，每行包含按 group_by 选择的维度和汇总指标:
+    {'bucket': datetime, 'provider': ..., 'model_name': ..., 'session_id': ...,
+     'cost': 0.12, 'input_tokens': 1000, 'output_tokens': 500, 'requests': 3}
+"""
+
+import atexit
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+GRANULARITIES = ('hour', 'day')
+DIMENSIONS = ('bucket', 'provider', 'model_name', 'session_id')
+METRICS = ('cost', 'input_tokens', 'output_tokens', 'requests')
+
+# 小时汇总只保留最近31天（更早的统计使用天汇总）
+HOUR_RETENTION_DAYS = 31
+
+
+def parse_timestamp(value: Any) -> datetime:
+    """使用记录的时间戳（ISO字符串或datetime）转换为datetime"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    """时间所在汇总区间的起点"""
+    if granularity == 'hour':
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"不支持的汇总粒度: {granularity}")
+
+
+def granularity_for_days(days: Optional[int]) -> str:
+    """统计窗口对应的汇总粒度：7天以内用小时汇总，窗口起点更精确"""
+    return 'hour' if days is not None and days <= 7 else 'day'
+
+
+def window_start(days: Optional[int], granularity: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """最近 days 天对应的起始汇总区间；days 为 None 表示不限"""
+    if days is None:
+        return None
+    return bucket_start((now or datetime.now()) - timedelta(days=days), granularity)
+
+
+def summarize_rollups(rows: Iterable[Dict[str, Any]], days: Optional[int]) -> Dict[str, Any]:
+    """把按供应商分组的汇总行转换为 get_usage_statistics 的返回格式"""
+    provider_stats: Dict[str, Dict[str, Any]] = {}
+    totals = dict.fromkeys(METRICS, 0)
+    for row in rows:
+        stats = provider_stats.setdefault(row.get('provider'), dict.fromkeys(METRICS, 0))
+        for metric in METRICS:
+            stats[metric] += row.get(metric, 0)
+            totals[metric] += row.get(metric, 0)
+    for stats in provider_stats.values():
+        stats['cost'] = round(stats['cost'], 4)
+
+    return {
+        "period_days": days,
+        "total_cost": round(totals['cost'], 4),
+        "total_input_tokens": totals['input_tokens'],
+        "total_output_tokens": totals['output_tokens'],
+        "total_requests": totals['requests'],
+        "provider_stats": provider_stats,
+        "records_count": totals['requests'],
+    }
+
+
+def _record_fields(record: Any) -> Dict[str, Any]:
+    if isinstance(record, dict):
+        return record
+    return vars(record)
+
+
+class UsageRollups:
+    """内存中的汇总表"""
+
+    def __init__(self):
+        # (granularity, bucket, provider, model_name, session_id) -> 指标
+        self._rows: Dict[Tuple[str, datetime, str, str, str], Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, record: Any):
+        """累加一条使用记录（UsageRecord 或字典）"""
+        fields = _record_fields(record)
+        ts = parse_timestamp(fields['timestamp'])
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(ts, granularity), fields['provider'],
+                   fields['model_name'], fields['session_id'])
+            row = self._rows.setdefault(key, dict.fromkeys(METRICS, 0))
+            row['cost'] += fields['cost']
+            row['input_tokens'] += fields['input_tokens']
+            row['output_tokens'] += fields['output_tokens']
+            row['requests'] += 1
+
+    def rows(self) -> Iterable[Dict[str, Any]]:
+        """全部汇总行（含 granularity 字段）"""
+        for (granularity, bucket, provider, model_name, session_id), metrics in self._rows.items():
+            yield dict(metrics, granularity=granularity, bucket=bucket, provider=provider,
+                       model_name=model_name, session_id=session_id)
+
+    def prune(self, now: Optional[datetime] = None):
+        """删除超过保留期的小时汇总"""
+        cutoff = (now or datetime.now()) - timedelta(days=HOUR_RETENTION_DAYS)
+        for key in [k for k in self._rows if k[0] == 'hour' and k[1] < cutoff]:
+            del self._rows[key]
+
+    def query(self, granularity: str = 'day', start: Optional[datetime] = None,
+              group_by: Sequence[str] = ('bucket', 'provider', 'model_name'),
+              session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        按维度分组查询汇总
+
+        Args:
+            granularity: hour 或 day
+            start: 起始汇总区间（含），None 表示不限
+            group_by: 分组维度，取自 DIMENSIONS；为空时返回一行总计
+            session_id: 只统计指定会话
+
+        Returns:
+            List[Dict]: 分组维度 + 汇总指标，按维度排序
+        """
+        grouped: Dict[tuple, Dict[str, Any]] = {}
+        for row in self.rows():
+            if row['granularity'] != granularity:
+                continue
+            if start is not None and row['bucket'] < start:
+                continue
+            if session_id is not None and row['session_id'] != session_id:
+                continue
+            key = tuple(row[dim] for dim in group_by)
+            target = grouped.setdefault(key, dict(zip(group_by, key), **dict.fromkeys(METRICS, 0)))
+            for metric in METRICS:
+                target[metric] += row[metric]
+        return [grouped[key] for key in sorted(grouped, key=lambda k: tuple(str(v) for v in k))]
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        return [dict(row, bucket=row['bucket'].isoformat()) for row in self.rows()]
+
+    @classmethod
+    def from_json(cls, data: Iterable[Dict[str, Any]]) -> 'UsageRollups':
+        rollups = cls()
+        for row in data:
+            key = (row['granularity'], parse_timestamp(row['bucket']), row['provider'],
+                   row['model_name'], row['session_id'])
+            rollups._rows[key] = {metric: row.get(metric, 0) for metric in METRICS}
+        return rollups
+
+
+class JsonRollupStore:
+    """
+    JSON文件存储的汇总表：每次写入使用记录时增量更新内存中的汇总
+
+    写回文件按批进行：累计 save_every 条记录或距上次写入超过 save_interval 秒时写一次，
+    进程退出时写入剩余的更新（查询始终读取内存中的汇总）。
+    """
+
+    def __init__(self, path: Path, save_every: int = 20, save_interval: float = 30.0):
+        self.path = Path(path)
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._rollups: Optional[UsageRollups] = None
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+        atexit.register(self.flush)
+
+    def load(self, records_loader=None) -> UsageRollups:
+        """
+        加载汇总表（只从文件读取一次）
+
+        Args:
+            records_loader: 汇总文件不存在时用于重建的原始记录加载函数
+        """
+        if self._rollups is not None:
+            return self._rollups
+        with self._lock:
+            if self._rollups is not None:
+                return self._rollups
+            if self.path.exists():
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        self._rollups = UsageRollups.from_json(json.load(f))
+                    return self._rollups
+                except Exception as e:
+                    logger.error(f"加载使用量汇总失败，将从原始记录重建: {e}")
+
+            rollups = UsageRollups()
+            records = records_loader() if records_loader else []
+            for record in records:
+                try:
+                    rollups.add(record)
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.debug(f"跳过无法汇总的使用记录: {e}")
+            if records:
+                logger.info(f"📊 已从 {len(records)} 条使用记录重建汇总")
+                rollups.prune()
+                self._save(rollups)
+            self._rollups = rollups
+            return rollups
+
+    def add(self, record: Any, records_loader=None):
+        """累加一条使用记录，达到批量条件时写回文件"""
+        rollups = self.load(records_loader)
+        with self._lock:
+            rollups.add(record)
+            self._unsaved += 1
+            if (self._unsaved >= self.save_every
+                    or time.monotonic() - self._last_save >= self.save_interval):
+                rollups.prune()
+                self._save(rollups)
+
+    def flush(self):
+        """把尚未写回的更新写入文件"""
+        with self._lock:
+            if self._rollups is not None and self._unsaved:
+                self._rollups.prune()
+                self._save(self._rollups)
+
+    def _save(self, rollups: UsageRollups):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(rollups.to_json(), f, ensure_ascii=False)
+            self._unsaved = 0
+            self._last_save = time.monotonic()
+        except Exception as e:
+            logger.error(f"保存使用量汇总失败: {e}")
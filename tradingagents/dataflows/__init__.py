@@ -1,63 +1,89 @@
-# 导入基础模块
-from .finnhub_utils import get_data_in_range
-from .googlenews_utils import getNewsData
-from .reddit_utils import fetch_top_from_category
+# 数据流模块按需导入
+# interface.py 及 yfinance、stockstats 等重依赖只在首次访问对应名称时加载，
+# 直接导入子模块（from tradingagents.dataflows import akshare_utils）不受影响
+import importlib
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
-# 尝试导入yfinance相关模块，如果失败则跳过
-try:
-    from .yfin_utils import YFinanceUtils
-    YFINANCE_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ yfinance模块不可用: {e}")
-    YFinanceUtils = None
-    YFINANCE_AVAILABLE = False
-
-try:
-    from .stockstats_utils import StockstatsUtils
-    STOCKSTATS_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ stockstats模块不可用: {e}")
-    StockstatsUtils = None
-    STOCKSTATS_AVAILABLE = False
-
-from .interface import (
-
+# 导出名称 -> 所在模块（相对本包）
+_LAZY_EXPORTS = {
+    # 基础模块
+    "get_data_in_range": ".finnhub_utils",
+    "getNewsData": ".googlenews_utils",
+    "fetch_top_from_category": ".reddit_utils",
     # News and sentiment functions
-    get_finnhub_news,
-    get_finnhub_company_insider_sentiment,
-    get_finnhub_company_insider_transactions,
-    get_google_news,
-    get_reddit_global_news,
-    get_reddit_company_news,
+    "get_finnhub_news": ".interface",
+    "get_finnhub_company_insider_sentiment": ".interface",
+    "get_finnhub_company_insider_transactions": ".interface",
+    "get_google_news": ".interface",
+    "get_reddit_global_news": ".interface",
+    "get_reddit_company_news": ".interface",
     # Financial statements functions
-    get_simfin_balance_sheet,
-    get_simfin_cashflow,
-    get_simfin_income_statements,
+    "get_simfin_balance_sheet": ".interface",
+    "get_simfin_cashflow": ".interface",
+    "get_simfin_income_statements": ".interface",
     # Technical analysis functions
-    get_stock_stats_indicators_window,
-    get_stockstats_indicator,
+    "get_stock_stats_indicators_window": ".interface",
+    "get_stockstats_indicator": ".interface",
     # Market data functions
-    get_YFin_data_window,
-    get_YFin_data,
+    "get_YFin_data_window": ".interface",
+    "get_YFin_data": ".interface",
     # Tushare data functions
-    get_china_stock_data_tushare,
-    search_china_stocks_tushare,
-    get_china_stock_fundamentals_tushare,
-    get_china_stock_info_tushare,
+    "get_china_stock_data_tushare": ".interface",
+    "search_china_stocks_tushare": ".interface",
+    "get_china_stock_fundamentals_tushare": ".interface",
+    "get_china_stock_info_tushare": ".interface",
     # Unified China data functions (recommended)
-    get_china_stock_data_unified,
-    get_china_stock_info_unified,
-    switch_china_data_source,
-    get_current_china_data_source,
+    "get_china_stock_data_unified": ".interface",
+    "get_china_stock_info_unified": ".interface",
+    "switch_china_data_source": ".interface",
+    "get_current_china_data_source": ".interface",
     # Hong Kong stock functions
-    get_hk_stock_data_unified,
-    get_hk_stock_info_unified,
-    get_stock_data_by_market,
-)
+    "get_hk_stock_data_unified": ".interface",
+    "get_hk_stock_info_unified": ".interface",
+    "get_stock_data_by_market": ".interface",
+}
+
+# 可选依赖：访问时尝试导入，失败则为None并将对应的*_AVAILABLE标记为False
+_OPTIONAL_EXPORTS = {
+    "YFinanceUtils": (".yfin_utils", "YFINANCE_AVAILABLE", "yfinance"),
+    "StockstatsUtils": (".stockstats_utils", "STOCKSTATS_AVAILABLE", "stockstats"),
+}
+_AVAILABILITY_FLAGS = {flag: name for name, (_, flag, _) in _OPTIONAL_EXPORTS.items()}
+
+
+def _load_optional(name):
+    module_name, flag, label = _OPTIONAL_EXPORTS[name]
+    try:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+        available = True
+    except ImportError as e:
+        logger.warning(f"⚠️ {label}模块不可用: {e}")
+        value = None
+        available = False
+    globals()[name] = value
+    globals()[flag] = available
+    return value
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    if name in _OPTIONAL_EXPORTS:
+        return _load_optional(name)
+    if name in _AVAILABILITY_FLAGS:
+        _load_optional(_AVAILABILITY_FLAGS[name])
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS) | set(_OPTIONAL_EXPORTS) | set(_AVAILABILITY_FLAGS))
+
 
 __all__ = [
     # News and sentiment functions
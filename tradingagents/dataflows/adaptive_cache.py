@@ -11,7 +11,7 @@ import hashlib
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
 import pandas as pd
 
 from ..config.database_manager import get_database_manager
@@ -44,6 +44,11 @@ class AdaptiveCacheSystem:
         """生成缓存键"""
         key_data = f"{symbol}_{start_date}_{end_date}_{data_source}_{data_type}"
         return hashlib.md5(key_data.encode()).hexdigest()
+
+    def cache_key(self, symbol: str, start_date: str = "", end_date: str = "",
+                  data_source: str = "default", data_type: str = "stock_data") -> str:
+        """计算与 save_data 相同的缓存键，用于批量读取前组装键列表"""
+        return self._get_cache_key(symbol, start_date, end_date, data_source, data_type)
     
     def _get_ttl_seconds(self, symbol: str, data_type: str = "stock_data") -> int:
         """获取TTL秒数"""
@@ -139,11 +144,7 @@ class AdaptiveCacheSystem:
             if not serialized_data:
                 return None
             
-            cache_data = pickle.loads(serialized_data)
-            
-            # 转换时间戳
-            if isinstance(cache_data['timestamp'], str):
-                cache_data['timestamp'] = datetime.fromisoformat(cache_data['timestamp'])
+            cache_data = self._parse_redis_value(serialized_data)
             
             self.logger.debug(f"Redis缓存加载成功: {cache_key}")
             return cache_data
@@ -152,6 +153,16 @@ class AdaptiveCacheSystem:
             self.logger.error(f"Redis缓存加载失败: {e}")
             return None
     
+    @staticmethod
+    def _parse_redis_value(serialized_data: bytes) -> Dict:
+        """反序列化Redis中的缓存记录"""
+        cache_data = pickle.loads(serialized_data)
+        
+        # 转换时间戳
+        if isinstance(cache_data['timestamp'], str):
+            cache_data['timestamp'] = datetime.fromisoformat(cache_data['timestamp'])
+        return cache_data
+
     def _save_to_mongodb(self, cache_key: str, data: Any, metadata: Dict, ttl_seconds: int) -> bool:
         """保存到MongoDB缓存"""
         mongodb_client = self.db_manager.get_mongodb_client()
@@ -208,18 +219,7 @@ class AdaptiveCacheSystem:
                 collection.delete_one({'_id': cache_key})
                 return None
             
-            # 反序列化数据
-            if doc['data_type'] == 'dataframe':
-                data = pd.read_json(doc['data'])
-            else:
-                data = pickle.loads(bytes.fromhex(doc['data']))
-            
-            cache_data = {
-                'data': data,
-                'metadata': doc['metadata'],
-                'timestamp': doc['timestamp'],
-                'backend': 'mongodb'
-            }
+            cache_data = self._parse_mongodb_doc(doc)
             
             self.logger.debug(f"MongoDB缓存加载成功: {cache_key}")
             return cache_data
@@ -228,6 +228,21 @@ class AdaptiveCacheSystem:
             self.logger.error(f"MongoDB缓存加载失败: {e}")
             return None
     
+    @staticmethod
+    def _parse_mongodb_doc(doc: Dict) -> Dict:
+        """反序列化MongoDB中的缓存文档"""
+        if doc['data_type'] == 'dataframe':
+            data = pd.read_json(doc['data'])
+        else:
+            data = pickle.loads(bytes.fromhex(doc['data']))
+        
+        return {
+            'data': data,
+            'metadata': doc['metadata'],
+            'timestamp': doc['timestamp'],
+            'backend': 'mongodb'
+        }
+
     def save_data(self, symbol: str, data: Any, start_date: str = "", end_date: str = "", 
                   data_source: str = "default", data_type: str = "stock_data") -> str:
         """保存数据到缓存"""
@@ -270,6 +285,16 @@ class AdaptiveCacheSystem:
     
     def load_data(self, cache_key: str) -> Optional[Any]:
         """从缓存加载数据"""
+        entry = self.load_entry(cache_key)
+        return entry[0] if entry else None
+
+    def load_entry(self, cache_key: str) -> Optional[Tuple[Any, str, Optional[float]]]:
+        """
+        从缓存加载数据及其来源
+
+        Returns:
+            (数据, 实际命中的后端, 剩余TTL秒数)；未命中或已过期时返回None
+        """
         cache_data = None
         
         # 根据主要后端加载
@@ -285,20 +310,70 @@ class AdaptiveCacheSystem:
             self.logger.debug(f"主要后端({self.primary_backend})加载失败，尝试文件缓存")
             cache_data = self._load_from_file(cache_key)
         
+        return self._to_entry(cache_key, cache_data)
+
+    def load_entries(self, cache_keys: Iterable[str]) -> Dict[str, Tuple[Any, str, Optional[float]]]:
+        """
+        批量加载：Redis后端一次MGET，MongoDB后端一次$in查询，未命中的键再按文件缓存降级
+
+        Returns:
+            缓存键 -> (数据, 实际命中的后端, 剩余TTL秒数)，未命中或已过期的键不包含在内
+        """
+        keys = list(dict.fromkeys(cache_keys))
+        found: Dict[str, Dict] = {}
+
+        if self.primary_backend == "redis":
+            redis_client = self.db_manager.get_redis_client()
+            if redis_client and keys:
+                try:
+                    for key, serialized_data in zip(keys, redis_client.mget(keys)):
+                        if serialized_data:
+                            found[key] = self._parse_redis_value(serialized_data)
+                except Exception as e:
+                    self.logger.error(f"Redis批量加载失败: {e}")
+        elif self.primary_backend == "mongodb":
+            mongodb_client = self.db_manager.get_mongodb_client()
+            if mongodb_client and keys:
+                try:
+                    now = datetime.now()
+                    for doc in mongodb_client.tradingagents.cache.find({'_id': {'$in': keys}}):
+                        if doc.get('expires_at') and doc['expires_at'] < now:
+                            continue
+                        found[doc['_id']] = self._parse_mongodb_doc(doc)
+                except Exception as e:
+                    self.logger.error(f"MongoDB批量加载失败: {e}")
+
+        entries = {}
+        for key in keys:
+            cache_data = found.get(key)
+            if cache_data is None and (self.primary_backend == "file" or self.fallback_enabled):
+                cache_data = self._load_from_file(key)
+            entry = self._to_entry(key, cache_data)
+            if entry is not None:
+                entries[key] = entry
+        return entries
+
+    def _to_entry(self, cache_key: str, cache_data: Optional[Dict]) -> Optional[Tuple[Any, str, Optional[float]]]:
+        """检查有效期并计算剩余TTL"""
         if not cache_data:
             return None
         
+        symbol = cache_data['metadata'].get('symbol', '')
+        data_type = cache_data['metadata'].get('data_type', 'stock_data')
+        ttl_seconds = self._get_ttl_seconds(symbol, data_type)
+
         # 检查缓存是否有效（仅对文件缓存，数据库缓存有自己的TTL机制）
         if cache_data.get('backend') == 'file':
-            symbol = cache_data['metadata'].get('symbol', '')
-            data_type = cache_data['metadata'].get('data_type', 'stock_data')
-            ttl_seconds = self._get_ttl_seconds(symbol, data_type)
-            
             if not self._is_cache_valid(cache_data['timestamp'], ttl_seconds):
                 self.logger.debug(f"文件缓存已过期: {cache_key}")
                 return None
-        
-        return cache_data['data']
+
+        remaining = None
+        if isinstance(cache_data.get('timestamp'), datetime):
+            expiry_time = cache_data['timestamp'] + timedelta(seconds=ttl_seconds)
+            remaining = (expiry_time - datetime.now()).total_seconds()
+
+        return cache_data['data'], cache_data.get('backend', self.primary_backend), remaining
     
     def find_cached_data(self, symbol: str, start_date: str = "", end_date: str = "", 
                         data_source: str = "default", data_type: str = "stock_data") -> Optional[str]:
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+数据库缓存负载编码
+DatabaseCacheManager 原本把 DataFrame 存为 to_json(orient='records') 文本、把报告存为原始Markdown，
+长行情和新闻在 Redis 内存和网络传输中占用很大。本模块负责：
+
+- DataFrame 按 to_json(orient='split') 编码并附带列类型和索引类型，读取时据此还原；负载只含数据，不执行任何反序列化代码
+- 超过阈值的负载使用 zstd / lz4 压缩（未安装时退回标准库 zlib）
+- 每条记录带 data_format / compression 标记，旧版本写入的 dataframe_json / text 记录照常读取，未知标记的记录一律拒绝
+- 统计压缩前后的字节数
+"""
+
+import base64
+import io
+import json
+import os
+import threading
+import zlib
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 可选压缩库
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+# 数据格式标记
+FORMAT_TEXT = "text"
+FORMAT_DATAFRAME_JSON = "dataframe_json"  # 旧版本格式，只读
+FORMAT_DATAFRAME_SPLIT = "dataframe_split"
+
+# 默认压缩阈值（字节）：小负载压缩收益低于开销
+DEFAULT_MIN_BYTES = 1024
+
+
+def _compressors() -> Dict[str, tuple]:
+    codecs = {'zlib': (lambda raw: zlib.compress(raw, 6), zlib.decompress)}
+    if ZSTD_AVAILABLE:
+        codecs['zstd'] = (lambda raw: zstandard.ZstdCompressor(level=3).compress(raw),
+                          lambda raw: zstandard.ZstdDecompressor().decompress(raw))
+    if LZ4_AVAILABLE:
+        codecs['lz4'] = (lz4.frame.compress, lz4.frame.decompress)
+    return codecs
+
+
+def _frame_to_json(frame: pd.DataFrame) -> str:
+    """DataFrame 按 split 结构编码，附带各列类型和索引类型/名称（split 本身不保留类型）"""
+    body = frame.to_json(orient='split', date_format='iso', date_unit='ns', double_precision=15)
+    schema = {'dtypes': [str(dtype) for dtype in frame.dtypes],
+              'index_dtype': str(frame.index.dtype), 'index_name': frame.index.name}
+    return json.dumps(schema, ensure_ascii=False, default=str)[:-1] + ',"frame":' + body + '}'
+
+
+def _frame_from_json(text: str) -> pd.DataFrame:
+    payload = json.loads(text)
+    body = payload['frame']
+    frame = pd.DataFrame(body['data'], columns=body['columns'])
+    frame = frame.astype(dict(zip(frame.columns, payload['dtypes'])))
+    frame.index = pd.Index(body['index'], name=payload['index_name']).astype(payload['index_dtype'])
+    return frame
+
+
+def default_codec() -> str:
+    """优先使用zstd，其次lz4，都未安装时使用zlib"""
+    if ZSTD_AVAILABLE:
+        return 'zstd'
+    if LZ4_AVAILABLE:
+        return 'lz4'
+    return 'zlib'
+
+
+class PayloadCodec:
+    """
+    缓存负载编解码器
+
+    Args:
+        codec: 压缩算法（zstd / lz4 / zlib / none），默认读取 DB_CACHE_COMPRESSION，
+               未设置时自动选择已安装的最快算法
+        min_bytes: 编码后不小于该字节数的负载才压缩，默认读取 DB_CACHE_COMPRESS_MIN_BYTES
+    """
+
+    def __init__(self, codec: str = None, min_bytes: int = None):
+        self._codecs = _compressors()
+        codec = (codec or os.getenv('DB_CACHE_COMPRESSION', '') or default_codec()).lower()
+        if codec != 'none' and codec not in self._codecs:
+            logger.warning(f"⚠️ 压缩算法{codec}不可用，改用{default_codec()}")
+            codec = default_codec()
+        self.codec = codec
+        self.min_bytes = min_bytes if min_bytes is not None else int(
+            os.getenv('DB_CACHE_COMPRESS_MIN_BYTES', str(DEFAULT_MIN_BYTES)))
+        self._lock = threading.Lock()
+        self.stats = {'encoded': 0, 'compressed': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+
+    def encode(self, data: Any) -> Dict[str, Any]:
+        """
+        编码缓存数据
+
+        Returns:
+            {'data': str或bytes, 'data_format': 格式标记, 'compression': 压缩算法或None}；
+            未压缩的负载保持为 str，与旧版本记录一致
+        """
+        if isinstance(data, pd.DataFrame):
+            raw = _frame_to_json(data).encode('utf-8')
+            data_format = FORMAT_DATAFRAME_SPLIT
+        else:
+            raw = str(data).encode('utf-8')
+            data_format = FORMAT_TEXT
+
+        payload: Any = raw
+        compression = None
+        if self.codec != 'none' and len(raw) >= self.min_bytes:
+            compressed = self._codecs[self.codec][0](raw)
+            if len(compressed) < len(raw):
+                payload = compressed
+                compression = self.codec
+
+        with self._lock:
+            self.stats['encoded'] += 1
+            self.stats['raw_bytes'] += len(raw)
+            self.stats['stored_bytes'] += len(payload)
+            if compression:
+                self.stats['compressed'] += 1
+
+        if compression is None:
+            payload = raw.decode('utf-8')
+        return {'data': payload, 'data_format': data_format, 'compression': compression}
+
+    def decode(self, data: Any, data_format: Optional[str] = None, compression: Optional[str] = None) -> Any:
+        """
+        解码缓存数据，兼容旧版本的 dataframe_json / text 记录和没有格式标记的记录
+
+        Raises:
+            ValueError: 记录的格式标记未知，或使用了本进程不可用的压缩算法
+        """
+        data_format = data_format or FORMAT_TEXT
+        if data_format == FORMAT_DATAFRAME_JSON:
+            return pd.read_json(io.StringIO(data), orient='records')
+        if data_format not in (FORMAT_TEXT, FORMAT_DATAFRAME_SPLIT):
+            raise ValueError(f"不支持的缓存数据格式: {data_format}")
+
+        if isinstance(data, str) and compression:
+            # Redis中的二进制负载以base64保存
+            data = base64.b64decode(data)
+        if compression:
+            if compression not in self._codecs:
+                raise ValueError(f"缓存记录使用的压缩算法{compression}不可用")
+            data = self._codecs[compression][1](bytes(data))
+
+        if isinstance(data, (bytes, bytearray)):
+            data = bytes(data).decode('utf-8')
+        if data_format == FORMAT_DATAFRAME_SPLIT:
+            return _frame_from_json(data)
+        return data
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats['codec'] = self.codec
+        stats['min_bytes'] = self.min_bytes
+        stats['bytes_saved'] = stats['raw_bytes'] - stats['stored_bytes']
+        stats['ratio'] = round(stats['stored_bytes'] / stats['raw_bytes'], 4) if stats['raw_bytes'] else 1.0
+        return stats
+
+
+def to_redis_value(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Redis客户端按文本读写，把二进制负载转为base64"""
+    if isinstance(fields.get('data'), (bytes, bytearray)):
+        fields = dict(fields)
+        fields['data'] = base64.b64encode(fields['data']).decode('ascii')
+    return fields
@@ -10,7 +10,7 @@ import pickle
 import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any, Union, List
+from typing import Optional, Dict, Any, Union, List, Sequence, Tuple
 import hashlib
 
 # 导入日志模块
@@ -52,14 +52,18 @@ class StockDataCache:
             dir_path.mkdir(exist_ok=True)
 
         # 缓存配置 - 针对不同市场设置不同的TTL
+        # ttl_hours 为软TTL：超过后缓存不再视为新鲜；
+        # hard_ttl_hours 为硬TTL：软、硬TTL之间先返回过期缓存并在后台刷新，未配置则超过软TTL即同步获取
         self.cache_config = {
             'us_stock_data': {
                 'ttl_hours': 2,  # 美股数据缓存2小时（考虑到API限制）
+                'hard_ttl_hours': 12,  # 12小时内的过期行情先返回、后台刷新
                 'max_files': 1000,
                 'description': '美股历史数据'
             },
             'china_stock_data': {
                 'ttl_hours': 1,  # A股数据缓存1小时（实时性要求高）
+                'hard_ttl_hours': 6,  # 6小时内的过期行情先返回、后台刷新
                 'max_files': 1000,
                 'description': 'A股历史数据'
             },
@@ -92,6 +96,9 @@ class StockDataCache:
             'enable_length_check': os.getenv('ENABLE_CACHE_LENGTH_CHECK', 'false').lower() == 'true'  # 文件缓存默认不限制
         }
 
+        # 过期缓存先返回、后台刷新（stale-while-revalidate），可通过环境变量关闭
+        self.stale_while_revalidate = os.getenv('CACHE_STALE_WHILE_REVALIDATE', 'true').lower() == 'true'
+
         logger.info(f"📁 缓存管理器初始化完成，缓存目录: {self.cache_dir}")
         logger.info(f"🗄️ 数据库缓存管理器初始化完成")
         logger.info(f"   美股数据: ✅ 已配置")
@@ -410,6 +417,62 @@ class StockDataCache:
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol}")
         return None
     
+    def get_ttl_hours(self, symbol: str, data_type: str) -> Tuple[float, Optional[float]]:
+        """返回数据类型的 (软TTL, 硬TTL)，未配置硬TTL或关闭了后台刷新时硬TTL为None"""
+        cache_type = f"{self._determine_market_type(symbol)}_{data_type}"
+        config = self.cache_config.get(cache_type, {})
+        hard_ttl = config.get('hard_ttl_hours') if self.stale_while_revalidate else None
+        return config.get('ttl_hours', 24), hard_ttl
+
+    def get_cache_age_hours(self, cache_key: str) -> Optional[float]:
+        """缓存已存在的小时数，缓存不存在时返回None"""
+        return self._age_hours(self._load_metadata(cache_key))
+
+    @staticmethod
+    def _age_hours(metadata: Optional[Dict[str, Any]]) -> Optional[float]:
+        if not metadata or 'cached_at' not in metadata:
+            return None
+        try:
+            cached_at = datetime.fromisoformat(metadata['cached_at'])
+        except ValueError:
+            return None
+        return (datetime.now() - cached_at).total_seconds() / 3600
+
+    def get_remaining_ttl_seconds(self, cache_key: str) -> Optional[float]:
+        """缓存距离软TTL到期的秒数（已过期时为负数），缓存不存在时返回None"""
+        metadata = self._load_metadata(cache_key)
+        age_hours = self._age_hours(metadata)
+        if age_hours is None:
+            return None
+        ttl_hours, _ = self.get_ttl_hours(metadata.get('symbol', ''), metadata.get('data_type', 'stock_data'))
+        return (ttl_hours - age_hours) * 3600
+
+    def find_stale_stock_data(self, symbol: str, start_date: str, end_date: str,
+                              data_sources: Sequence[str]) -> Optional[Tuple[str, float]]:
+        """
+        查找已超过软TTL、仍在硬TTL内的行情缓存（仅精确匹配代码、日期区间和数据源）
+
+        Returns:
+            (cache_key, 已缓存小时数)，没有可用的过期缓存或该数据类型未配置硬TTL时返回None
+        """
+        soft_ttl, hard_ttl = self.get_ttl_hours(symbol, 'stock_data')
+        if hard_ttl is None:
+            return None
+
+        market_type = self._determine_market_type(symbol)
+        for data_source in data_sources:
+            cache_key = self._generate_cache_key("stock_data", symbol,
+                                               start_date=start_date,
+                                               end_date=end_date,
+                                               source=data_source,
+                                               market=market_type)
+            age_hours = self.get_cache_age_hours(cache_key)
+            if age_hours is not None and soft_ttl <= age_hours < hard_ttl:
+                metadata = self._load_metadata(cache_key)
+                if metadata and Path(metadata.get('file_path', '')).exists():
+                    return cache_key, age_hours
+        return None
+
     def save_news_data(self, symbol: str, news_data: str, 
                       start_date: str = None, end_date: str = None,
                       data_source: str = "unknown") -> str:
@@ -450,6 +513,39 @@ class StockDataCache:
         logger.info(f"📰 新闻数据已缓存: {symbol} ({data_source}) -> {cache_key}")
         return cache_key
     
+    def find_cached_news_data(self, symbol: str, start_date: str = None, end_date: str = None,
+                              data_source: str = "unknown", max_age_hours: int = None) -> Optional[str]:
+        """
+        查找有效的新闻缓存（缓存键由参数唯一确定，与 save_news_data 一致）
+
+        Returns:
+            cache_key: 如果找到有效缓存则返回缓存键，否则返回None
+        """
+        cache_key = self._generate_cache_key("news", symbol,
+                                           start_date=start_date,
+                                           end_date=end_date,
+                                           source=data_source)
+        if self.is_cache_valid(cache_key, max_age_hours, symbol, 'news'):
+            return cache_key
+        return None
+
+    def load_news_data(self, cache_key: str) -> Optional[str]:
+        """从缓存加载新闻数据"""
+        metadata = self._load_metadata(cache_key)
+        if not metadata:
+            return None
+
+        cache_path = Path(metadata['file_path'])
+        if not cache_path.exists():
+            return None
+
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except Exception as e:
+            logger.error(f"⚠️ 加载新闻缓存数据失败: {e}")
+            return None
+
     def save_fundamentals_data(self, symbol: str, fundamentals_data: str,
                               data_source: str = "unknown") -> str:
         """保存基本面数据到缓存"""
@@ -644,3 +740,45 @@ def get_cache() -> StockDataCache:
     if _cache_instance is None:
         _cache_instance = StockDataCache()
     return _cache_instance
+
+
+def news_cached(data_source: str):
+    """
+    新闻接口的文件缓存装饰器（按 us_news / china_news 的TTL复用结果）
+
+    被装饰函数的前两个参数为（股票代码或搜索词, 当前日期），其余参数计入数据源标识；
+    获取失败或内容过短的结果不缓存。缓存预热任务提前调用这些接口后，盘前的第一次分析直接命中缓存。
+    """
+    import functools
+    import re
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(key: str, curr_date: str, *args, **kwargs):
+            cache = get_cache()
+            # 搜索词中的空格和符号不适合作为缓存文件名
+            symbol = re.sub(r'[^\w.]+', '_', str(key)).strip('_')
+            extra = [str(a) for a in args] + [f"{k}={v}" for k, v in sorted(kwargs.items())]
+            source = "_".join([data_source] + extra)
+            try:
+                cache_key = cache.find_cached_news_data(symbol, curr_date, curr_date, source)
+                if cache_key:
+                    cached = cache.load_news_data(cache_key)
+                    if cached:
+                        logger.info(f"⚡ 从缓存加载新闻: {key} ({data_source})")
+                        return cached
+            except Exception as e:
+                logger.debug(f"读取新闻缓存失败: {e}")
+
+            result = func(key, curr_date, *args, **kwargs)
+            if isinstance(result, str) and len(result.strip()) > 100 and "❌" not in result[:200]:
+                try:
+                    cache.save_news_data(symbol, result, start_date=curr_date, end_date=curr_date,
+                                         data_source=source)
+                except Exception as e:
+                    logger.debug(f"保存新闻缓存失败: {e}")
+            return result
+
+        return wrapper
+
+    return decorator
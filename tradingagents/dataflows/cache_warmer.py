@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+盘前缓存预热
+各类缓存过期后（A股行情1小时、A股基本面12小时、美股新闻6小时、Tushare股票列表等），
+每天的第一批分析都要重新访问数据源。预热任务在开盘前按自选股列表（watchlist）
+通过分析时使用的同一套数据接口提前获取数据，使交互式分析开始时缓存已是热的。
+
+    # 预热一次
+    python -m cli.main warm-cache --watchlist config/watchlist.txt
+
+    # 常驻进程：每天 08:30 预热
+    python -m cli.main warm-cache --watchlist config/watchlist.txt --at 08:30
+
+预热内容（按市场选择与分析时相同的接口和参数）：
+- price: 数据预获取阶段、市场分析师、基本面分析师读取的行情区间（美股批量下载）
+- fundamentals: A股基本面（china_fundamentals）、美股Finnhub基本面
+- info: A股/港股基本信息，A股代码存在时额外预热 Tushare 股票列表
+- news: A股实时新闻、港股/美股Google新闻
+
+数据源访问仍经过各自的令牌桶限流（rate_limiter）和 AKShare 执行器，并发只决定同时处理的股票数。
+每次预热的覆盖率和耗时追加写入 data_cache_dir/cache_warmup_history.jsonl。
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from tradingagents.utils.tracing import span, trace_event
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+WARMUP_TASKS = ('price', 'fundamentals', 'info', 'news')
+
+DEFAULT_MAX_WORKERS = 4
+HISTORY_FILENAME = 'cache_warmup_history.jsonl'
+
+# 共享任务（不属于单只股票）在结果中的代码
+SHARED_SYMBOL = '*'
+
+
+@dataclass
+class WarmupResult:
+    """一项预热任务的结果"""
+    symbol: str
+    task: str
+    status: str  # ok / failed / skipped
+    duration: float = 0.0
+    detail: str = ''
+
+
+@dataclass
+class WarmupReport:
+    """一次预热的汇总"""
+    started_at: str
+    analysis_date: str
+    symbols: List[str]
+    tasks: List[str]
+    duration: float = 0.0
+    results: List[WarmupResult] = field(default_factory=list)
+
+    def coverage(self) -> Dict[str, Dict[str, int]]:
+        """各任务的 {ok, failed, skipped}"""
+        summary: Dict[str, Dict[str, int]] = {}
+        for result in self.results:
+            counts = summary.setdefault(result.task, {'ok': 0, 'failed': 0, 'skipped': 0})
+            counts[result.status] += 1
+        return summary
+
+    def coverage_ratio(self) -> float:
+        """成功的任务占已执行（未跳过）任务的比例"""
+        attempted = [r for r in self.results if r.status != 'skipped']
+        if not attempted:
+            return 1.0
+        return sum(1 for r in attempted if r.status == 'ok') / len(attempted)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'started_at': self.started_at,
+            'analysis_date': self.analysis_date,
+            'symbols': self.symbols,
+            'tasks': self.tasks,
+            'duration': round(self.duration, 3),
+            'coverage': self.coverage(),
+            'coverage_ratio': round(self.coverage_ratio(), 4),
+            'failures': [asdict(r) for r in self.results if r.status == 'failed'],
+            'results': [asdict(r) for r in self.results],
+        }
+
+
+def load_watchlist(path: str) -> List[str]:
+    """
+    读取自选股列表
+
+    支持文本文件（每行一个代码，# 开头为注释，也可用逗号分隔）和
+    JSON 文件（代码数组，或 {"symbols": [...]}）。
+    """
+    text = Path(path).read_text(encoding='utf-8')
+    if path.endswith('.json'):
+        data = json.loads(text)
+        symbols = data.get('symbols', []) if isinstance(data, dict) else data
+    else:
+        symbols = []
+        for line in text.splitlines():
+            line = line.split('#', 1)[0]
+            symbols.extend(part.strip() for part in line.split(','))
+    return list(dict.fromkeys(str(s).strip() for s in symbols if str(s).strip()))
+
+
+def _is_valid(result: Any) -> bool:
+    """数据接口返回的文本是否为有效数据（各接口失败时返回带❌或“失败”的提示文本）"""
+    if result is None:
+        return False
+    if isinstance(result, dict):
+        return bool(result) and not result.get('error')
+    text = str(result)
+    return bool(text.strip()) and '❌' not in text[:200] and '失败' not in text[:50]
+
+
+class CacheWarmer:
+    """按自选股列表预热数据缓存"""
+
+    def __init__(self, symbols: Sequence[str], tasks: Sequence[str] = WARMUP_TASKS,
+                 analysis_date: Optional[str] = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                 force_refresh: bool = False):
+        unknown = set(tasks) - set(WARMUP_TASKS)
+        if unknown:
+            raise ValueError(f"不支持的预热任务: {', '.join(sorted(unknown))}")
+        self.symbols = list(dict.fromkeys(symbols))
+        self.tasks = [t for t in WARMUP_TASKS if t in tasks]
+        self.analysis_date = analysis_date or datetime.now().strftime('%Y-%m-%d')
+        self.max_workers = max_workers
+        self.force_refresh = force_refresh
+
+    def run(self) -> WarmupReport:
+        """执行一次预热"""
+        from tradingagents.utils.stock_utils import StockUtils
+
+        report = WarmupReport(started_at=datetime.now().isoformat(), analysis_date=self.analysis_date,
+                              symbols=self.symbols, tasks=self.tasks)
+        start = time.perf_counter()
+        markets = {symbol: StockUtils.get_market_info(symbol) for symbol in self.symbols}
+        logger.info(f"🔥 [缓存预热] 开始: {len(self.symbols)} 只股票, 任务 {', '.join(self.tasks)}, "
+                    f"分析日期 {self.analysis_date}")
+
+        with span('cache_warmup', 'warmup', symbols=len(self.symbols)):
+            if 'info' in self.tasks and any(m['is_china'] for m in markets.values()):
+                report.results.append(self._timed(SHARED_SYMBOL, 'stock_list', self._warm_stock_list))
+
+            us_symbols = [s for s, m in markets.items() if m['is_us']]
+            if 'price' in self.tasks and us_symbols:
+                report.results.extend(self._warm_us_prices(us_symbols))
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="warmup") as pool:
+                futures = [pool.submit(self._warm_symbol, symbol, markets[symbol]) for symbol in self.symbols]
+                for future in futures:
+                    report.results.extend(future.result())
+
+        report.duration = time.perf_counter() - start
+        coverage = report.coverage()
+        logger.info(f"✅ [缓存预热] 完成: 耗时 {report.duration:.1f}s, 覆盖率 {report.coverage_ratio():.0%}, "
+                    + ", ".join(f"{task} {c['ok']}/{c['ok'] + c['failed']}" for task, c in coverage.items()))
+        trace_event('cache_warmup.done', coverage_ratio=report.coverage_ratio(), duration=report.duration)
+        self._record(report)
+        return report
+
+    # ------------------------------------------------------------------ 任务
+
+    def _timed(self, symbol: str, task: str, func: Callable[[], Any]) -> WarmupResult:
+        start = time.perf_counter()
+        try:
+            outcome = func()
+        except Exception as e:
+            logger.warning(f"⚠️ [缓存预热] {symbol} {task} 失败: {e}")
+            return WarmupResult(symbol, task, 'failed', time.perf_counter() - start, str(e)[:200])
+        duration = time.perf_counter() - start
+        if outcome is None:
+            return WarmupResult(symbol, task, 'skipped', duration)
+        ok = all(_is_valid(item) for item in outcome) if isinstance(outcome, list) else _is_valid(outcome)
+        return WarmupResult(symbol, task, 'ok' if ok else 'failed', duration,
+                            '' if ok else str(outcome)[:200])
+
+    def _warm_symbol(self, symbol: str, market: Dict[str, Any]) -> List[WarmupResult]:
+        results = []
+        for task in self.tasks:
+            if task == 'price' and market['is_us']:
+                continue  # 美股行情已批量预取
+            handler = getattr(self, f"_warm_{task}")
+            results.append(self._timed(symbol, task, lambda: handler(symbol, market)))
+        return results
+
+    def _price_windows(self, market: Dict[str, Any]):
+        from tradingagents.agents.utils.tool_prefetch import FUNDAMENTALS_START_DATE, analysis_data_windows
+
+        windows = analysis_data_windows(self.analysis_date)
+        if market['is_china']:
+            # A股基本面分析师的统一基本面工具同样读取行情
+            windows.append((FUNDAMENTALS_START_DATE, self.analysis_date))
+        return list(dict.fromkeys(windows))
+
+    def _warm_price(self, symbol: str, market: Dict[str, Any]):
+        from tradingagents.dataflows import interface
+
+        fetch = interface.get_china_stock_data_unified if market['is_china'] else interface.get_hk_stock_data_unified
+        return [fetch(symbol, start, end) for start, end in self._price_windows(market)]
+
+    def _warm_us_prices(self, symbols: List[str]) -> List[WarmupResult]:
+        from tradingagents.dataflows.optimized_us_data import prefetch_us_stock_data
+
+        start = time.perf_counter()
+        try:
+            saved = prefetch_us_stock_data(symbols, self.analysis_date, force_refresh=self.force_refresh)
+        except Exception as e:
+            logger.warning(f"⚠️ [缓存预热] 美股批量行情失败: {e}")
+            return [WarmupResult(s, 'price', 'failed', 0.0, str(e)[:200]) for s in symbols]
+        # 批量下载的耗时平摊到每只股票；已有缓存（不在返回结果中）同样视为已预热
+        duration = (time.perf_counter() - start) / len(symbols)
+        return [WarmupResult(s, 'price', 'failed' if saved.get(s.upper()) == 0 else 'ok', duration)
+                for s in symbols]
+
+    def _warm_fundamentals(self, symbol: str, market: Dict[str, Any]):
+        if market['is_china']:
+            from tradingagents.dataflows.optimized_china_data import get_china_fundamentals_cached
+            return get_china_fundamentals_cached(symbol, force_refresh=self.force_refresh)
+        if market['is_us'] and os.getenv('FINNHUB_API_KEY'):
+            from tradingagents.dataflows.interface import get_fundamentals_finnhub
+            return get_fundamentals_finnhub(symbol.upper(), self.analysis_date)
+        # 港股基本面由行情和基本信息组成；美股其他基本面来源需要调用LLM，不预热
+        return None
+
+    def _warm_info(self, symbol: str, market: Dict[str, Any]):
+        from tradingagents.dataflows import interface
+
+        if market['is_china']:
+            return interface.get_china_stock_info_unified(symbol)
+        if market['is_hk']:
+            return interface.get_hk_stock_info_unified(symbol)
+        return None
+
+    def _warm_stock_list(self):
+        if not os.getenv('TUSHARE_TOKEN'):
+            return None
+        from tradingagents.dataflows.tushare_utils import get_tushare_provider
+
+        stock_list = get_tushare_provider().get_stock_list()
+        return f"{len(stock_list)} stocks" if stock_list is not None and not stock_list.empty else None
+
+    def _warm_news(self, symbol: str, market: Dict[str, Any]):
+        from tradingagents.tools.unified_news_tool import UnifiedNewsAnalyzer
+
+        # 与统一新闻工具相同的接口和参数（按当天日期查询）
+        today = datetime.now().strftime('%Y-%m-%d')
+        if market['is_china']:
+            from tradingagents.dataflows.realtime_news_utils import get_realtime_stock_news
+            return get_realtime_stock_news(symbol, today, hours_back=6)
+
+        from tradingagents.dataflows.interface import get_google_news
+        query = UnifiedNewsAnalyzer.hk_news_query(symbol) if market['is_hk'] else UnifiedNewsAnalyzer.us_news_query(symbol)
+        return get_google_news(query, today)
+
+    # ------------------------------------------------------------------ 记录
+
+    def _record(self, report: WarmupReport):
+        """把本次预热的覆盖率和耗时追加到历史记录"""
+        try:
+            from tradingagents.dataflows.config import get_config
+
+            cache_dir = Path(get_config().get('data_cache_dir', './data_cache'))
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            summary = report.to_dict()
+            summary.pop('results')
+            with open(cache_dir / HISTORY_FILENAME, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(summary, ensure_ascii=False) + '\n')
+        except Exception as e:
+            logger.warning(f"⚠️ [缓存预热] 记录预热结果失败: {e}")
+
+
+def seconds_until(at: str, now: Optional[datetime] = None) -> float:
+    """距离下一次 HH:MM 的秒数"""
+    now = now or datetime.now()
+    hour, minute = (int(part) for part in at.split(':'))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def run_daily(at: str, make_warmer: Callable[[], CacheWarmer], weekdays_only: bool = True,
+              sleep: Callable[[float], None] = time.sleep):
+    """
+    常驻运行：每天 at（HH:MM）执行一次预热
+
+    Args:
+        make_warmer: 每次预热前调用，可重新读取自选股列表
+        weekdays_only: 只在工作日预热
+    """
+    logger.info(f"⏰ [缓存预热] 常驻模式，每天 {at} 预热{'（仅工作日）' if weekdays_only else ''}")
+    while True:
+        sleep(seconds_until(at))
+        if weekdays_only and datetime.now().weekday() >= 5:
+            continue
+        try:
+            make_warmer().run()
+        except Exception as e:
+            logger.error(f"❌ [缓存预热] 预热失败: {e}")
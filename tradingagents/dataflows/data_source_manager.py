@@ -20,6 +20,10 @@ warnings.filterwarnings('ignore')
 from tradingagents.utils.logging_init import setup_dataflow_logging
 logger = setup_dataflow_logging()
 
+from tradingagents.utils.cassette import cassette_call
+from .single_flight import single_flight
+from .run_data_context import run_context_frame
+
 
 class ChinaDataSource(Enum):
     """中国股票数据源枚举"""
@@ -294,9 +298,13 @@ class DataSourceManager:
             logger.error(f"❌ TDX适配器导入失败: {e}")
             return None
     
+    @single_flight('china_stock_data', key_func=lambda a: (
+        a['self'].current_source.value, a['symbol'], a['start_date'], a['end_date']))
+    @cassette_call('data', 'china_stock_data')
     def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None) -> str:
         """
         获取股票数据的统一接口
+        相同数据源、代码和日期区间的并发请求会合并为一次数据源调用
 
         Args:
             symbol: 股票代码
@@ -411,7 +419,8 @@ class DataSourceManager:
             logger.info(f"🔍 [DataSourceManager详细日志] 开始调用tushare_adapter...")
 
             adapter = get_tushare_adapter()
-            data = adapter.get_stock_data(symbol, start_date, end_date)
+            data = run_context_frame('tushare_daily', symbol, start_date, end_date,
+                                     lambda start, end: adapter.get_stock_data(symbol, start, end))
 
             if data is not None and not data.empty:
                 # 获取股票基本信息
@@ -473,7 +482,8 @@ class DataSourceManager:
             # 这里需要实现AKShare的统一接口
             from .akshare_utils import get_akshare_provider
             provider = get_akshare_provider()
-            data = provider.get_stock_data(symbol, start_date, end_date)
+            data = run_context_frame('akshare_daily', symbol, start_date, end_date,
+                                     lambda start, end: provider.get_stock_data(symbol, start, end))
 
             duration = time.time() - start_time
 
@@ -613,8 +623,11 @@ class DataSourceManager:
         
         return f"❌ 所有数据源都无法获取{symbol}的数据"
     
+    @single_flight('china_stock_info', key_func=lambda a: (
+        a['self'].current_source.value, a['symbol']))
+    @cassette_call('data', 'china_stock_info')
     def get_stock_info(self, symbol: str) -> Dict:
-        """获取股票基本信息，支持降级机制"""
+        """获取股票基本信息，支持降级机制（相同代码的并发请求会合并）"""
         logger.info(f"📊 [股票信息] 开始获取{symbol}基本信息...")
 
         # 首先尝试当前数据源
@@ -6,19 +6,23 @@ MongoDB + Redis 数据库缓存管理器
 
 import os
 import json
+import atexit
 import pickle
 import hashlib
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, Iterable, List, Union
 import pandas as pd
 
+from .cache_codec import PayloadCodec, to_redis_value
+from .write_behind import WriteBehindQueue
+
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
 # MongoDB
 try:
-    from pymongo import MongoClient
+    from pymongo import MongoClient, ReplaceOne
     from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
     MONGODB_AVAILABLE = True
 except ImportError:
@@ -37,6 +41,14 @@ except ImportError:
 
 class DatabaseCacheManager:
     """MongoDB + Redis 数据库缓存管理器"""
+
+    # 各类数据在Redis中的过期时间（秒）
+    REDIS_TTL = {
+        "stock_data": 6 * 3600,
+        "news_data": 24 * 3600,
+        "fundamentals_data": 24 * 3600,
+        "analysis_results": 24 * 3600,
+    }
     
     def __init__(self,
                  mongodb_url: Optional[str] = None,
@@ -62,6 +74,9 @@ class DatabaseCacheManager:
         self.redis_url = redis_url or os.getenv("REDIS_URL", f"redis://:{redis_password}@localhost:{redis_port}")
         self.mongodb_db_name = mongodb_db
         self.redis_db = redis_db
+
+        # 负载编码与压缩
+        self.codec = PayloadCodec()
         
         # 初始化连接
         self.mongodb_client = None
@@ -70,6 +85,16 @@ class DatabaseCacheManager:
         
         self._init_mongodb()
         self._init_redis()
+
+        # MongoDB延迟写入：保存时只同步写Redis，MongoDB由后台队列合并、批量写入
+        self._write_behind = None
+        if self.mongodb_db is not None and os.getenv("DB_CACHE_WRITE_BEHIND", "true").lower() == "true":
+            self._write_behind = WriteBehindQueue(
+                self._bulk_write_mongodb,
+                flush_interval=float(os.getenv("DB_CACHE_WRITE_BEHIND_INTERVAL", "0.5")),
+                max_batch=int(os.getenv("DB_CACHE_WRITE_BEHIND_BATCH", "500")),
+                max_pending=int(os.getenv("DB_CACHE_WRITE_BEHIND_MAX_PENDING", "10000")),
+            )
         
         logger.info(f"🗄️ 数据库缓存管理器初始化完成")
         logger.error(f"   MongoDB: {'✅ 已连接' if self.mongodb_client else '❌ 未连接'}")
@@ -155,6 +180,15 @@ class DatabaseCacheManager:
                 ("analysis_date", 1)
             ])
             fundamentals_collection.create_index([("created_at", 1)])
+
+            # 分析结果集合索引
+            analysis_collection = self.mongodb_db.analysis_results
+            analysis_collection.create_index([
+                ("symbol", 1),
+                ("data_source", 1),
+                ("analysis_date", 1)
+            ])
+            analysis_collection.create_index([("created_at", 1)])
             
             logger.info(f"✅ MongoDB索引创建完成")
             
@@ -187,128 +221,22 @@ class DatabaseCacheManager:
         Returns:
             cache_key: 缓存键
         """
-        cache_key = self._generate_cache_key("stock", symbol,
-                                           start_date=start_date,
-                                           end_date=end_date,
-                                           source=data_source)
-        
-        # 自动推断市场类型
-        if market_type is None:
-            # 根据股票代码格式推断市场类型
-            import re
-
-            if re.match(r'^\d{6}$', symbol):  # 6位数字为A股
-                market_type = "china"
-            else:  # 其他格式为美股
-                market_type = "us"
-        
-        # 准备文档数据
-        doc = {
-            "_id": cache_key,
-            "symbol": symbol,
-            "market_type": market_type,
-            "data_type": "stock_data",
-            "start_date": start_date,
-            "end_date": end_date,
-            "data_source": data_source,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-        
-        # 处理数据格式
-        if isinstance(data, pd.DataFrame):
-            doc["data"] = data.to_json(orient='records', date_format='iso')
-            doc["data_format"] = "dataframe_json"
-        else:
-            doc["data"] = str(data)
-            doc["data_format"] = "text"
-        
-        # 保存到MongoDB（持久化）
-        if self.mongodb_db is not None:
-            try:
-                collection = self.mongodb_db.stock_data
-                collection.replace_one({"_id": cache_key}, doc, upsert=True)
-                logger.info(f"💾 股票数据已保存到MongoDB: {symbol} -> {cache_key}")
-            except Exception as e:
-                logger.error(f"⚠️ MongoDB保存失败: {e}")
-        
-        # 保存到Redis（快速缓存，6小时过期）
-        if self.redis_client:
-            try:
-                redis_data = {
-                    "data": doc["data"],
-                    "data_format": doc["data_format"],
-                    "symbol": symbol,
-                    "data_source": data_source,
-                    "created_at": doc["created_at"].isoformat()
-                }
-                self.redis_client.setex(
-                    cache_key,
-                    6 * 3600,  # 6小时过期
-                    json.dumps(redis_data, ensure_ascii=False)
-                )
-                logger.info(f"⚡ 股票数据已缓存到Redis: {symbol} -> {cache_key}")
-            except Exception as e:
-                logger.error(f"⚠️ Redis缓存失败: {e}")
-        
-        return cache_key
+        doc = self._stock_doc(symbol, data, start_date, end_date, data_source, market_type)
+        self._write_docs("stock_data", [doc])
+        return doc["_id"]
     
     def load_stock_data(self, cache_key: str) -> Optional[Union[pd.DataFrame, str]]:
         """从Redis或MongoDB加载股票数据"""
-        
-        # 首先尝试从Redis加载（更快）
-        if self.redis_client:
-            try:
-                redis_data = self.redis_client.get(cache_key)
-                if redis_data:
-                    data_dict = json.loads(redis_data)
-                    logger.info(f"⚡ 从Redis加载数据: {cache_key}")
-                    
-                    if data_dict["data_format"] == "dataframe_json":
-                        return pd.read_json(data_dict["data"], orient='records')
-                    else:
-                        return data_dict["data"]
-            except Exception as e:
-                logger.error(f"⚠️ Redis加载失败: {e}")
-        
-        # 如果Redis没有，从MongoDB加载
-        if self.mongodb_db is not None:
-            try:
-                collection = self.mongodb_db.stock_data
-                doc = collection.find_one({"_id": cache_key})
-                
-                if doc:
-                    logger.info(f"💾 从MongoDB加载数据: {cache_key}")
-                    
-                    # 同时更新到Redis缓存
-                    if self.redis_client:
-                        try:
-                            redis_data = {
-                                "data": doc["data"],
-                                "data_format": doc["data_format"],
-                                "symbol": doc["symbol"],
-                                "data_source": doc["data_source"],
-                                "created_at": doc["created_at"].isoformat()
-                            }
-                            self.redis_client.setex(
-                                cache_key,
-                                6 * 3600,
-                                json.dumps(redis_data, ensure_ascii=False)
-                            )
-                            logger.info(f"⚡ 数据已同步到Redis缓存")
-                        except Exception as e:
-                            logger.error(f"⚠️ Redis同步失败: {e}")
-                    
-                    if doc["data_format"] == "dataframe_json":
-                        return pd.read_json(doc["data"], orient='records')
-                    else:
-                        return doc["data"]
-                        
-            except Exception as e:
-                logger.error(f"⚠️ MongoDB加载失败: {e}")
-        
-        return None
-    
+        return self.mget([cache_key], "stock_data").get(cache_key)
+
+    def load_news_data(self, cache_key: str) -> Optional[str]:
+        """从Redis或MongoDB加载新闻数据"""
+        return self.mget([cache_key], "news_data").get(cache_key)
+
+    def load_fundamentals_data(self, cache_key: str) -> Optional[str]:
+        """从Redis或MongoDB加载基本面数据"""
+        return self.mget([cache_key], "fundamentals_data").get(cache_key)
+
     def find_cached_stock_data(self, symbol: str, start_date: str = None,
                               end_date: str = None, data_source: str = None,
                               max_age_hours: int = 6) -> Optional[str]:
@@ -324,6 +252,10 @@ class DatabaseCacheManager:
         if self.redis_client and self.redis_client.exists(exact_key):
             logger.info(f"⚡ Redis中找到精确匹配: {symbol} -> {exact_key}")
             return exact_key
+
+        # 尚未写入MongoDB的精确匹配
+        if self._write_behind is not None and self._write_behind.get("stock_data", exact_key):
+            return exact_key
         
         # 检查MongoDB中的匹配项
         if self.mongodb_db is not None:
@@ -359,12 +291,190 @@ class DatabaseCacheManager:
     def save_news_data(self, symbol: str, news_data: str,
                       start_date: str = None, end_date: str = None,
                       data_source: str = "unknown") -> str:
-        """保存新闻数据到MongoDB和Redis"""
-        cache_key = self._generate_cache_key("news", symbol,
-                                           start_date=start_date,
-                                           end_date=end_date,
-                                           source=data_source)
+        """保存新闻数据到MongoDB和Redis（Redis 24小时过期）"""
+        doc = self._news_doc(symbol, news_data, start_date, end_date, data_source)
+        self._write_docs("news_data", [doc])
+        return doc["_id"]
+
+    def save_fundamentals_data(self, symbol: str, fundamentals_data: str,
+                              analysis_date: str = None,
+                              data_source: str = "unknown") -> str:
+        """保存基本面数据到MongoDB和Redis（Redis 24小时过期）"""
+        doc = self._fundamentals_doc(symbol, fundamentals_data, analysis_date, data_source)
+        self._write_docs("fundamentals_data", [doc])
+        return doc["_id"]
+
+    # ------------------------------------------------------------------
+    # 批量读写
+    # ------------------------------------------------------------------
+
+    def mset(self, records: Iterable[Dict[str, Any]], data_type: str = "stock_data") -> List[str]:
+        """
+        批量保存：MongoDB一次 bulk_write，Redis一次管道提交
+
+        Args:
+            records: 每项为对应 save_* 方法的关键字参数，如
+                     {"symbol": "AAPL", "data": df, "start_date": ..., "end_date": ..., "data_source": "yfinance"}
+            data_type: stock_data / news_data / fundamentals_data / analysis_results
+
+        Returns:
+            List[str]: 与 records 顺序一致的缓存键
+        """
+        builder = self._doc_builder(data_type)
+        docs = [builder(**record) for record in records]
+        if docs:
+            self._write_docs(data_type, docs)
+        return [doc["_id"] for doc in docs]
+
+    def mget(self, cache_keys: Iterable[str], data_type: str = "stock_data") -> Dict[str, Any]:
+        """
+        批量加载：Redis一次 MGET，未命中的键用一次 MongoDB $in 查询，并通过管道回填Redis
 
+        Returns:
+            Dict[str, Any]: 缓存键 -> 数据，未命中的键不包含在内
+        """
+        keys = list(dict.fromkeys(cache_keys))
+        results: Dict[str, Any] = {}
+        if not keys:
+            return results
+        
+        # 首先尝试从Redis加载（更快）
+        if self.redis_client:
+            try:
+                for key, redis_data in zip(keys, self.redis_client.mget(keys)):
+                    if redis_data:
+                        try:
+                            results[key] = self._decode(json.loads(redis_data))
+                        except Exception as e:
+                            logger.error(f"⚠️ Redis缓存解码失败 {key}: {e}")
+                if results:
+                    logger.info(f"⚡ 从Redis加载数据: {len(results)}/{len(keys)} 个键")
+            except Exception as e:
+                logger.error(f"⚠️ Redis加载失败: {e}")
+        
+        # 延迟写入队列中尚未持久化的文档
+        if self._write_behind is not None:
+            for key in keys:
+                if key not in results:
+                    pending_doc = self._write_behind.get(data_type, key)
+                    if pending_doc is not None:
+                        results[key] = self._decode(pending_doc)
+
+        # Redis没有的键，从MongoDB加载
+        missing = [key for key in keys if key not in results]
+        if missing and self.mongodb_db is not None:
+            try:
+                collection = self.mongodb_db[data_type]
+                docs = list(collection.find({"_id": {"$in": missing}}))
+                loaded = []
+                for doc in docs:
+                    try:
+                        results[doc["_id"]] = self._decode(doc)
+                        loaded.append(doc)
+                    except Exception as e:
+                        logger.error(f"⚠️ MongoDB缓存解码失败 {doc['_id']}: {e}")
+                if loaded:
+                    logger.info(f"💾 从MongoDB加载数据: {len(loaded)}/{len(missing)} 个键")
+                    # 同时更新到Redis缓存
+                    self._write_redis(data_type, loaded)
+            except Exception as e:
+                logger.error(f"⚠️ MongoDB加载失败: {e}")
+        
+        return results
+
+    def cache_key(self, data_type: str, symbol: str, start_date: str = None, end_date: str = None,
+                  analysis_date: str = None, data_source: str = "unknown") -> str:
+        """计算与 save_* 相同的缓存键，用于批量读取前组装键列表"""
+        if data_type == "stock_data":
+            return self._generate_cache_key("stock", symbol, start_date=start_date,
+                                            end_date=end_date, source=data_source)
+        if data_type == "news_data":
+            return self._generate_cache_key("news", symbol, start_date=start_date,
+                                            end_date=end_date, source=data_source)
+        if data_type == "fundamentals_data":
+            return self._generate_cache_key("fundamentals", symbol,
+                                            date=analysis_date or datetime.now().strftime("%Y-%m-%d"),
+                                            source=data_source)
+        if data_type == "analysis_results":
+            return self._generate_cache_key("analysis", symbol,
+                                            date=analysis_date or datetime.now().strftime("%Y-%m-%d"),
+                                            source=data_source)
+        raise ValueError(f"不支持的数据类型: {data_type}")
+
+    def find_latest_keys(self, symbols: Iterable[str], data_type: str = "stock_data") -> Dict[str, Dict[str, Any]]:
+        """
+        一次MongoDB聚合查询多只股票最近写入的缓存
+
+        Returns:
+            Dict[str, Dict]: 股票代码 -> {"cache_key", "data_source", "created_at"}
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols or self.mongodb_db is None:
+            return {}
+        try:
+            pipeline = [
+                {"$match": {"symbol": {"$in": symbols}}},
+                {"$sort": {"created_at": -1}},
+                {"$group": {"_id": "$symbol", "cache_key": {"$first": "$_id"},
+                            "data_source": {"$first": "$data_source"},
+                            "created_at": {"$first": "$created_at"}}},
+            ]
+            return {doc["_id"]: {"cache_key": doc["cache_key"], "data_source": doc.get("data_source"),
+                                 "created_at": doc.get("created_at")}
+                    for doc in self.mongodb_db[data_type].aggregate(pipeline)}
+        except Exception as e:
+            logger.error(f"⚠️ MongoDB查询失败: {e}")
+            return {}
+
+    def _doc_builder(self, data_type: str):
+        builders = {
+            "stock_data": self._stock_doc,
+            "news_data": self._news_doc,
+            "fundamentals_data": self._fundamentals_doc,
+            "analysis_results": self._analysis_doc,
+        }
+        if data_type not in builders:
+            raise ValueError(f"不支持的数据类型: {data_type}")
+        return builders[data_type]
+
+    def _stock_doc(self, symbol: str, data: Union[pd.DataFrame, str],
+                   start_date: str = None, end_date: str = None,
+                   data_source: str = "unknown", market_type: str = None) -> Dict[str, Any]:
+        """构造股票数据文档"""
+        cache_key = self.cache_key("stock_data", symbol, start_date=start_date,
+                                   end_date=end_date, data_source=data_source)
+        
+        # 自动推断市场类型
+        if market_type is None:
+            # 根据股票代码格式推断市场类型
+            import re
+
+            if re.match(r'^\d{6}$', symbol):  # 6位数字为A股
+                market_type = "china"
+            else:  # 其他格式为美股
+                market_type = "us"
+        
+        doc = {
+            "_id": cache_key,
+            "symbol": symbol,
+            "market_type": market_type,
+            "data_type": "stock_data",
+            "start_date": start_date,
+            "end_date": end_date,
+            "data_source": data_source,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+        # 处理数据格式（DataFrame二进制编码，大负载压缩）
+        doc.update(self.codec.encode(data))
+        return doc
+
+    def _news_doc(self, symbol: str, news_data: str,
+                  start_date: str = None, end_date: str = None,
+                  data_source: str = "unknown") -> Dict[str, Any]:
+        """构造新闻数据文档"""
+        cache_key = self.cache_key("news_data", symbol, start_date=start_date,
+                                   end_date=end_date, data_source=data_source)
         doc = {
             "_id": cache_key,
             "symbol": symbol,
@@ -373,103 +483,122 @@ class DatabaseCacheManager:
             "start_date": start_date,
             "end_date": end_date,
             "data_source": data_source,
-            "data": news_data,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
+        doc.update(self.codec.encode(news_data))
+        return doc
 
-        # 保存到MongoDB
-        if self.mongodb_db is not None:
-            try:
-                collection = self.mongodb_db.news_data
-                collection.replace_one({"_id": cache_key}, doc, upsert=True)
-                logger.info(f"📰 新闻数据已保存到MongoDB: {symbol} -> {cache_key}")
-            except Exception as e:
-                logger.error(f"⚠️ MongoDB保存失败: {e}")
-
-        # 保存到Redis（24小时过期）
-        if self.redis_client:
-            try:
-                redis_data = {
-                    "data": news_data,
-                    "symbol": symbol,
-                    "data_source": data_source,
-                    "created_at": doc["created_at"].isoformat()
-                }
-                self.redis_client.setex(
-                    cache_key,
-                    24 * 3600,  # 24小时过期
-                    json.dumps(redis_data, ensure_ascii=False)
-                )
-                logger.info(f"⚡ 新闻数据已缓存到Redis: {symbol} -> {cache_key}")
-            except Exception as e:
-                logger.error(f"⚠️ Redis缓存失败: {e}")
+    def _fundamentals_doc(self, symbol: str, fundamentals_data: str,
+                          analysis_date: str = None,
+                          data_source: str = "unknown") -> Dict[str, Any]:
+        """构造基本面数据文档"""
+        if not analysis_date:
+            analysis_date = datetime.now().strftime("%Y-%m-%d")
 
-        return cache_key
+        cache_key = self.cache_key("fundamentals_data", symbol, analysis_date=analysis_date,
+                                   data_source=data_source)
+        doc = {
+            "_id": cache_key,
+            "symbol": symbol,
+            "data_type": "fundamentals_data",
+            "analysis_date": analysis_date,
+            "data_source": data_source,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+        doc.update(self.codec.encode(fundamentals_data))
+        return doc
 
-    def save_fundamentals_data(self, symbol: str, fundamentals_data: str,
-                              analysis_date: str = None,
-                              data_source: str = "unknown") -> str:
-        """保存基本面数据到MongoDB和Redis"""
+    def _analysis_doc(self, symbol: str, analysis: str,
+                      analysis_date: str = None,
+                      data_source: str = "unknown") -> Dict[str, Any]:
+        """构造分析结果文档（LLM生成的分析文本，与基本面原始数据分开存放）"""
         if not analysis_date:
             analysis_date = datetime.now().strftime("%Y-%m-%d")
 
-        cache_key = self._generate_cache_key("fundamentals", symbol,
-                                           date=analysis_date,
-                                           source=data_source)
-
+        cache_key = self.cache_key("analysis_results", symbol, analysis_date=analysis_date,
+                                   data_source=data_source)
         doc = {
             "_id": cache_key,
             "symbol": symbol,
-            "data_type": "fundamentals_data",
+            "data_type": "analysis_results",
             "analysis_date": analysis_date,
             "data_source": data_source,
-            "data": fundamentals_data,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
+        doc.update(self.codec.encode(analysis))
+        return doc
 
-        # 保存到MongoDB
-        if self.mongodb_db is not None:
-            try:
-                collection = self.mongodb_db.fundamentals_data
-                collection.replace_one({"_id": cache_key}, doc, upsert=True)
-                logger.info(f"💼 基本面数据已保存到MongoDB: {symbol} -> {cache_key}")
-            except Exception as e:
-                logger.error(f"⚠️ MongoDB保存失败: {e}")
+    def _decode(self, record: Dict[str, Any]) -> Any:
+        """按记录中的格式和压缩标记解码（兼容旧版本记录）"""
+        return self.codec.decode(record["data"], record.get("data_format"), record.get("compression"))
 
-        # 保存到Redis（24小时过期）
-        if self.redis_client:
+    def _write_docs(self, data_type: str, docs: List[Dict[str, Any]]):
+        """写入Redis（快速缓存，同步）和MongoDB（持久化，默认经延迟写入队列）"""
+        self._write_redis(data_type, docs)
+
+        if self.mongodb_db is None:
+            return
+        if self._write_behind is not None:
             try:
+                self._write_behind.enqueue(data_type, docs)
+                return
+            except RuntimeError:
+                # 队列已关闭（close之后的保存）时同步写入
+                pass
+        try:
+            self._bulk_write_mongodb(data_type, docs)
+        except Exception as e:
+            logger.error(f"⚠️ MongoDB保存失败: {e}")
+
+    def _bulk_write_mongodb(self, data_type: str, docs: List[Dict[str, Any]]):
+        """一次 bulk_write 写入同一集合的多条文档，失败时抛出异常"""
+        collection = self.mongodb_db[data_type]
+        collection.bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs],
+                              ordered=False)
+        logger.info(f"💾 {data_type} 已保存到MongoDB: "
+                    f"{', '.join(doc['symbol'] for doc in docs[:5])}{' ...' if len(docs) > 5 else ''} "
+                    f"({len(docs)}条)")
+
+    def _write_redis(self, data_type: str, docs: List[Dict[str, Any]]):
+        """通过管道一次写入多条Redis缓存"""
+        if not self.redis_client or not docs:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for doc in docs:
                 redis_data = {
-                    "data": fundamentals_data,
-                    "symbol": symbol,
-                    "data_source": data_source,
-                    "analysis_date": analysis_date,
+                    "data": doc["data"],
+                    "data_format": doc.get("data_format"),
+                    "compression": doc.get("compression"),
+                    "symbol": doc["symbol"],
+                    "data_source": doc["data_source"],
                     "created_at": doc["created_at"].isoformat()
                 }
-                self.redis_client.setex(
-                    cache_key,
-                    24 * 3600,  # 24小时过期
-                    json.dumps(redis_data, ensure_ascii=False)
-                )
-                logger.info(f"⚡ 基本面数据已缓存到Redis: {symbol} -> {cache_key}")
-            except Exception as e:
-                logger.error(f"⚠️ Redis缓存失败: {e}")
-
-        return cache_key
+                if doc.get("analysis_date"):
+                    redis_data["analysis_date"] = doc["analysis_date"]
+                pipe.setex(doc["_id"], self.REDIS_TTL[data_type],
+                           json.dumps(to_redis_value(redis_data), ensure_ascii=False))
+            pipe.execute()
+            logger.info(f"⚡ {data_type} 已缓存到Redis: {len(docs)}条")
+        except Exception as e:
+            logger.error(f"⚠️ Redis缓存失败: {e}")
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
         stats = {
             "mongodb": {"available": self.mongodb_db is not None, "collections": {}},
-            "redis": {"available": self.redis_client is not None, "keys": 0, "memory_usage": "N/A"}
+            "redis": {"available": self.redis_client is not None, "keys": 0, "memory_usage": "N/A"},
+            "compression": self.codec.get_stats(),
+            "write_behind": self._write_behind.get_stats() if self._write_behind is not None else {"enabled": False}
         }
 
         # MongoDB统计
         if self.mongodb_db is not None:
             try:
-                for collection_name in ["stock_data", "news_data", "fundamentals_data"]:
+                for collection_name in self.REDIS_TTL:
                     collection = self.mongodb_db[collection_name]
                     count = collection.count_documents({})
                     size = self.mongodb_db.command("collStats", collection_name).get("size", 0)
@@ -499,7 +628,7 @@ class DatabaseCacheManager:
         # 清理MongoDB
         if self.mongodb_db is not None:
             try:
-                for collection_name in ["stock_data", "news_data", "fundamentals_data"]:
+                for collection_name in self.REDIS_TTL:
                     collection = self.mongodb_db[collection_name]
                     result = collection.delete_many({"created_at": {"$lt": cutoff_time}})
                     cleared_count += result.deleted_count
@@ -511,8 +640,17 @@ class DatabaseCacheManager:
         logger.info(f"🧹 总共清理了 {cleared_count} 条过期记录")
         return cleared_count
 
+    def flush_writes(self, timeout: float = None) -> bool:
+        """同步写完延迟写入队列中的积压，返回是否全部写入成功"""
+        if self._write_behind is None:
+            return True
+        return self._write_behind.flush(timeout)
+
     def close(self):
-        """关闭数据库连接"""
+        """写完延迟写入队列后关闭数据库连接"""
+        if self._write_behind is not None:
+            self._write_behind.close()
+
         if self.mongodb_client:
             self.mongodb_client.close()
             logger.info(f"🔒 MongoDB连接已关闭")
@@ -525,6 +663,15 @@ class DatabaseCacheManager:
 # 全局数据库缓存实例
 _db_cache_instance = None
 
+
+def _close_db_cache():
+    """进程退出时写完延迟写入队列"""
+    if _db_cache_instance is not None:
+        _db_cache_instance.close()
+
+
+atexit.register(_close_db_cache)
+
 def get_db_cache() -> DatabaseCacheManager:
     """获取全局数据库缓存实例"""
     global _db_cache_instance
@@ -12,6 +12,8 @@ import os
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from .rate_limiter import get_rate_limiter, is_rate_limit_error
+from .run_data_context import run_context_frame
 logger = get_logger('agents')
 
 
@@ -21,8 +23,8 @@ class HKStockProvider:
 
     def __init__(self):
         """初始化港股数据提供器"""
-        self.last_request_time = 0
-        self.min_request_interval = 2.0  # 增加请求间隔到2秒
+        # yfinance港股限流器在进程内所有实例和线程间共享（默认0.5次/秒）
+        self.rate_limiter = get_rate_limiter('yfinance_hk')
         self.timeout = 60  # 请求超时时间（增加到60秒）
         self.max_retries = 3  # 增加重试次数
         self.rate_limit_wait = 60  # 遇到限制时等待时间
@@ -31,14 +33,7 @@ class HKStockProvider:
     
     def _wait_for_rate_limit(self):
         """等待速率限制"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+        self.rate_limiter.acquire()
     
     def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None) -> Optional[pd.DataFrame]:
         """
@@ -78,6 +73,8 @@ class HKStockProvider:
                     )
                     
                     if not data.empty:
+                        self.rate_limiter.report_success()
+
                         # 数据预处理
                         data = data.reset_index()
                         data['Symbol'] = symbol
@@ -92,10 +89,11 @@ class HKStockProvider:
                     logger.error(f"❌ 港股数据获取失败 (尝试 {attempt + 1}/{self.max_retries}): {error_msg}")
 
                     # 检查是否是频率限制错误
-                    if "Rate limited" in error_msg or "Too Many Requests" in error_msg:
+                    if is_rate_limit_error(e):
+                        # 通知共享限流器退避，其他线程的请求也会一起暂停
+                        self.rate_limiter.report_rate_limited(retry_after=self.rate_limit_wait)
                         if attempt < self.max_retries - 1:
                             logger.info(f"⏳ 检测到频率限制，等待{self.rate_limit_wait}秒...")
-                            time.sleep(self.rate_limit_wait)
                         else:
                             logger.error(f"❌ 频率限制，跳过重试")
                             break
@@ -324,7 +322,9 @@ def get_hk_stock_data(symbol: str, start_date: str = None, end_date: str = None)
         str: 格式化的港股数据
     """
     provider = get_hk_stock_provider()
-    data = provider.get_stock_data(symbol, start_date, end_date)
+    data = run_context_frame('yfinance_hk_history', symbol, start_date, end_date,
+                             lambda start, end: provider.get_stock_data(symbol, start, end),
+                             end_inclusive=False)
     return provider.format_stock_data(symbol, data, start_date, end_date)
 
 
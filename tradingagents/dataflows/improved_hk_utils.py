@@ -5,13 +5,14 @@
 """
 
 import time
-import json
-import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
+from .rate_limiter import get_rate_limiter, is_rate_limit_error
+from .symbol_master import get_symbol_master, MARKET_HK
+from .kv_store import get_kv_store
 logger = get_logger("default")
 
 
@@ -19,10 +20,12 @@ class ImprovedHKStockProvider:
     """改进的港股数据提供器"""
     
     def __init__(self):
-        self.cache_file = "hk_stock_cache.json"
+        # 公司名称缓存位于共享键值存储（SQLite WAL或Redis），按key设置TTL，多进程安全
+        self.cache_store = get_kv_store('hk_stock')
         self.cache_ttl = 3600 * 24  # 24小时缓存
-        self.rate_limit_wait = 5  # 速率限制等待时间
-        self.last_request_time = 0
+        self.default_name_ttl = 3600  # 默认名称1小时后过期
+        # AKShare港股限流器在进程内所有实例和线程间共享（默认每5秒1次）
+        self.rate_limiter = get_rate_limiter('akshare_hk')
         
         # 内置港股名称映射（避免API调用）
         self.hk_stock_names = {
@@ -82,37 +85,23 @@ class ImprovedHKStockProvider:
             '0902.HK': '华能国际', '0902': '华能国际', '00902': '华能国际',
             '0991.HK': '大唐发电', '0991': '大唐发电', '00991': '大唐发电'
         }
-        
-        self._load_cache()
-    
-    def _load_cache(self):
-        """加载缓存"""
-        try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    self.cache = json.load(f)
-            else:
-                self.cache = {}
-        except Exception as e:
-            logger.debug(f"📊 [港股缓存] 加载缓存失败: {e}")
-            self.cache = {}
+
+        # 内置映射写入共享的股票主表，查询时统一支持 0700.HK / 0700 / 00700 等格式
+        get_symbol_master().load_entries(
+            ({'code': code, 'name': name} for code, name in self.hk_stock_names.items() if code.endswith('.HK')),
+            MARKET_HK, 'builtin')
     
-    def _save_cache(self):
-        """保存缓存"""
+    def _cache_name(self, symbol: str, name: str, source: str, ttl: float = None):
+        """写入公司名称缓存（单条原子upsert）"""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            self.cache_store.set(f"name_{symbol}", {
+                'data': name,
+                'timestamp': time.time(),
+                'source': source
+            }, ttl=ttl or self.cache_ttl)
         except Exception as e:
             logger.debug(f"📊 [港股缓存] 保存缓存失败: {e}")
     
-    def _is_cache_valid(self, key: str) -> bool:
-        """检查缓存是否有效"""
-        if key not in self.cache:
-            return False
-        
-        cache_time = self.cache[key].get('timestamp', 0)
-        return (time.time() - cache_time) < self.cache_ttl
-    
     def _normalize_hk_symbol(self, symbol: str) -> str:
         """标准化港股代码"""
         # 移除.HK后缀
@@ -142,41 +131,26 @@ class ImprovedHKStockProvider:
         """
         try:
             # 检查缓存
-            cache_key = f"name_{symbol}"
-            if self._is_cache_valid(cache_key):
-                cached_name = self.cache[cache_key]['data']
+            try:
+                cached = self.cache_store.get(f"name_{symbol}")
+            except Exception as e:
+                logger.debug(f"📊 [港股缓存] 读取缓存失败: {e}")
+                cached = None
+            if cached:
+                cached_name = cached['data']
                 logger.debug(f"📊 [港股缓存] 从缓存获取公司名称: {symbol} -> {cached_name}")
                 return cached_name
             
-            # 方案1：使用内置映射
-            normalized_symbol = self._normalize_hk_symbol(symbol)
-            
-            # 尝试多种格式匹配
-            for format_symbol in [symbol, normalized_symbol, f"{normalized_symbol}.HK"]:
-                if format_symbol in self.hk_stock_names:
-                    company_name = self.hk_stock_names[format_symbol]
-                    
-                    # 缓存结果
-                    self.cache[cache_key] = {
-                        'data': company_name,
-                        'timestamp': time.time(),
-                        'source': 'builtin_mapping'
-                    }
-                    self._save_cache()
-                    
-                    logger.debug(f"📊 [港股映射] 获取公司名称: {symbol} -> {company_name}")
-                    return company_name
+            # 方案1：查询股票主表（内置映射及已通过API获取的名称，内存查询无需再写缓存文件）
+            company_name = get_symbol_master().get_name(symbol, MARKET_HK)
+            if company_name:
+                logger.debug(f"📊 [港股映射] 获取公司名称: {symbol} -> {company_name}")
+                return company_name
             
             # 方案2：优先尝试AKShare API获取（有速率限制保护）
             try:
                 # 速率限制保护
-                current_time = time.time()
-                if current_time - self.last_request_time < self.rate_limit_wait:
-                    wait_time = self.rate_limit_wait - (current_time - self.last_request_time)
-                    logger.debug(f"📊 [港股API] 速率限制保护，等待 {wait_time:.1f} 秒")
-                    time.sleep(wait_time)
-
-                self.last_request_time = time.time()
+                self.rate_limiter.acquire()
 
                 # 优先尝试AKShare获取
                 try:
@@ -184,21 +158,23 @@ class ImprovedHKStockProvider:
                     logger.debug(f"📊 [港股API] 优先使用AKShare获取: {symbol}")
 
                     akshare_info = get_hk_stock_info_akshare(symbol)
+                    # AKShare接口失败时返回带 error 字段的默认信息
+                    if isinstance(akshare_info, dict) and is_rate_limit_error(akshare_info.get('error', '')):
+                        self.rate_limiter.report_rate_limited()
                     if akshare_info and isinstance(akshare_info, dict) and 'name' in akshare_info:
                         akshare_name = akshare_info['name']
                         if not akshare_name.startswith('港股'):
+                            self.rate_limiter.report_success()
+                            get_symbol_master().upsert({'code': symbol, 'name': akshare_name}, MARKET_HK, 'akshare')
                             # 缓存AKShare结果
-                            self.cache[cache_key] = {
-                                'data': akshare_name,
-                                'timestamp': time.time(),
-                                'source': 'akshare_api'
-                            }
-                            self._save_cache()
+                            self._cache_name(symbol, akshare_name, 'akshare_api')
 
                             logger.debug(f"📊 [港股AKShare] 获取公司名称: {symbol} -> {akshare_name}")
                             return akshare_name
                 except Exception as e:
                     logger.debug(f"📊 [港股AKShare] AKShare获取失败: {e}")
+                    if is_rate_limit_error(e):
+                        self.rate_limiter.report_rate_limited()
 
                 # 备用：尝试从统一接口获取（包含Yahoo Finance）
                 from tradingagents.dataflows.interface import get_hk_stock_info_unified
@@ -208,12 +184,7 @@ class ImprovedHKStockProvider:
                     api_name = hk_info['name']
                     if not api_name.startswith('港股'):
                         # 缓存API结果
-                        self.cache[cache_key] = {
-                            'data': api_name,
-                            'timestamp': time.time(),
-                            'source': 'unified_api'
-                        }
-                        self._save_cache()
+                        self._cache_name(symbol, api_name, 'unified_api')
 
                         logger.debug(f"📊 [港股统一API] 获取公司名称: {symbol} -> {api_name}")
                         return api_name
@@ -226,12 +197,7 @@ class ImprovedHKStockProvider:
             default_name = f"港股{clean_symbol}"
             
             # 缓存默认结果（较短的TTL）
-            self.cache[cache_key] = {
-                'data': default_name,
-                'timestamp': time.time() - self.cache_ttl + 3600,  # 1小时后过期
-                'source': 'default'
-            }
-            self._save_cache()
+            self._cache_name(symbol, default_name, 'default', ttl=self.default_name_ttl)
             
             logger.debug(f"📊 [港股默认] 使用默认名称: {symbol} -> {default_name}")
             return default_name
@@ -241,6 +207,33 @@ class ImprovedHKStockProvider:
             clean_symbol = self._normalize_hk_symbol(symbol)
             return f"港股{clean_symbol}"
     
+    def get_company_names(self, symbols: List[str]) -> Dict[str, str]:
+        """
+        批量获取港股公司名称
+
+        一次批量读取缓存，股票主表中已有的直接返回，其余逐个走API（受限流保护）
+
+        Args:
+            symbols: 港股代码列表
+
+        Returns:
+            Dict[str, str]: 代码 -> 公司名称
+        """
+        symbols = list(dict.fromkeys(symbols))
+        try:
+            cached = self.cache_store.get_many([f"name_{symbol}" for symbol in symbols])
+        except Exception as e:
+            logger.debug(f"📊 [港股缓存] 批量读取缓存失败: {e}")
+            cached = {}
+
+        names = {}
+        for symbol in symbols:
+            entry = cached.get(f"name_{symbol}")
+            names[symbol] = entry['data'] if entry else self.get_company_name(symbol)
+
+        logger.debug(f"📊 [港股缓存] 批量获取{len(symbols)}个公司名称，缓存命中{len(cached)}个")
+        return names
+
     def get_stock_info(self, symbol: str) -> Dict[str, Any]:
         """
         获取港股基本信息
@@ -302,6 +295,20 @@ def get_hk_company_name_improved(symbol: str) -> str:
     return provider.get_company_name(symbol)
 
 
+def prefetch_hk_company_names(symbols: List[str]) -> Dict[str, str]:
+    """
+    批量预取港股公司名称（用于批量分析前预热缓存）
+
+    Args:
+        symbols: 港股代码列表
+
+    Returns:
+        Dict[str, str]: 代码 -> 公司名称
+    """
+    provider = get_improved_hk_provider()
+    return provider.get_company_names(symbols)
+
+
 def get_hk_stock_info_improved(symbol: str) -> Dict[str, Any]:
     """
     获取港股信息的改进版本
@@ -7,15 +7,18 @@
 
 import os
 import logging
+import threading
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
 import pandas as pd
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import setup_dataflow_logging
+from tradingagents.utils.tracing import span
 
 # 导入原有缓存系统
 from .cache_manager import StockDataCache
+from .memory_cache import SizedLRUCache
 
 # 导入自适应缓存系统
 try:
@@ -25,6 +28,7 @@ try:
 except ImportError:
     ADAPTIVE_CACHE_AVAILABLE = False
 
+
 class IntegratedCacheManager:
     """集成缓存管理器 - 智能选择缓存策略"""
     
@@ -33,6 +37,11 @@ class IntegratedCacheManager:
         
         # 初始化原有缓存系统（作为备用）
         self.legacy_cache = StockDataCache(cache_dir)
+
+        # 进程内L1缓存：保存反序列化后的对象，命中时不再读文件或访问数据库
+        self.memory_cache = SizedLRUCache() if os.getenv('L1_CACHE_ENABLED', 'true').lower() == 'true' else None
+        self._tier_lock = threading.Lock()
+        self.tier_stats = {'lookups': 0, 'misses': 0, 'hits': {}}
         
         # 尝试初始化自适应缓存系统
         self.adaptive_cache = None
@@ -68,6 +77,116 @@ class IntegratedCacheManager:
         else:
             self.logger.info("📁 使用传统文件缓存系统")
     
+    def _load_tiered(self, name: str, legacy_loader, cache_key: str) -> Optional[Any]:
+        """依次从L1内存缓存和底层缓存加载，并记录命中的层级"""
+        with span(name, 'cache') as cache_span:
+            tier = 'memory'
+            data = self.memory_cache.get(cache_key) if self.memory_cache is not None else None
+            if data is None:
+                tier, data, remaining_ttl = self._load_backend(legacy_loader, cache_key)
+                if data is not None and self.memory_cache is not None:
+                    self.memory_cache.put(cache_key, data, remaining_ttl)
+            self._record_tier(tier if data is not None else None)
+            if cache_span is not None:
+                cache_span.set(hit=data is not None, tier=tier if data is not None else None)
+            return data
+
+    def load_many(self, cache_keys: Iterable[str], data_type: str = "stock_data") -> Dict[str, Any]:
+        """
+        批量加载缓存：先查L1，未命中的键由自适应缓存一次批量查询（Redis MGET / MongoDB $in）
+
+        Args:
+            data_type: stock_data / news_data / fundamentals_data（传统文件缓存按类型选择加载方法）
+
+        Returns:
+            Dict[str, Any]: 缓存键 -> 数据，未命中的键不包含在内
+        """
+        legacy_loaders = {
+            "stock_data": self.legacy_cache.load_stock_data,
+            "news_data": self.legacy_cache.load_news_data,
+            "fundamentals_data": self.legacy_cache.load_fundamentals_data,
+        }
+        keys = list(dict.fromkeys(cache_keys))
+        results: Dict[str, Any] = {}
+        tiers: Dict[str, str] = {}
+
+        with span('cache.load_many', 'cache', data_type=data_type, keys=len(keys)) as cache_span:
+            missing = []
+            for key in keys:
+                data = self.memory_cache.get(key) if self.memory_cache is not None else None
+                if data is None:
+                    missing.append(key)
+                else:
+                    results[key], tiers[key] = data, 'memory'
+
+            if missing:
+                if self.use_adaptive:
+                    loaded = {key: (backend, data, remaining_ttl) for key, (data, backend, remaining_ttl)
+                              in self.adaptive_cache.load_entries(missing).items()}
+                else:
+                    loaded = {}
+                    for key in missing:
+                        tier, data, remaining_ttl = self._load_backend(legacy_loaders[data_type], key)
+                        if data is not None:
+                            loaded[key] = (tier, data, remaining_ttl)
+                for key, (tier, data, remaining_ttl) in loaded.items():
+                    results[key], tiers[key] = data, tier
+                    if self.memory_cache is not None:
+                        self.memory_cache.put(key, data, remaining_ttl)
+
+            for key in keys:
+                self._record_tier(tiers.get(key))
+            if cache_span is not None:
+                cache_span.set(hits=len(results))
+        return results
+
+    def _load_backend(self, legacy_loader, cache_key: str):
+        """从底层缓存加载，返回 (命中层级, 数据, 剩余TTL秒数)"""
+        if self.use_adaptive:
+            entry = self.adaptive_cache.load_entry(cache_key)
+            if entry is None:
+                return None, None, None
+            data, backend, remaining_ttl = entry
+            return backend, data, remaining_ttl
+        data = legacy_loader(cache_key)
+        if data is None:
+            return None, None, None
+        return 'file', data, self.legacy_cache.get_remaining_ttl_seconds(cache_key)
+
+    def _record_tier(self, tier: Optional[str]):
+        with self._tier_lock:
+            self.tier_stats['lookups'] += 1
+            if tier is None:
+                self.tier_stats['misses'] += 1
+            else:
+                self.tier_stats['hits'][tier] = self.tier_stats['hits'].get(tier, 0) + 1
+
+    def _invalidate(self, cache_key: str) -> str:
+        """保存新数据后使L1中的旧对象失效"""
+        if self.memory_cache is not None and cache_key:
+            self.memory_cache.invalidate(cache_key)
+        return cache_key
+
+    def get_tier_stats(self) -> Dict[str, Any]:
+        """各缓存层级的命中次数和命中率（命中率 = 该层命中次数 / 总查询次数）"""
+        with self._tier_lock:
+            lookups = self.tier_stats['lookups']
+            hits = dict(self.tier_stats['hits'])
+            misses = self.tier_stats['misses']
+        tiers = {
+            tier: {'hits': count, 'hit_ratio': round(count / lookups, 4) if lookups else 0.0}
+            for tier, count in hits.items()
+        }
+        stats = {
+            'lookups': lookups,
+            'misses': misses,
+            'hit_ratio': round((lookups - misses) / lookups, 4) if lookups else 0.0,
+            'tiers': tiers,
+        }
+        if self.memory_cache is not None:
+            stats['memory_cache'] = self.memory_cache.get_stats()
+        return stats
+
     def save_stock_data(self, symbol: str, data: Any, start_date: str = None, 
                        end_date: str = None, data_source: str = "default") -> str:
         """
@@ -85,7 +204,7 @@ class IntegratedCacheManager:
         """
         if self.use_adaptive:
             # 使用自适应缓存系统
-            return self.adaptive_cache.save_data(
+            cache_key = self.adaptive_cache.save_data(
                 symbol=symbol,
                 data=data,
                 start_date=start_date or "",
@@ -95,13 +214,14 @@ class IntegratedCacheManager:
             )
         else:
             # 使用传统缓存系统
-            return self.legacy_cache.save_stock_data(
+            cache_key = self.legacy_cache.save_stock_data(
                 symbol=symbol,
                 data=data,
                 start_date=start_date,
                 end_date=end_date,
                 data_source=data_source
             )
+        return self._invalidate(cache_key)
     
     def load_stock_data(self, cache_key: str) -> Optional[Any]:
         """
@@ -113,12 +233,8 @@ class IntegratedCacheManager:
         Returns:
             股票数据或None
         """
-        if self.use_adaptive:
-            # 使用自适应缓存系统
-            return self.adaptive_cache.load_data(cache_key)
-        else:
-            # 使用传统缓存系统
-            return self.legacy_cache.load_stock_data(cache_key)
+        # 先查进程内L1缓存，未命中时使用自适应缓存系统或传统缓存系统
+        return self._load_tiered('cache.load_stock_data', self.legacy_cache.load_stock_data, cache_key)
     
     def find_cached_stock_data(self, symbol: str, start_date: str = None, 
                               end_date: str = None, data_source: str = "default") -> Optional[str]:
@@ -151,44 +267,68 @@ class IntegratedCacheManager:
                 end_date=end_date,
                 data_source=data_source
             )
+
+    def find_cached_stock_data_many(self, queries: Iterable[Tuple[str, str, str, str]]) -> Dict[Tuple[str, str, str, str], str]:
+        """
+        批量查找股票数据缓存
+
+        自适应缓存的缓存键由查询参数确定，所有查询经 load_many 一次批量读取（Redis MGET / MongoDB $in）；
+        传统文件缓存按元数据查找，逐个调用 find_cached_stock_data
+
+        Args:
+            queries: (股票代码, 开始日期, 结束日期, 数据源) 列表
+
+        Returns:
+            Dict: 命中的查询 -> 缓存键
+        """
+        queries = list(dict.fromkeys(queries))
+        if not self.use_adaptive:
+            found = {}
+            for query in queries:
+                cache_key = self.find_cached_stock_data(*query)
+                if cache_key:
+                    found[query] = cache_key
+            return found
+
+        keys = {(symbol, start_date, end_date, data_source):
+                self.adaptive_cache.cache_key(symbol, start_date or "", end_date or "", data_source)
+                for symbol, start_date, end_date, data_source in queries}
+        loaded = self.load_many(keys.values())
+        return {query: cache_key for query, cache_key in keys.items() if cache_key in loaded}
     
     def save_news_data(self, symbol: str, data: Any, data_source: str = "default") -> str:
         """保存新闻数据"""
         if self.use_adaptive:
-            return self.adaptive_cache.save_data(
+            cache_key = self.adaptive_cache.save_data(
                 symbol=symbol,
                 data=data,
                 data_source=data_source,
                 data_type="news_data"
             )
         else:
-            return self.legacy_cache.save_news_data(symbol, data, data_source)
+            cache_key = self.legacy_cache.save_news_data(symbol, data, data_source)
+        return self._invalidate(cache_key)
     
     def load_news_data(self, cache_key: str) -> Optional[Any]:
         """加载新闻数据"""
-        if self.use_adaptive:
-            return self.adaptive_cache.load_data(cache_key)
-        else:
-            return self.legacy_cache.load_news_data(cache_key)
+        return self._load_tiered('cache.load_news_data', self.legacy_cache.load_news_data, cache_key)
     
     def save_fundamentals_data(self, symbol: str, data: Any, data_source: str = "default") -> str:
         """保存基本面数据"""
         if self.use_adaptive:
-            return self.adaptive_cache.save_data(
+            cache_key = self.adaptive_cache.save_data(
                 symbol=symbol,
                 data=data,
                 data_source=data_source,
                 data_type="fundamentals_data"
             )
         else:
-            return self.legacy_cache.save_fundamentals_data(symbol, data, data_source)
+            cache_key = self.legacy_cache.save_fundamentals_data(symbol, data, data_source)
+        return self._invalidate(cache_key)
     
     def load_fundamentals_data(self, cache_key: str) -> Optional[Any]:
         """加载基本面数据"""
-        if self.use_adaptive:
-            return self.adaptive_cache.load_data(cache_key)
-        else:
-            return self.legacy_cache.load_fundamentals_data(cache_key)
+        return self._load_tiered('cache.load_fundamentals_data', self.legacy_cache.load_fundamentals_data, cache_key)
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
@@ -203,6 +343,7 @@ class IntegratedCacheManager:
                 "cache_system": "adaptive",
                 "adaptive_cache": adaptive_stats,
                 "legacy_cache": legacy_stats,
+                "tier_stats": self.get_tier_stats(),
                 "database_available": self.db_manager.is_database_available(),
                 "mongodb_available": self.db_manager.is_mongodb_available(),
                 "redis_available": self.db_manager.is_redis_available()
@@ -213,6 +354,7 @@ class IntegratedCacheManager:
             return {
                 "cache_system": "legacy",
                 "legacy_cache": legacy_stats,
+                "tier_stats": self.get_tier_stats(),
                 "database_available": False,
                 "mongodb_available": False,
                 "redis_available": False
@@ -220,6 +362,9 @@ class IntegratedCacheManager:
     
     def clear_expired_cache(self):
         """清理过期缓存"""
+        if self.memory_cache is not None:
+            self.memory_cache.purge_expired()
+
         if self.use_adaptive:
             self.adaptive_cache.clear_expired_cache()
         
@@ -1,10 +1,12 @@
 from typing import Annotated, Dict
+import importlib
 import time
 import os
 from .reddit_utils import fetch_top_from_category
-from .chinese_finance_utils import get_chinese_social_sentiment
-from .googlenews_utils import *
 from .finnhub_utils import get_data_in_range
+from .cache_manager import news_cached
+from .single_flight import single_flight
+from .run_data_context import run_context_cached, run_context_frame
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import setup_dataflow_logging
@@ -14,53 +16,61 @@ from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 logger = setup_dataflow_logging()
 
-# 导入港股工具
-try:
-    from .hk_stock_utils import get_hk_stock_data, get_hk_stock_info
-    HK_STOCK_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ 港股工具不可用: {e}")
-    HK_STOCK_AVAILABLE = False
-
-# 导入AKShare港股工具
-try:
-    from .akshare_utils import get_hk_stock_data_akshare, get_hk_stock_info_akshare
-    AKSHARE_HK_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ AKShare港股工具不可用: {e}")
-    AKSHARE_HK_AVAILABLE = False
-
-# 尝试导入yfinance相关模块，如果失败则跳过
-try:
-    from .yfin_utils import *
-    YFIN_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ yfinance工具不可用: {e}")
-    YFIN_AVAILABLE = False
-
-try:
-    from .stockstats_utils import *
-    STOCKSTATS_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ stockstats工具不可用: {e}")
-    STOCKSTATS_AVAILABLE = False
+# 重依赖（港股/AKShare/yfinance/stockstats）在首次使用时才导入，缩短启动时间
+# 标志 -> (模块, {本模块中的名称: 模块属性，None表示模块本身}, 说明)
+# 可用性标志仍可作为模块属性读取，如 from .interface import HK_STOCK_AVAILABLE
+_OPTIONAL_IMPORTS = {
+    'HK_STOCK_AVAILABLE': ('.hk_stock_utils', {'get_hk_stock_data': 'get_hk_stock_data',
+                                               'get_hk_stock_info': 'get_hk_stock_info'}, '港股工具'),
+    'AKSHARE_HK_AVAILABLE': ('.akshare_utils', {'get_hk_stock_data_akshare': 'get_hk_stock_data_akshare',
+                                                'get_hk_stock_info_akshare': 'get_hk_stock_info_akshare'}, 'AKShare港股工具'),
+    'YFIN_AVAILABLE': ('.yfin_utils', {'YFinanceUtils': 'YFinanceUtils'}, 'yfinance工具'),
+    'STOCKSTATS_AVAILABLE': ('.stockstats_utils', {'StockstatsUtils': 'StockstatsUtils'}, 'stockstats工具'),
+    'YF_AVAILABLE': ('yfinance', {'yf': None}, 'yfinance库'),
+}
+
+
+def _ensure_optional(flag: str) -> bool:
+    """按需导入标志对应的可选依赖，返回是否可用（结果写入模块全局变量，只导入一次）"""
+    if flag in globals():
+        return globals()[flag]
+
+    module_name, names, label = _OPTIONAL_IMPORTS[flag]
+    try:
+        module = importlib.import_module(module_name, __package__)
+        values = {name: (module if attr is None else getattr(module, attr)) for name, attr in names.items()}
+        available = True
+    except ImportError as e:
+        logger.warning(f"⚠️ {label}不可用: {e}")
+        values = {name: None for name in names}
+        available = False
+    globals().update(values)
+    globals()[flag] = available
+    return available
+
+
+def __getattr__(name):
+    if name in _OPTIONAL_IMPORTS:
+        return _ensure_optional(name)
+    for flag, (_, names, _) in _OPTIONAL_IMPORTS.items():
+        if name in names:
+            _ensure_optional(flag)
+            return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_chinese_social_sentiment(*args, **kwargs):
+    """中国社交媒体情绪分析（按需加载 chinese_finance_utils 及其 bs4 依赖）"""
+    from .chinese_finance_utils import get_chinese_social_sentiment as _get_chinese_social_sentiment
+    return _get_chinese_social_sentiment(*args, **kwargs)
+
+
 from dateutil.relativedelta import relativedelta
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import json
 import os
 import pandas as pd
-from tqdm import tqdm
-from openai import OpenAI
-
-# 尝试导入yfinance，如果失败则设置为None
-try:
-    import yfinance as yf
-    YF_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ yfinance库不可用: {e}")
-    yf = None
-    YF_AVAILABLE = False
 from .config import get_config, set_config, DATA_DIR
 
 
@@ -337,6 +347,7 @@ def get_simfin_income_statements(
     )
 
 
+@news_cached('google')
 def get_google_news(
     query: Annotated[str, "Query to search with"],
     curr_date: Annotated[str, "Curr date in yyyy-mm-dd format"],
@@ -370,6 +381,7 @@ def get_google_news(
     before = before.strftime("%Y-%m-%d")
 
     logger.info(f"[Google新闻] 开始获取新闻，查询: {query}, 时间范围: {before} 至 {curr_date}")
+    from .googlenews_utils import getNewsData
     news_results = getNewsData(query, before, curr_date)
 
     news_str = ""
@@ -410,6 +422,7 @@ def get_reddit_global_news(
     curr_date = datetime.strptime(before, "%Y-%m-%d")
 
     total_iterations = (start_date - curr_date).days + 1
+    from tqdm import tqdm
     pbar = tqdm(desc=f"Getting Global News on {start_date}", total=total_iterations)
 
     while curr_date <= start_date:
@@ -464,6 +477,7 @@ def get_reddit_company_news(
     curr_date = datetime.strptime(before, "%Y-%m-%d")
 
     total_iterations = (start_date - curr_date).days + 1
+    from tqdm import tqdm
     pbar = tqdm(
         desc=f"Getting Company News for {ticker} on {start_date}",
         total=total_iterations,
@@ -646,6 +660,7 @@ def get_stockstats_indicator(
     curr_date = datetime.strptime(curr_date, "%Y-%m-%d")
     curr_date = curr_date.strftime("%Y-%m-%d")
 
+    _ensure_optional('STOCKSTATS_AVAILABLE')
     try:
         indicator_value = StockstatsUtils.get_stock_stats(
             symbol,
@@ -710,7 +725,7 @@ def get_YFin_data_online(
     end_date: Annotated[str, "End date in yyyy-mm-dd format"],
 ):
     # 检查yfinance是否可用
-    if not YF_AVAILABLE or yf is None:
+    if not _ensure_optional('YF_AVAILABLE') or yf is None:
         return "yfinance库不可用，无法获取美股数据"
 
     datetime.strptime(start_date, "%Y-%m-%d")
@@ -720,7 +735,10 @@ def get_YFin_data_online(
     ticker = yf.Ticker(symbol.upper())
 
     # Fetch historical data for the specified date range
-    data = ticker.history(start=start_date, end=end_date)
+    # 分析运行中优先复用本次已获取、区间覆盖请求的行情（如数据预获取阶段的结果）
+    data = run_context_frame('yfinance_history', symbol.upper(), start_date, end_date,
+                             lambda start, end: ticker.history(start=start, end=end),
+                             end_inclusive=False)
 
     # Check if data is empty
     if data.empty:
@@ -786,6 +804,7 @@ def get_YFin_data(
 
 def get_stock_news_openai(ticker, curr_date):
     config = get_config()
+    from openai import OpenAI
     client = OpenAI(base_url=config["backend_url"])
 
     response = client.responses.create(
@@ -821,6 +840,7 @@ def get_stock_news_openai(ticker, curr_date):
 
 def get_global_news_openai(curr_date):
     config = get_config()
+    from openai import OpenAI
     client = OpenAI(base_url=config["backend_url"])
 
     response = client.responses.create(
@@ -1037,6 +1057,7 @@ def get_fundamentals_openai(ticker, curr_date):
         
         logger.debug(f"📊 [DEBUG] 尝试使用OpenAI获取 {ticker} 的基本面数据...")
         
+        from openai import OpenAI
         client = OpenAI(base_url=config["backend_url"])
 
         response = client.responses.create(
@@ -1201,6 +1222,7 @@ def get_china_stock_info_tushare(
 
 # ==================== 统一数据源接口 ====================
 
+@run_context_cached('china_stock_data', key_arity=3)
 def get_china_stock_data_unified(
     ticker: Annotated[str, "中国股票代码，如：000001、600036等"],
     start_date: Annotated[str, "开始日期，格式：YYYY-MM-DD"],
@@ -1287,6 +1309,7 @@ def get_china_stock_data_unified(
         return f"❌ 获取{ticker}股票数据失败: {e}"
 
 
+@run_context_cached('china_stock_info', key_arity=1)
 def get_china_stock_info_unified(
     ticker: Annotated[str, "中国股票代码，如：000001、600036等"]
 ) -> str:
@@ -1391,9 +1414,12 @@ def get_current_china_data_source() -> str:
 
 # ==================== 港股数据接口 ====================
 
+@run_context_cached('hk_stock_data', key_arity=3)
+@single_flight('hk_stock_data')
 def get_hk_stock_data_unified(symbol: str, start_date: str = None, end_date: str = None) -> str:
     """
     获取港股数据的统一接口
+    相同代码和日期区间的并发请求会合并为一次数据源调用
 
     Args:
         symbol: 港股代码 (如: 0700.HK)
@@ -1407,7 +1433,7 @@ def get_hk_stock_data_unified(symbol: str, start_date: str = None, end_date: str
         logger.info(f"🇭🇰 获取港股数据: {symbol}")
 
         # 优先使用AKShare港股数据（国内数据源，港股支持更好，更稳定）
-        if AKSHARE_HK_AVAILABLE:
+        if _ensure_optional('AKSHARE_HK_AVAILABLE'):
             try:
                 logger.info(f"🔄 优先使用AKShare获取港股数据: {symbol}")
                 result = get_hk_stock_data_akshare(symbol, start_date, end_date)
@@ -1420,7 +1446,7 @@ def get_hk_stock_data_unified(symbol: str, start_date: str = None, end_date: str
                 logger.error(f"⚠️ AKShare港股数据获取失败: {e}")
 
         # 备用方案1：使用Yahoo Finance港股工具
-        if HK_STOCK_AVAILABLE:
+        if _ensure_optional('HK_STOCK_AVAILABLE'):
             try:
                 logger.info(f"🔄 使用Yahoo Finance备用方案获取港股数据: {symbol}")
                 result = get_hk_stock_data(symbol, start_date, end_date)
@@ -1452,9 +1478,11 @@ def get_hk_stock_data_unified(symbol: str, start_date: str = None, end_date: str
         return f"❌ 获取港股{symbol}数据失败: {e}"
 
 
+@run_context_cached('hk_stock_info', key_arity=1)
+@single_flight('hk_stock_info')
 def get_hk_stock_info_unified(symbol: str) -> Dict:
     """
-    获取港股信息的统一接口
+    获取港股信息的统一接口（相同代码的并发请求会合并）
 
     Args:
         symbol: 港股代码
@@ -1464,7 +1492,7 @@ def get_hk_stock_info_unified(symbol: str) -> Dict:
     """
     try:
         # 优先使用AKShare（国内数据源，港股支持更好）
-        if AKSHARE_HK_AVAILABLE:
+        if _ensure_optional('AKSHARE_HK_AVAILABLE'):
             try:
                 logger.info(f"🔄 优先使用AKShare获取港股信息: {symbol}")
                 result = get_hk_stock_info_akshare(symbol)
@@ -1477,7 +1505,7 @@ def get_hk_stock_info_unified(symbol: str) -> Dict:
                 logger.error(f"⚠️ AKShare港股信息获取失败: {e}")
 
         # 备用方案1：使用Yahoo Finance港股工具
-        if HK_STOCK_AVAILABLE:
+        if _ensure_optional('HK_STOCK_AVAILABLE'):
             try:
                 logger.info(f"🔄 使用Yahoo Finance备用方案获取港股信息: {symbol}")
                 result = get_hk_stock_info(symbol)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+共享键值缓存存储
+支持按key设置TTL、原子写入和批量读取，多进程安全：
+- SQLite（WAL模式，默认）：文件位于配置的 data_cache_dir 下
+- Redis：使用 database_manager 配置的Redis连接
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+class KVStore:
+    """键值存储接口，值为可JSON序列化的对象"""
+
+    backend = 'none'
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: Dict[str, Any], ttl: float = None):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class SQLiteKVStore(KVStore):
+    """
+    SQLite键值存储（WAL模式）
+
+    每个线程使用独立连接；写入为单条 INSERT ... ON CONFLICT 语句，天然原子，
+    多进程并发写由SQLite文件锁串行化，读不阻塞写。过期数据在读取时过滤并定期清理。
+    """
+
+    backend = 'sqlite'
+    PURGE_INTERVAL = 3600
+
+    def __init__(self, path: str, namespace: str):
+        self.path = path
+        self.namespace = namespace
+        self._local = threading.local()
+        self._last_purge = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv_cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        result = {}
+        now = time.time()
+        conn = self._conn()
+        # SQLite单条语句的参数个数有限，分批查询
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, value FROM kv_cache WHERE namespace = ? AND key IN ({placeholders})"
+                f" AND (expires_at IS NULL OR expires_at > ?)",
+                [self.namespace, *chunk, now]).fetchall()
+            for key, value in rows:
+                try:
+                    result[key] = json.loads(value)
+                except ValueError:
+                    continue
+        return result
+
+    def set_many(self, items: Dict[str, Any], ttl: float = None):
+        if not items:
+            return
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        rows = [(self.namespace, key, json.dumps(value, ensure_ascii=False), expires_at, now)
+                for key, value in items.items()]
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO kv_cache (namespace, key, value, expires_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(namespace, key) DO UPDATE SET"
+                " value = excluded.value, expires_at = excluded.expires_at, updated_at = excluded.updated_at",
+                rows)
+        self._purge_expired(now)
+
+    def _purge_expired(self, now: float):
+        if now - self._last_purge < self.PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM kv_cache WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                         (self.namespace, now))
+
+    def delete(self, key: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM kv_cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM kv_cache WHERE namespace = ?", (self.namespace,))
+
+
+class RedisKVStore(KVStore):
+    """Redis键值存储，TTL由Redis原生过期实现，批量读写使用MGET和pipeline"""
+
+    backend = 'redis'
+
+    def __init__(self, client, namespace: str):
+        self.client = client
+        self.namespace = namespace
+        self._prefix = f"tradingagents:kv:{namespace}:"
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        values = self.client.mget([self._prefix + key for key in keys])
+        result = {}
+        for key, value in zip(keys, values):
+            if value is None:
+                continue
+            try:
+                result[key] = json.loads(value)
+            except ValueError:
+                continue
+        return result
+
+    def set_many(self, items: Dict[str, Any], ttl: float = None):
+        if not items:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(self._prefix + key, json.dumps(value, ensure_ascii=False),
+                     ex=max(1, int(ttl)) if ttl is not None else None)
+        pipe.execute()
+
+    def delete(self, key: str):
+        self.client.delete(self._prefix + key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self._prefix + '*', count=500))
+        if keys:
+            self.client.delete(*keys)
+
+
+def get_kv_store_path(filename: str = 'kv_cache.db') -> str:
+    """SQLite存储文件路径：环境变量 KV_STORE_PATH 优先，否则位于配置的 data_cache_dir 下"""
+    path = os.getenv('KV_STORE_PATH')
+    if path:
+        return path
+    try:
+        from .config import get_config
+        cache_dir = get_config().get('data_cache_dir')
+    except Exception as e:
+        logger.debug(f"读取data_cache_dir配置失败，使用默认目录: {e}")
+        cache_dir = None
+    if not cache_dir:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_cache')
+    return os.path.join(cache_dir, filename)
+
+
+# 全局存储实例（按命名空间）
+_stores: Dict[str, KVStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_kv_store(namespace: str) -> KVStore:
+    """
+    获取命名空间对应的共享键值存储
+
+    KV_STORE_BACKEND=redis 且Redis可用时使用Redis，否则使用SQLite
+    """
+    store = _stores.get(namespace)
+    if store is not None:
+        return store
+
+    with _stores_lock:
+        store = _stores.get(namespace)
+        if store is not None:
+            return store
+
+        if os.getenv('KV_STORE_BACKEND', 'sqlite').lower() == 'redis':
+            try:
+                from tradingagents.config.database_manager import get_redis_client
+                client = get_redis_client()
+                if client is not None:
+                    store = RedisKVStore(client, namespace)
+                else:
+                    logger.warning("⚠️ [键值存储] Redis不可用，使用SQLite存储")
+            except Exception as e:
+                logger.warning(f"⚠️ [键值存储] 初始化Redis存储失败，使用SQLite存储: {e}")
+
+        if store is None:
+            store = SQLiteKVStore(get_kv_store_path(), namespace)
+
+        _stores[namespace] = store
+        logger.debug(f"🗄️ [键值存储] {namespace} 使用{store.backend}存储")
+        return store
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+进程内内存缓存（L1）
+IntegratedCacheManager 的每次命中都要读文件或访问Redis/MongoDB再反序列化CSV/JSON/pickle，
+即使同一进程的另一个分析师几毫秒前刚读过同一个键。本模块在其前面提供一层按字节数限制容量的
+LRU缓存，保存反序列化后的对象：
+
+- 容量按估算的对象字节数计算，超出上限时淘汰最久未使用的条目
+- 每个条目的过期时间不超过底层缓存条目的剩余TTL
+- 保存新数据时由调用方按缓存键失效
+"""
+
+import copy
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+def estimate_size(obj: Any) -> int:
+    """估算对象占用的字节数（DataFrame按实际内存，容器递归累加）"""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, (str, bytes, bytearray)):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+def _copy_value(value: Any) -> Any:
+    """可变结果给每个调用方一份拷贝，避免调用方修改缓存中的对象"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, (dict, list)):
+        return copy.copy(value)
+    return value
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'expires_at')
+
+    def __init__(self, value: Any, size: int, expires_at: float):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class SizedLRUCache:
+    """
+    按字节数限制容量的线程安全LRU缓存
+
+    Args:
+        max_bytes: 所有条目估算大小之和的上限；单个超过上限一半的对象不缓存
+        max_ttl: 条目最长存活秒数，底层剩余TTL未知时使用该值
+    """
+
+    def __init__(self, max_bytes: int = None, max_ttl: float = None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.getenv('L1_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+        self.max_ttl = max_ttl if max_ttl is not None else float(
+            os.getenv('L1_CACHE_MAX_TTL_SECONDS', '600'))
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0,
+                      'invalidations': 0, 'rejected': 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            value = entry.value
+        return _copy_value(value)
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        缓存对象
+
+        Args:
+            ttl: 底层缓存条目的剩余TTL（秒），None表示未知；实际存活时间不超过 max_ttl
+
+        Returns:
+            bool: 是否已缓存（已过期、过大或None值不缓存）
+        """
+        if value is None or self.max_bytes <= 0:
+            return False
+        ttl = self.max_ttl if ttl is None else min(ttl, self.max_ttl)
+        if ttl <= 0:
+            return False
+        size = estimate_size(value)
+        with self._lock:
+            if size > self.max_bytes // 2:
+                self.stats['rejected'] += 1
+                return False
+            if key in self._entries:
+                self._remove(key)
+            # 缓存调用方对象的拷贝，之后调用方的修改不影响缓存
+            self._entries[key] = _Entry(_copy_value(value), size, time.monotonic() + ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                evicted_key, _ = next(iter(self._entries.items()))
+                self._remove(evicted_key)
+                self.stats['evictions'] += 1
+        return True
+
+    def invalidate(self, key: str) -> bool:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.stats['invalidations'] += 1
+                return True
+            return False
+
+    def purge_expired(self) -> int:
+        """移除已过期的条目，返回移除数量"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+            for key in expired:
+                self._remove(key)
+            self.stats['expirations'] += len(expired)
+        return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hit_ratio': round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+                **self.stats,
+            }
@@ -5,12 +5,13 @@
 """
 
 import os
-import time
 import random
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from .cache_manager import get_cache
 from .config import get_config
+from .rate_limiter import get_rate_limiter, is_rate_limit_error
+from .stale_while_revalidate import serve_stale_stock_data
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -23,21 +24,14 @@ class OptimizedChinaDataProvider:
     def __init__(self):
         self.cache = get_cache()
         self.config = get_config()
-        self.last_api_call = 0
-        self.min_api_interval = 0.5  # Tushare数据接口调用间隔较短
+        # Tushare限流器在进程内所有提供器实例和线程间共享
+        self.rate_limiter = get_rate_limiter('tushare')
         
         logger.info(f"📊 优化A股数据提供器初始化完成")
     
     def _wait_for_rate_limit(self):
         """等待API限制"""
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_api_call
-        
-        if time_since_last_call < self.min_api_interval:
-            wait_time = self.min_api_interval - time_since_last_call
-            time.sleep(wait_time)
-        
-        self.last_api_call = time.time()
+        self.rate_limiter.acquire()
     
     def get_stock_data(self, symbol: str, start_date: str, end_date: str, 
                       force_refresh: bool = False) -> str:
@@ -57,18 +51,31 @@ class OptimizedChinaDataProvider:
         
         # 检查缓存（除非强制刷新）
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
-                symbol=symbol,
-                start_date=start_date,
-                end_date=end_date,
-                data_source="tdx"
-            )
+            # 数据以统一数据源标识保存；同时兼容旧版本以tdx保存的缓存
+            cache_key = None
+            for data_source in ("unified", "tdx"):
+                cache_key = self.cache.find_cached_stock_data(
+                    symbol=symbol,
+                    start_date=start_date,
+                    end_date=end_date,
+                    data_source=data_source
+                )
+                if cache_key:
+                    break
             
             if cache_key:
                 cached_data = self.cache.load_stock_data(cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存加载A股数据: {symbol}")
                     return cached_data
+
+            # 缓存已过软TTL但仍在硬TTL内：先返回过期缓存，后台刷新
+            stale_data = serve_stale_stock_data(
+                self.cache, symbol, start_date, end_date, ("unified", "tdx"),
+                lambda: self.get_stock_data(symbol, start_date, end_date, force_refresh=True)
+            )
+            if stale_data:
+                return stale_data
         
         # 缓存未命中，从Tushare数据接口获取
         logger.info(f"🌐 从Tushare数据接口获取数据: {symbol}")
@@ -89,6 +96,9 @@ class OptimizedChinaDataProvider:
             # 检查是否获取成功
             if "❌" in formatted_data or "错误" in formatted_data:
                 logger.error(f"❌ 数据源API调用失败: {symbol}")
+                # 只识别数据源返回的错误信息（以❌开头），行情正文中的数字不参与判断
+                if formatted_data.lstrip().startswith("❌") and is_rate_limit_error(formatted_data):
+                    self.rate_limiter.report_rate_limited()
                 # 尝试从旧缓存获取数据
                 old_cache = self._try_get_old_cache(symbol, start_date, end_date)
                 if old_cache:
@@ -97,6 +107,8 @@ class OptimizedChinaDataProvider:
 
                 # 生成备用数据
                 return self._generate_fallback_data(symbol, start_date, end_date, "数据源API调用失败")
+
+            self.rate_limiter.report_success()
             
             # 保存到缓存
             self.cache.save_stock_data(
@@ -113,6 +125,8 @@ class OptimizedChinaDataProvider:
         except Exception as e:
             error_msg = f"Tushare数据接口调用异常: {str(e)}"
             logger.error(f"❌ {error_msg}")
+            if is_rate_limit_error(e):
+                self.rate_limiter.report_rate_limited()
             
             # 尝试从旧缓存获取数据
             old_cache = self._try_get_old_cache(symbol, start_date, end_date)
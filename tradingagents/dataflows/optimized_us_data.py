@@ -8,11 +8,16 @@ import os
 import time
 import random
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence, Tuple
 import yfinance as yf
 import pandas as pd
 from .cache_manager import get_cache
 from .config import get_config
+from .rate_limiter import get_rate_limiter, is_rate_limit_error
+from .single_flight import single_flight
+from .stale_while_revalidate import serve_stale_stock_data
+from .yfin_bulk import DEFAULT_BATCH_SIZE, bulk_download
+from .run_data_context import run_context_cached, run_context_frame
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -25,27 +30,24 @@ class OptimizedUSDataProvider:
     def __init__(self):
         self.cache = get_cache()
         self.config = get_config()
-        self.last_api_call = 0
-        self.min_api_interval = 1.0  # 最小API调用间隔（秒）
         
         logger.info(f"📊 优化美股数据提供器初始化完成")
     
-    def _wait_for_rate_limit(self):
-        """等待API限制"""
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_api_call
-        
-        if time_since_last_call < self.min_api_interval:
-            wait_time = self.min_api_interval - time_since_last_call
+    def _wait_for_rate_limit(self, source: str = 'yfinance'):
+        """等待API限制（按数据源共享令牌桶）"""
+        limiter = get_rate_limiter(source)
+        start = time.time()
+        limiter.acquire()
+        wait_time = time.time() - start
+        if wait_time >= 0.1:
             logger.info(f"⏳ API限制等待 {wait_time:.1f}s...")
-            time.sleep(wait_time)
-        
-        self.last_api_call = time.time()
     
+    @single_flight('us_stock_data')
     def get_stock_data(self, symbol: str, start_date: str, end_date: str, 
                       force_refresh: bool = False) -> str:
         """
         获取美股数据 - 优先使用缓存
+        相同代码和日期区间的并发请求会合并，只有一个请求访问缓存和API
         
         Args:
             symbol: 股票代码
@@ -82,6 +84,14 @@ class OptimizedUSDataProvider:
                 if cached_data:
                     logger.info(f"⚡ 从缓存加载美股数据: {symbol}")
                     return cached_data
+
+            # 缓存已过软TTL但仍在硬TTL内：先返回过期缓存，后台刷新
+            stale_data = serve_stale_stock_data(
+                self.cache, symbol, start_date, end_date, ("finnhub", "yfinance"),
+                lambda: self.get_stock_data(symbol, start_date, end_date, force_refresh=True)
+            )
+            if stale_data:
+                return stale_data
         
         # 缓存未命中，从API获取 - 优先使用FINNHUB
         formatted_data = None
@@ -90,11 +100,12 @@ class OptimizedUSDataProvider:
         # 尝试FINNHUB API（优先）
         try:
             logger.info(f"🌐 从FINNHUB API获取数据: {symbol}")
-            self._wait_for_rate_limit()
+            self._wait_for_rate_limit('finnhub')
 
             formatted_data = self._get_data_from_finnhub(symbol, start_date, end_date)
             if formatted_data and "❌" not in formatted_data:
                 data_source = "finnhub"
+                get_rate_limiter('finnhub').report_success()
                 logger.info(f"✅ FINNHUB数据获取成功: {symbol}")
             else:
                 logger.error(f"⚠️ FINNHUB数据获取失败，尝试备用方案")
@@ -102,6 +113,8 @@ class OptimizedUSDataProvider:
 
         except Exception as e:
             logger.error(f"❌ FINNHUB API调用失败: {e}")
+            if is_rate_limit_error(e):
+                get_rate_limiter('finnhub').report_rate_limited()
             formatted_data = None
 
         # 备用方案：根据股票类型选择合适的数据源
@@ -130,13 +143,14 @@ class OptimizedUSDataProvider:
                         # 备用方案：Yahoo Finance
                         logger.info(f"🔄 使用Yahoo Finance备用方案获取港股数据: {symbol}")
 
-                        self._wait_for_rate_limit()
+                        self._wait_for_rate_limit('yfinance_hk')
                         ticker = yf.Ticker(symbol)  # 港股代码保持原格式
                         data = ticker.history(start=start_date, end=end_date)
 
                         if not data.empty:
                             formatted_data = self._format_stock_data(symbol, data, start_date, end_date)
                             data_source = "yfinance_hk"
+                            get_rate_limiter('yfinance_hk').report_success()
                             logger.info(f"✅ Yahoo Finance港股数据获取成功: {symbol}")
                         else:
                             logger.error(f"❌ Yahoo Finance港股数据为空: {symbol}")
@@ -147,7 +161,9 @@ class OptimizedUSDataProvider:
 
                     # 获取数据
                     ticker = yf.Ticker(symbol.upper())
-                    data = ticker.history(start=start_date, end=end_date)
+                    data = run_context_frame('yfinance_history', symbol.upper(), start_date, end_date,
+                                             lambda start, end: ticker.history(start=start, end=end),
+                                             end_inclusive=False)
 
                     if data.empty:
                         error_msg = f"未找到股票 '{symbol}' 在 {start_date} 到 {end_date} 期间的数据"
@@ -156,10 +172,13 @@ class OptimizedUSDataProvider:
                         # 格式化数据
                         formatted_data = self._format_stock_data(symbol, data, start_date, end_date)
                         data_source = "yfinance"
+                        get_rate_limiter('yfinance').report_success()
                         logger.info(f"✅ Yahoo Finance美股数据获取成功: {symbol}")
 
             except Exception as e:
                 logger.error(f"❌ 数据获取失败: {e}")
+                if is_rate_limit_error(e):
+                    get_rate_limiter('yfinance').report_rate_limited()
                 formatted_data = None
 
         # 如果所有API都失败，生成备用数据
@@ -179,6 +198,70 @@ class OptimizedUSDataProvider:
 
         return formatted_data
     
+    def prefetch_stock_data(self, symbols: Sequence[str], windows: Sequence[Tuple[str, str]],
+                            force_refresh: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+        """
+        批量预取多只美股的行情并写入缓存（批量分析、缓存预热使用）
+
+        覆盖所有日期区间的行情用 yf.download 按批一次下载，再按股票和区间切分、格式化后
+        以 yfinance 数据源写入缓存；之后 get_stock_data 对相同代码和区间直接命中缓存。
+        非美股代码和已有缓存的区间（除非 force_refresh）跳过，已有缓存经 find_cached_stock_data_many 一次批量查找。
+
+        Args:
+            symbols: 股票代码
+            windows: 需要缓存的 (开始日期, 结束日期) 列表，与之后 get_stock_data 的参数一致
+
+        Returns:
+            Dict[str, int]: 股票代码 -> 本次写入缓存的区间数
+        """
+        from tradingagents.utils.stock_utils import StockUtils
+
+        us_symbols = []
+        for symbol in dict.fromkeys(s.upper() for s in symbols):
+            if StockUtils.get_market_info(symbol)['is_us']:
+                us_symbols.append(symbol)
+            else:
+                logger.debug(f"📦 [批量预取] 跳过非美股代码: {symbol}")
+
+        # 所有股票、区间和数据源的缓存一次批量查找
+        sources = ("finnhub", "yfinance")
+        cached = {} if force_refresh else self.cache.find_cached_stock_data_many(
+            (symbol, start, end, source) for symbol in us_symbols for start, end in windows for source in sources)
+
+        pending: Dict[str, List[Tuple[str, str]]] = {}
+        for symbol in us_symbols:
+            missing = [(start, end) for start, end in windows
+                       if not any((symbol, start, end, source) in cached for source in sources)]
+            if missing:
+                pending[symbol] = missing
+
+        saved = {symbol: 0 for symbol in pending}
+        if not pending:
+            logger.info(f"⚡ [批量预取] {len(symbols)} 只股票的行情均已缓存")
+            return saved
+
+        start_date = min(start for missing in pending.values() for start, _ in missing)
+        end_date = max(end for missing in pending.values() for _, end in missing)
+        logger.info(f"📦 [批量预取] 下载 {len(pending)} 只美股行情 ({start_date} 到 {end_date})")
+        frames = bulk_download(list(pending), start_date, end_date, batch_size=batch_size)
+
+        for symbol, missing in pending.items():
+            data = frames.get(symbol)
+            if data is None:
+                continue
+            for start, end in missing:
+                # 与 Ticker.history 一致：含开始日期，不含结束日期
+                window = data[(data.index >= pd.Timestamp(start)) & (data.index < pd.Timestamp(end))]
+                if window.empty:
+                    continue
+                formatted = self._format_stock_data(symbol, window.copy(), start, end)
+                self.cache.save_stock_data(symbol=symbol, data=formatted, start_date=start,
+                                           end_date=end, data_source="yfinance")
+                saved[symbol] += 1
+
+        logger.info(f"✅ [批量预取] 已缓存 {sum(1 for n in saved.values() if n)}/{len(pending)} 只美股行情")
+        return saved
+
     def _format_stock_data(self, symbol: str, data: pd.DataFrame, 
                           start_date: str, end_date: str) -> str:
         """格式化股票数据为字符串"""
@@ -320,6 +403,8 @@ class OptimizedUSDataProvider:
 
         except Exception as e:
             logger.error(f"❌ FINNHUB数据获取失败: {e}")
+            if is_rate_limit_error(e):
+                get_rate_limiter('finnhub').report_rate_limited()
             return None
 
     def _generate_fallback_data(self, symbol: str, start_date: str, end_date: str, error_msg: str) -> str:
@@ -354,6 +439,33 @@ def get_optimized_us_data_provider() -> OptimizedUSDataProvider:
     return _us_data_provider
 
 
+def prefetch_us_stock_data(symbols: Sequence[str], analysis_date: str,
+                           force_refresh: bool = False) -> Dict[str, int]:
+    """
+    批量预取多只美股在指定分析日期所需的行情（批量分析、缓存预热开始前调用）
+
+    - 数据预获取阶段和市场分析师读取的区间行情写入股票数据缓存（OptimizedUSDataProvider.get_stock_data 读取）
+    - 在线技术指标（StockstatsUtils.get_stock_stats）使用的15年历史行情写入 stockstats 缓存文件
+
+    Returns:
+        Dict[str, int]: 股票代码 -> 本次写入缓存的区间数
+    """
+    from tradingagents.utils.stock_utils import StockUtils
+
+    us_symbols = [s.upper() for s in symbols if StockUtils.get_market_info(s)['is_us']]
+    try:
+        from .stockstats_utils import StockstatsUtils
+        StockstatsUtils.prefetch_price_history(us_symbols)
+    except ImportError as e:
+        logger.warning(f"⚠️ stockstats不可用，跳过历史行情预取: {e}")
+
+    from tradingagents.agents.utils.tool_prefetch import analysis_data_windows
+
+    provider = get_optimized_us_data_provider()
+    return provider.prefetch_stock_data(us_symbols, analysis_data_windows(analysis_date), force_refresh)
+
+
+@run_context_cached('us_stock_data', key_arity=3)
 def get_us_stock_data_cached(symbol: str, start_date: str, end_date: str, 
                            force_refresh: bool = False) -> str:
     """
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+数据源调用执行器
+为阻塞式数据源调用（AKShare等）提供共享的有界线程池、协作式超时、
+按数据源的并发上限、熔断器以及运行指标
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+class ProviderCallError(Exception):
+    """数据源调用执行器异常基类"""
+
+
+class ProviderTimeoutError(ProviderCallError):
+    """数据源调用超时"""
+
+
+class ProviderCircuitOpenError(ProviderCallError):
+    """数据源熔断中，拒绝派发调用"""
+
+
+class ProviderBusyError(ProviderCallError):
+    """数据源并发已满，在超时时间内未能获得执行槽位"""
+
+
+class _CircuitBreaker:
+    """简单的连续超时熔断器：closed -> open -> half_open -> closed"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_timeouts = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self.trial_in_flight:
+            # 半开状态只放行一个试探调用
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.consecutive_timeouts = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_timeout(self) -> bool:
+        """记录一次超时，返回是否触发（或保持）熔断"""
+        self.consecutive_timeouts += 1
+        self.trial_in_flight = False
+        if self.consecutive_timeouts >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+
+class _ProviderState:
+    """单个数据源的并发槽位、熔断器和计数器"""
+
+    def __init__(self, max_concurrency: int, failure_threshold: int, reset_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.breaker = _CircuitBreaker(failure_threshold, reset_timeout)
+        self.queued = 0
+        self.running = 0
+        self.abandoned = 0
+        self.stats = {
+            'submitted': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'timeouts': 0,
+            'rejected': 0,
+            'circuit_opened': 0,
+        }
+
+
+class ProviderExecutor:
+    """
+    共享的数据源调用执行器
+
+    - 所有阻塞调用在同一个有界线程池中执行，超时的调用不会再额外创建线程
+    - 每个数据源有独立的并发上限，避免单个慢数据源占满线程池
+    - 连续超时达到阈值后熔断，冷却期内直接拒绝调用
+    - 超时是协作式的：尚未开始的调用会被取消；已开始的调用无法被强制终止，
+      会被标记为"已放弃"并在完成后释放槽位
+    """
+
+    def __init__(self, max_workers: int = None, default_max_concurrency: int = None,
+                 failure_threshold: int = None, reset_timeout: float = None):
+        self.max_workers = max_workers or int(os.getenv('PROVIDER_EXECUTOR_MAX_WORKERS', '16'))
+        self.default_max_concurrency = default_max_concurrency or int(
+            os.getenv('PROVIDER_MAX_CONCURRENCY', '4'))
+        self.failure_threshold = failure_threshold or int(
+            os.getenv('PROVIDER_CIRCUIT_FAILURE_THRESHOLD', '3'))
+        self.reset_timeout = reset_timeout or float(
+            os.getenv('PROVIDER_CIRCUIT_RESET_SECONDS', '120'))
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='provider-call')
+        self._lock = threading.Lock()
+        self._providers: Dict[str, _ProviderState] = {}
+        self._concurrency_overrides: Dict[str, int] = {}
+
+        logger.info(f"🔧 数据源调用执行器初始化: 线程池{self.max_workers}, "
+                    f"单数据源并发{self.default_max_concurrency}, 熔断阈值{self.failure_threshold}次超时")
+
+    def configure_provider(self, provider: str, max_concurrency: int):
+        """设置指定数据源的并发上限（需在首次调用前设置）"""
+        with self._lock:
+            self._concurrency_overrides[provider] = max_concurrency
+            if provider in self._providers:
+                logger.warning(f"⚠️ 数据源{provider}已在使用，并发上限修改将不会生效")
+
+    def _get_state(self, provider: str) -> _ProviderState:
+        with self._lock:
+            state = self._providers.get(provider)
+            if state is None:
+                concurrency = self._concurrency_overrides.get(provider, self.default_max_concurrency)
+                state = _ProviderState(concurrency, self.failure_threshold, self.reset_timeout)
+                self._providers[provider] = state
+            return state
+
+    def call(self, provider: str, func: Callable[..., Any], *args,
+             timeout: float = 60, **kwargs) -> Any:
+        """
+        在共享线程池中执行阻塞调用并等待结果
+
+        Args:
+            provider: 数据源名称（用于并发上限和熔断）
+            func: 要执行的阻塞函数
+            timeout: 总超时时间（秒），包括等待并发槽位的时间
+
+        Returns:
+            func的返回值
+
+        Raises:
+            ProviderCircuitOpenError: 数据源熔断中
+            ProviderBusyError: 超时时间内未获得并发槽位
+            ProviderTimeoutError: 调用超时
+            其他异常: func自身抛出的异常原样抛出
+        """
+        state = self._get_state(provider)
+        deadline = time.monotonic() + timeout
+
+        with self._lock:
+            state.stats['submitted'] += 1
+            if not state.breaker.allow():
+                state.stats['rejected'] += 1
+                raise ProviderCircuitOpenError(f"数据源{provider}熔断中，暂停调用")
+            state.queued += 1
+
+        if not state.slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            with self._lock:
+                state.queued -= 1
+                state.stats['rejected'] += 1
+                state.breaker.trial_in_flight = False
+            raise ProviderBusyError(f"数据源{provider}并发已满（{state.max_concurrency}），等待超时")
+
+        # 记录调用是否已结束/已被放弃，两者均在锁内修改，避免计数竞争
+        call_state = {'finished': False, 'abandoned': False}
+
+        def run():
+            with self._lock:
+                state.queued -= 1
+                state.running += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    state.running -= 1
+                    call_state['finished'] = True
+                    if call_state['abandoned']:
+                        state.abandoned -= 1
+                state.slots.release()
+
+        try:
+            future = self._executor.submit(run)
+        except Exception:
+            with self._lock:
+                state.queued -= 1
+            state.slots.release()
+            raise
+
+        try:
+            result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            with self._lock:
+                state.stats['timeouts'] += 1
+                if future.cancel():
+                    # 尚未开始执行，直接取消并归还槽位
+                    state.queued -= 1
+                    state.slots.release()
+                elif not call_state['finished']:
+                    call_state['abandoned'] = True
+                    state.abandoned += 1
+                if state.breaker.record_timeout():
+                    state.stats['circuit_opened'] += 1
+                    logger.warning(f"⚠️ 数据源{provider}连续超时{state.breaker.consecutive_timeouts}次，"
+                                   f"熔断{self.reset_timeout:.0f}秒")
+            raise ProviderTimeoutError(f"数据源{provider}调用超时（{timeout:.0f}秒）")
+        except Exception:
+            with self._lock:
+                state.stats['failed'] += 1
+                # 业务异常说明数据源仍有响应，不计入熔断
+                state.breaker.record_success()
+            raise
+
+        with self._lock:
+            state.stats['succeeded'] += 1
+            state.breaker.record_success()
+        return result
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取执行器及各数据源的运行指标"""
+        with self._lock:
+            providers = {}
+            for name, state in self._providers.items():
+                providers[name] = {
+                    'max_concurrency': state.max_concurrency,
+                    'queue_depth': state.queued,
+                    'running': state.running,
+                    'abandoned_in_flight': state.abandoned,
+                    'circuit_state': state.breaker.state,
+                    'consecutive_timeouts': state.breaker.consecutive_timeouts,
+                    **state.stats,
+                }
+            return {
+                'max_workers': self.max_workers,
+                'queue_depth': sum(p['queue_depth'] for p in providers.values()),
+                'abandoned_in_flight': sum(p['abandoned_in_flight'] for p in providers.values()),
+                'providers': providers,
+            }
+
+    def shutdown(self, wait: bool = False):
+        """关闭线程池"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# 全局执行器实例
+_provider_executor = None
+_provider_executor_lock = threading.Lock()
+
+
+def get_provider_executor() -> ProviderExecutor:
+    """获取全局数据源调用执行器实例"""
+    global _provider_executor
+    if _provider_executor is None:
+        with _provider_executor_lock:
+            if _provider_executor is None:
+                _provider_executor = ProviderExecutor()
+    return _provider_executor
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+数据源速率限制器
+按数据源共享的令牌桶限流，进程内线程/asyncio安全，
+遇到429/配额错误时自适应退避，可选通过Redis在多进程间协调
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 各数据源默认限流配置（qps: 每秒请求数, burst: 突发容量）
+# 可通过环境变量 RATE_LIMIT_<SOURCE>_QPS / RATE_LIMIT_<SOURCE>_BURST 覆盖
+DEFAULT_RATE_LIMITS = {
+    'tushare': {'qps': 2.0, 'burst': 4},       # 原最小间隔0.5秒
+    'finnhub': {'qps': 1.0, 'burst': 5},       # 免费版60次/分钟
+    'yfinance': {'qps': 1.0, 'burst': 2},      # 原最小间隔1秒
+    'yfinance_hk': {'qps': 0.5, 'burst': 1},   # 原最小间隔2秒
+    'akshare': {'qps': 2.0, 'burst': 4},
+    'akshare_hk': {'qps': 0.2, 'burst': 1},    # 原最小间隔5秒
+}
+
+# 识别速率限制/配额错误的关键字
+RATE_LIMIT_MARKERS = (
+    'too many requests',
+    'rate limit',
+    'rate limited',
+    'quota',
+    '每分钟最多访问',
+    '访问频率',
+    '频率限制',
+)
+
+# 独立出现的429状态码（避免匹配000429这类股票代码）
+_HTTP_429 = re.compile(r'(?<!\d)429(?!\d)')
+
+
+def is_rate_limit_error(error: Any) -> bool:
+    """判断异常或错误信息是否为速率限制/配额错误"""
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return bool(_HTTP_429.search(message)) or any(marker in message for marker in RATE_LIMIT_MARKERS)
+
+
+class RateLimiter:
+    """
+    自适应令牌桶限流器
+
+    - qps/burst 为配置的上限；遇到限流错误时有效速率按 backoff_factor 下调，
+      并在 retry_after 期间暂停发放令牌
+    - 后续成功调用逐步将有效速率恢复到配置值
+    - 启用Redis协调时，令牌计算在Redis中通过Lua脚本原子完成，多个进程共享同一个桶
+    """
+
+    # KEYS[1]: 桶key; ARGV: rate, burst, now, requested
+    # 返回需要等待的秒数（0表示已获得令牌）
+    _REDIS_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'blocked_until')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+local blocked_until = tonumber(state[3]) or 0
+if blocked_until > now then
+    return tostring(blocked_until - now)
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+    def __init__(self, source: str, qps: float, burst: int = 1,
+                 backoff_factor: float = 0.5, min_qps: float = None,
+                 recovery_step: float = 0.1, redis_client=None):
+        if qps <= 0:
+            raise ValueError(f"qps必须大于0: {qps}")
+        self.source = source
+        self.qps = float(qps)
+        self.burst = max(1, int(burst))
+        self.backoff_factor = backoff_factor
+        self.min_qps = min_qps if min_qps is not None else self.qps / 16
+        self.recovery_step = recovery_step
+
+        self._lock = threading.Lock()
+        self._rate = self.qps
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+
+        self._redis = redis_client
+        self._redis_key = f"tradingagents:ratelimit:{source}"
+        self._redis_script = None
+        if self._redis is not None:
+            try:
+                self._redis_script = self._redis.register_script(self._REDIS_SCRIPT)
+            except Exception as e:
+                logger.warning(f"⚠️ [限流] {source} Redis协调不可用，使用进程内限流: {e}")
+                self._redis = None
+
+        self.stats = {
+            'acquired': 0,
+            'waited': 0,
+            'total_wait_seconds': 0.0,
+            'rate_limited': 0,
+            'redis_errors': 0,
+        }
+
+    @property
+    def effective_qps(self) -> float:
+        return self._rate
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self._rate)
+            self._updated_at = now
+
+    def _reserve_local(self, tokens: float) -> float:
+        """尝试取令牌，返回需要等待的秒数（0表示已取得）"""
+        with self._lock:
+            now = time.monotonic()
+            if self._blocked_until > now:
+                return self._blocked_until - now
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self._rate
+
+    def _reserve_redis(self, tokens: float) -> Optional[float]:
+        try:
+            wait = self._redis_script(keys=[self._redis_key],
+                                      args=[self._rate, self.burst, time.time(), tokens])
+            return float(wait)
+        except Exception as e:
+            self.stats['redis_errors'] += 1
+            logger.debug(f"⚠️ [限流] {self.source} Redis限流失败，回退到进程内限流: {e}")
+            return None
+
+    def _reserve(self, tokens: float) -> float:
+        if self._redis_script is not None:
+            # 本地冷却期优先（429退避在本进程内立即生效）
+            with self._lock:
+                local_block = self._blocked_until - time.monotonic()
+            if local_block > 0:
+                return local_block
+            wait = self._reserve_redis(tokens)
+            if wait is not None:
+                return wait
+        return self._reserve_local(tokens)
+
+    def _record_wait(self, waited: float):
+        with self._lock:
+            self.stats['acquired'] += 1
+            if waited > 0:
+                self.stats['waited'] += 1
+                self.stats['total_wait_seconds'] += waited
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        """
+        阻塞直到获得令牌
+
+        Args:
+            tokens: 需要的令牌数
+            timeout: 最长等待时间（秒），None表示一直等待
+
+        Returns:
+            bool: 是否获得令牌
+        """
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                self._record_wait(time.monotonic() - start)
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1, timeout: float = None) -> bool:
+        """acquire的asyncio版本，等待期间不阻塞事件循环"""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                self._record_wait(time.monotonic() - start)
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    def report_rate_limited(self, retry_after: float = None):
+        """
+        报告一次速率限制/配额错误：降低有效速率并暂停发放令牌
+
+        Args:
+            retry_after: 服务端建议的等待秒数，未提供时按当前速率推算
+        """
+        with self._lock:
+            self._rate = max(self.min_qps, self._rate * self.backoff_factor)
+            pause = retry_after if retry_after is not None else self.burst / self._rate
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+            self._tokens = 0.0
+            self._updated_at = time.monotonic()
+            self.stats['rate_limited'] += 1
+            rate = self._rate
+
+        if self._redis_script is not None:
+            try:
+                self._redis.hset(self._redis_key, mapping={
+                    'tokens': 0, 'ts': time.time(), 'blocked_until': time.time() + pause})
+            except Exception as e:
+                self.stats['redis_errors'] += 1
+                logger.debug(f"⚠️ [限流] {self.source} Redis退避同步失败: {e}")
+
+        logger.warning(f"⏳ [限流] {self.source} 触发速率限制，暂停{pause:.1f}秒，有效速率降至{rate:.2f}次/秒")
+
+    def report_success(self):
+        """报告一次成功调用：逐步恢复有效速率"""
+        if self._rate >= self.qps:
+            return
+        with self._lock:
+            self._rate = min(self.qps, self._rate + self.qps * self.recovery_step)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'source': self.source,
+                'qps': self.qps,
+                'burst': self.burst,
+                'effective_qps': round(self._rate, 4),
+                'blocked_for': round(max(0.0, self._blocked_until - time.monotonic()), 3),
+                'distributed': self._redis_script is not None,
+                **self.stats,
+            }
+
+
+# 全局限流器注册表
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def _get_redis_client_for_rate_limit():
+    """启用RATE_LIMIT_REDIS_ENABLED时返回Redis客户端"""
+    from tradingagents.config.env_utils import parse_bool_env
+    if not parse_bool_env('RATE_LIMIT_REDIS_ENABLED', False):
+        return None
+    try:
+        from tradingagents.config.database_manager import get_redis_client
+        return get_redis_client()
+    except Exception as e:
+        logger.warning(f"⚠️ [限流] 获取Redis客户端失败，使用进程内限流: {e}")
+        return None
+
+
+def get_rate_limiter(source: str) -> RateLimiter:
+    """获取指定数据源的共享限流器（进程内单例）"""
+    limiter = _rate_limiters.get(source)
+    if limiter is not None:
+        return limiter
+
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(source)
+        if limiter is None:
+            defaults = DEFAULT_RATE_LIMITS.get(source, {'qps': 1.0, 'burst': 1})
+            env_prefix = f"RATE_LIMIT_{source.upper()}"
+            qps = float(os.getenv(f"{env_prefix}_QPS", defaults['qps']))
+            burst = int(os.getenv(f"{env_prefix}_BURST", defaults['burst']))
+            limiter = RateLimiter(source, qps=qps, burst=burst,
+                                  redis_client=_get_redis_client_for_rate_limit())
+            _rate_limiters[source] = limiter
+            logger.debug(f"🔧 [限流] 创建{source}限流器: {qps}次/秒, 突发{burst}")
+        return limiter
+
+
+def get_rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """获取所有数据源限流器的统计信息"""
+    return {source: limiter.get_stats() for source, limiter in list(_rate_limiters.items())}
@@ -12,6 +12,8 @@ import time
 import os
 from dataclasses import dataclass
 
+from .cache_manager import news_cached
+
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -674,6 +676,7 @@ class RealtimeNewsAggregator:
         return report
 
 
+@news_cached('realtime')
 def get_realtime_stock_news(ticker: str, curr_date: str, hours_back: int = 6) -> str:
     """
     获取实时股票新闻的主要接口函数
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+单次分析运行的数据上下文
+保存本次分析中已获取的数据（包括数据预获取阶段的结果），
+使分析师工具对同一股票和同一时间窗口的请求直接复用，而不再访问数据源；
+行情数据另按原始DataFrame保存，区间被已获取数据覆盖的请求切片复用
+"""
+
+import contextvars
+import functools
+import inspect
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.tracing import trace_event
+from .single_flight import SingleFlight
+logger = get_logger('agents')
+
+
+# 当前线程/协程绑定的运行上下文
+# LangGraph/LangChain的线程池会复制contextvars，节点内的工具调用可以看到同一个上下文
+_current_run_context: contextvars.ContextVar[Optional['RunDataContext']] = contextvars.ContextVar(
+    'tradingagents_run_data_context', default=None)
+
+# 当前线程是否在执行预取（预取的工具调用不计入工具调用统计）
+_prefetching: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    'tradingagents_prefetching', default=False)
+
+
+def normalize_symbol(symbol: Any) -> str:
+    """统一股票代码格式作为上下文key的一部分"""
+    return str(symbol).strip().upper() if symbol is not None else ''
+
+
+def is_valid_payload(value: Any) -> bool:
+    """判断数据是否值得放入上下文（错误信息不缓存）"""
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return bool(value) and "❌" not in value and "获取失败" not in value
+    if isinstance(value, dict):
+        return bool(value) and 'error' not in value
+    return True
+
+
+class RunDataContext:
+    """
+    单次分析运行的数据上下文
+
+    key 形如 (kind, symbol, ...)，例如:
+        ('china_stock_data', '000001', '2025-01-01', '2025-01-31')
+        ('hk_stock_info', '0700.HK')
+    格式化后的数据只做精确匹配；行情DataFrame按 (kind, symbol) 保存已获取的区间，
+    请求区间被覆盖时切片返回（见 run_context_frame）。
+    上下文随分析运行创建并在运行结束后丢弃，不设TTL。
+
+    frame_window: 本次运行会读取的行情总区间（由数据预获取阶段设置），
+    行情未命中时按该区间扩展获取，使之后不同区间的请求都能切片复用。
+    """
+
+    def __init__(self, symbol: str = None, run_id: str = None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.symbol = normalize_symbol(symbol) if symbol else None
+        self.created_at = time.time()
+        self._lock = threading.Lock()
+        self._data: Dict[Hashable, Any] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+        # 行情DataFrame: (kind, symbol) -> [(开始日期, 结束日期, DataFrame)]
+        self._frames: Dict[Tuple[str, str], List[Tuple[str, str, Any]]] = {}
+        self.frame_stats = {'hits': 0, 'misses': 0}
+        self.frame_window: Optional[Tuple[str, str]] = None
+        # 工具调用去重统计: {tool_name: {'calls': n, 'deduped': m}}
+        self.tool_stats: Dict[str, Dict[str, int]] = {}
+        # 本次运行的追踪记录（由 Toolkit.begin_run 创建）
+        self.trace = None
+        # 进行中的工具调用：预取尚未完成时，相同的工具调用等待预取结果而不是重复获取
+        self.in_flight = SingleFlight(f"run:{self.run_id}")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._data:
+                self.stats['hits'] += 1
+                return self._data[key]
+            self.stats['misses'] += 1
+            return default
+
+    def contains(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self.stats['stores'] += 1
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    def get_frame(self, kind: str, symbol: Any, start_date: str, end_date: str,
+                  end_inclusive: bool = True) -> Optional[pd.DataFrame]:
+        """返回覆盖请求区间的已获取行情（切片到请求区间），没有时返回None"""
+        with self._lock:
+            frames = list(self._frames.get((kind, normalize_symbol(symbol)), ()))
+        for frame_start, frame_end, frame in frames:
+            if frame_start <= start_date and end_date <= frame_end:
+                sliced = slice_frame(frame, start_date, end_date, end_inclusive)
+                if sliced is not None:
+                    with self._lock:
+                        self.frame_stats['hits'] += 1
+                    return sliced
+        with self._lock:
+            self.frame_stats['misses'] += 1
+        return None
+
+    def put_frame(self, kind: str, symbol: Any, start_date: str, end_date: str, frame: pd.DataFrame):
+        """保存已获取的行情及其请求区间，被新区间覆盖的旧条目丢弃"""
+        with self._lock:
+            frames = self._frames.setdefault((kind, normalize_symbol(symbol)), [])
+            frames[:] = [item for item in frames if not (start_date <= item[0] and item[1] <= end_date)]
+            frames.append((start_date, end_date, frame))
+
+    def record_tool_call(self, tool_name: str, deduped: bool):
+        """记录一次工具调用及其是否由本次运行的已有结果直接返回"""
+        with self._lock:
+            stats = self.tool_stats.setdefault(tool_name, {'calls': 0, 'deduped': 0})
+            stats['calls'] += 1
+            if deduped:
+                stats['deduped'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            tool_calls = sum(t['calls'] for t in self.tool_stats.values())
+            tool_deduped = sum(t['deduped'] for t in self.tool_stats.values())
+            return {
+                'run_id': self.run_id,
+                'symbol': self.symbol,
+                'entries': len(self._data),
+                'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+                **self.stats,
+                'frame_hits': self.frame_stats['hits'],
+                'frame_misses': self.frame_stats['misses'],
+                'tool_calls': tool_calls,
+                'tool_calls_deduped': tool_deduped,
+                'tools': {name: dict(t) for name, t in self.tool_stats.items()},
+            }
+
+    def activate(self) -> contextvars.Token:
+        """将本上下文绑定到当前线程/协程，返回用于恢复的token"""
+        return _current_run_context.set(self)
+
+    @staticmethod
+    def deactivate(token: contextvars.Token):
+        """恢复activate之前的上下文"""
+        _current_run_context.reset(token)
+
+    @contextmanager
+    def activated(self):
+        """with语句形式的activate/deactivate"""
+        token = self.activate()
+        try:
+            yield self
+        finally:
+            self.deactivate(token)
+
+
+@contextmanager
+def prefetching():
+    """标记当前线程正在执行预取"""
+    token = _prefetching.set(True)
+    try:
+        yield
+    finally:
+        _prefetching.reset(token)
+
+
+def get_current_run_context() -> Optional[RunDataContext]:
+    """获取当前绑定的运行上下文，未处于分析运行中时返回None"""
+    return _current_run_context.get()
+
+
+def make_run_context_key(kind: str, symbol: Any, *window) -> tuple:
+    """生成上下文key: (kind, 标准化代码, *时间窗口)"""
+    return (kind, normalize_symbol(symbol)) + tuple(window)
+
+
+# 行情DataFrame中可能的日期列
+_DATE_COLUMNS = ('date', 'Date', 'trade_date', '日期')
+
+
+def slice_frame(frame: pd.DataFrame, start_date: str, end_date: str,
+                end_inclusive: bool = True) -> Optional[pd.DataFrame]:
+    """
+    按日期切片行情DataFrame（日期索引或日期列），无法识别日期时返回None
+
+    Args:
+        end_inclusive: 结束日期是否包含在内（yfinance的history不包含结束日期）
+    """
+    if isinstance(frame.index, pd.DatetimeIndex):
+        dates = frame.index
+    else:
+        column = next((c for c in _DATE_COLUMNS if c in frame.columns), None)
+        if column is None:
+            return None
+        dates = pd.DatetimeIndex(pd.to_datetime(frame[column].astype(str), errors='coerce'))
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    dates = dates.normalize()
+
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    mask = (dates >= start) & ((dates <= end) if end_inclusive else (dates < end))
+    return frame[mask].copy()
+
+
+def run_context_frame(kind: str, symbol: Any, start_date: Optional[str], end_date: Optional[str],
+                      fetch: Callable[[str, str], Any], end_inclusive: bool = True) -> Any:
+    """
+    获取行情DataFrame：处于分析运行中时，优先从运行上下文中覆盖请求区间的已有行情切片返回
+
+    未命中时按 frame_window 扩展区间调用 fetch(开始日期, 结束日期) 获取并保存，再切片到请求区间；
+    扩展区间的获取失败（抛出异常、返回None或空DataFrame）时原样返回，不按请求区间再获取一次。
+    不在分析运行中或日期缺失时直接按请求区间调用 fetch。
+
+    Args:
+        kind: 数据源标识（同一kind的DataFrame格式和结束日期语义相同）
+        fetch: fetch(start_date, end_date) -> DataFrame
+        end_inclusive: 数据源是否包含结束日期当天
+    """
+    context = get_current_run_context()
+    if context is None or not start_date or not end_date:
+        return fetch(start_date, end_date)
+
+    cached = context.get_frame(kind, symbol, start_date, end_date, end_inclusive)
+    if cached is not None:
+        logger.debug(f"⚡ [运行上下文] 复用已获取的行情: {kind} {symbol} {start_date}~{end_date}")
+        return cached
+
+    fetch_start, fetch_end = start_date, end_date
+    if context.frame_window is not None:
+        fetch_start = min(start_date, context.frame_window[0])
+        fetch_end = max(end_date, context.frame_window[1])
+
+    data = fetch(fetch_start, fetch_end)
+    if not isinstance(data, pd.DataFrame) or data.empty:
+        # 获取失败（None/空结果）直接返回，不再按原区间重复数据源的重试和限流
+        return data
+    sliced = slice_frame(data, start_date, end_date, end_inclusive)
+    if sliced is not None:
+        context.put_frame(kind, symbol, fetch_start, fetch_end, data)
+        return sliced
+    if (fetch_start, fetch_end) != (start_date, end_date):
+        # 扩展区间的结果没有可切片的日期时按原区间重新获取
+        return fetch(start_date, end_date)
+    return data
+
+
+def run_context_cached(kind: str, key_arity: int = 1):
+    """
+    数据函数装饰器：处于分析运行中时，优先从运行上下文返回数据，
+    未命中时调用原函数并将有效结果写回上下文
+
+    Args:
+        kind: 数据类型，作为key的第一个元素
+        key_arity: 组成key的前几个参数个数（含默认值），
+                   如 (symbol,) 为1，(symbol, start_date, end_date) 为3
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            context = get_current_run_context()
+            if context is None:
+                return func(*args, **kwargs)
+
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                values = list(bound.arguments.values())[:key_arity]
+                key = make_run_context_key(kind, *values)
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+
+            cached = context.get(key)
+            if cached is not None:
+                logger.debug(f"⚡ [运行上下文] 复用本次分析已获取的数据: {key}")
+                return cached
+
+            result = func(*args, **kwargs)
+            if is_valid_payload(result):
+                context.put(key, result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+# 参与去重key时需要统一大小写的股票代码参数名
+_SYMBOL_ARG_NAMES = ('ticker', 'symbol', 'stock_code', 'company_name')
+
+
+def run_memoized_tool(tool_name: str):
+    """
+    工具调用去重装饰器
+
+    在一次分析运行（TradingAgentsGraph.propagate）内，相同工具+相同参数
+    （去除首尾空格、股票代码不区分大小写、补全默认值后）的重复调用直接返回首次结果。
+    LLM重试、强制工具调用和Google工具处理器重跑都会产生这类重复调用。
+    预取（tradingagents.agents.utils.tool_prefetch）进行中的相同调用会等待预取完成并复用其结果。
+    不在分析运行中时不做任何处理。
+    用于Toolkit工具时放在@tool之下、@log_tool_call之上，命中时不重复记录工具日志。
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            context = get_current_run_context()
+            if context is None:
+                return func(*args, **kwargs)
+
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                normalized = []
+                for name, value in bound.arguments.items():
+                    if isinstance(value, str):
+                        value = value.strip()
+                        if name in _SYMBOL_ARG_NAMES:
+                            value = value.upper()
+                    normalized.append((name, value))
+                key = ('tool', tool_name) + tuple(normalized)
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+
+            is_prefetch = _prefetching.get()
+            cached = context.get(key)
+            if cached is not None:
+                if not is_prefetch:
+                    context.record_tool_call(tool_name, deduped=True)
+                trace_event('run_memo.hit', tool=tool_name)
+                logger.info(f"♻️ [工具去重] {tool_name} 参数与本次分析中的已有调用相同，直接复用结果")
+                return cached
+
+            executed = []
+
+            def call():
+                executed.append(True)
+                result = func(*args, **kwargs)
+                if is_valid_payload(result):
+                    context.put(key, result)
+                return result
+
+            result = context.in_flight.do(key, call)
+            if not is_prefetch:
+                context.record_tool_call(tool_name, deduped=not executed)
+                if not executed:
+                    trace_event('run_memo.hit', tool=tool_name)
+                    logger.info(f"♻️ [工具去重] {tool_name} 等待进行中的相同调用（预取）完成，复用其结果")
+            return result
+
+        return wrapper
+
+    return decorator
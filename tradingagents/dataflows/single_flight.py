@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+请求合并（single-flight）
+相同参数的并发数据请求只执行一次，其余调用方等待并共享同一个结果
+"""
+
+import copy
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+class _Call:
+    """一次正在进行的调用"""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    按key合并并发调用
+
+    第一个调用方（leader）实际执行函数，执行期间到达的相同key调用方（follower）
+    等待leader完成后直接复用其结果或异常。调用结束后立即移除，不做结果缓存。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats = {'leaders': 0, 'followers': 0, 'errors': 0}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """执行func，若相同key的调用正在进行则等待并共享其结果"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats['followers'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.stats['leaders'] += 1
+                leader = True
+
+        if not leader:
+            logger.debug(f"🔗 [请求合并] {self.name} 等待进行中的相同请求: {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # 可变结果给每个follower一份浅拷贝，避免调用方之间互相修改
+            if isinstance(call.result, (dict, list)):
+                return copy.copy(call.result)
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                if call.waiters:
+                    logger.debug(f"🔗 [请求合并] {self.name} 一次请求服务了{call.waiters + 1}个调用方: {key}")
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'in_flight': len(self._calls), **self.stats}
+
+
+# 全局合并组注册表
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """获取指定名称的合并组（进程内单例）"""
+    group = _groups.get(name)
+    if group is None:
+        with _groups_lock:
+            group = _groups.setdefault(name, SingleFlight(name))
+    return group
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """获取所有合并组的统计信息"""
+    return {name: group.get_stats() for name, group in list(_groups.items())}
+
+
+def single_flight(name: str, key_func: Callable[[Dict[str, Any]], Hashable] = None):
+    """
+    请求合并装饰器
+
+    Args:
+        name: 合并组名称
+        key_func: 根据绑定后的参数字典（含默认值）生成合并key；
+                  默认使用除self外的全部参数
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                # 参数不匹配时交给原函数抛出正常的错误
+                return func(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+
+            try:
+                if key_func is not None:
+                    key = key_func(arguments)
+                else:
+                    key = tuple((k, v) for k, v in arguments.items() if k != 'self')
+                hash(key)
+            except TypeError:
+                # 参数不可哈希时不合并
+                return func(*args, **kwargs)
+
+            return get_single_flight(name).do(key, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+过期缓存先返回、后台再刷新（stale-while-revalidate）
+行情缓存超过软TTL（cache_config 中的 ttl_hours）后，get_stock_data 原本要同步等待数据源重新获取；
+对盘中分析来说，一小时前的日线数据完全可用。配置了硬TTL（hard_ttl_hours）的数据类型，
+在软TTL与硬TTL之间直接返回过期缓存，同时在后台线程刷新缓存，数据源延迟不再阻塞分析。
+超过硬TTL的缓存仍然同步获取。
+
+刷新失败（抛出异常，或数据提供器返回生成的错误/备用文本、退回的旧缓存）时保留原缓存，
+同一key在退避时间内不再提交刷新，避免每次命中过期缓存都请求正在失败的数据源。
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from tradingagents.utils.tracing import trace_event
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 数据提供器在数据源不可用时生成的备用数据标记（见 _generate_fallback_data）
+FALLBACK_MARKER = '## ❌ 错误信息'
+# 连续失败时退避时间的上限（秒）
+MAX_BACKOFF_SECONDS = 3600
+
+
+def is_failed_refresh(result: Any) -> bool:
+    """刷新结果是否为数据提供器生成的错误或备用文本"""
+    if not isinstance(result, str):
+        return False
+    text = result.lstrip()
+    return not text or text.startswith('❌') or FALLBACK_MARKER in result
+
+
+class BackgroundRefresher:
+    """
+    后台缓存刷新器
+
+    相同key的刷新任务在执行期间只提交一次；线程池有界，刷新请求同样经过各数据源的限流器。
+    刷新失败后该key按 backoff_seconds 指数退避（上限 MAX_BACKOFF_SECONDS），成功后清除。
+    """
+
+    def __init__(self, max_workers: int = None, backoff_seconds: float = None):
+        self.max_workers = max_workers or int(os.getenv('CACHE_REVALIDATE_WORKERS', '2'))
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else \
+            float(os.getenv('CACHE_REVALIDATE_BACKOFF_SECONDS', '60'))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='cache-revalidate')
+        self._lock = threading.Lock()
+        self._pending: set = set()
+        # key -> (连续失败次数, 允许再次刷新的时间)
+        self._backoff: Dict[Hashable, Tuple[int, float]] = {}
+        self.stats = {'scheduled': 0, 'deduplicated': 0, 'backed_off': 0, 'succeeded': 0, 'failed': 0}
+
+    def schedule(self, key: Hashable, refresh: Callable[[], Any], stale: Any = None) -> bool:
+        """
+        提交后台刷新，相同key的刷新正在进行或处于失败退避期时返回 False
+
+        Args:
+            stale: 当前返回的过期数据；刷新结果与之相同（提供器在数据源失败时退回旧缓存）视为失败
+        """
+        with self._lock:
+            if key in self._pending:
+                self.stats['deduplicated'] += 1
+                return False
+            backoff = self._backoff.get(key)
+            if backoff is not None and time.monotonic() < backoff[1]:
+                self.stats['backed_off'] += 1
+                return False
+            self._pending.add(key)
+            self.stats['scheduled'] += 1
+        try:
+            self._executor.submit(self._run, key, refresh, stale)
+        except RuntimeError:
+            # 解释器退出时线程池已关闭
+            with self._lock:
+                self._pending.discard(key)
+            return False
+        return True
+
+    def _run(self, key: Hashable, refresh: Callable[[], Any], stale: Any = None):
+        try:
+            result = refresh()
+            succeeded = not is_failed_refresh(result) and (stale is None or result != stale)
+            if not succeeded:
+                logger.warning(f"⚠️ [后台刷新] 数据源未返回新数据，保留原缓存 {key}")
+        except Exception as e:
+            logger.warning(f"⚠️ [后台刷新] 缓存刷新失败 {key}: {e}")
+            succeeded = False
+        with self._lock:
+            self._pending.discard(key)
+            if succeeded:
+                self._backoff.pop(key, None)
+                self.stats['succeeded'] += 1
+            else:
+                failures = self._backoff.get(key, (0, 0.0))[0] + 1
+                delay = min(self.backoff_seconds * 2 ** (failures - 1), MAX_BACKOFF_SECONDS)
+                self._backoff[key] = (failures, time.monotonic() + delay)
+                self.stats['failed'] += 1
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'pending': len(self._pending), 'backing_off': len(self._backoff),
+                    'max_workers': self.max_workers, **self.stats}
+
+
+_refresher: Optional[BackgroundRefresher] = None
+_refresher_lock = threading.Lock()
+
+
+def get_background_refresher() -> BackgroundRefresher:
+    """获取全局后台刷新器（进程内单例）"""
+    global _refresher
+    if _refresher is None:
+        with _refresher_lock:
+            if _refresher is None:
+                _refresher = BackgroundRefresher()
+    return _refresher
+
+
+def serve_stale_stock_data(cache, symbol: str, start_date: str, end_date: str,
+                           data_sources: Sequence[str], refresh: Callable[[], Any]) -> Optional[str]:
+    """
+    在硬TTL内返回过期的行情缓存，并在后台调用 refresh 更新缓存
+
+    Args:
+        cache: StockDataCache
+        data_sources: 按优先级查找的缓存数据源
+        refresh: 后台执行的刷新函数（通常为 force_refresh=True 的 get_stock_data），
+                 返回错误/备用文本或原过期数据时视为失败
+
+    Returns:
+        Optional[str]: 过期缓存数据；没有可用的过期缓存（或该数据类型未启用）时返回 None，
+        调用方应同步获取
+    """
+    stale = cache.find_stale_stock_data(symbol, start_date, end_date, data_sources)
+    if stale is None:
+        return None
+    cache_key, age_hours = stale
+    data = cache.load_stock_data(cache_key)
+    if not data or not isinstance(data, str):
+        return None
+
+    scheduled = get_background_refresher().schedule(('stock_data', symbol, start_date, end_date), refresh, data)
+    logger.info(f"♻️ 返回过期缓存并后台刷新: {symbol} (已缓存 {age_hours:.1f}h"
+                f"{'' if scheduled else '，刷新已在进行或等待重试'})")
+    trace_event('cache.stale_served', symbol=symbol, age_hours=round(age_hours, 2), scheduled=scheduled)
+    return data
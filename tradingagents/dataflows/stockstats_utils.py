@@ -1,12 +1,59 @@
 import pandas as pd
 import yfinance as yf
 from stockstats import wrap
-from typing import Annotated
+from typing import Annotated, Dict, List
 import os
 from .config import get_config
+from .yfin_bulk import bulk_download
 
 
 class StockstatsUtils:
+    @staticmethod
+    def _online_data_file(symbol: str):
+        """Cache file holding the 15-year daily history used by online indicator lookups."""
+        # Get today's date as YYYY-mm-dd to add to cache
+        today_date = pd.Timestamp.today()
+        start_date = (today_date - pd.DateOffset(years=15)).strftime("%Y-%m-%d")
+        end_date = today_date.strftime("%Y-%m-%d")
+
+        # Get config and ensure cache directory exists
+        config = get_config()
+        os.makedirs(config["data_cache_dir"], exist_ok=True)
+
+        data_file = os.path.join(
+            config["data_cache_dir"],
+            f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
+        )
+        return data_file, start_date, end_date
+
+    @staticmethod
+    def prefetch_price_history(
+        symbols: Annotated[List[str], "ticker symbols to download"],
+    ) -> Dict[str, str]:
+        """
+        Download the 15-year history for many symbols in batched yf.download calls
+        and write the same per-symbol CSV files get_stock_stats(online=True) reads.
+        Symbols whose file already exists are skipped.
+
+        Returns:
+            Dict[str, str]: symbol -> cache file written
+        """
+        pending = {}
+        for symbol in dict.fromkeys(symbols):
+            data_file, start_date, end_date = StockstatsUtils._online_data_file(symbol)
+            if not os.path.exists(data_file):
+                pending[symbol] = data_file
+        if not pending:
+            return {}
+
+        written = {}
+        frames = bulk_download(list(pending), start_date, end_date)
+        for symbol, data in frames.items():
+            data = data.reset_index()
+            data.to_csv(pending[symbol], index=False)
+            written[symbol] = pending[symbol]
+        return written
+
     @staticmethod
     def get_stock_stats(
         symbol: Annotated[str, "ticker symbol for the company"],
@@ -40,23 +87,8 @@ class StockstatsUtils:
             except FileNotFoundError:
                 raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
         else:
-            # Get today's date as YYYY-mm-dd to add to cache
-            today_date = pd.Timestamp.today()
             curr_date = pd.to_datetime(curr_date)
-
-            end_date = today_date
-            start_date = today_date - pd.DateOffset(years=15)
-            start_date = start_date.strftime("%Y-%m-%d")
-            end_date = end_date.strftime("%Y-%m-%d")
-
-            # Get config and ensure cache directory exists
-            config = get_config()
-            os.makedirs(config["data_cache_dir"], exist_ok=True)
-
-            data_file = os.path.join(
-                config["data_cache_dir"],
-                f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
-            )
+            data_file, start_date, end_date = StockstatsUtils._online_data_file(symbol)
 
             if os.path.exists(data_file):
                 data = pd.read_csv(data_file)
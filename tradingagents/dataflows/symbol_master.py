@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+股票代码主表（A股/港股/美股）
+一次性从MongoDB stock_basic_info、Tushare stock_basic 股票列表或本地快照加载，
+在内存中维护 代码->信息 哈希表以及名称/代码n-gram、拼音首字母前缀索引，
+为股票名称解析、代码校验和Web搜索提供微秒级查询，并支持增量刷新
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 可选：pypinyin用于为没有cnspell字段的中文名称生成拼音首字母
+try:
+    from pypinyin import lazy_pinyin, Style
+    PYPINYIN_AVAILABLE = True
+except ImportError:
+    PYPINYIN_AVAILABLE = False
+
+MARKET_CHINA = 'china'
+MARKET_HK = 'hk'
+MARKET_US = 'us'
+
+# 数据来源优先级：高优先级来源的记录不会被低优先级来源覆盖
+SOURCE_PRIORITY = {
+    'builtin': 0,
+    'snapshot': 1,
+    'tushare': 2,
+    'stock_api': 2,
+    'akshare': 2,
+    'mongodb': 3,
+}
+
+
+def _primary_code(code: str, market: str) -> str:
+    """主表中的标准代码：A股6位数字，港股4位数字+.HK，美股大写代码"""
+    code = str(code).strip().upper()
+    if market == MARKET_CHINA:
+        return code.split('.')[0]
+    if market == MARKET_HK:
+        digits = code.replace('.HK', '')
+        if digits.isdigit():
+            return f"{int(digits):04d}.HK"
+        return code
+    return code
+
+
+def _code_aliases(code: str, market: str) -> List[str]:
+    """同一股票可能的输入形式，如 0700.HK / 0700 / 00700 / 700"""
+    aliases = [code]
+    if market == MARKET_HK and code.endswith('.HK'):
+        digits = code[:-3]
+        aliases += [digits, digits.zfill(5), digits.lstrip('0') or '0']
+    return aliases
+
+
+def _infer_market(code: str) -> str:
+    """根据代码格式推断市场"""
+    code = str(code).strip().upper()
+    if code.endswith('.HK'):
+        return MARKET_HK
+    if code.endswith(('.SZ', '.SH', '.BJ')) or (len(code) == 6 and code.isdigit()):
+        return MARKET_CHINA
+    if code.isdigit() and len(code) <= 5:
+        return MARKET_HK
+    return MARKET_US
+
+
+def _ngrams(text: str) -> Set[str]:
+    """单字和双字n-gram，用于任意子串检索"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _pinyin_initials(name: str) -> str:
+    if not PYPINYIN_AVAILABLE or not name:
+        return ''
+    return ''.join(p[0] for p in lazy_pinyin(name, style=Style.FIRST_LETTER) if p).upper()
+
+
+class SymbolMaster:
+    """
+    内存股票主表
+
+    条目为dict，至少包含 code、name、market_type（china/hk/us）、source，
+    其余字段（area、industry、ts_code等）保留数据源的原始值。
+    查询返回条目的副本，调用方修改不影响索引。
+    """
+
+    def __init__(self, snapshot_path: str = None, refresh_interval: float = None):
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._aliases: Dict[str, str] = {}
+        self._gram_index: Dict[str, Set[str]] = defaultdict(set)
+        self._pinyin_index: Dict[str, Set[str]] = defaultdict(set)
+        self._loaded_sources: Dict[str, float] = {}
+        self._mongodb_watermark = None
+        self._loading = threading.Lock()
+        self._last_refresh: Optional[float] = None
+        self._refreshing = False
+
+        self.snapshot_path = snapshot_path or os.getenv('SYMBOL_MASTER_SNAPSHOT')
+        self.refresh_interval = refresh_interval if refresh_interval is not None else \
+            float(os.getenv('SYMBOL_MASTER_REFRESH_SECONDS', str(6 * 3600)))
+        self.stats = {'lookups': 0, 'hits': 0, 'searches': 0, 'upserts': 0}
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def _index(self, key: str, entry: Dict[str, Any]):
+        for alias in _code_aliases(key, entry['market_type']):
+            self._aliases[alias] = key
+        for field in ('ts_code', 'symbol'):
+            if entry.get(field):
+                self._aliases[str(entry[field]).upper()] = key
+        for gram in _ngrams(key) | _ngrams(entry['name'].upper()):
+            self._gram_index[gram].add(key)
+        pinyin = entry.get('pinyin', '')
+        for i in range(1, len(pinyin) + 1):
+            self._pinyin_index[pinyin[:i]].add(key)
+
+    def _unindex(self, key: str, entry: Dict[str, Any]):
+        for gram in _ngrams(key) | _ngrams(entry['name'].upper()):
+            postings = self._gram_index.get(gram)
+            if postings is not None:
+                postings.discard(key)
+        pinyin = entry.get('pinyin', '')
+        for i in range(1, len(pinyin) + 1):
+            postings = self._pinyin_index.get(pinyin[:i])
+            if postings is not None:
+                postings.discard(key)
+
+    def upsert(self, record: Dict[str, Any], market: str = None, source: str = 'builtin') -> bool:
+        """
+        新增或更新一条记录
+
+        Returns:
+            bool: 主表是否发生变化
+        """
+        code = record.get('code') or record.get('symbol') or record.get('ts_code')
+        name = str(record.get('name') or '').strip()
+        if not code or not name:
+            return False
+
+        market = market or _infer_market(code)
+        key = _primary_code(code, market)
+        entry = {k: v for k, v in record.items() if k != '_id'}
+        entry.update({
+            'code': key,
+            'name': name,
+            'market_type': market,
+            'source': source,
+            'pinyin': str(record.get('cnspell') or record.get('pinyin') or _pinyin_initials(name)).upper(),
+        })
+
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                if SOURCE_PRIORITY.get(existing['source'], 0) > SOURCE_PRIORITY.get(source, 0):
+                    return False
+                if existing == entry:
+                    return False
+                self._unindex(key, existing)
+            self._entries[key] = entry
+            self._index(key, entry)
+            self.stats['upserts'] += 1
+            return True
+
+    def load_entries(self, records: Iterable[Dict[str, Any]], market: str = None,
+                     source: str = 'builtin') -> int:
+        """批量增量写入，返回发生变化的条目数"""
+        changed = sum(1 for record in records if isinstance(record, dict) and
+                      'error' not in record and self.upsert(record, market, source))
+        with self._lock:
+            self._loaded_sources[source] = time.time()
+        if changed:
+            logger.debug(f"📇 [股票主表] {source} 更新{changed}条，当前共{len(self._entries)}条")
+        return changed
+
+    def load_dataframe(self, frame, market: str = MARKET_CHINA, source: str = 'tushare') -> int:
+        """写入股票列表DataFrame（如Tushare stock_basic结果）"""
+        if frame is None or not hasattr(frame, 'to_dict') or frame.empty:
+            return 0
+        return self.load_entries(frame.to_dict('records'), market, source)
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def _resolve(self, code: str) -> Optional[str]:
+        code = str(code).strip().upper()
+        key = self._aliases.get(code)
+        if key is None and '.' in code and not code.endswith('.HK'):
+            key = self._aliases.get(code.split('.')[0])
+        return key
+
+    def get(self, code: str, market: str = None) -> Optional[Dict[str, Any]]:
+        """按代码（支持 000001 / 000001.SZ / 0700.HK / 00700 / AAPL 等形式）查询"""
+        self.ensure_loaded()
+        with self._lock:
+            self.stats['lookups'] += 1
+            key = self._resolve(code)
+            entry = self._entries.get(key) if key else None
+            if entry is None or (market and entry['market_type'] != market):
+                return None
+            self.stats['hits'] += 1
+            return dict(entry)
+
+    def get_name(self, code: str, market: str = None) -> Optional[str]:
+        entry = self.get(code, market)
+        return entry['name'] if entry else None
+
+    def search(self, keyword: str, market: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        按代码、名称子串或拼音首字母前缀搜索
+
+        排序：代码精确匹配 > 代码前缀 > 名称前缀 > 拼音首字母前缀 > 其他子串匹配
+        """
+        self.ensure_loaded()
+        query = str(keyword or '').strip().upper()
+        if not query:
+            return []
+
+        with self._lock:
+            self.stats['searches'] += 1
+            candidates: Set[str] = set()
+
+            exact = self._resolve(query)
+            if exact:
+                candidates.add(exact)
+
+            grams = [query] if len(query) == 1 else [query[i:i + 2] for i in range(len(query) - 1)]
+            postings = sorted((self._gram_index.get(g, set()) for g in grams), key=len)
+            if postings and postings[0]:
+                matched = set(postings[0])
+                for other in postings[1:]:
+                    matched &= other
+                    if not matched:
+                        break
+                candidates |= matched
+            candidates |= self._pinyin_index.get(query, set())
+
+            ranked = []
+            for key in candidates:
+                entry = self._entries[key]
+                if market and entry['market_type'] != market:
+                    continue
+                name = entry['name'].upper()
+                if key == exact:
+                    rank = 0
+                elif key.startswith(query):
+                    rank = 1
+                elif name.startswith(query):
+                    rank = 2
+                elif entry['pinyin'].startswith(query):
+                    rank = 3
+                elif query in key or query in name:
+                    rank = 4
+                else:
+                    continue
+                ranked.append((rank, key))
+
+            ranked.sort()
+            return [dict(self._entries[key]) for _, key in ranked[:limit]]
+
+    def has_source(self, source: str) -> bool:
+        return source in self._loaded_sources
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_market = defaultdict(int)
+            for entry in self._entries.values():
+                by_market[entry['market_type']] += 1
+            return {
+                'entries': len(self._entries),
+                'by_market': dict(by_market),
+                'sources': {s: round(time.time() - t, 1) for s, t in self._loaded_sources.items()},
+                **self.stats,
+            }
+
+    # ------------------------------------------------------------------
+    # 加载与刷新
+    # ------------------------------------------------------------------
+
+    def ensure_loaded(self):
+        """首次使用时加载；超过刷新间隔后在后台增量刷新"""
+        if self._last_refresh is not None:
+            if self._needs_refresh() and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._background_refresh, name='symbol-master-refresh',
+                                 daemon=True).start()
+            return
+
+        with self._loading:
+            if self._last_refresh is None:
+                self.refresh()
+
+    def _needs_refresh(self) -> bool:
+        return self.refresh_interval > 0 and time.time() - self._last_refresh > self.refresh_interval
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.debug(f"⚠️ [股票主表] 后台刷新失败: {e}")
+        finally:
+            self._refreshing = False
+
+    def refresh(self) -> int:
+        """从本地快照（仅首次）和MongoDB增量加载，返回变化条数"""
+        changed = 0
+        if not self.has_source('snapshot'):
+            changed += self.load_snapshot()
+        changed += self._load_from_mongodb()
+        if changed and self.has_source('mongodb'):
+            self.save_snapshot()
+        # 即使所有来源都不可用也记录刷新时间，避免每次查询都重试
+        self._last_refresh = time.time()
+        return changed
+
+    def _load_from_mongodb(self) -> int:
+        """从MongoDB stock_basic_info加载；已有水位时只查询updated_at更新的记录"""
+        try:
+            from tradingagents.config.database_manager import get_database_manager
+            db_manager = get_database_manager()
+            client = db_manager.get_mongodb_client()
+            if client is None:
+                return 0
+            collection = client[db_manager.mongodb_config['database']]['stock_basic_info']
+
+            query = {}
+            if self._mongodb_watermark is not None:
+                query = {'updated_at': {'$gt': self._mongodb_watermark}}
+            records = list(collection.find(query, {'_id': 0}))
+        except Exception as e:
+            logger.warning(f"⚠️ [股票主表] 从MongoDB加载失败: {e}")
+            return 0
+
+        for record in records:
+            updated_at = record.get('updated_at')
+            if updated_at is None:
+                continue
+            try:
+                if self._mongodb_watermark is None or updated_at > self._mongodb_watermark:
+                    self._mongodb_watermark = updated_at
+            except TypeError:
+                # 历史数据中updated_at类型不一致（字符串/datetime）时忽略
+                pass
+
+        changed = self.load_entries(records, MARKET_CHINA, 'mongodb')
+        logger.info(f"📇 [股票主表] MongoDB加载{len(records)}条记录（变化{changed}条）")
+        return changed
+
+    def load_snapshot(self, path: str = None) -> int:
+        """从本地JSON快照加载"""
+        path = path or self.snapshot_path
+        if not path or not os.path.exists(path):
+            return 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ [股票主表] 读取快照失败: {e}")
+            return 0
+
+        changed = 0
+        for record in records:
+            if isinstance(record, dict) and self.upsert(record, record.get('market_type'), 'snapshot'):
+                changed += 1
+        with self._lock:
+            self._loaded_sources['snapshot'] = time.time()
+        logger.info(f"📇 [股票主表] 从快照加载{changed}条记录: {path}")
+        return changed
+
+    def save_snapshot(self, path: str = None) -> bool:
+        """保存当前主表到本地JSON快照（先写临时文件再替换）"""
+        path = path or self.snapshot_path
+        if not path:
+            return False
+        with self._lock:
+            records = [{k: v for k, v in entry.items() if isinstance(v, (str, int, float, bool)) or v is None}
+                       for entry in self._entries.values() if entry['source'] != 'builtin']
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(records, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logger.warning(f"⚠️ [股票主表] 保存快照失败: {e}")
+            return False
+
+
+# 全局股票主表实例
+_symbol_master: Optional[SymbolMaster] = None
+_symbol_master_lock = threading.Lock()
+
+
+def get_symbol_master() -> SymbolMaster:
+    """获取全局股票主表实例"""
+    global _symbol_master
+    if _symbol_master is None:
+        with _symbol_master_lock:
+            if _symbol_master is None:
+                _symbol_master = SymbolMaster()
+    return _symbol_master
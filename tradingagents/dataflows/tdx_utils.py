@@ -554,7 +554,15 @@ def _get_mongodb_connection():
     return _mongodb_client, _mongodb_db
 
 def _get_stock_name_from_mongodb(stock_code: str) -> Optional[str]:
-    """从MongoDB获取股票名称"""
+    """从MongoDB获取股票名称（优先查询内存股票主表，主表已全量加载MongoDB时不再逐条查询）"""
+    from .symbol_master import get_symbol_master, MARKET_CHINA
+    master = get_symbol_master()
+    name = master.get_name(stock_code, MARKET_CHINA)
+    if name:
+        return name
+    if master.has_source('mongodb'):
+        return None
+
     try:
         client, db = _get_mongodb_connection()
         if db is None:
@@ -564,6 +572,7 @@ def _get_stock_name_from_mongodb(stock_code: str) -> Optional[str]:
         stock_info = collection.find_one({'code': stock_code})
         
         if stock_info and 'name' in stock_info:
+            master.upsert(stock_info, MARKET_CHINA, 'mongodb')
             return stock_info['name'].strip()
         
         return None
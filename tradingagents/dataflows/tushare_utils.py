@@ -124,7 +124,7 @@ class TushareProvider:
             stock_list = self.api.stock_basic(
                 exchange='',
                 list_status='L',  # 上市状态
-                fields='ts_code,symbol,name,area,industry,market,list_date'
+                fields='ts_code,symbol,name,area,industry,market,list_date,cnspell'
             )
             
             if stock_list is not None and not stock_list.empty:
@@ -529,14 +529,17 @@ class TushareProvider:
             if stock_list.empty:
                 return pd.DataFrame()
             
-            # 按名称和代码搜索
-            mask = (
-                stock_list['name'].str.contains(keyword, na=False) |
-                stock_list['symbol'].str.contains(keyword, na=False) |
-                stock_list['ts_code'].str.contains(keyword, na=False)
-            )
+            # 通过内存股票主表的索引搜索（代码/名称子串、拼音首字母），避免每次全表str.contains
+            from .symbol_master import get_symbol_master, MARKET_CHINA
+            master = get_symbol_master()
+            if not master.has_source('tushare'):
+                master.load_dataframe(stock_list, MARKET_CHINA, 'tushare')
+            codes = [item['code'] for item in master.search(keyword, market=MARKET_CHINA, limit=len(stock_list))]
             
-            results = stock_list[mask]
+            # 完整代码（如000001.SZ）由主表的ts_code别名解析；结果保留主表索引的相关度排序
+            rank = {code: i for i, code in enumerate(codes)}
+            matched = stock_list[stock_list['symbol'].isin(rank)]
+            results = matched.sort_values('symbol', key=lambda symbols: symbols.map(rank), kind='stable')
             logger.debug(f"🔍 搜索'{keyword}'找到{len(results)}只股票")
             
             return results
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+MongoDB 延迟写入（write-behind）队列
+DatabaseCacheManager 的每次保存原本同步写 MongoDB 和 Redis 后才返回，两次网络写入都在分析的关键路径上。
+启用本队列后保存只同步写 Redis，MongoDB 持久化交给后台线程：
+
+- 同一集合、同一缓存键在写入前被多次保存时只保留最新文档（合并）
+- 按 max_batch 分批，每个集合一次 bulk_write
+- 写入失败的文档重新入队（已有更新版本时丢弃旧版本），按间隔重试
+- close() 停止后台线程并同步写完剩余文档
+- 队列延迟（最早未持久化文档的等待秒数）通过 get_stats() 暴露
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+_Key = Tuple[str, Any]
+
+
+class WriteBehindQueue:
+    """
+    合并写入的后台持久化队列
+
+    Args:
+        flush_fn: flush_fn(collection_name, docs) 批量写入一个集合，失败时抛出异常
+        flush_interval: 后台线程的最长写入间隔（秒）
+        max_batch: 每批最多写入的文档数，积压达到该数量时立即写入
+        max_pending: 积压上限，超过后保存方最多等待 block_timeout 秒
+        block_timeout: 积压超限时的最长等待秒数，超时后仍然入队（记为overflow）
+    """
+
+    def __init__(self, flush_fn: Callable[[str, List[Dict[str, Any]]], Any],
+                 flush_interval: float = 0.5, max_batch: int = 500,
+                 max_pending: int = 10000, block_timeout: float = 5.0, name: str = "mongodb"):
+        self.flush_fn = flush_fn
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.block_timeout = block_timeout
+        self.name = name
+
+        self._cond = threading.Condition()
+        # (集合, 缓存键) -> (文档, 首次入队时间)
+        self._pending: 'OrderedDict[_Key, Tuple[Dict[str, Any], float]]' = OrderedDict()
+        self._in_flight = 0
+        self._closed = False
+        self.stats = {'enqueued': 0, 'coalesced': 0, 'flushed': 0, 'batches': 0,
+                      'failures': 0, 'overflow': 0, 'last_flush_lag_seconds': 0.0}
+
+        self._worker = threading.Thread(target=self._run, name=f'write-behind-{name}', daemon=True)
+        self._worker.start()
+
+    def enqueue(self, collection_name: str, docs: Iterable[Dict[str, Any]]):
+        """入队待持久化的文档（按 _id 合并）"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("写入队列已关闭")
+            if len(self._pending) >= self.max_pending:
+                self._cond.notify_all()
+                if not self._cond.wait_for(lambda: len(self._pending) < self.max_pending or self._closed,
+                                           timeout=self.block_timeout):
+                    self.stats['overflow'] += 1
+                    logger.warning(f"⚠️ [延迟写入] {self.name} 积压超过{self.max_pending}条")
+            now = time.monotonic()
+            for doc in docs:
+                key = (collection_name, doc["_id"])
+                previous = self._pending.get(key)
+                if previous is not None:
+                    # 保留首次入队时间，延迟指标反映数据未持久化的真实时长
+                    self._pending[key] = (doc, previous[1])
+                    self.stats['coalesced'] += 1
+                else:
+                    self._pending[key] = (doc, now)
+                self.stats['enqueued'] += 1
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+
+    def get(self, collection_name: str, key: Any) -> Optional[Dict[str, Any]]:
+        """返回尚未持久化的最新文档（读取方在MongoDB之前查询，保证读到自己的写入）"""
+        with self._cond:
+            entry = self._pending.get((collection_name, key))
+            return entry[0] if entry else None
+
+    def _take_batch(self) -> List[Tuple[_Key, Dict[str, Any], float]]:
+        batch = []
+        while self._pending and len(batch) < self.max_batch:
+            key, (doc, enqueued_at) = self._pending.popitem(last=False)
+            batch.append((key, doc, enqueued_at))
+        self._in_flight += len(batch)
+        return batch
+
+    def _flush_batch(self, batch: List[Tuple[_Key, Dict[str, Any], float]]) -> bool:
+        """按集合分组写入；失败的文档在没有更新版本时重新入队"""
+        by_collection: Dict[str, List[Tuple[_Key, Dict[str, Any], float]]] = {}
+        for item in batch:
+            by_collection.setdefault(item[0][0], []).append(item)
+
+        ok = True
+        for collection_name, items in by_collection.items():
+            try:
+                self.flush_fn(collection_name, [doc for _, doc, _ in items])
+                lag = time.monotonic() - min(enqueued_at for _, _, enqueued_at in items)
+                with self._cond:
+                    self.stats['flushed'] += len(items)
+                    self.stats['batches'] += 1
+                    self.stats['last_flush_lag_seconds'] = round(lag, 3)
+            except Exception as e:
+                ok = False
+                logger.error(f"⚠️ [延迟写入] {self.name}.{collection_name} 写入{len(items)}条失败，稍后重试: {e}")
+                with self._cond:
+                    self.stats['failures'] += 1
+                    # 倒序放回队首，保持原有写入顺序
+                    for key, doc, enqueued_at in reversed(items):
+                        if key not in self._pending:
+                            self._pending[key] = (doc, enqueued_at)
+                            self._pending.move_to_end(key, last=False)
+
+        with self._cond:
+            self._in_flight -= len(batch)
+            self._cond.notify_all()
+        return ok
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or len(self._pending) >= self.max_batch,
+                                    timeout=self.flush_interval)
+                if self._closed:
+                    return
+                batch = self._take_batch()
+            if batch and not self._flush_batch(batch):
+                # 写入失败时等待一个间隔再重试，避免持续打满数据库
+                time.sleep(self.flush_interval)
+
+    def flush(self, timeout: float = None) -> bool:
+        """在调用线程中写完当前积压，返回是否全部写入成功"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                # 等待后台线程正在写入的批次完成
+                self._cond.wait_for(lambda: self._in_flight == 0,
+                                    timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+                if not self._pending:
+                    return self._in_flight == 0
+                batch = self._take_batch()
+            if not self._flush_batch(batch):
+                return False
+            if deadline is not None and time.monotonic() > deadline:
+                return not self._pending
+
+    def close(self, timeout: float = 30.0) -> bool:
+        """停止后台线程并写完剩余文档，返回是否全部写入成功"""
+        with self._cond:
+            if self._closed:
+                return not self._pending
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout)
+        drained = self.flush(timeout)
+        with self._cond:
+            remaining = len(self._pending)
+        if remaining:
+            logger.error(f"❌ [延迟写入] {self.name} 关闭时仍有{remaining}条未写入")
+        else:
+            logger.info(f"🔒 [延迟写入] {self.name} 队列已清空")
+        return drained and not remaining
+
+    def lag_seconds(self) -> float:
+        """最早一条未持久化文档已等待的秒数，队列为空时为0"""
+        with self._cond:
+            if not self._pending:
+                return 0.0
+            oldest = min(enqueued_at for _, enqueued_at in self._pending.values())
+        return time.monotonic() - oldest
+
+    def get_stats(self) -> Dict[str, Any]:
+        lag = self.lag_seconds()
+        with self._cond:
+            return {
+                'pending': len(self._pending),
+                'in_flight': self._in_flight,
+                'lag_seconds': round(lag, 3),
+                'closed': self._closed,
+                **self.stats,
+            }
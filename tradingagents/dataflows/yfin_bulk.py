@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Yahoo Finance 批量行情下载
+逐只调用 yf.Ticker(symbol).history 时，每只股票一次HTTP会话、一次限流等待；
+批量分析或缓存预热上百只美股时改用 yf.download 一次下载一批股票（yfinance 内部多线程），
+再按股票拆分为与 Ticker.history 列格式一致的单只 DataFrame。
+"""
+
+from typing import Dict, List, Sequence
+
+import pandas as pd
+import yfinance as yf
+
+from .rate_limiter import get_rate_limiter, is_rate_limit_error
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 每次 yf.download 请求的股票数量
+DEFAULT_BATCH_SIZE = 50
+
+
+def split_download(data: pd.DataFrame, symbols: Sequence[str]) -> Dict[str, pd.DataFrame]:
+    """
+    把 yf.download(group_by='ticker') 的结果拆分为单只股票的 DataFrame
+
+    多只股票时列为 (股票代码, 字段) 的 MultiIndex；单只股票时可能是普通列。
+    没有数据的股票（代码无效、停牌等）不出现在结果中。
+    """
+    frames: Dict[str, pd.DataFrame] = {}
+    if data is None or data.empty:
+        return frames
+
+    if isinstance(data.columns, pd.MultiIndex):
+        available = set(data.columns.get_level_values(0))
+        for symbol in symbols:
+            if symbol not in available:
+                continue
+            frame = data[symbol].dropna(how='all')
+            if not frame.empty:
+                frame.columns.name = None
+                frames[symbol] = frame
+    elif len(symbols) == 1:
+        frame = data.dropna(how='all')
+        if not frame.empty:
+            frames[symbols[0]] = frame
+    return frames
+
+
+def bulk_download(symbols: Sequence[str], start_date: str, end_date: str,
+                  batch_size: int = DEFAULT_BATCH_SIZE, auto_adjust: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    批量下载多只股票的日线行情
+
+    Args:
+        symbols: 股票代码（大小写按原样传给 Yahoo Finance）
+        start_date: 开始日期 (YYYY-MM-DD)
+        end_date: 结束日期 (YYYY-MM-DD，不含当天，与 Ticker.history 一致)
+        batch_size: 每次请求的股票数量，每批只占用一次 yfinance 限流令牌
+        auto_adjust: 是否复权（Ticker.history 默认复权）
+
+    Returns:
+        Dict[str, DataFrame]: 股票代码 -> 行情（Open/High/Low/Close/Volume ...），下载失败的股票不包含在内
+    """
+    unique: List[str] = list(dict.fromkeys(symbols))
+    limiter = get_rate_limiter('yfinance')
+    frames: Dict[str, pd.DataFrame] = {}
+
+    for offset in range(0, len(unique), batch_size):
+        batch = unique[offset:offset + batch_size]
+        limiter.acquire()
+        try:
+            data = yf.download(batch, start=start_date, end=end_date, group_by='ticker',
+                               auto_adjust=auto_adjust, threads=True, progress=False)
+            limiter.report_success()
+        except Exception as e:
+            logger.error(f"❌ [批量下载] {len(batch)} 只股票下载失败: {e}")
+            if is_rate_limit_error(e):
+                limiter.report_rate_limited()
+            continue
+
+        batch_frames = split_download(data, batch)
+        frames.update(batch_frames)
+        missing = [s for s in batch if s not in batch_frames]
+        logger.info(f"📦 [批量下载] {start_date} 到 {end_date}: {len(batch_frames)}/{len(batch)} 只股票有数据"
+                    + (f"，无数据: {', '.join(missing[:10])}" if missing else ""))
+
+    return frames
@@ -17,8 +17,16 @@ DEFAULT_CONFIG = {
     "max_debate_rounds": 1,
     "max_risk_discuss_rounds": 1,
     "max_recur_limit": 100,
+    # Context budget: digest analyst reports and debate history before the debate rounds
+    "context_compaction": True,
+    "report_token_budget": 2000,
+    "debate_history_token_budget": 4000,
     # Tool settings
     "online_tools": True,
+    # Start the analysts' predictable first tool calls in the background at graph start
+    "speculative_prefetch": True,
+    # Market analyst price history window (days before the analysis date); also used by the prefetcher
+    "market_lookback_days": 60,
 
     # Note: Database and cache configuration is now managed by .env file and config.database_manager
     # No database/cache settings in default config to avoid configuration conflicts
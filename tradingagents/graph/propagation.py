@@ -43,6 +43,7 @@ class Propagator:
             "fundamentals_report": "",
             "sentiment_report": "",
             "news_report": "",
+            "context_digests": {},
         }
 
     def get_graph_args(self) -> Dict[str, Any]:
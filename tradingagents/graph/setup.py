@@ -1,13 +1,15 @@
 # TradingAgents/graph/setup.py
 
 from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+from langchain_core.language_models.chat_models import BaseChatModel
 from langgraph.graph import END, StateGraph, START
 from langgraph.prebuilt import ToolNode
 
 from tradingagents.agents import *
 from tradingagents.agents.utils.agent_states import AgentState
 from tradingagents.agents.utils.agent_utils import Toolkit
+from tradingagents.agents.utils.context_budget import create_context_compactor
+from tradingagents.utils.token_stream import stream_node
 
 from .conditional_logic import ConditionalLogic
 
@@ -21,8 +23,8 @@ class GraphSetup:
 
     def __init__(
         self,
-        quick_thinking_llm: ChatOpenAI,
-        deep_thinking_llm: ChatOpenAI,
+        quick_thinking_llm: BaseChatModel,
+        deep_thinking_llm: BaseChatModel,
         toolkit: Toolkit,
         tool_nodes: Dict[str, ToolNode],
         bull_memory,
@@ -161,21 +163,26 @@ class GraphSetup:
 
         # Add analyst nodes to the graph
         for analyst_type, node in analyst_nodes.items():
-            workflow.add_node(f"{analyst_type.capitalize()} Analyst", node)
+            node_name = f"{analyst_type.capitalize()} Analyst"
+            workflow.add_node(node_name, stream_node(node_name, node))
             workflow.add_node(
                 f"Msg Clear {analyst_type.capitalize()}", delete_nodes[analyst_type]
             )
             workflow.add_node(f"tools_{analyst_type}", tool_nodes[analyst_type])
 
         # Add other nodes
-        workflow.add_node("Bull Researcher", bull_researcher_node)
-        workflow.add_node("Bear Researcher", bear_researcher_node)
-        workflow.add_node("Research Manager", research_manager_node)
-        workflow.add_node("Trader", trader_node)
-        workflow.add_node("Risky Analyst", risky_analyst)
-        workflow.add_node("Neutral Analyst", neutral_analyst)
-        workflow.add_node("Safe Analyst", safe_analyst)
-        workflow.add_node("Risk Judge", risk_manager_node)
+        # 分析师报告在进入辩论前压缩一次，后续各轮提示词使用摘要
+        compaction_enabled = self.config.get("context_compaction", True)
+        if compaction_enabled:
+            workflow.add_node("Context Compactor", create_context_compactor(self.config))
+        workflow.add_node("Bull Researcher", stream_node("Bull Researcher", bull_researcher_node))
+        workflow.add_node("Bear Researcher", stream_node("Bear Researcher", bear_researcher_node))
+        workflow.add_node("Research Manager", stream_node("Research Manager", research_manager_node))
+        workflow.add_node("Trader", stream_node("Trader", trader_node))
+        workflow.add_node("Risky Analyst", stream_node("Risky Analyst", risky_analyst))
+        workflow.add_node("Neutral Analyst", stream_node("Neutral Analyst", neutral_analyst))
+        workflow.add_node("Safe Analyst", stream_node("Safe Analyst", safe_analyst))
+        workflow.add_node("Risk Judge", stream_node("Risk Judge", risk_manager_node))
 
         # Define edges
         # Start with the first analyst
@@ -200,9 +207,14 @@ class GraphSetup:
             if i < len(selected_analysts) - 1:
                 next_analyst = f"{selected_analysts[i+1].capitalize()} Analyst"
                 workflow.add_edge(current_clear, next_analyst)
+            elif compaction_enabled:
+                workflow.add_edge(current_clear, "Context Compactor")
             else:
                 workflow.add_edge(current_clear, "Bull Researcher")
 
+        if compaction_enabled:
+            workflow.add_edge("Context Compactor", "Bull Researcher")
+
         # Add remaining edges
         workflow.add_conditional_edges(
             "Bull Researcher",
@@ -6,10 +6,7 @@ import json
 from datetime import date
 from typing import Dict, Any, Tuple, List, Optional
 
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
-from tradingagents.llm_adapters import ChatDashScope, ChatDashScopeOpenAI, ChatGoogleOpenAI
+# LLM提供商SDK在__init__对应分支中按需导入，避免未使用的提供商拖慢启动
 
 from langgraph.prebuilt import ToolNode
 
@@ -29,6 +26,7 @@ from tradingagents.agents.utils.agent_states import (
     RiskDebateState,
 )
 from tradingagents.dataflows.interface import set_config
+from tradingagents.agents.utils.tool_prefetch import SpeculativePrefetcher
 
 from .conditional_logic import ConditionalLogic
 from .setup import GraphSetup
@@ -55,6 +53,7 @@ class TradingAgentsGraph:
         """
         self.debug = debug
         self.config = config or DEFAULT_CONFIG
+        self.selected_analysts = list(selected_analysts)
 
         # Update the interface's config
         set_config(self.config)
@@ -67,10 +66,12 @@ class TradingAgentsGraph:
 
         # Initialize LLMs
         if self.config["llm_provider"].lower() == "openai":
+            from langchain_openai import ChatOpenAI
             self.deep_thinking_llm = ChatOpenAI(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
             self.quick_thinking_llm = ChatOpenAI(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
         elif self.config["llm_provider"] == "siliconflow":
             # SiliconFlow支持：使用OpenAI兼容API
+            from langchain_openai import ChatOpenAI
             siliconflow_api_key = os.getenv('SILICONFLOW_API_KEY')
             if not siliconflow_api_key:
                 raise ValueError("使用SiliconFlow需要设置SILICONFLOW_API_KEY环境变量")
@@ -93,6 +94,7 @@ class TradingAgentsGraph:
             )
         elif self.config["llm_provider"] == "openrouter":
             # OpenRouter支持：优先使用OPENROUTER_API_KEY，否则使用OPENAI_API_KEY
+            from langchain_openai import ChatOpenAI
             openrouter_api_key = os.getenv('OPENROUTER_API_KEY') or os.getenv('OPENAI_API_KEY')
             if not openrouter_api_key:
                 raise ValueError("使用OpenRouter需要设置OPENROUTER_API_KEY或OPENAI_API_KEY环境变量")
@@ -110,13 +112,16 @@ class TradingAgentsGraph:
                 api_key=openrouter_api_key
             )
         elif self.config["llm_provider"] == "ollama":
+            from langchain_openai import ChatOpenAI
             self.deep_thinking_llm = ChatOpenAI(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
             self.quick_thinking_llm = ChatOpenAI(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
         elif self.config["llm_provider"].lower() == "anthropic":
+            from langchain_anthropic import ChatAnthropic
             self.deep_thinking_llm = ChatAnthropic(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
             self.quick_thinking_llm = ChatAnthropic(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
         elif self.config["llm_provider"].lower() == "google":
             # 使用 Google OpenAI 兼容适配器，解决工具调用格式不匹配问题
+            from tradingagents.llm_adapters.google_openai_adapter import ChatGoogleOpenAI
             logger.info(f"🔧 使用Google AI OpenAI 兼容适配器 (解决工具调用问题)")
             google_api_key = os.getenv('GOOGLE_API_KEY')
             if not google_api_key:
@@ -141,6 +146,7 @@ class TradingAgentsGraph:
               "dashscope" in self.config["llm_provider"].lower() or
               "阿里百炼" in self.config["llm_provider"]):
             # 使用 OpenAI 兼容适配器，支持原生 Function Calling
+            from tradingagents.llm_adapters.dashscope_openai_adapter import ChatDashScopeOpenAI
             logger.info(f"🔧 使用阿里百炼 OpenAI 兼容适配器 (支持原生工具调用)")
             self.deep_thinking_llm = ChatDashScopeOpenAI(
                 model=self.config["deep_think_llm"],
@@ -210,6 +216,25 @@ class TradingAgentsGraph:
             )
             
             logger.info(f"✅ [自定义OpenAI] 已配置自定义端点: {custom_base_url}")
+        elif self.config["llm_provider"].lower() == "replay":
+            # 回放录制的LLM回复，不访问模型服务（离线基准测试/压测）
+            from tradingagents.llm_adapters.replay_adapter import ChatReplay
+            replay_script = self.config.get("replay_script") or os.getenv("LLM_REPLAY_SCRIPT")
+            if not replay_script:
+                raise ValueError("使用回放模式需要在配置中设置replay_script或设置LLM_REPLAY_SCRIPT环境变量")
+            replay_latency = float(self.config.get("replay_latency", 0.0))
+
+            self.deep_thinking_llm = ChatReplay(
+                script_path=replay_script,
+                model_name=self.config["deep_think_llm"],
+                latency=replay_latency
+            )
+            self.quick_thinking_llm = ChatReplay(
+                script_path=replay_script,
+                model_name=self.config["quick_think_llm"],
+                latency=replay_latency
+            )
+            logger.info(f"📼 [回放LLM] 使用回放脚本: {replay_script}")
         else:
             raise ValueError(f"Unsupported LLM provider: {self.config['llm_provider']}")
         
@@ -258,6 +283,8 @@ class TradingAgentsGraph:
 
         # State tracking
         self.curr_state = None
+        self.last_run_stats = None
+        self.last_trace = None
         self.ticker = None
         self.log_states_dict = {}  # date to full state dict
 
@@ -311,8 +338,22 @@ class TradingAgentsGraph:
             ),
         }
 
-    def propagate(self, company_name, trade_date):
-        """Run the trading agents graph for a company on a specific date."""
+    def propagate(self, company_name, trade_date, data_context=None):
+        """Run the trading agents graph for a company on a specific date.
+
+        Args:
+            company_name: Ticker to analyze
+            trade_date: Analysis date
+            data_context: Optional RunDataContext (e.g. from prepare_stock_data)
+                whose pre-fetched data the analyst tools reuse during this run.
+                A fresh context is created when omitted; per-run dedup stats
+                are kept in ``self.last_run_stats`` and the run's tracing spans
+                in ``self.last_trace``.
+
+        When ``speculative_prefetch`` is enabled, the analysts' predictable first
+        tool calls are started in the background right after the initial state
+        is built, so the data is warm by the time the first LLM call returns.
+        """
 
         # 添加详细的接收日志
         logger.debug(f"🔍 [GRAPH DEBUG] ===== TradingAgentsGraph.propagate 接收参数 =====")
@@ -331,6 +372,33 @@ class TradingAgentsGraph:
         logger.debug(f"🔍 [GRAPH DEBUG] 初始状态中的trade_date: '{init_agent_state.get('trade_date', 'NOT_FOUND')}'")
         args = self.propagator.get_graph_args()
 
+        # 每次运行使用独立的数据上下文：数据复用和工具调用去重都限定在本次运行内
+        data_context, context_token = self.toolkit.begin_run(company_name, data_context)
+        prefetcher = None
+        if self.config.get("speculative_prefetch", True):
+            prefetcher = SpeculativePrefetcher(self.toolkit, self.selected_analysts)
+            prefetcher.start(company_name, trade_date)
+        try:
+            final_state = self._run_graph(init_agent_state, args)
+        finally:
+            if prefetcher is not None:
+                prefetcher.shutdown()
+            self.last_run_stats = self.toolkit.end_run(data_context, context_token)
+            if prefetcher is not None:
+                self.last_run_stats['prefetch'] = prefetcher.stats()
+            self.last_trace = data_context.trace
+
+        # Store current state for reflection
+        self.curr_state = final_state
+
+        # Log state
+        self._log_state(trade_date, final_state)
+
+        # Return decision and processed signal
+        return final_state, self.process_signal(final_state["final_trade_decision"], company_name)
+
+    def _run_graph(self, init_agent_state, args):
+        """Invoke (or stream in debug mode) the compiled graph and return the final state."""
         if self.debug:
             # Debug mode with tracing
             trace = []
@@ -346,14 +414,7 @@ class TradingAgentsGraph:
             # Standard mode without tracing
             final_state = self.graph.invoke(init_agent_state, **args)
 
-        # Store current state for reflection
-        self.curr_state = final_state
-
-        # Log state
-        self._log_state(trade_date, final_state)
-
-        # Return decision and processed signal
-        return final_state, self.process_signal(final_state["final_trade_decision"], company_name)
+        return final_state
 
     def _log_state(self, trade_date, final_state):
         """Log the final state to a JSON file."""
@@ -1,6 +1,27 @@
 # LLM Adapters for TradingAgents
-from .dashscope_adapter import ChatDashScope
-from .dashscope_openai_adapter import ChatDashScopeOpenAI
-from .google_openai_adapter import ChatGoogleOpenAI
+# 适配器按需导入：只加载实际使用的提供商SDK（dashscope、langchain_openai等）
+import importlib
 
-__all__ = ["ChatDashScope", "ChatDashScopeOpenAI", "ChatGoogleOpenAI"]
+_LAZY_EXPORTS = {
+    "ChatDashScope": ".dashscope_adapter",
+    "ChatDashScopeOpenAI": ".dashscope_openai_adapter",
+    "ChatGoogleOpenAI": ".google_openai_adapter",
+    "ChatReplay": ".replay_adapter",
+    "count_tokens": ".tokenizer",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
+
+__all__ = ["ChatDashScope", "ChatDashScopeOpenAI", "ChatGoogleOpenAI", "ChatReplay", "count_tokens"]
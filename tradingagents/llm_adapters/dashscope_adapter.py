@@ -8,7 +8,8 @@ import json
 from typing import Any, Dict, List, Optional, Union, Iterator, AsyncIterator, Sequence
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage
-from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
 from langchain_core.callbacks.manager import CallbackManagerForLLMRun, AsyncCallbackManagerForLLMRun
 from langchain_core.tools import BaseTool
 from langchain_core.utils.function_calling import convert_to_openai_tool
@@ -19,6 +20,9 @@ from ..config.config_manager import token_tracker
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.cassette import cassette_llm_call
+from tradingagents.utils.token_stream import stream_generate
+from tradingagents.utils.tracing import trace_llm_call
 logger = get_logger('agents')
 
 
@@ -93,6 +97,8 @@ class ChatDashScope(BaseChatModel):
         
         return dashscope_messages
     
+    @trace_llm_call("dashscope")
+    @cassette_llm_call("dashscope")
     def _generate(
         self,
         messages: List[BaseMessage],
@@ -101,6 +107,23 @@ class ChatDashScope(BaseChatModel):
         **kwargs: Any,
     ) -> ChatResult:
         """生成聊天回复"""
+
+        # 界面注册了流式回调时改用流式接口
+        streamed = stream_generate(self._stream, messages, stop, run_manager, model_name=self.model, **kwargs)
+        if streamed is not None:
+            usage = streamed.llm_output['token_usage']
+            try:
+                token_tracker.track_usage(
+                    provider="dashscope",
+                    model_name=self.model,
+                    input_tokens=usage['prompt_tokens'],
+                    output_tokens=usage['completion_tokens'],
+                    session_id=kwargs.get('session_id', f"dashscope_{hash(str(messages))%10000}"),
+                    analysis_type=kwargs.get('analysis_type', 'stock_analysis')
+                )
+            except Exception as track_error:
+                logger.info(f"Token tracking failed: {track_error}")
+            return streamed
         
         # 转换消息格式
         dashscope_messages = self._convert_messages_to_dashscope_format(messages)
@@ -184,6 +207,48 @@ class ChatDashScope(BaseChatModel):
         except Exception as e:
             raise Exception(f"Error calling DashScope API: {str(e)}")
     
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """流式生成聊天回复（增量输出）"""
+        request_params = {
+            "model": self.model,
+            "messages": self._convert_messages_to_dashscope_format(messages),
+            "result_format": "message",
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "top_p": self.top_p,
+            "stream": True,
+            "incremental_output": True,
+        }
+        if stop:
+            request_params["stop"] = stop
+        request_params.update(kwargs)
+
+        usage_metadata = None
+        for response in Generation.call(**request_params):
+            if response.status_code != 200:
+                raise Exception(f"DashScope API error: {response.code} - {response.message}")
+            content = response.output.choices[0].message.content or ""
+            usage = getattr(response, 'usage', None)
+            if usage and getattr(usage, 'input_tokens', None) is not None:
+                usage_metadata = {
+                    "input_tokens": usage.input_tokens,
+                    "output_tokens": usage.output_tokens,
+                    "total_tokens": usage.input_tokens + usage.output_tokens,
+                }
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=content))
+            if run_manager and content:
+                run_manager.on_llm_new_token(content, chunk=chunk)
+            yield chunk
+        # 增量输出时用量在每个响应中为累计值，只在最后附加一次
+        if usage_metadata:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage_metadata))
+
     async def _agenerate(
         self,
         messages: List[BaseMessage],
@@ -13,6 +13,9 @@ from ..config.config_manager import token_tracker
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.cassette import cassette_llm_call
+from tradingagents.utils.token_stream import stream_generate
+from tradingagents.utils.tracing import trace_llm_call
 logger = get_logger('agents')
 
 
@@ -50,11 +53,15 @@ class ChatDashScopeOpenAI(ChatOpenAI):
         api_base = getattr(self, 'base_url', None) or getattr(self, 'openai_api_base', None) or kwargs.get('base_url', 'unknown')
         logger.info(f"   API Base: {api_base}")
     
+    @trace_llm_call("dashscope")
+    @cassette_llm_call("dashscope")
     def _generate(self, *args, **kwargs):
         """重写生成方法，添加 token 使用量追踪"""
         
-        # 调用父类的生成方法
-        result = super()._generate(*args, **kwargs)
+        # 调用父类的生成方法（界面注册了流式回调时改用流式接口）
+        result = stream_generate(super()._stream, *args, model_name=self.model_name, **kwargs)
+        if result is None:
+            result = super()._generate(*args, **kwargs)
         
         # 追踪 token 使用量
         try:
@@ -15,6 +15,10 @@ from tradingagents.utils.logging_init import setup_llm_logging
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger, get_logger_manager
+from tradingagents.utils.cassette import cassette_llm_call
+from tradingagents.utils.token_stream import stream_generate
+from tradingagents.utils.tracing import trace_llm_call
+from .tokenizer import count_text_tokens, count_tokens
 logger = get_logger('agents')
 logger = setup_llm_logging()
 
@@ -74,6 +78,8 @@ class ChatDeepSeek(ChatOpenAI):
         
         self.model_name = model
         
+    @trace_llm_call("deepseek")
+    @cassette_llm_call("deepseek")
     def _generate(
         self,
         messages: List[BaseMessage],
@@ -93,8 +99,11 @@ class ChatDeepSeek(ChatOpenAI):
         analysis_type = kwargs.pop('analysis_type', None)
 
         try:
-            # 调用父类方法生成响应
-            result = super()._generate(messages, stop, run_manager, **kwargs)
+            # 调用父类方法生成响应（界面注册了流式回调时改用流式接口）
+            result = stream_generate(super()._stream, messages, stop, run_manager,
+                                     model_name=self.model_name, **kwargs)
+            if result is None:
+                result = super()._generate(messages, stop, run_manager, **kwargs)
             
             # 提取token使用量
             input_tokens = 0
@@ -109,7 +118,7 @@ class ChatDeepSeek(ChatOpenAI):
             
             # 如果没有获取到token使用量，进行估算
             if input_tokens == 0 and output_tokens == 0:
-                input_tokens = self._estimate_input_tokens(messages)
+                input_tokens = self._estimate_input_tokens(messages, kwargs.get('tools'))
                 output_tokens = self._estimate_output_tokens(result)
                 logger.debug(f"🔍 [DeepSeek] 使用估算token: 输入={input_tokens}, 输出={output_tokens}")
             else:
@@ -159,26 +168,19 @@ class ChatDeepSeek(ChatOpenAI):
             logger.error(f"❌ [DeepSeek] 调用失败: {e}", exc_info=True)
             raise
     
-    def _estimate_input_tokens(self, messages: List[BaseMessage]) -> int:
+    def _estimate_input_tokens(self, messages: List[BaseMessage], tools: Optional[List[Any]] = None) -> int:
         """
-        估算输入token数量
-        
+        估算输入token数量（API未返回用量时使用）
+
         Args:
             messages: 输入消息列表
-            
+            tools: 绑定的工具定义
+
         Returns:
             估算的输入token数量
         """
-        total_chars = 0
-        for message in messages:
-            if hasattr(message, 'content'):
-                total_chars += len(str(message.content))
-        
-        # 粗略估算：中文约1.5字符/token，英文约4字符/token
-        # 这里使用保守估算：2字符/token
-        estimated_tokens = max(1, total_chars // 2)
-        return estimated_tokens
-    
+        return count_tokens(messages, self.model_name, tools)
+
     def _estimate_output_tokens(self, result: ChatResult) -> int:
         """
         估算输出token数量
@@ -189,14 +191,17 @@ class ChatDeepSeek(ChatOpenAI):
         Returns:
             估算的输出token数量
         """
-        total_chars = 0
-        for generation in result.generations:
-            if hasattr(generation, 'message') and hasattr(generation.message, 'content'):
-                total_chars += len(str(generation.message.content))
-        
-        # 粗略估算：2字符/token
-        estimated_tokens = max(1, total_chars // 2)
-        return estimated_tokens
+        return sum(count_text_tokens(str(generation.message.content), self.model_name)
+                   for generation in result.generations
+                   if hasattr(generation, 'message') and hasattr(generation.message, 'content'))
+
+    def get_num_tokens(self, text: str) -> int:
+        """统计文本的token数"""
+        return count_text_tokens(text, self.model_name)
+
+    def get_num_tokens_from_messages(self, messages: List[BaseMessage], tools: Optional[List[Any]] = None) -> int:
+        """统计消息的token数（供提示词预算使用）"""
+        return count_tokens(messages, self.model_name, tools)
     
     def invoke(
         self,
@@ -15,6 +15,9 @@ from ..config.config_manager import token_tracker
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.cassette import cassette_llm_call
+from tradingagents.utils.token_stream import stream_generate
+from tradingagents.utils.tracing import trace_llm_call
 logger = get_logger('agents')
 
 
@@ -50,12 +53,18 @@ class ChatGoogleOpenAI(ChatGoogleGenerativeAI):
         logger.info(f"   温度: {kwargs.get('temperature', 0.1)}")
         logger.info(f"   最大Token: {kwargs.get('max_tokens', 2000)}")
     
+    @trace_llm_call("google")
+    @cassette_llm_call("google")
     def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs) -> LLMResult:
         """重写生成方法，优化工具调用处理和内容格式"""
         
         try:
-            # 调用父类的生成方法
-            result = super()._generate(messages, stop, **kwargs)
+            # 调用父类的生成方法（界面注册了流式回调时改用流式接口）
+            run_manager = kwargs.pop('run_manager', None)
+            result = stream_generate(super()._stream, messages, stop, run_manager,
+                                     model_name=self.model, **kwargs)
+            if result is None:
+                result = super()._generate(messages, stop, run_manager=run_manager, **kwargs)
             
             # 优化返回内容格式
             if result and result.generations:
@@ -16,6 +16,10 @@ from tradingagents.utils.logging_init import setup_llm_logging
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger, get_logger_manager
+from tradingagents.utils.cassette import cassette_llm_call
+from tradingagents.utils.token_stream import stream_generate
+from tradingagents.utils.tracing import trace_llm_call
+from .tokenizer import count_text_tokens, count_tokens
 logger = get_logger('agents')
 logger = setup_llm_logging()
 
@@ -101,6 +105,8 @@ class OpenAICompatibleBase(ChatOpenAI):
         logger.info(f"   模型: {model}")
         logger.info(f"   API Base: {base_url}")
     
+    @trace_llm_call()
+    @cassette_llm_call()
     def _generate(
         self,
         messages: List[BaseMessage],
@@ -115,59 +121,75 @@ class OpenAICompatibleBase(ChatOpenAI):
         # 记录开始时间
         start_time = time.time()
         
-        # 调用父类生成方法
-        result = super()._generate(messages, stop, run_manager, **kwargs)
+        # 调用父类生成方法（界面注册了流式回调时改用流式接口）
+        result = stream_generate(super()._stream, messages, stop, run_manager,
+                                 model_name=self.model_name, **kwargs)
+        if result is None:
+            result = super()._generate(messages, stop, run_manager, **kwargs)
         
         # 记录token使用量
         if TOKEN_TRACKING_ENABLED:
             try:
-                self._track_token_usage(result, kwargs, start_time)
+                self._track_token_usage(result, kwargs, start_time, messages)
             except Exception as e:
                 logger.error(f"⚠️ {self.provider_name} Token追踪失败: {e}", exc_info=True)
         
         return result
     
-    def _track_token_usage(self, result: ChatResult, kwargs: Dict, start_time: float):
+    def get_num_tokens(self, text: str) -> int:
+        """统计文本的token数（使用模型对应的分词器，非OpenAI模型不依赖tiktoken的模型映射）"""
+        return count_text_tokens(text, self.model_name)
+
+    def get_num_tokens_from_messages(self, messages: List[BaseMessage], tools: Optional[List[Any]] = None) -> int:
+        """统计消息的token数（供提示词预算使用）"""
+        return count_tokens(messages, self.model_name, tools)
+
+    def _track_token_usage(self, result: ChatResult, kwargs: Dict, start_time: float,
+                           messages: Optional[List[BaseMessage]] = None):
         """追踪token使用量"""
         
-        # 提取token使用信息
-        if hasattr(result, 'llm_output') and result.llm_output:
-            token_usage = result.llm_output.get('token_usage', {})
+        # 提取token使用信息（部分供应商不返回 llm_output）
+        token_usage = (getattr(result, 'llm_output', None) or {}).get('token_usage') or {}
+        input_tokens = token_usage.get('prompt_tokens', 0)
+        output_tokens = token_usage.get('completion_tokens', 0)
+
+        # API未返回用量时用分词器估算
+        if input_tokens == 0 and output_tokens == 0 and messages:
+            input_tokens = count_tokens(messages, self.model_name, kwargs.get('tools'))
+            output_tokens = sum(count_text_tokens(str(g.message.content), self.model_name)
+                                for g in result.generations)
+            logger.debug(f"🔍 [{self.provider_name}] 使用估算token: 输入={input_tokens}, 输出={output_tokens}")
+        
+        if input_tokens > 0 or output_tokens > 0:
+            # 生成会话ID
+            session_id = kwargs.get('session_id', f"{self.provider_name}_{hash(str(kwargs))%10000}")
+            analysis_type = kwargs.get('analysis_type', 'stock_analysis')
             
-            input_tokens = token_usage.get('prompt_tokens', 0)
-            output_tokens = token_usage.get('completion_tokens', 0)
+            # 记录使用量
+            token_tracker.track_usage(
+                provider=self.provider_name,
+                model_name=self.model_name,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                session_id=session_id,
+                analysis_type=analysis_type
+            )
             
-            if input_tokens > 0 or output_tokens > 0:
-                # 生成会话ID
-                session_id = kwargs.get('session_id', f"{self.provider_name}_{hash(str(kwargs))%10000}")
-                analysis_type = kwargs.get('analysis_type', 'stock_analysis')
-                
-                # 记录使用量
-                token_tracker.track_usage(
-                    provider=self.provider_name,
-                    model_name=self.model_name,
-                    input_tokens=input_tokens,
-                    output_tokens=output_tokens,
-                    session_id=session_id,
-                    analysis_type=analysis_type
-                )
-                
-                # 计算成本
-                cost = token_tracker.calculate_cost(
-                    provider=self.provider_name,
-                    model_name=self.model_name,
-                    input_tokens=input_tokens,
-                    output_tokens=output_tokens
-                )
-                
-                # 使用统一日志管理器记录Token使用
-                logger_manager = get_logger_manager()
-                logger_manager.log_token_usage(
-                    logger, self.provider_name, self.model_name,
-                    input_tokens, output_tokens, cost,
-                    session_id
-                )
-
+            # 计算成本
+            cost = token_tracker.calculate_cost(
+                provider=self.provider_name,
+                model_name=self.model_name,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens
+            )
+            
+            # 使用统一日志管理器记录Token使用
+            logger_manager = get_logger_manager()
+            logger_manager.log_token_usage(
+                logger, self.provider_name, self.model_name,
+                input_tokens, output_tokens, cost,
+                session_id
+            )
 
 class ChatDeepSeekOpenAI(OpenAICompatibleBase):
     """DeepSeek OpenAI兼容适配器"""
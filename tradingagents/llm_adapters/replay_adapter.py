@@ -0,0 +1,123 @@
+"""
+回放 LLM 适配器
+按录制的脚本返回固定回复，不访问任何模型服务，用于离线基准测试和压测
+
+脚本文件格式（JSON）:
+{
+    "model": "replay-000001",
+    "tool_calls": {"get_stock_market_data_unified": {"ticker": "000001", ...}},
+    "completions": [
+        {"name": "bull_researcher", "match": ["你是一位看涨分析师"], "content": "..."}
+    ],
+    "default": "..."
+}
+
+- 绑定了工具且对话中还没有工具结果时，返回脚本中该工具的调用（按 tool_calls 的顺序取第一个已绑定的工具）
+- 否则依次用第一条消息、最后一条消息的文本匹配 completions 中的关键词，返回第一个命中的回复
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.callbacks.manager import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.tracing import trace_llm_call
+logger = get_logger('agents')
+
+# 已加载的脚本（按路径缓存，bind_tools 复制出的实例共享同一份）
+_scripts: Dict[str, Dict[str, Any]] = {}
+_scripts_lock = threading.Lock()
+
+
+def load_replay_script(path: str) -> Dict[str, Any]:
+    """加载回放脚本"""
+    script = _scripts.get(path)
+    if script is None:
+        with _scripts_lock:
+            script = _scripts.get(path)
+            if script is None:
+                with open(path, 'r', encoding='utf-8') as f:
+                    script = json.load(f)
+                _scripts[path] = script
+                logger.info(f"📼 [回放LLM] 已加载回放脚本: {path}（{len(script.get('completions', []))}条回复）")
+    return script
+
+
+def _message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, list):
+        return "\n".join(part.get('text', '') if isinstance(part, dict) else str(part) for part in content)
+    return str(content)
+
+
+class ChatReplay(BaseChatModel):
+    """按录制脚本回复的 LangChain 聊天模型"""
+
+    script_path: str = Field(description="回放脚本路径")
+    model_name: str = Field(default="replay", description="模型名称（仅用于日志和追踪）")
+    latency: float = Field(default=0.0, description="每次调用注入的延迟（秒）")
+    bound_tools: List[str] = Field(default_factory=list, description="已绑定的工具名称")
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "script_path": self.script_path}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "ChatReplay":
+        """绑定工具：只记录工具名称，调用参数来自脚本"""
+        names = []
+        for tool in tools:
+            if isinstance(tool, dict):
+                names.append(tool.get('name') or tool.get('function', {}).get('name'))
+            else:
+                names.append(getattr(tool, 'name', None) or getattr(tool, '__name__', str(tool)))
+        return self.model_copy(update={'bound_tools': names})
+
+    def _select_tool_call(self, script: Dict[str, Any], messages: List[BaseMessage]) -> Optional[Dict[str, Any]]:
+        if not self.bound_tools or any(isinstance(m, ToolMessage) for m in messages):
+            return None
+        for name, args in script.get('tool_calls', {}).items():
+            if name in self.bound_tools:
+                return {'name': name, 'args': dict(args), 'id': f"call_replay_{name}"}
+        return None
+
+    def _select_completion(self, script: Dict[str, Any], messages: List[BaseMessage]) -> str:
+        probes = [_message_text(messages[0]), _message_text(messages[-1])] if messages else []
+        for probe in probes:
+            for completion in script.get('completions', []):
+                if any(keyword in probe for keyword in completion['match']):
+                    return completion['content']
+        logger.debug("📼 [回放LLM] 未匹配到脚本回复，使用默认回复")
+        return script.get('default', '')
+
+    @trace_llm_call("replay")
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        script = load_replay_script(self.script_path)
+        tool_call = self._select_tool_call(script, messages)
+        if tool_call is not None:
+            message = AIMessage(content="", tool_calls=[tool_call])
+        else:
+            message = AIMessage(content=self._select_completion(script, messages))
+
+        return ChatResult(generations=[ChatGeneration(message=message)],
+                          llm_output={'model_name': self.model_name})
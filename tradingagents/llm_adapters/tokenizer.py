@@ -0,0 +1,253 @@
+"""
+Token 计数
+为 OpenAI 兼容适配器提供可替换的分词器，在 API 未返回用量时估算 token，并供提示词预算功能使用。
+
+分词器选择（按模型名称前缀）：
+- 通过 register_tokenizer() 或 TRADINGAGENTS_TOKENIZER_FILES 环境变量注册的分词器优先，
+  例如 TRADINGAGENTS_TOKENIZER_FILES="deepseek=/models/deepseek/tokenizer.json,qwen=/models/qwen/tokenizer.json"
+  使用 HuggingFace tokenizers 加载官方 tokenizer.json
+- OpenAI 模型使用 tiktoken（gpt-4o / o 系列为 o200k_base，其余为 cl100k_base）
+- 其他模型、或以上依赖不可用时，按 DeepSeek 官方换算比例估算（中文字符约0.6 token，其他字符约0.3 token）
+
+同一段文本（系统提示词、工具定义、重复出现的报告）的计数会被缓存，多轮对话中只对新增消息分词。
+"""
+
+import json
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 每条消息的格式开销（角色标记等），以及回复前缀开销，参考 OpenAI ChatML 计数方式
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+# 文本计数缓存的最大条目数
+DEFAULT_CACHE_SIZE = 4096
+
+# 中日韩文字及全角标点
+_CJK_PATTERN = re.compile(r'[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]')
+
+
+class Tokenizer(ABC):
+    """分词器基类：只需实现 count"""
+
+    name = "base"
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """返回文本的token数"""
+
+
+class HeuristicTokenizer(Tokenizer):
+    """按字符类别估算（无需任何依赖）"""
+
+    name = "heuristic"
+
+    def __init__(self, cjk_ratio: float = 0.6, other_ratio: float = 0.3):
+        self.cjk_ratio = cjk_ratio
+        self.other_ratio = other_ratio
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        cjk = len(_CJK_PATTERN.findall(text))
+        return max(1, int(cjk * self.cjk_ratio + (len(text) - cjk) * self.other_ratio + 0.5))
+
+
+class TiktokenTokenizer(Tokenizer):
+    """tiktoken BPE 分词器"""
+
+    def __init__(self, encoding_name: str):
+        import tiktoken
+        self._encoding = tiktoken.get_encoding(encoding_name)
+        self.name = f"tiktoken:{encoding_name}"
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=())) if text else 0
+
+
+class HuggingFaceTokenizer(Tokenizer):
+    """HuggingFace tokenizers 加载的 tokenizer.json（DeepSeek、Qwen 等官方分词器）"""
+
+    def __init__(self, path: str):
+        from tokenizers import Tokenizer as HFTokenizer
+        self._tokenizer = HFTokenizer.from_file(path)
+        self.name = f"hf:{os.path.basename(os.path.dirname(path)) or path}"
+
+    def count(self, text: str) -> int:
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids) if text else 0
+
+
+class CachedTokenizer(Tokenizer):
+    """带 LRU 缓存的分词器包装"""
+
+    def __init__(self, tokenizer: Tokenizer, max_size: int = DEFAULT_CACHE_SIZE):
+        self.tokenizer = tokenizer
+        self.name = tokenizer.name
+        self.max_size = max_size
+        self._cache: 'OrderedDict[str, int]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        with self._lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                self.hits += 1
+                return cached
+        count = self.tokenizer.count(text)
+        with self._lock:
+            self.misses += 1
+            self._cache[text] = count
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {'tokenizer': self.name, 'entries': len(self._cache), 'hits': self.hits,
+                'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0}
+
+
+# 模型名称前缀 -> 分词器工厂
+_factories: Dict[str, Callable[[], Tokenizer]] = {}
+# 模型名称 -> 分词器实例
+_tokenizers: Dict[str, CachedTokenizer] = {}
+_registry_lock = threading.Lock()
+_env_loaded = False
+
+
+def register_tokenizer(model_prefix: str, factory: Callable[[], Tokenizer]):
+    """为模型名称前缀（不区分大小写）注册分词器工厂"""
+    with _registry_lock:
+        _factories[model_prefix.lower()] = factory
+        _tokenizers.clear()
+
+
+def _load_env_tokenizers():
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    for item in filter(None, os.getenv('TRADINGAGENTS_TOKENIZER_FILES', '').split(',')):
+        prefix, _, path = item.partition('=')
+        if prefix and path:
+            _factories.setdefault(prefix.strip().lower(), lambda p=path.strip(): HuggingFaceTokenizer(p))
+
+
+def _default_tokenizer(model: str) -> Tokenizer:
+    if model.startswith(('gpt-4o', 'gpt-4.1', 'o1', 'o3', 'o4', 'gpt-5')):
+        return TiktokenTokenizer('o200k_base')
+    if model.startswith(('gpt-', 'text-embedding')):
+        return TiktokenTokenizer('cl100k_base')
+    return HeuristicTokenizer()
+
+
+def get_tokenizer(model: Optional[str] = None) -> CachedTokenizer:
+    """获取模型对应的（带缓存的）分词器"""
+    model = (model or '').lower()
+    tokenizer = _tokenizers.get(model)
+    if tokenizer is not None:
+        return tokenizer
+
+    with _registry_lock:
+        tokenizer = _tokenizers.get(model)
+        if tokenizer is not None:
+            return tokenizer
+        _load_env_tokenizers()
+        prefix = max((p for p in _factories if model.startswith(p)), key=len, default=None)
+        try:
+            base = _factories[prefix]() if prefix is not None else _default_tokenizer(model)
+        except Exception as e:
+            # tiktoken / tokenizers 未安装，或分词器文件无法加载
+            logger.warning(f"⚠️ [Token计数] 模型 {model or 'default'} 的分词器加载失败，使用估算: {e}")
+            base = HeuristicTokenizer()
+        tokenizer = CachedTokenizer(base)
+        _tokenizers[model] = tokenizer
+        logger.debug(f"🔢 [Token计数] 模型 {model or 'default'} 使用分词器: {tokenizer.name}")
+        return tokenizer
+
+
+def _message_parts(message: Any) -> List[str]:
+    """提取消息中需要计数的文本：角色、内容、工具调用"""
+    if isinstance(message, str):
+        return [message]
+    if isinstance(message, dict):
+        role, content = message.get('role', ''), message.get('content', '')
+        tool_calls = message.get('tool_calls')
+    else:
+        role, content = getattr(message, 'type', ''), getattr(message, 'content', '')
+        tool_calls = getattr(message, 'tool_calls', None)
+
+    if isinstance(content, list):
+        content = "\n".join(part.get('text', '') if isinstance(part, dict) else str(part) for part in content)
+    parts = [str(role), str(content or '')]
+    for call in tool_calls or ():
+        parts.append(call.get('name', '') if isinstance(call, dict) else str(call))
+        args = call.get('args') if isinstance(call, dict) else None
+        if args:
+            parts.append(json.dumps(args, ensure_ascii=False, sort_keys=True))
+    return parts
+
+
+# 工具名称 -> 工具定义JSON（工具对象在进程内不变，转换只做一次）
+_tool_schemas: Dict[str, str] = {}
+
+
+def _tool_schema(tool: Any) -> str:
+    if isinstance(tool, dict):
+        return json.dumps(tool, ensure_ascii=False, sort_keys=True)
+    name = getattr(tool, 'name', None) or getattr(tool, '__name__', None)
+    schema = _tool_schemas.get(name) if name else None
+    if schema is None:
+        try:
+            from langchain_core.utils.function_calling import convert_to_openai_tool
+            schema = json.dumps(convert_to_openai_tool(tool), ensure_ascii=False, sort_keys=True)
+        except Exception:
+            schema = f"{name or tool}: {getattr(tool, 'description', '')}"
+        if name:
+            _tool_schemas[name] = schema
+    return schema
+
+
+def count_text_tokens(text: str, model: Optional[str] = None) -> int:
+    """统计一段文本的 token 数"""
+    return get_tokenizer(model).count(text)
+
+
+def count_tokens(messages: Iterable[Any], model: Optional[str] = None,
+                 tools: Optional[Sequence[Any]] = None) -> int:
+    """
+    统计一组聊天消息（及绑定的工具定义）的输入 token 数
+
+    Args:
+        messages: LangChain 消息、{'role', 'content'} 字典或字符串
+        model: 模型名称，用于选择分词器
+        tools: 绑定的工具（LangChain 工具或 OpenAI 工具定义字典）
+
+    Returns:
+        int: token 数
+    """
+    tokenizer = get_tokenizer(model)
+    total = TOKENS_PER_REPLY
+    for message in messages:
+        total += TOKENS_PER_MESSAGE + sum(tokenizer.count(part) for part in _message_parts(message))
+    for tool in tools or ():
+        total += tokenizer.count(_tool_schema(tool))
+    return total
+
+
+def tokenizer_stats() -> List[Dict[str, Any]]:
+    """各模型分词器的缓存统计"""
+    return [dict(tokenizer.stats(), model=model) for model, tokenizer in list(_tokenizers.items())]
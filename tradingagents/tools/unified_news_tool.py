@@ -64,6 +64,16 @@ class UnifiedNewsAnalyzer:
         
         return result
     
+    @staticmethod
+    def hk_news_query(stock_code: str) -> str:
+        """港股Google新闻搜索词"""
+        return f"{stock_code} 港股 香港股票 新闻"
+
+    @staticmethod
+    def us_news_query(stock_code: str) -> str:
+        """美股Google新闻搜索词"""
+        return f"{stock_code} stock news earnings financial"
+
     def _identify_stock_type(self, stock_code: str) -> str:
         """识别股票类型"""
         stock_code = stock_code.upper().strip()
@@ -154,7 +164,7 @@ class UnifiedNewsAnalyzer:
         try:
             if hasattr(self.toolkit, 'get_google_news'):
                 logger.info(f"[统一新闻工具] 尝试Google港股新闻...")
-                query = f"{stock_code} 港股 香港股票 新闻"
+                query = self.hk_news_query(stock_code)
                 # 使用LangChain工具的正确调用方式：.invoke()方法和字典参数
                 result = self.toolkit.get_google_news.invoke({"query": query, "curr_date": curr_date})
                 if result and len(result.strip()) > 50:
@@ -212,7 +222,7 @@ class UnifiedNewsAnalyzer:
         try:
             if hasattr(self.toolkit, 'get_google_news'):
                 logger.info(f"[统一新闻工具] 尝试Google美股新闻...")
-                query = f"{stock_code} stock news earnings financial"
+                query = self.us_news_query(stock_code)
                 # 使用LangChain工具的正确调用方式：.invoke()方法和字典参数
                 result = self.toolkit.get_google_news.invoke({"query": query, "curr_date": curr_date})
                 if result and len(result.strip()) > 50:
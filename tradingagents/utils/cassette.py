@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+LLM / 数据源调用录制与回放
+record 模式把真实的请求和响应（含耗时）追加写入录制目录；replay 模式按请求内容查找录制的响应返回，
+并按录制耗时（或固定延迟）注入等待，不访问任何模型服务和数据源，用于压测和容量规划。
+
+录制目录下每类调用一个 JSONL 文件（llm.jsonl、data.jsonl、embedding.jsonl），每行一条:
+    {"key": ..., "loose_key": ..., "name": ..., "request": {...}, "response": ..., "duration": 1.23}
+
+匹配规则：先按请求完整内容的哈希（key）匹配；未命中时按去掉日期时间后的哈希（loose_key）匹配，
+使录制的数据在之后的日期回放时仍然可用。同一请求录制了多条响应时按顺序轮流返回。
+
+配置（环境变量，或调用 configure_cassette）:
+    TRADINGAGENTS_CASSETTE_MODE: off（默认）/ record / replay
+    TRADINGAGENTS_CASSETTE_DIR: 录制目录，默认 ./cassettes
+    TRADINGAGENTS_REPLAY_LATENCY: recorded（默认，按录制耗时）或固定秒数
+    TRADINGAGENTS_REPLAY_LATENCY_SCALE: 延迟缩放系数，默认 1.0
+"""
+
+import functools
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.tracing import trace_event
+logger = get_logger('agents')
+
+MODES = ('off', 'record', 'replay')
+
+# 宽松匹配时抹去的日期时间（2025-07-01、20250701、2025-07-01 09:30:00 等）
+_DATETIME_PATTERN = re.compile(r'\d{4}-?\d{2}-?\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?')
+
+
+class CassetteMissError(RuntimeError):
+    """回放模式下没有找到与请求匹配的录制响应"""
+
+
+def _digest(payload: str) -> str:
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def request_keys(name: str, request: Any) -> Tuple[str, str]:
+    """请求的精确匹配键和宽松匹配键"""
+    payload = json.dumps({'name': name, 'request': request}, sort_keys=True, ensure_ascii=False, default=str)
+    return _digest(payload), _digest(_DATETIME_PATTERN.sub('<datetime>', payload))
+
+
+class Cassette:
+    """一个录制目录"""
+
+    def __init__(self, directory: str, mode: str = 'replay', latency: Optional[float] = None,
+                 latency_scale: float = 1.0):
+        """
+        Args:
+            directory: 录制目录
+            mode: record 或 replay
+            latency: 回放时每次调用的固定延迟（秒）；None 表示按录制耗时
+            latency_scale: 延迟缩放系数
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"不支持的录制模式: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        # kind -> key -> [entry]
+        self._entries: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self._loose_entries: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self._cursors: Dict[str, itertools.count] = {}
+        self.stats = {'recorded': 0, 'replayed': 0, 'loose_hits': 0, 'misses': 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, kind: str) -> str:
+        return os.path.join(self.directory, f"{kind}.jsonl")
+
+    def _load(self, kind: str):
+        """加载一类调用的录制（每类只加载一次）"""
+        if kind in self._entries:
+            return
+        with self._lock:
+            if kind in self._entries:
+                return
+            exact, loose = {}, {}
+            path = self._path(kind)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        entry = json.loads(line)
+                        exact.setdefault(entry['key'], []).append(entry)
+                        loose.setdefault(entry['loose_key'], []).append(entry)
+            self._loose_entries[kind] = loose
+            self._entries[kind] = exact
+            logger.info(f"📼 [回放] 已加载 {kind} 录制 {sum(len(v) for v in exact.values())} 条: {path}")
+
+    def record(self, kind: str, name: str, request: Any, response: Any, duration: float):
+        """追加一条录制"""
+        key, loose_key = request_keys(name, request)
+        entry = {
+            'key': key,
+            'loose_key': loose_key,
+            'name': name,
+            'request': request,
+            'response': response,
+            'duration': round(duration, 4),
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self._path(kind), 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            self.stats['recorded'] += 1
+
+    def lookup(self, kind: str, name: str, request: Any) -> Dict[str, Any]:
+        """
+        查找录制的响应
+
+        Raises:
+            CassetteMissError: 没有匹配的录制
+        """
+        self._load(kind)
+        key, loose_key = request_keys(name, request)
+        candidates = self._entries[kind].get(key)
+        cursor_key = f"{kind}:{key}"
+        if not candidates:
+            candidates = self._loose_entries[kind].get(loose_key)
+            cursor_key = f"{kind}:~{loose_key}"
+            if candidates:
+                self.stats['loose_hits'] += 1
+        if not candidates:
+            self.stats['misses'] += 1
+            trace_event('cassette.miss')
+            raise CassetteMissError(f"没有找到 {kind}/{name} 的录制响应（录制目录: {self.directory}）")
+
+        cursor = self._cursors.get(cursor_key)
+        if cursor is None:
+            with self._lock:
+                cursor = self._cursors.setdefault(cursor_key, itertools.count())
+        self.stats['replayed'] += 1
+        trace_event('cassette.replay')
+        return candidates[next(cursor) % len(candidates)]
+
+    def replay_delay(self, entry: Dict[str, Any]) -> float:
+        """回放时注入的延迟（秒）"""
+        base = self.latency if self.latency is not None else entry.get('duration', 0.0)
+        return max(0.0, base * self.latency_scale)
+
+    def replay(self, kind: str, name: str, request: Any) -> Any:
+        """查找录制的响应并按配置等待"""
+        entry = self.lookup(kind, name, request)
+        delay = self.replay_delay(entry)
+        if delay > 0:
+            time.sleep(delay)
+        return entry['response']
+
+
+_cassette: Optional[Cassette] = None
+_cassette_loaded = False
+_cassette_lock = threading.Lock()
+
+
+def _cassette_from_env() -> Optional[Cassette]:
+    mode = os.getenv('TRADINGAGENTS_CASSETTE_MODE', 'off').lower()
+    if mode not in MODES:
+        logger.warning(f"⚠️ 无效的 TRADINGAGENTS_CASSETTE_MODE={mode}，已关闭录制/回放")
+        return None
+    if mode == 'off':
+        return None
+    latency_env = os.getenv('TRADINGAGENTS_REPLAY_LATENCY', 'recorded').lower()
+    latency = None if latency_env == 'recorded' else float(latency_env)
+    cassette = Cassette(os.getenv('TRADINGAGENTS_CASSETTE_DIR', './cassettes'), mode, latency,
+                        float(os.getenv('TRADINGAGENTS_REPLAY_LATENCY_SCALE', '1.0')))
+    logger.info(f"📼 录制/回放已启用: mode={mode}, dir={cassette.directory}")
+    return cassette
+
+
+def get_cassette() -> Optional[Cassette]:
+    """获取当前录制目录；未启用录制/回放时返回 None"""
+    global _cassette, _cassette_loaded
+    if not _cassette_loaded:
+        with _cassette_lock:
+            if not _cassette_loaded:
+                _cassette = _cassette_from_env()
+                _cassette_loaded = True
+    return _cassette
+
+
+def configure_cassette(mode: str, directory: Optional[str] = None, latency: Optional[float] = None,
+                       latency_scale: float = 1.0) -> Optional[Cassette]:
+    """以代码方式启用/关闭录制或回放（覆盖环境变量配置）"""
+    global _cassette, _cassette_loaded
+    if mode not in MODES:
+        raise ValueError(f"不支持的录制模式: {mode}")
+    with _cassette_lock:
+        _cassette = None if mode == 'off' else Cassette(directory or './cassettes', mode, latency, latency_scale)
+        _cassette_loaded = True
+    return _cassette
+
+
+def _call_request(signature: inspect.Signature, args, kwargs) -> Dict[str, Any]:
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return {k: v for k, v in bound.arguments.items() if k not in ('self', 'cls')}
+
+
+def cassette_call(kind: str, name: Optional[str] = None):
+    """
+    数据源/向量化等返回 JSON 可序列化结果的方法的录制/回放装饰器
+    请求为除 self 外的全部参数
+    """
+    def decorator(func: Callable) -> Callable:
+        call_name = name or func.__qualname__
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cassette = get_cassette()
+            if cassette is None:
+                return func(*args, **kwargs)
+            request = _call_request(signature, args, kwargs)
+            if cassette.mode == 'replay':
+                return cassette.replay(kind, call_name, request)
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            cassette.record(kind, call_name, request, result, time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorator
+
+
+def _message_request(message) -> Dict[str, Any]:
+    request = {'type': message.type, 'content': message.content}
+    tool_calls = getattr(message, 'tool_calls', None)
+    if tool_calls:
+        request['tool_calls'] = [{'name': c['name'], 'args': c['args']} for c in tool_calls]
+    return request
+
+
+def _tool_names(tools) -> List[str]:
+    names = []
+    for tool in tools or ():
+        if isinstance(tool, dict):
+            names.append(tool.get('name') or tool.get('function', {}).get('name'))
+        else:
+            names.append(getattr(tool, 'name', None) or str(tool))
+    return sorted(str(n) for n in names)
+
+
+def _dump_chat_result(result) -> Dict[str, Any]:
+    from langchain_core.messages import message_to_dict
+    return {
+        'generations': [{'message': message_to_dict(g.message), 'generation_info': g.generation_info}
+                        for g in result.generations],
+        'llm_output': result.llm_output,
+    }
+
+
+def _load_chat_result(data: Dict[str, Any]):
+    from langchain_core.messages import messages_from_dict
+    from langchain_core.outputs import ChatGeneration, ChatResult
+    messages = messages_from_dict([g['message'] for g in data['generations']])
+    generations = [ChatGeneration(message=m, generation_info=g.get('generation_info'))
+                   for m, g in zip(messages, data['generations'])]
+    return ChatResult(generations=generations, llm_output=data.get('llm_output'))
+
+
+def cassette_llm_call(provider: Optional[str] = None):
+    """
+    LLM适配器 _generate 方法的录制/回放装饰器
+    请求为消息内容和绑定的工具名称（不含提供商和模型，同一份录制可供不同模型配置回放）
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            cassette = get_cassette()
+            if cassette is None:
+                return func(self, *args, **kwargs)
+            messages = args[0] if args else kwargs.get('messages') or ()
+            request = {
+                'messages': [_message_request(m) for m in messages],
+                'tools': _tool_names(kwargs.get('tools')),
+            }
+            if cassette.mode == 'replay':
+                return _load_chat_result(cassette.replay('llm', 'chat', request))
+            start = time.perf_counter()
+            result = func(self, *args, **kwargs)
+            response = _dump_chat_result(result)
+            response['provider'] = provider or getattr(self, 'provider_name', None) or type(self).__name__
+            response['model'] = getattr(self, 'model_name', None) or getattr(self, 'model', '')
+            cassette.record('llm', 'chat', request, response, time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorator
@@ -4,10 +4,13 @@
 提供项目级别的日志配置和管理功能
 """
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, Union
@@ -40,6 +43,93 @@ class ColoredFormatter(logging.Formatter):
         return super().format(record)
 
 
+class LazyValue:
+    """
+    延迟计算的日志字段
+
+    用于 extra 中代价较高的字段（如参数/结果的字符串化）：只有当格式化器真正输出该字段时
+    才计算，并且在队列模式下在后台线程中计算，不占用调用线程。
+    """
+
+    __slots__ = ('_func', '_args', '_kwargs', '_value', '_resolved')
+
+    def __init__(self, func, *args, **kwargs):
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._value = None
+        self._resolved = False
+
+    def resolve(self):
+        if not self._resolved:
+            try:
+                self._value = self._func(*self._args, **self._kwargs)
+            except Exception as e:
+                self._value = f"<lazy value error: {e}>"
+            self._resolved = True
+            self._args = self._kwargs = None
+        return self._value
+
+    def __str__(self):
+        return str(self.resolve())
+
+    __repr__ = __str__
+
+
+def lazy(func, *args, **kwargs) -> LazyValue:
+    """创建延迟计算的日志字段，例如 extra={'args_info': lazy(format_args, args)}"""
+    return LazyValue(func, *args, **kwargs)
+
+
+def resolve_lazy(value):
+    """解析延迟字段，普通值原样返回"""
+    return value.resolve() if isinstance(value, LazyValue) else value
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    有界队列日志处理器
+
+    调用线程只做最少的工作（合并消息参数后入队），格式化和磁盘写入由 QueueListener 后台线程完成。
+    队列满时的策略：
+    - drop: 丢弃 WARNING 以下的日志；WARNING 及以上最多阻塞 block_timeout 秒，仍满则丢弃
+    - block: 阻塞调用线程直到队列有空位（反压，不丢日志）
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = 'drop', block_timeout: float = 0.5):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 进程内队列无需序列化：只固定消息参数，保留 exc_info 和 extra 中的延迟字段，
+        # 由后台线程的各处理器自行格式化
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        try:
+            if self.policy == 'block':
+                self.queue.put(record)
+            elif record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                raise queue.Full
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
 class StructuredFormatter(logging.Formatter):
     """结构化日志格式化器（JSON格式）"""
     
@@ -54,19 +144,12 @@ class StructuredFormatter(logging.Formatter):
             'line': record.lineno
         }
         
-        # 添加额外字段
-        if hasattr(record, 'session_id'):
-            log_entry['session_id'] = record.session_id
-        if hasattr(record, 'analysis_type'):
-            log_entry['analysis_type'] = record.analysis_type
-        if hasattr(record, 'stock_symbol'):
-            log_entry['stock_symbol'] = record.stock_symbol
-        if hasattr(record, 'cost'):
-            log_entry['cost'] = record.cost
-        if hasattr(record, 'tokens'):
-            log_entry['tokens'] = record.tokens
+        # 添加额外字段（延迟字段在此时才计算）
+        for field in ('session_id', 'analysis_type', 'stock_symbol', 'cost', 'tokens'):
+            if hasattr(record, field):
+                log_entry[field] = resolve_lazy(getattr(record, field))
             
-        return json.dumps(log_entry, ensure_ascii=False)
+        return json.dumps(log_entry, ensure_ascii=False, default=str)
 
 
 class TradingAgentsLogger:
@@ -75,6 +158,8 @@ class TradingAgentsLogger:
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or self._load_default_config()
         self.loggers: Dict[str, logging.Logger] = {}
+        self.queue_handler: Optional[BoundedQueueHandler] = None
+        self.queue_listener: Optional[logging.handlers.QueueListener] = None
         self._setup_logging()
     
     def _load_default_config(self) -> Dict[str, Any]:
@@ -125,6 +210,12 @@ class TradingAgentsLogger:
             'docker': {
                 'enabled': os.getenv('DOCKER_CONTAINER', 'false').lower() == 'true',
                 'stdout_only': True  # Docker环境只输出到stdout
+            },
+            'queue': {
+                'enabled': False,  # 默认关闭，可通过 TRADINGAGENTS_LOG_ASYNC=true 启用
+                'max_size': 10000,
+                'policy': 'drop',
+                'block_timeout': 0.5
             }
         }
 
@@ -170,6 +261,7 @@ class TradingAgentsLogger:
                 'enabled': is_docker,
                 'stdout_only': logging_config.get('docker', {}).get('stdout_only', True)
             },
+            'queue': logging_config.get('queue', {}),
             'performance': logging_config.get('performance', {}),
             'security': logging_config.get('security', {}),
             'business': logging_config.get('business', {})
@@ -186,20 +278,73 @@ class TradingAgentsLogger:
         root_logger = logging.getLogger()
         root_logger.setLevel(getattr(logging, self.config['level']))
         
-        # 清除现有处理器
+        # 清除现有处理器（并停止之前的队列监听线程，写完已入队的日志）
         root_logger.handlers.clear()
+        _stop_active_listener()
+        
+        # 队列模式下处理器挂在后台监听线程上（先收集到一个不注册的临时日志器），根日志器只挂一个队列处理器
+        queue_config = self._get_queue_config()
+        target = logging.Logger('tradingagents.queue_targets') if queue_config['enabled'] else root_logger
         
         # 添加处理器
-        self._add_console_handler(root_logger)
+        self._add_console_handler(target)
         
         if not self.config['docker']['enabled'] or not self.config['docker']['stdout_only']:
-            self._add_file_handler(root_logger)
+            self._add_file_handler(target)
             if self.config['handlers']['structured']['enabled']:
-                self._add_structured_handler(root_logger)
+                self._add_structured_handler(target)
+        
+        if queue_config['enabled']:
+            self._start_queue_listener(root_logger, list(target.handlers), queue_config)
         
         # 配置特定日志器
         self._configure_specific_loggers()
     
+    def _get_queue_config(self) -> Dict[str, Any]:
+        """队列日志配置，环境变量优先于配置文件"""
+        queue_config = {'enabled': False, 'max_size': 10000, 'policy': 'drop', 'block_timeout': 0.5}
+        queue_config.update(self.config.get('queue') or {})
+        
+        env_enabled = os.getenv('TRADINGAGENTS_LOG_ASYNC')
+        if env_enabled is not None:
+            queue_config['enabled'] = env_enabled.lower() == 'true'
+        queue_config['max_size'] = int(os.getenv('TRADINGAGENTS_LOG_QUEUE_SIZE', queue_config['max_size']))
+        queue_config['policy'] = os.getenv('TRADINGAGENTS_LOG_QUEUE_POLICY', queue_config['policy']).lower()
+        if queue_config['policy'] not in ('drop', 'block'):
+            _bootstrap_logger.warning(f"警告: 未知的日志队列策略 {queue_config['policy']}，使用drop")
+            queue_config['policy'] = 'drop'
+        return queue_config
+    
+    def _start_queue_listener(self, root_logger: logging.Logger, handlers: list, queue_config: Dict[str, Any]):
+        """启动后台日志监听线程，根日志器只做入队"""
+        global _active_listener
+        
+        log_queue = queue.Queue(maxsize=max(1, queue_config['max_size']))
+        self.queue_handler = BoundedQueueHandler(
+            log_queue, policy=queue_config['policy'], block_timeout=float(queue_config['block_timeout']))
+        self.queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self.queue_listener.start()
+        _active_listener = self.queue_listener
+        
+        root_logger.addHandler(self.queue_handler)
+    
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """队列日志统计：是否启用、当前积压、容量、策略和丢弃条数"""
+        if self.queue_handler is None:
+            return {'enabled': False}
+        return {
+            'enabled': True,
+            'pending': self.queue_handler.queue.qsize(),
+            'capacity': self.queue_handler.queue.maxsize,
+            'policy': self.queue_handler.policy,
+            'dropped': self.queue_handler.dropped,
+        }
+    
+    def flush(self):
+        """等待已入队的日志全部写出（仅队列模式）"""
+        if self.queue_handler is not None and self.queue_listener is _active_listener:
+            self.queue_handler.queue.join()
+    
     def _add_console_handler(self, logger: logging.Logger):
         """添加控制台处理器"""
         if not self.config['handlers']['console']['enabled']:
@@ -389,6 +534,19 @@ class TradingAgentsLogger:
 # 全局日志管理器实例
 _logger_manager: Optional[TradingAgentsLogger] = None
 
+# 当前运行中的队列监听线程（重新配置或进程退出时停止，确保日志写完）
+_active_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_active_listener():
+    global _active_listener
+    listener, _active_listener = _active_listener, None
+    if listener is not None and listener._thread is not None:
+        listener.stop()
+
+
+atexit.register(_stop_active_listener)
+
 
 def get_logger_manager() -> TradingAgentsLogger:
     """获取全局日志管理器实例"""
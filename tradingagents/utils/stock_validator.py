@@ -19,7 +19,8 @@ class StockDataPreparationResult:
     def __init__(self, is_valid: bool, stock_code: str, market_type: str = "",
                  stock_name: str = "", error_message: str = "", suggestion: str = "",
                  has_historical_data: bool = False, has_basic_info: bool = False,
-                 data_period_days: int = 0, cache_status: str = ""):
+                 data_period_days: int = 0, cache_status: str = "",
+                 basic_info=None, historical_data: str = None, data_context=None):
         self.is_valid = is_valid
         self.stock_code = stock_code
         self.market_type = market_type
@@ -30,6 +31,10 @@ class StockDataPreparationResult:
         self.has_basic_info = has_basic_info
         self.data_period_days = data_period_days
         self.cache_status = cache_status
+        # 预获取的原始数据，以及承载这些数据的运行上下文（传给分析流程复用）
+        self.basic_info = basic_info
+        self.historical_data = historical_data
+        self.data_context = data_context
 
     def to_dict(self) -> Dict:
         """转换为字典格式"""
@@ -43,7 +48,8 @@ class StockDataPreparationResult:
             'has_historical_data': self.has_historical_data,
             'has_basic_info': self.has_basic_info,
             'data_period_days': self.data_period_days,
-            'cache_status': self.cache_status
+            'cache_status': self.cache_status,
+            'has_data_context': self.data_context is not None
         }
 
 
@@ -91,7 +97,20 @@ class StockDataPreparer:
             logger.debug(f"📊 [数据准备] 自动检测市场类型: {market_type}")
 
         # 3. 预获取数据并验证
-        return self._prepare_data_by_market(stock_code, market_type, period_days, analysis_date)
+        # 在运行上下文中获取数据，获取到的数据会保存在上下文里，供后续分析流程直接复用
+        from tradingagents.dataflows.run_data_context import RunDataContext, get_current_run_context
+        from tradingagents.agents.utils.tool_prefetch import analysis_data_windows
+        data_context = get_current_run_context() or RunDataContext(symbol=stock_code)
+        # 按本次分析会读取的总区间获取行情，预获取阶段和市场分析师的不同区间都从同一份数据切片
+        windows = analysis_data_windows(analysis_date, period_days)
+        data_context.frame_window = (min(start for start, _ in windows), max(end for _, end in windows))
+        with data_context.activated():
+            result = self._prepare_data_by_market(stock_code, market_type, period_days, analysis_date)
+
+        if result.is_valid:
+            result.data_context = data_context
+            logger.debug(f"📊 [数据准备] 运行上下文已缓存{len(data_context.keys())}项数据: {data_context.run_id}")
+        return result
     
     def _validate_format(self, stock_code: str, market_type: str) -> StockDataPreparationResult:
         """验证股票代码格式"""
@@ -402,7 +421,9 @@ class StockDataPreparer:
                 has_historical_data=has_historical_data,
                 has_basic_info=has_basic_info,
                 data_period_days=period_days,
-                cache_status=cache_status.rstrip('; ')
+                cache_status=cache_status.rstrip('; '),
+                basic_info=stock_info,
+                historical_data=historical_data
             )
 
         except Exception as e:
@@ -570,7 +591,9 @@ class StockDataPreparer:
                 has_historical_data=has_historical_data,
                 has_basic_info=has_basic_info,
                 data_period_days=period_days,
-                cache_status=cache_status.rstrip('; ')
+                cache_status=cache_status.rstrip('; '),
+                basic_info=stock_info,
+                historical_data=historical_data
             )
 
         except Exception as e:
@@ -645,7 +668,8 @@ class StockDataPreparer:
                         has_historical_data=has_historical_data,
                         has_basic_info=has_basic_info,
                         data_period_days=period_days,
-                        cache_status=cache_status
+                        cache_status=cache_status,
+                        historical_data=historical_data
                     )
                 else:
                     logger.warning(f"⚠️ [美股数据] 历史数据无效: {formatted_code}")
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+智能体节点的LLM流式输出
+CLI 和 Web 界面原本只能在整个图节点执行完毕后更新报告，长报告生成期间界面没有任何变化。
+本模块提供一个按运行生效的回调通道：
+
+    with token_stream(callback):
+        graph.propagate(...)
+
+期间各智能体节点（见 stream_node）调用LLM时，适配器改用流式接口（见 stream_generate），
+每收到一段输出就把该节点当前累计的文本通过 callback(StreamEvent) 推送给界面。
+没有注册回调时适配器保持原有的非流式调用，行为不变。
+
+回调通道和当前节点保存在 contextvars 中，LangGraph 执行节点的工作线程和后台预取线程
+复制调用方的上下文，因此只有注册了回调的那次运行会产生流式事件。
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 图节点名称 -> 节点输出的报告字段
+NODE_SECTIONS: Dict[str, str] = {
+    "Market Analyst": "market_report",
+    "Social Analyst": "sentiment_report",
+    "News Analyst": "news_report",
+    "Fundamentals Analyst": "fundamentals_report",
+    "Bull Researcher": "investment_plan",
+    "Bear Researcher": "investment_plan",
+    "Research Manager": "investment_plan",
+    "Trader": "trader_investment_plan",
+    "Risky Analyst": "final_trade_decision",
+    "Safe Analyst": "final_trade_decision",
+    "Neutral Analyst": "final_trade_decision",
+    "Risk Judge": "final_trade_decision",
+}
+
+# 默认推送间隔（秒）：界面刷新不需要逐token进行
+DEFAULT_MIN_INTERVAL = 0.2
+
+
+@dataclass
+class StreamEvent:
+    """一次流式输出事件"""
+    node: str
+    section: Optional[str]
+    delta: str
+    text: str
+    done: bool = False
+
+
+class _Channel:
+    """按节点节流的回调通道"""
+
+    def __init__(self, callback: Callable[[StreamEvent], Any], min_interval: float):
+        self.callback = callback
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._last_sent: Dict[str, float] = {}
+        self._pending_delta: Dict[str, str] = {}
+
+    def emit(self, node: str, delta: str, text: Callable[[], str], done: bool = False):
+        """推送一段输出；text 返回当前累计文本，只在实际推送时调用"""
+        with self._lock:
+            pending = self._pending_delta.get(node, "") + delta
+            now = time.monotonic()
+            if not done and now - self._last_sent.get(node, 0.0) < self.min_interval:
+                self._pending_delta[node] = pending
+                return
+            self._pending_delta[node] = ""
+            self._last_sent[node] = now
+        try:
+            self.callback(StreamEvent(node=node, section=NODE_SECTIONS.get(node), delta=pending,
+                                      text=text(), done=done))
+        except Exception as e:
+            # 界面回调失败不影响分析
+            logger.debug(f"流式输出回调失败: {e}")
+
+
+_channel: contextvars.ContextVar[Optional[_Channel]] = contextvars.ContextVar('token_stream_channel', default=None)
+_current_node: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('token_stream_node', default=None)
+
+
+@contextmanager
+def token_stream(callback: Callable[[StreamEvent], Any], min_interval: float = DEFAULT_MIN_INTERVAL):
+    """
+    在上下文内把智能体节点的LLM输出流式推送给 callback
+
+    Args:
+        callback: 接收 StreamEvent；同一节点两次推送至少间隔 min_interval 秒，
+                  每次LLM调用结束时总会推送一次 done=True 的完整文本
+        min_interval: 推送间隔（秒），0 表示每段输出都推送
+    """
+    token = _channel.set(_Channel(callback, min_interval))
+    try:
+        yield
+    finally:
+        _channel.reset(token)
+
+
+def is_streaming() -> bool:
+    """当前是否有需要流式输出的节点LLM调用"""
+    return _channel.get() is not None and _current_node.get() is not None
+
+
+@contextmanager
+def streaming_node(name: str):
+    """在上下文内把LLM输出归属于指定节点"""
+    token = _current_node.set(name)
+    try:
+        yield
+    finally:
+        _current_node.reset(token)
+
+
+def stream_node(name: str, node: Callable) -> Callable:
+    """包装图节点函数：节点内的LLM调用在有回调通道时流式输出"""
+
+    @functools.wraps(node)
+    def wrapper(*args, **kwargs):
+        with streaming_node(name):
+            return node(*args, **kwargs)
+
+    return wrapper
+
+
+def _chunk_text(chunk) -> str:
+    content = getattr(chunk.message, 'content', '')
+    if isinstance(content, str):
+        return content
+    # 多段内容（如Gemini）只取文本部分
+    return "".join(part.get('text', '') if isinstance(part, dict) else str(part) for part in content)
+
+
+def stream_generate(stream_fn: Callable[..., Iterator], messages: List, stop: Optional[List[str]] = None,
+                    run_manager=None, model_name: Optional[str] = None, **kwargs):
+    """
+    适配器 _generate 的流式实现
+
+    Args:
+        stream_fn: 返回 ChatGenerationChunk 迭代器的流式方法（通常为父类的 _stream）
+        model_name: 供应商未返回用量时用于估算token的模型名称
+
+    Returns:
+        Optional[ChatResult]: 当前没有流式回调（或流式调用在产生任何输出前失败）时返回 None，
+        调用方应回退到非流式调用。结果的 llm_output['token_usage'] 与非流式调用格式一致。
+    """
+    channel = _channel.get()
+    node = _current_node.get()
+    if channel is None or node is None:
+        return None
+
+    from langchain_core.language_models.chat_models import generate_from_stream
+    from tradingagents.llm_adapters.tokenizer import count_text_tokens, count_tokens
+
+    chunks = []
+    parts: List[str] = []
+    try:
+        for chunk in stream_fn(messages, stop, run_manager, **kwargs):
+            chunks.append(chunk)
+            delta = _chunk_text(chunk)
+            if delta:
+                parts.append(delta)
+                # 累计文本只在节流后实际推送时拼接
+                channel.emit(node, delta, lambda: "".join(parts))
+    except Exception as e:
+        if not chunks:
+            logger.warning(f"⚠️ [流式输出] {node} 流式调用失败，改用普通调用: {e}")
+            return None
+        raise
+
+    if not chunks:
+        return None
+    text = "".join(parts)
+    channel.emit(node, "", lambda: text, done=True)
+
+    result = generate_from_stream(iter(chunks))
+    usage = getattr(result.generations[0].message, 'usage_metadata', None) or {}
+    input_tokens = usage.get('input_tokens', 0)
+    output_tokens = usage.get('output_tokens', 0)
+    if not input_tokens and not output_tokens and model_name:
+        # 流式响应通常不带用量，用分词器估算
+        input_tokens = count_tokens(messages, model_name, kwargs.get('tools'))
+        output_tokens = count_text_tokens(text, model_name)
+    result.llm_output = {
+        'token_usage': {'prompt_tokens': input_tokens, 'completion_tokens': output_tokens,
+                        'total_tokens': input_tokens + output_tokens},
+        'model_name': model_name,
+    }
+    return result
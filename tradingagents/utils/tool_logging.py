@@ -12,13 +12,33 @@ from datetime import datetime
 from tradingagents.utils.logging_init import get_logger
 
 # 导入日志模块
-from tradingagents.utils.logging_manager import get_logger, get_logger_manager
+from tradingagents.utils.logging_manager import get_logger, get_logger_manager, lazy
+from tradingagents.utils.tracing import span
 logger = get_logger('agents')
 
 # 工具调用日志器
 tool_logger = get_logger("tools")
 
 
+def _truncate(value: Any, limit: int) -> str:
+    text = str(value)
+    return text[:limit] + '...' if len(text) > limit else text
+
+
+def _format_args_info(args: tuple, kwargs: dict) -> Dict[str, Any]:
+    """参数字符串化（作为延迟字段，只在格式化器输出时计算）"""
+    args_info = {}
+    if args:
+        args_info['args'] = [_truncate(arg, 100) for arg in args]
+    if kwargs:
+        args_info['kwargs'] = {k: _truncate(v, 100) for k, v in kwargs.items()}
+    return args_info
+
+
+def _result_length(result: Any) -> int:
+    return len(str(result)) if result else 0
+
+
 def log_tool_call(tool_name: Optional[str] = None, log_args: bool = True, log_result: bool = False):
     """
     工具调用日志装饰器
@@ -37,34 +57,21 @@ def log_tool_call(tool_name: Optional[str] = None, log_args: bool = True, log_re
             # 记录开始时间
             start_time = time.time()
             
-            # 准备参数信息
-            args_info = {}
-            if log_args:
-                # 记录位置参数
-                if args:
-                    args_info['args'] = [str(arg)[:100] + '...' if len(str(arg)) > 100 else str(arg) for arg in args]
-                
-                # 记录关键字参数
-                if kwargs:
-                    args_info['kwargs'] = {
-                        k: str(v)[:100] + '...' if len(str(v)) > 100 else str(v) 
-                        for k, v in kwargs.items()
-                    }
-            
-            # 记录工具调用开始
+            # 记录工具调用开始（参数信息为延迟字段，只在被输出时才字符串化）
             tool_logger.info(
                 f"🔧 [工具调用] {name} - 开始",
                 extra={
                     'tool_name': name,
                     'event_type': 'tool_call_start',
                     'timestamp': datetime.now().isoformat(),
-                    'args_info': args_info if log_args else None
+                    'args_info': lazy(_format_args_info, args, kwargs) if log_args else None
                 }
             )
             
             try:
                 # 执行工具函数
-                result = func(*args, **kwargs)
+                with span(name, 'tool'):
+                    result = func(*args, **kwargs)
                 
                 # 计算执行时间
                 duration = time.time() - start_time
@@ -72,8 +79,7 @@ def log_tool_call(tool_name: Optional[str] = None, log_args: bool = True, log_re
                 # 准备结果信息
                 result_info = None
                 if log_result and result is not None:
-                    result_str = str(result)
-                    result_info = result_str[:200] + '...' if len(result_str) > 200 else result_str
+                    result_info = lazy(_truncate, result, 200)
                 
                 # 记录工具调用成功
                 tool_logger.info(
@@ -140,11 +146,15 @@ def log_data_source_call(source_name: str):
             )
             
             try:
-                result = func(*args, **kwargs)
+                with span(f"{source_name}.{func.__name__}", 'data_source', symbol=str(symbol)) as source_span:
+                    result = func(*args, **kwargs)
                 duration = time.time() - start_time
                 
                 # 检查结果是否成功
-                success = result and "❌" not in str(result) and "错误" not in str(result)
+                result_str = str(result) if result else ''
+                success = result and "❌" not in result_str and "错误" not in result_str
+                if source_span is not None:
+                    source_span.set(success=bool(success), data_size=len(result_str))
                 
                 if success:
                     tool_logger.info(
@@ -154,7 +164,7 @@ def log_data_source_call(source_name: str):
                             'symbol': symbol,
                             'event_type': 'data_source_success',
                             'duration': duration,
-                            'data_size': len(str(result)) if result else 0,
+                            'data_size': len(result_str),
                             'timestamp': datetime.now().isoformat()
                         }
                     )
@@ -219,7 +229,8 @@ def log_llm_call(provider: str, model: str):
             )
             
             try:
-                result = func(*args, **kwargs)
+                with span(f"{provider}/{model}", 'llm'):
+                    result = func(*args, **kwargs)
                 duration = time.time() - start_time
                 
                 tool_logger.info(
@@ -360,13 +371,14 @@ def log_analysis_module(module_name: str, session_id: str = None):
 
             try:
                 # 执行分析函数
-                result = func(*args, **kwargs)
+                with span(module_name, 'node', symbol=symbol):
+                    result = func(*args, **kwargs)
 
                 # 计算执行时间
                 duration = time.time() - start_time
 
                 # 记录模块完成
-                result_length = len(str(result)) if result else 0
+                result_length = lazy(_result_length, result)
                 logger_manager.log_module_complete(
                     tool_logger, module_name, symbol, actual_session_id,
                     duration, success=True, result_length=result_length,
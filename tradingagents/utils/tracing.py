@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+分析运行追踪
+在内存中记录一次分析运行的嵌套耗时区间（图节点 → 工具 → 数据源 → 缓存命中/未命中 → LLM），
+可导出为 Chrome trace JSON（chrome://tracing、Perfetto）或 OpenTelemetry OTLP/JSON 文件，
+并生成关键路径摘要，回答"这次分析的时间花在哪里"。
+
+未开始追踪时 span() 只做一次 ContextVar 读取，开销可忽略。
+"""
+
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 单次运行最多保留的区间数，超出后只计数不记录，避免长时间运行占用过多内存
+DEFAULT_MAX_SPANS = 50000
+
+# 即时事件（缓存命中等）的类别，不参与关键路径计算
+EVENT_CATEGORY = 'event'
+
+_current_span: ContextVar[Optional['Span']] = ContextVar('tradingagents_current_span', default=None)
+
+
+class Span:
+    """一个耗时区间；start_ns/end_ns 为相对追踪开始时刻的纳秒数"""
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'category', 'start_ns', 'end_ns',
+                 'thread_id', 'attributes')
+
+    def __init__(self, trace: 'RunTrace', span_id: int, parent_id: Optional[int], name: str,
+                 category: str, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.category = category
+        self.start_ns = time.perf_counter_ns() - trace.origin_ns
+        self.end_ns = None
+        self.thread_id = threading.get_ident()
+        self.attributes = attributes
+
+    @property
+    def duration_ns(self) -> int:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns() - self.trace.origin_ns
+        return end - self.start_ns
+
+    def set(self, **attributes):
+        """补充区间属性（如缓存是否命中、返回数据大小）"""
+        self.attributes.update(attributes)
+
+
+class RunTrace:
+    """一次分析运行的追踪记录"""
+
+    def __init__(self, name: str, max_spans: int = DEFAULT_MAX_SPANS, **attributes):
+        self.name = name
+        self.max_spans = max_spans
+        self.epoch_ns = time.time_ns()
+        self.origin_ns = time.perf_counter_ns()
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._ids = itertools.count(1)
+        self.root = self._new_span(name, 'run', None, attributes)
+
+    def _new_span(self, name: str, category: str, parent: Optional[Span], attributes: Dict[str, Any]) -> Optional[Span]:
+        if len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return None
+        span_obj = Span(self, next(self._ids), parent.span_id if parent else None, name, category, attributes)
+        # list.append 在GIL下是原子的，并行节点的线程可直接写入
+        self.spans.append(span_obj)
+        return span_obj
+
+    def finish(self):
+        if self.root.end_ns is None:
+            self.root.end_ns = time.perf_counter_ns() - self.origin_ns
+
+    # ------------------------------------------------------------------ 导出
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace event 格式（时间单位微秒）"""
+        pid = os.getpid()
+        events = []
+        for s in self.spans:
+            event = {
+                'name': s.name,
+                'cat': s.category,
+                'ts': s.start_ns / 1000,
+                'pid': pid,
+                'tid': s.thread_id,
+                'args': {k: _json_value(v) for k, v in s.attributes.items()},
+            }
+            if s.category == EVENT_CATEGORY:
+                event.update(ph='i', s='t')
+            else:
+                event.update(ph='X', dur=s.duration_ns / 1000)
+            events.append(event)
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'run': self.name, 'dropped_spans': self.dropped},
+        }
+
+    def to_otel(self) -> Dict[str, Any]:
+        """OpenTelemetry OTLP/JSON 格式（可由 OTel Collector 的 otlpjsonfile 接收器读取）"""
+        trace_id = f"{self.epoch_ns:016x}{id(self) & 0xFFFFFFFFFFFFFFFF:016x}"[-32:]
+        spans = []
+        for s in self.spans:
+            end_ns = s.start_ns + s.duration_ns
+            otel_span = {
+                'traceId': trace_id,
+                'spanId': f"{s.span_id:016x}",
+                'name': s.name,
+                'kind': 1,
+                'startTimeUnixNano': str(self.epoch_ns + s.start_ns),
+                'endTimeUnixNano': str(self.epoch_ns + end_ns),
+                'attributes': [_otel_attribute('category', s.category)] +
+                              [_otel_attribute(k, v) for k, v in s.attributes.items()],
+            }
+            if s.parent_id is not None:
+                otel_span['parentSpanId'] = f"{s.parent_id:016x}"
+            if 'error' in s.attributes:
+                otel_span['status'] = {'code': 2, 'message': str(s.attributes['error'])}
+            spans.append(otel_span)
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [_otel_attribute('service.name', 'tradingagents')]},
+                'scopeSpans': [{'scope': {'name': 'tradingagents.tracing'}, 'spans': spans}],
+            }]
+        }
+
+    def export(self, path: str, fmt: str = 'chrome') -> str:
+        """导出到文件，fmt 为 chrome 或 otel"""
+        data = self.to_otel() if fmt == 'otel' else self.to_chrome_trace()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        return path
+
+    # ------------------------------------------------------------------ 分析
+
+    def _children(self) -> Dict[Optional[int], List[Span]]:
+        children: Dict[Optional[int], List[Span]] = {}
+        for s in self.spans:
+            if s.category != EVENT_CATEGORY:
+                children.setdefault(s.parent_id, []).append(s)
+        return children
+
+    def critical_path(self) -> List[Dict[str, Any]]:
+        """
+        关键路径：从运行结束时刻往回，每层取最后结束的子区间，再取在它开始前结束的子区间，依此类推。
+        并行执行的子区间中只有决定总耗时的那条链会出现在路径上。
+        """
+        children = self._children()
+        path = []
+
+        def walk(span_obj: Span, depth: int):
+            chain = []
+            cursor = span_obj.start_ns + span_obj.duration_ns
+            for child in sorted(children.get(span_obj.span_id, []),
+                                key=lambda c: c.start_ns + c.duration_ns, reverse=True):
+                if child.start_ns + child.duration_ns <= cursor:
+                    chain.append(child)
+                    cursor = child.start_ns
+            chain.reverse()
+
+            path.append({
+                'name': span_obj.name,
+                'category': span_obj.category,
+                'depth': depth,
+                'duration_ms': span_obj.duration_ns / 1e6,
+                'self_ms': (span_obj.duration_ns - sum(c.duration_ns for c in chain)) / 1e6,
+            })
+            for child in chain:
+                walk(child, depth + 1)
+
+        walk(self.root, 0)
+        return path
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """运行摘要：总耗时、按类别的耗时/自身耗时、关键路径和最慢的区间"""
+        children = self._children()
+        by_category: Dict[str, Dict[str, float]] = {}
+        events: Dict[str, int] = {}
+        for s in self.spans:
+            if s.category == EVENT_CATEGORY:
+                events[s.name] = events.get(s.name, 0) + 1
+                continue
+            stats = by_category.setdefault(s.category, {'count': 0, 'total_ms': 0.0, 'self_ms': 0.0})
+            stats['count'] += 1
+            stats['total_ms'] += s.duration_ns / 1e6
+            stats['self_ms'] += (s.duration_ns - _union_ns(children.get(s.span_id, []))) / 1e6
+
+        slowest = sorted((s for s in self.spans if s.category not in (EVENT_CATEGORY, 'run')),
+                         key=lambda s: s.duration_ns, reverse=True)[:top]
+        return {
+            'run': self.name,
+            'duration_ms': self.root.duration_ns / 1e6,
+            'span_count': len(self.spans),
+            'dropped_spans': self.dropped,
+            'by_category': by_category,
+            'events': events,
+            'critical_path': self.critical_path(),
+            'slowest': [{'name': s.name, 'category': s.category, 'duration_ms': s.duration_ns / 1e6}
+                        for s in slowest],
+        }
+
+
+def _union_ns(spans: List[Span]) -> int:
+    """子区间的并集长度（并行的子区间不重复计算）"""
+    total = 0
+    current_start = current_end = None
+    for s in sorted(spans, key=lambda c: c.start_ns):
+        end = s.start_ns + s.duration_ns
+        if current_end is None or s.start_ns > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = s.start_ns, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def _json_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _otel_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {'boolValue': value}
+    elif isinstance(value, int):
+        typed = {'intValue': str(value)}
+    elif isinstance(value, float):
+        typed = {'doubleValue': value}
+    else:
+        typed = {'stringValue': str(value)}
+    return {'key': key, 'value': typed}
+
+
+class _SpanScope:
+    """span() 返回的上下文管理器；未开始追踪时为空操作"""
+
+    __slots__ = ('_name', '_category', '_attributes', '_span', '_token')
+
+    def __init__(self, name: str, category: str, attributes: Dict[str, Any]):
+        self._name = name
+        self._category = category
+        self._attributes = attributes
+        self._span = None
+        self._token = None
+
+    def __enter__(self) -> Optional[Span]:
+        parent = _current_span.get()
+        if parent is not None:
+            self._span = parent.trace._new_span(self._name, self._category, parent, self._attributes)
+            if self._span is not None:
+                self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        span_obj = self._span
+        if span_obj is not None:
+            span_obj.end_ns = time.perf_counter_ns() - span_obj.trace.origin_ns
+            if exc is not None:
+                span_obj.attributes['error'] = f"{exc_type.__name__}: {exc}"
+            _current_span.reset(self._token)
+        return False
+
+
+def span(name: str, category: str = 'function', **attributes) -> _SpanScope:
+    """
+    记录一个嵌套区间
+
+    用法:
+        with span("tushare.get_stock_data", "data_source", symbol=symbol) as s:
+            ...
+            if s: s.set(rows=len(data))
+    """
+    return _SpanScope(name, category, attributes)
+
+
+def trace_event(name: str, **attributes):
+    """在当前区间下记录一个即时事件（如缓存命中/未命中）"""
+    parent = _current_span.get()
+    if parent is not None:
+        event = parent.trace._new_span(name, EVENT_CATEGORY, parent, attributes)
+        if event is not None:
+            event.end_ns = event.start_ns
+
+
+def traced(category: str, name: Optional[str] = None):
+    """函数装饰器形式的 span()"""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_llm_call(provider: Optional[str] = None):
+    """
+    LLM适配器 _generate 方法的追踪装饰器
+    区间名称为"提供商/模型"，提供商默认取实例的 provider_name
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if _current_span.get() is None:
+                return func(self, *args, **kwargs)
+            provider_name = provider or getattr(self, 'provider_name', None) or type(self).__name__
+            model = getattr(self, 'model_name', None) or getattr(self, 'model', '')
+            messages = args[0] if args else kwargs.get('messages') or ()
+            with span(f"{provider_name}/{model}", 'llm', messages=len(messages)):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_trace() -> Optional[RunTrace]:
+    """当前上下文中正在进行的追踪"""
+    current = _current_span.get()
+    return current.trace if current is not None else None
+
+
+def start_trace(name: str, **attributes) -> Tuple[RunTrace, Any]:
+    """
+    开始一次运行的追踪
+
+    Returns:
+        (RunTrace, token): token需传给finish_trace
+    """
+    max_spans = int(os.getenv('TRADINGAGENTS_TRACE_MAX_SPANS', DEFAULT_MAX_SPANS))
+    trace = RunTrace(name, max_spans=max_spans, **attributes)
+    return trace, _current_span.set(trace.root)
+
+
+def finish_trace(trace: RunTrace, token) -> Dict[str, Any]:
+    """
+    结束追踪并返回摘要
+
+    设置环境变量 TRADINGAGENTS_TRACE_DIR 时将追踪导出到该目录，
+    TRADINGAGENTS_TRACE_FORMAT 为 chrome（默认）或 otel
+    """
+    trace.finish()
+    _current_span.reset(token)
+
+    summary = trace.summary()
+    trace_dir = os.getenv('TRADINGAGENTS_TRACE_DIR')
+    if trace_dir:
+        fmt = os.getenv('TRADINGAGENTS_TRACE_FORMAT', 'chrome').lower()
+        safe_name = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in trace.name)
+        path = os.path.join(trace_dir, f"{safe_name}_{time.strftime('%Y%m%d_%H%M%S')}.{fmt}.json")
+        try:
+            summary['export_path'] = trace.export(path, fmt)
+            logger.info(f"⏱️ [追踪] 已导出追踪文件: {path}")
+        except Exception as e:
+            logger.warning(f"⚠️ [追踪] 导出追踪文件失败: {e}")
+    return summary
+
+
+def format_critical_path(summary: Dict[str, Any], limit: int = 8) -> str:
+    """将关键路径格式化为一行文本，只保留自身耗时最长的若干段"""
+    path = [p for p in summary['critical_path'] if p['depth'] > 0]
+    top = sorted(path, key=lambda p: p['self_ms'], reverse=True)[:limit]
+    return ' → '.join(f"{p['name']}({p['self_ms'] / 1000:.1f}s)" for p in path if p in top)
@@ -584,6 +584,12 @@ def display_static_progress_with_controls(analysis_id: str, show_refresh_control
     else:
         st.info(f"{status_icon} **当前状态**: {last_message}")
 
+        # 显示智能体正在流式生成的报告
+        streaming = progress_data.get('streaming')
+        if streaming and streaming.get('text'):
+            with st.expander(f"✍️ {streaming.get('node', '')} 正在生成报告...", expanded=True):
+                st.markdown(streaming['text'])
+
     # 显示刷新控制的条件：
     # 1. 需要显示刷新控件 AND
     # 2. (分析正在运行 OR 分析刚开始还没有状态)
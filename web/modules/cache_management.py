@@ -202,6 +202,11 @@ def main():
     else:
         st.warning("优化数据提供器不可用，无法进行缓存测试")
 
+    # 数据库缓存批量查看：一次查询自选股的最新缓存，再批量读取内容
+    st.markdown("---")
+    st.subheader("🗄️ 数据库缓存批量查看")
+    render_database_cache_lookup()
+
     # 原有的缓存详情部分
     with col2:
         st.subheader("⚙️ 缓存配置")
@@ -321,5 +326,82 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+def render_database_cache_lookup():
+    """按股票列表批量查看MongoDB/Redis中的最新缓存"""
+    try:
+        from tradingagents.config.database_manager import get_database_manager
+        if not get_database_manager().is_database_available():
+            st.info("MongoDB/Redis 未启用，数据库缓存批量查看不可用")
+            return
+        from tradingagents.dataflows.db_cache_manager import get_db_cache
+    except ImportError as e:
+        st.warning(f"数据库缓存不可用: {e}")
+        return
+
+    default_symbols = ""
+    watchlist = os.getenv("TRADINGAGENTS_WATCHLIST")
+    if watchlist and os.path.exists(watchlist):
+        try:
+            from tradingagents.dataflows.cache_warmer import load_watchlist
+            default_symbols = ", ".join(load_watchlist(watchlist))
+        except Exception:
+            pass
+
+    lookup_col1, lookup_col2 = st.columns([3, 1])
+    with lookup_col1:
+        symbols_text = st.text_input("股票代码（逗号分隔）", value=default_symbols, key="db_cache_symbols")
+    with lookup_col2:
+        data_type = st.selectbox(
+            "数据类型",
+            ["stock_data", "news_data", "fundamentals_data", "analysis_results"],
+            format_func=lambda x: {
+                "stock_data": "📈 股票数据",
+                "news_data": "📰 新闻数据",
+                "fundamentals_data": "💼 基本面数据",
+                "analysis_results": "📊 分析结果"
+            }[x],
+            key="db_cache_type"
+        )
+
+    if not st.button("🔍 批量查看", key="db_cache_lookup"):
+        return
+    symbols = [s.strip().upper() for s in symbols_text.replace("，", ",").split(",") if s.strip()]
+    if not symbols:
+        st.warning("请输入股票代码")
+        return
+
+    with st.spinner(f"查询 {len(symbols)} 只股票的缓存..."):
+        db_cache = get_db_cache()
+        latest = db_cache.find_latest_keys(symbols, data_type)
+        contents = db_cache.mget([info["cache_key"] for info in latest.values()], data_type)
+
+    rows = []
+    for symbol in symbols:
+        info = latest.get(symbol)
+        data = contents.get(info["cache_key"]) if info else None
+        rows.append({
+            "symbol": symbol,
+            "data_source": info["data_source"] if info else "-",
+            "cached_at": info["created_at"].strftime('%Y-%m-%d %H:%M:%S') if info and info["created_at"] else "-",
+            "size": len(data) if data is not None else 0,
+            "preview": str(data)[:80] if data is not None else "未缓存",
+        })
+
+    import pandas as pd
+    st.dataframe(
+        pd.DataFrame(rows),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "symbol": st.column_config.TextColumn("股票代码", width="small"),
+            "data_source": st.column_config.TextColumn("数据源", width="small"),
+            "cached_at": st.column_config.TextColumn("缓存时间(UTC)", width="medium"),
+            "size": st.column_config.NumberColumn("行数/字符数", width="small"),
+            "preview": st.column_config.TextColumn("内容预览", width="large")
+        }
+    )
+    st.info(f"📊 {len(contents)}/{len(symbols)} 只股票有可读取的缓存")
+
+
 if __name__ == "__main__":
     main()
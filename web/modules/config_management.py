@@ -5,7 +5,6 @@
 
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
 from typing import List
@@ -335,51 +334,39 @@ def render_usage_statistics():
     # 使用趋势
     st.markdown("**📈 使用趋势**")
     
-    records = config_manager.load_usage_records()
-    if records:
-        # 按日期聚合
-        daily_stats = {}
-        for record in records:
-            try:
-                date = datetime.fromisoformat(record.timestamp).date()
-                if date not in daily_stats:
-                    daily_stats[date] = {"cost": 0, "requests": 0}
-                daily_stats[date]["cost"] += record.cost
-                daily_stats[date]["requests"] += 1
-            except:
-                continue
+    # 读取按天汇总
+    daily_rollups = config_manager.get_usage_rollups(days, 'day', group_by=('bucket',))
+    if daily_rollups:
+        dates = [row["bucket"].date() for row in daily_rollups]
+        costs = [row["cost"] for row in daily_rollups]
+        requests = [row["requests"] for row in daily_rollups]
         
-        if daily_stats:
-            dates = sorted(daily_stats.keys())
-            costs = [daily_stats[date]["cost"] for date in dates]
-            requests = [daily_stats[date]["requests"] for date in dates]
-            
-            # 创建双轴图表
-            fig = go.Figure()
-            
-            fig.add_trace(go.Scatter(
-                x=dates, y=costs,
-                mode='lines+markers',
-                name='每日成本 (¥)',
-                yaxis='y'
-            ))
-            
-            fig.add_trace(go.Scatter(
-                x=dates, y=requests,
-                mode='lines+markers',
-                name='每日请求数',
-                yaxis='y2'
-            ))
-            
-            fig.update_layout(
-                title='使用趋势',
-                xaxis_title='日期',
-                yaxis=dict(title='成本 (¥)', side='left'),
-                yaxis2=dict(title='请求数', side='right', overlaying='y'),
-                hovermode='x unified'
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        # 创建双轴图表
+        fig = go.Figure()
+        
+        fig.add_trace(go.Scatter(
+            x=dates, y=costs,
+            mode='lines+markers',
+            name='每日成本 (¥)',
+            yaxis='y'
+        ))
+        
+        fig.add_trace(go.Scatter(
+            x=dates, y=requests,
+            mode='lines+markers',
+            name='每日请求数',
+            yaxis='y2'
+        ))
+        
+        fig.update_layout(
+            title='使用趋势',
+            xaxis_title='日期',
+            yaxis=dict(title='成本 (¥)', side='left'),
+            yaxis2=dict(title='请求数', side='right', overlaying='y'),
+            hovermode='x unified'
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
 
 
 def render_system_settings():
@@ -10,10 +10,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 import os
-from typing import Dict, List, Any
+from typing import Dict, Any
 
 # 添加项目根目录到路径
 import sys
@@ -26,7 +26,10 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 from utils.ui_utils import apply_hide_deploy_button_css
 
-from tradingagents.config.config_manager import config_manager, token_tracker, UsageRecord
+from tradingagents.config.config_manager import config_manager, token_tracker
+
+# 导出时包含的最近明细记录数上限
+EXPORT_MAX_RECORDS = 10000
 
 def render_token_statistics():
     """渲染Token统计页面"""
@@ -64,10 +67,9 @@ def render_token_statistics():
         if st.button("📥 导出统计数据", use_container_width=True):
             export_statistics_data(days)
     
-    # 获取统计数据
+    # 获取统计数据（全部读取使用量汇总，明细记录由记录表分页加载）
     try:
         stats = config_manager.get_usage_statistics(days)
-        records = load_detailed_records(days)
         
         if not stats or stats.get('total_requests', 0) == 0:
             st.info(f"📊 {time_range}内暂无Token使用记录")
@@ -86,18 +88,16 @@ def render_token_statistics():
         render_overview_metrics(stats, time_range)
         
         # 显示详细图表
-        if records:
-            render_detailed_charts(records, stats)
+        render_detailed_charts(days, stats)
         
         # 显示供应商统计
         render_provider_statistics(stats)
         
         # 显示成本趋势
-        if records:
-            render_cost_trends(records)
+        render_cost_trends(days)
         
         # 显示详细记录表
-        render_detailed_records_table(records)
+        render_detailed_records_table(days)
         
     except Exception as e:
         st.error(f"❌ 获取统计数据失败: {str(e)}")
@@ -157,7 +157,7 @@ def render_overview_metrics(stats: Dict[str, Any], time_range: str):
             delta=f"{stats['total_output_tokens']/(stats['total_input_tokens']+stats['total_output_tokens'])*100:.1f}%"
         )
 
-def render_detailed_charts(records: List[UsageRecord], stats: Dict[str, Any]):
+def render_detailed_charts(days: int, stats: Dict[str, Any]):
     """渲染详细图表"""
     st.markdown("**📊 详细分析图表**")
     
@@ -185,25 +185,28 @@ def render_detailed_charts(records: List[UsageRecord], stats: Dict[str, Any]):
     with col2:
         st.markdown("**📈 成本vs Token关系**")
         
-        # 创建散点图
-        df_records = pd.DataFrame([
+        # 创建散点图（每个点为一次会话在某个模型上的用量）
+        session_rollups = config_manager.get_usage_rollups(
+            days, group_by=('provider', 'model_name', 'session_id'))
+        df_sessions = pd.DataFrame([
             {
-                'total_tokens': record.input_tokens + record.output_tokens,
-                'cost': record.cost,
-                'provider': record.provider,
-                'model': record.model_name
+                'total_tokens': row['input_tokens'] + row['output_tokens'],
+                'cost': row['cost'],
+                'provider': row['provider'],
+                'model': row['model_name'],
+                'requests': row['requests']
             }
-            for record in records
+            for row in session_rollups
         ])
         
-        if not df_records.empty:
+        if not df_sessions.empty:
             fig_scatter = px.scatter(
-                df_records,
+                df_sessions,
                 x='total_tokens',
                 y='cost',
                 color='provider',
-                hover_data=['model'],
-                title="成本与Token使用量关系",
+                hover_data=['model', 'requests'],
+                title="各会话成本与Token使用量关系",
                 labels={'total_tokens': 'Token总数', 'cost': '成本(¥)'}
             )
             st.plotly_chart(fig_scatter, use_container_width=True)
@@ -262,31 +265,24 @@ def render_provider_statistics(stats: Dict[str, Any]):
         )
         st.plotly_chart(fig_requests, use_container_width=True)
 
-def render_cost_trends(records: List[UsageRecord]):
+def render_cost_trends(days: int):
     """渲染成本趋势图"""
     st.markdown("**📈 成本趋势分析**")
     
-    # 按日期聚合数据
-    df_records = pd.DataFrame([
+    # 读取按天汇总
+    daily_stats = pd.DataFrame([
         {
-            'date': datetime.fromisoformat(record.timestamp).date(),
-            'cost': record.cost,
-            'tokens': record.input_tokens + record.output_tokens,
-            'provider': record.provider
+            'date': row['bucket'].date(),
+            'cost': row['cost'],
+            'tokens': row['input_tokens'] + row['output_tokens']
         }
-        for record in records
+        for row in config_manager.get_usage_rollups(days, 'day', group_by=('bucket',))
     ])
     
-    if df_records.empty:
+    if daily_stats.empty:
         st.info("暂无趋势数据")
         return
     
-    # 按日期聚合
-    daily_stats = df_records.groupby('date').agg({
-        'cost': 'sum',
-        'tokens': 'sum'
-    }).reset_index()
-    
     # 创建双轴图表
     fig = make_subplots(
         specs=[[{"secondary_y": True}]],
@@ -325,14 +321,28 @@ def render_cost_trends(records: List[UsageRecord]):
     fig.update_layout(height=400)
     st.plotly_chart(fig, use_container_width=True)
 
-def render_detailed_records_table(records: List[UsageRecord]):
-    """渲染详细记录表"""
+def render_detailed_records_table(days: int, page_size: int = 20):
+    """渲染详细记录表（服务端分页，只加载当前页）"""
     st.markdown("**📋 详细使用记录**")
     
-    if not records:
+    # 当前页号来自上一次渲染的分页控件，记录和总数一次查询取回
+    page = int(st.session_state.get('token_records_page', 1))
+    records, total_records = config_manager.get_usage_records_page(days, page=page, page_size=page_size)
+    if total_records == 0:
         st.info("暂无详细记录")
         return
     
+    # 分页显示
+    total_pages = (total_records + page_size - 1) // page_size
+    if page > total_pages:
+        # 统计窗口缩小后页号超出范围时回到最后一页
+        page = total_pages
+        records, total_records = config_manager.get_usage_records_page(days, page=page, page_size=page_size)
+        st.session_state['token_records_page'] = page
+    if total_pages > 1:
+        st.number_input(f"页面 (共{total_pages}页, {total_records}条记录)",
+                        min_value=1, max_value=total_pages, step=1, key='token_records_page')
+    
     # 创建记录表格
     records_df = pd.DataFrame([
         {
@@ -346,55 +356,22 @@ def render_detailed_records_table(records: List[UsageRecord]):
             '会话ID': record.session_id[:12] + '...' if len(record.session_id) > 12 else record.session_id,
             '分析类型': record.analysis_type
         }
-        for record in sorted(records, key=lambda x: x.timestamp, reverse=True)
+        for record in records
     ])
     
-    # 分页显示
-    page_size = 20
-    total_records = len(records_df)
-    total_pages = (total_records + page_size - 1) // page_size
-    
-    if total_pages > 1:
-        page = st.selectbox(f"页面 (共{total_pages}页, {total_records}条记录)", range(1, total_pages + 1))
-        start_idx = (page - 1) * page_size
-        end_idx = min(start_idx + page_size, total_records)
-        display_df = records_df.iloc[start_idx:end_idx]
-    else:
-        display_df = records_df
-    
-    st.dataframe(display_df, use_container_width=True)
-
-def load_detailed_records(days: int) -> List[UsageRecord]:
-    """加载详细记录"""
-    try:
-        all_records = config_manager.load_usage_records()
-        
-        # 过滤时间范围
-        cutoff_date = datetime.now() - timedelta(days=days)
-        filtered_records = []
-        
-        for record in all_records:
-            try:
-                record_date = datetime.fromisoformat(record.timestamp)
-                if record_date >= cutoff_date:
-                    filtered_records.append(record)
-            except:
-                continue
-        
-        return filtered_records
-    except Exception as e:
-        st.error(f"加载记录失败: {e}")
-        return []
+    st.dataframe(records_df, use_container_width=True)
 
 def export_statistics_data(days: int):
     """导出统计数据"""
     try:
         stats = config_manager.get_usage_statistics(days)
-        records = load_detailed_records(days)
+        records, _ = config_manager.get_usage_records_page(days, page=1, page_size=EXPORT_MAX_RECORDS)
+        daily_rollups = config_manager.get_usage_rollups(days, 'day')
         
         # 创建导出数据
         export_data = {
             'summary': stats,
+            'daily_rollups': [dict(row, bucket=row['bucket'].isoformat()) for row in daily_rollups],
             'detailed_records': [
                 {
                     'timestamp': record.timestamp,
@@ -5,6 +5,7 @@
 import sys
 import os
 import uuid
+from contextlib import nullcontext
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
@@ -22,6 +23,7 @@ load_dotenv(project_root / ".env", override=True)
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import setup_web_logging
+from tradingagents.utils.token_stream import token_stream
 logger = setup_web_logging()
 
 # 添加配置管理器
@@ -97,7 +99,8 @@ def extract_risk_assessment(state):
         logger.info(f"提取风险评估数据时出错: {e}")
         return None
 
-def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, llm_provider, llm_model, market_type="美股", progress_callback=None):
+def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, llm_provider, llm_model, market_type="美股", progress_callback=None,
+                       stream_callback=None):
     """执行股票分析
 
     Args:
@@ -108,6 +111,7 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
         llm_provider: LLM提供商 (dashscope/deepseek/google)
         llm_model: 大模型名称
         progress_callback: 进度回调函数，用于更新UI状态
+        stream_callback: 流式输出回调函数，接收智能体节点正在生成的报告（StreamEvent）
     """
 
     def update_progress(message, step=None, total_steps=None):
@@ -443,7 +447,11 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
         logger.debug(f"🔍 [RUNNER DEBUG]   symbol: '{formatted_symbol}'")
         logger.debug(f"🔍 [RUNNER DEBUG]   date: '{analysis_date}'")
 
-        state, decision = graph.propagate(formatted_symbol, analysis_date)
+        # 传入数据预获取阶段的运行上下文，分析师工具直接复用已获取的数据
+        # 注册了流式回调时，智能体生成报告的过程实时推送给界面
+        with token_stream(stream_callback) if stream_callback else nullcontext():
+            state, decision = graph.propagate(formatted_symbol, analysis_date,
+                                              data_context=preparation_result.data_context)
 
         # 调试信息
         logger.debug(f"🔍 [DEBUG] 分析完成，decision类型: {type(decision)}")
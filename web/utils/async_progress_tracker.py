@@ -45,6 +45,10 @@ def safe_serialize(obj):
 
 class AsyncProgressTracker:
     """异步进度跟踪器"""
+
+    # 流式报告预览保留的字符数和最小保存间隔（秒）
+    STREAM_PREVIEW_CHARS = 3000
+    STREAM_SAVE_INTERVAL = 1.0
     
     def __init__(self, analysis_id: str, analysts: List[str], research_depth: int, llm_provider: str):
         self.analysis_id = analysis_id
@@ -52,6 +56,7 @@ class AsyncProgressTracker:
         self.research_depth = research_depth
         self.llm_provider = llm_provider
         self.start_time = time.time()
+        self._last_stream_save = 0.0
         
         # 生成分析步骤
         self.analysis_steps = self._generate_dynamic_steps()
@@ -474,6 +479,29 @@ class AsyncProgressTracker:
 
         return remaining
     
+    def update_stream(self, event):
+        """
+        记录智能体正在流式生成的报告（token_stream 回调）
+
+        只保存最近的部分文本供进度页面预览；为避免频繁写入Redis/文件，
+        每 STREAM_SAVE_INTERVAL 秒最多保存一次，节点输出完成时立即保存。
+        """
+        now = time.time()
+        text = event.text
+        if len(text) > self.STREAM_PREVIEW_CHARS:
+            text = "……" + text[-self.STREAM_PREVIEW_CHARS:]
+        self.progress_data['streaming'] = {
+            'node': event.node,
+            'section': event.section,
+            'text': text,
+            'done': event.done,
+            'updated_at': now,
+        }
+        if event.done or now - self._last_stream_save >= self.STREAM_SAVE_INTERVAL:
+            self._last_stream_save = now
+            self.progress_data['last_update'] = now
+            self._save_progress()
+
     def _save_progress(self):
         """保存进度到存储"""
         try: